@@ -3,12 +3,31 @@ Alert Management Module
 
 Handles threshold-based alerting and notification system.
 Supports multiple severity levels and notification channels.
+
+Triggering an alert only enqueues it: a dispatcher thread writes queued
+alerts to the database in batches and fans them out to notification
+channels concurrently, so monitoring threads never wait on the disk or
+on a slow notification endpoint.
+
+Each delivery attempt is abandoned after its channel's timeout, whether
+or not the channel honors it, and failed attempts are retried from a
+timer thread, so neither a hung channel nor a backoff delay holds a
+notifier worker.
 """
 
+import heapq
+import itertools
+import queue
+import threading
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+from .channels import NotificationChannel, create_channels
+from .dedup import DedupCache
 from ..database.db_manager import DatabaseManager
+from ..database.models import Alert
 
 
 class AlertManager:
@@ -21,48 +40,120 @@ class AlertManager:
     
     SEVERITY_LEVELS = ["INFO", "WARNING", "CRITICAL"]
     
-    def __init__(self, config):
+    def __init__(
+        self,
+        config,
+        db_manager: Optional[DatabaseManager] = None,
+        channels: Optional[List[NotificationChannel]] = None
+    ):
         """
-        Initialize alert manager.
+        Initialize alert manager and start the dispatcher thread.
         
         Args:
             config: Configuration manager instance
+            db_manager: Shared database manager (opened from
+                database.path if omitted)
+            channels: Notification channels (built from alerts.channels
+                if omitted)
         """
         self.logger = logging.getLogger(__name__)
         self.config = config
         
-        # Get database path with default fallback
-        db_path = config.get("database.path", "data/metrics.db")
-        self.db_manager = DatabaseManager(db_path)
+        if db_manager is None:
+            # Get database path with default fallback
+            db_manager = DatabaseManager(config.get("database.path", "data/metrics.db"))
+        self.db_manager = db_manager
+        
+        # Alert tracking to prevent spam (5 minutes between duplicate alerts)
+        self.cooldown_seconds = config.get("alerts.cooldown_seconds", 300)
+        self.dedup = DedupCache(
+            ttl_seconds=self.cooldown_seconds,
+            max_entries=config.get("alerts.dedup_max_entries", 10000)
+        )
+        
+        # Dispatch pipeline
+        self.channels = channels if channels is not None else create_channels(
+            config.get("alerts.channels")
+        )
+        self.batch_size = config.get("alerts.batch_size", 100)
+        self.retry_backoff = config.get("alerts.retry_backoff", 1.0)
+        self._queue: queue.Queue = queue.Queue(maxsize=config.get("alerts.queue_size", 10000))
+        self._notifier = ThreadPoolExecutor(
+            max_workers=config.get("alerts.notification_workers", 4),
+            thread_name_prefix="AlertNotifier"
+        )
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "queued": 0,
+            "dropped": 0,
+            "written": 0,
+            "write_failures": 0,
+            "notified": 0,
+            "notification_failures": 0,
+            "notification_timeouts": 0,
+        }
+        
+        # Retries waiting for their backoff: heap of (due, order, (channel, alert, attempt))
+        self._retries: List[Tuple[float, int, tuple]] = []
+        self._retry_order = itertools.count()
+        self._retry_cond = threading.Condition()
+        self._retry_stop = False
+        # Deliveries submitted and not yet notified or given up
+        self._deliveries = 0
+        self._retry_thread = threading.Thread(
+            target=self._run_retries, daemon=True, name="AlertRetry"
+        )
+        self._retry_thread.start()
         
-        # Alert tracking to prevent spam
-        self.recent_alerts = {}
-        self.cooldown_seconds = 300  # 5 minutes between duplicate alerts
+        self._dispatcher = threading.Thread(
+            target=self._run, daemon=True, name="AlertDispatcher"
+        )
+        self._dispatcher.start()
         
         self.logger.info("AlertManager initialized")
     
-    def trigger_alert(self, severity: str, message: str, target: Optional[str] = None):
+    def trigger_alert(
+        self,
+        severity: str,
+        message: str,
+        target: Optional[str] = None,
+        metric: Optional[str] = None
+    ):
         """
         Trigger an alert.
         
+        Repeated alerts for the same (target, metric, severity) are
+        suppressed for cooldown_seconds; alerts without a target and
+        metric are deduplicated on their message.
+        
         Args:
             severity: Alert severity (INFO, WARNING, CRITICAL)
             message: Alert message
             target: Optional target identifier
+            metric: Optional metric the alert is about (e.g. "latency")
         """
         if severity not in self.SEVERITY_LEVELS:
             self.logger.error(f"Invalid severity level: {severity}")
             return
         
         # Check if this is a duplicate recent alert
-        alert_key = f"{severity}:{message}"
-        if self._is_duplicate_alert(alert_key):
+        if target is not None and metric is not None:
+            alert_key = (target, metric, severity)
+        else:
+            alert_key = (target, message, severity)
+        if not self.dedup.check_and_record(alert_key):
             self.logger.debug(f"Suppressing duplicate alert: {alert_key}")
             return
         
-        # Record alert
+        # Hand the alert to the dispatcher without blocking
         timestamp = datetime.now()
-        self.db_manager.insert_alert(timestamp, severity, message)
+        alert = Alert(None, timestamp, severity, message, target=target)
+        try:
+            self._queue.put_nowait(alert)
+            self._count("queued")
+        except queue.Full:
+            self._count("dropped")
+            self.logger.error(f"Alert queue full, dropping alert: {message}")
         
         # Log alert
         log_func = {
@@ -71,43 +162,195 @@ class AlertManager:
             "CRITICAL": self.logger.critical
         }
         log_func[severity](f"ALERT [{severity}]: {message}")
+    
+    def _count(self, name: str, amount: int = 1):
+        """Increment a pipeline counter."""
+        with self._stats_lock:
+            self._stats[name] += amount
+    
+    def _run(self):
+        """Dispatcher loop: persist queued alerts in batches, then notify."""
+        stopping = False
+        while not stopping:
+            alert = self._queue.get()
+            if alert is None:
+                self._queue.task_done()
+                return
+            
+            batch = [alert]
+            while len(batch) < self.batch_size:
+                try:
+                    alert = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if alert is None:
+                    # Stop after dispatching this batch
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(alert)
+            
+            try:
+                if self.db_manager.insert_alerts(batch):
+                    self._count("written", len(batch))
+                else:
+                    self._count("write_failures", len(batch))
+                
+                for alert in batch:
+                    for channel in self.channels:
+                        if channel.accepts(alert):
+                            with self._retry_cond:
+                                self._deliveries += 1
+                            self._notifier.submit(self._deliver, channel, alert)
+            except Exception as e:
+                self.logger.error(f"Alert dispatch failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def _deliver(self, channel: NotificationChannel, alert: Alert, attempt: int = 0):
+        """
+        Make one delivery attempt and schedule a retry if it fails.
         
-        # Update recent alerts tracking
-        self.recent_alerts[alert_key] = timestamp
+        Retries back off exponentially on the retry timer instead of
+        sleeping in the notifier pool.
         
-        # Send notifications based on severity
-        if severity == "CRITICAL":
-            self._send_critical_notification(message, target)
+        Args:
+            channel: Notification channel
+            alert: Alert to deliver
+            attempt: Attempts already made
+        """
+        error = self._attempt(channel, alert)
+        if error is None:
+            self._count("notified")
+            self._finish_delivery()
+            return
+        
+        self.logger.warning(
+            f"Notification via {channel.name} failed "
+            f"(attempt {attempt + 1}/{channel.retries + 1}): {error}"
+        )
+        if attempt < channel.retries:
+            due = time.monotonic() + self.retry_backoff * 2 ** attempt
+            with self._retry_cond:
+                if not self._retry_stop:
+                    heapq.heappush(
+                        self._retries, (due, next(self._retry_order), (channel, alert, attempt + 1))
+                    )
+                    self._retry_cond.notify_all()
+                    return
+        
+        self._count("notification_failures")
+        self._finish_delivery()
     
-    def _is_duplicate_alert(self, alert_key: str) -> bool:
+    def _attempt(self, channel: NotificationChannel, alert: Alert) -> Optional[Exception]:
         """
-        Check if alert is a duplicate within cooldown period.
+        Call channel.send with a deadline of channel.timeout seconds.
+        
+        The send runs in its own daemon thread; one that overruns the
+        deadline is abandoned (it cannot be interrupted) and counted as a
+        failed attempt.
         
         Args:
-            alert_key: Unique alert identifier
-            
+            channel: Notification channel
+            alert: Alert to deliver
+        
         Returns:
-            True if duplicate, False otherwise
+            None on success, otherwise the exception of the failed attempt
         """
-        if alert_key not in self.recent_alerts:
-            return False
+        outcome = []
         
-        last_alert = self.recent_alerts[alert_key]
-        time_diff = (datetime.now() - last_alert).total_seconds()
+        def send():
+            try:
+                channel.send(alert)
+                outcome.append(None)
+            except Exception as e:
+                outcome.append(e)
         
-        return time_diff < self.cooldown_seconds
+        sender = threading.Thread(target=send, daemon=True, name=f"AlertSend-{channel.name}")
+        sender.start()
+        sender.join(channel.timeout)
+        if not outcome:
+            self._count("notification_timeouts")
+            return TimeoutError(f"no response within {channel.timeout}s")
+        return outcome[0]
+    
+    def _finish_delivery(self):
+        """Account for a delivery that was notified or given up."""
+        with self._retry_cond:
+            self._deliveries -= 1
+            self._retry_cond.notify_all()
+    
+    def _run_retries(self):
+        """Retry timer loop: hand retries back to the notifier pool when due."""
+        with self._retry_cond:
+            while not self._retry_stop:
+                now = time.monotonic()
+                while self._retries and self._retries[0][0] <= now:
+                    _, _, args = heapq.heappop(self._retries)
+                    self._notifier.submit(self._deliver, *args)
+                wait = self._retries[0][0] - now if self._retries else None
+                self._retry_cond.wait(wait)
     
-    def _send_critical_notification(self, message: str, target: Optional[str]):
+    def flush(self, timeout: Optional[float] = None) -> bool:
         """
-        Send notification for critical alerts.
+        Wait until every queued alert has been written to the database.
         
         Args:
-            message: Alert message
-            target: Target identifier
+            timeout: Maximum seconds to wait (None waits indefinitely)
+        
+        Returns:
+            True if the queue drained, False on timeout
         """
-        # Implementation would include email/webhook notifications
-        # For now, just enhanced logging
-        self.logger.critical(
-            f"CRITICAL ALERT NOTIFICATION: {message}"
-            + (f" [Target: {target}]" if target else "")
-        )
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+    
+    def stats(self) -> Dict:
+        """
+        Get alert pipeline counters.
+        
+        Returns:
+            Dictionary of queued/dropped/written/suppressed alerts and
+            notification results, plus queue and dedup cache sizes
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["pending"] = self._queue.qsize()
+        stats["suppressed"] = self.dedup.suppressed
+        stats["dedup_entries"] = len(self.dedup)
+        return stats
+    
+    def close(self, timeout: float = 10.0):
+        """
+        Drain the queue, stop the dispatcher and finish notifications.
+        
+        Deliveries still retrying when the timeout expires are given up.
+        
+        Args:
+            timeout: Maximum seconds to wait for queued alerts, and then
+                for notification retries
+        """
+        self.flush(timeout)
+        self._queue.put(None)
+        self._dispatcher.join(timeout)
+        
+        deadline = time.monotonic() + timeout
+        with self._retry_cond:
+            while self._deliveries and time.monotonic() < deadline:
+                self._retry_cond.wait(deadline - time.monotonic())
+            self._retry_stop = True
+            abandoned = len(self._retries)
+            self._retries.clear()
+            self._deliveries -= abandoned
+            self._retry_cond.notify_all()
+        if abandoned:
+            self._count("notification_failures", abandoned)
+            self.logger.warning(f"Gave up {abandoned} notification retries on close")
+        self._retry_thread.join(timeout)
+        self._notifier.shutdown(wait=True)
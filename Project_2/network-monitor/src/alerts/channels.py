@@ -0,0 +1,134 @@
+"""
+Notification Channels Module
+
+Destinations alerts are delivered to. Each channel exposes a blocking
+send(); the alert dispatcher calls channels concurrently, abandons an
+attempt that runs past the channel's timeout and retries it later, so a
+slow channel never delays the others. Channels should still pass their
+timeout to blocking calls (as WebhookChannel does), since an abandoned
+send keeps its thread until it returns.
+"""
+
+import json
+import logging
+import urllib.request
+from typing import Dict, List, Optional
+
+from ..database.models import Alert
+
+
+SEVERITY_RANK = {"INFO": 0, "WARNING": 1, "CRITICAL": 2}
+
+
+class NotificationChannel:
+    """
+    Base class for notification channels.
+    
+    Attributes:
+        name: Channel name used in logs
+        min_severity: Lowest severity delivered to this channel
+        timeout: Seconds allowed for one delivery attempt
+        retries: Additional attempts after a failure
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        min_severity: str = "CRITICAL",
+        timeout: float = 5.0,
+        retries: int = 2
+    ):
+        """
+        Initialize the channel.
+        
+        Args:
+            name: Channel name used in logs
+            min_severity: Lowest severity delivered to this channel
+            timeout: Seconds allowed for one delivery attempt
+            retries: Additional attempts after a failure
+        """
+        self.name = name
+        self.min_severity = min_severity
+        self.timeout = timeout
+        self.retries = retries
+    
+    def accepts(self, alert: Alert) -> bool:
+        """Return True if the alert is severe enough for this channel."""
+        return SEVERITY_RANK.get(alert.severity, 0) >= SEVERITY_RANK.get(self.min_severity, 0)
+    
+    def send(self, alert: Alert):
+        """
+        Deliver one alert (may block; raise on failure).
+        
+        Args:
+            alert: Alert to deliver
+        """
+        raise NotImplementedError
+
+
+class LogChannel(NotificationChannel):
+    """Writes a notification line to the application log."""
+    
+    def __init__(self, name: str = "log", **kwargs):
+        super().__init__(name, **kwargs)
+        self.logger = logging.getLogger(__name__)
+    
+    def send(self, alert: Alert):
+        self.logger.critical(
+            f"{alert.severity} ALERT NOTIFICATION: {alert.message}"
+            + (f" [Target: {alert.target}]" if alert.target else "")
+        )
+
+
+class WebhookChannel(NotificationChannel):
+    """Posts alerts as JSON to an HTTP endpoint."""
+    
+    def __init__(self, url: str, name: str = "webhook", **kwargs):
+        super().__init__(name, **kwargs)
+        self.url = url
+    
+    def send(self, alert: Alert):
+        payload = json.dumps({
+            "timestamp": alert.timestamp.isoformat(),
+            "severity": alert.severity,
+            "message": alert.message,
+            "target": alert.target,
+        }).encode()
+        request = urllib.request.Request(
+            self.url,
+            data=payload,
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def create_channels(configs: Optional[List[Dict]]) -> List[NotificationChannel]:
+    """
+    Build notification channels from configuration.
+    
+    Args:
+        configs: List of channel settings ({"type": "log" | "webhook", ...});
+            None gives the default critical-alert log channel
+    
+    Returns:
+        List of channels
+    
+    Raises:
+        ValueError: If a channel type is unknown
+    """
+    if configs is None:
+        return [LogChannel()]
+    
+    channels = []
+    for config in configs:
+        settings = dict(config)
+        kind = settings.pop("type", "log")
+        if kind == "log":
+            channels.append(LogChannel(**settings))
+        elif kind == "webhook":
+            channels.append(WebhookChannel(**settings))
+        else:
+            raise ValueError(f"Unknown notification channel type: {kind}")
+    return channels
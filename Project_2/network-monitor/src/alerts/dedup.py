@@ -0,0 +1,87 @@
+"""
+Alert Deduplication Module
+
+Thread-safe, size-bounded cache of recently raised alerts. An alert key
+is suppressed for a cooldown period after it was last raised; expired
+keys are evicted as time passes, so memory stays flat regardless of
+uptime.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class DedupCache:
+    """
+    Cooldown tracker for alert keys.
+    
+    All entries share the same TTL, so insertion order is expiry order:
+    the ordered dict acts as an expiry queue whose front is always the
+    next entry to expire. Eviction of expired entries and of the oldest
+    entries beyond max_entries is amortized O(1) per call.
+    """
+    
+    def __init__(
+        self,
+        ttl_seconds: float = 300,
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            ttl_seconds: Cooldown during which a key is suppressed
+            max_entries: Maximum number of tracked keys
+            clock: Monotonic time source (seconds)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self._expiry: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.suppressed = 0
+        self.evicted = 0
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._expiry)
+    
+    def check_and_record(self, key: Hashable) -> bool:
+        """
+        Record an alert key unless it is still cooling down.
+        
+        Args:
+            key: Alert identity, e.g. (target, metric, severity)
+        
+        Returns:
+            True if the alert should be raised, False if it is a duplicate
+        """
+        now = self.clock()
+        with self._lock:
+            self._expire(now)
+            
+            if key in self._expiry:
+                self.suppressed += 1
+                return False
+            
+            self._expiry[key] = now + self.ttl_seconds
+            while len(self._expiry) > self.max_entries:
+                self._expiry.popitem(last=False)
+                self.evicted += 1
+            return True
+    
+    def _expire(self, now: float):
+        """Drop entries whose cooldown has ended (lock held)."""
+        while self._expiry:
+            key, expiry = next(iter(self._expiry.items()))
+            if expiry > now:
+                break
+            del self._expiry[key]
+    
+    def clear(self):
+        """Forget all keys."""
+        with self._lock:
+            self._expiry.clear()
@@ -0,0 +1,281 @@
+"""
+Threshold Rule Engine Module
+
+Compiles the thresholds section of the configuration into flat rule
+objects once, so each NetworkMetrics sample is checked in a single pass
+without configuration lookups. Supported rules:
+
+- Warning/critical thresholds per metric, with per-target overrides
+- Hysteresis: an active level only clears once the value falls a
+  fraction below its threshold
+- N-of-M: a level fires only if it was breached in N of the last M
+  samples
+- Rate of change: a metric rising by more than a limit between two
+  consecutive samples
+"""
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Dict, List, Optional, Tuple
+
+
+# metric name -> (NetworkMetrics attribute, label, unit)
+METRICS = {
+    "latency": ("latency_ms", "Latency", "ms"),
+    "packet_loss": ("packet_loss_pct", "Packet loss", "%"),
+    "jitter": ("jitter_ms", "Jitter", "ms"),
+}
+
+# Defaults applied when the configuration omits a threshold
+DEFAULT_THRESHOLDS = {
+    "latency_warning": 100,
+    "latency_critical": 200,
+    "packet_loss_warning": 1.0,
+    "packet_loss_critical": 5.0,
+}
+
+# Breach levels, lowest first (index = level number)
+LEVELS = (None, "WARNING", "CRITICAL")
+
+
+@dataclass
+class AlertEvent:
+    """
+    Alert produced by a rule.
+    
+    Attributes:
+        severity: Alert severity
+        metric: Metric the alert is about
+        message: Alert message
+    """
+    severity: str
+    metric: str
+    message: str
+
+
+class ThresholdRule:
+    """
+    Warning/critical threshold on one metric with hysteresis and N-of-M.
+    """
+    
+    def __init__(
+        self,
+        metric: str,
+        warning: Optional[float],
+        critical: Optional[float],
+        hysteresis: float = 0.0,
+        breaches: int = 1,
+        window: int = 1
+    ):
+        """
+        Compile a threshold rule.
+        
+        Args:
+            metric: Metric name (key of METRICS)
+            warning: Warning threshold (None disables the level)
+            critical: Critical threshold (None disables the level)
+            hysteresis: Fraction below a threshold an active level must
+                fall before it clears
+            breaches: Breaches (N) required within the window
+            window: Most recent samples (M) considered
+        """
+        attribute, self.label, self.unit = METRICS[metric]
+        self.metric = metric
+        self.value_of = attrgetter(attribute)
+        # (level, threshold, clear level), highest level first
+        self.levels: Tuple[Tuple[int, float, float], ...] = tuple(
+            (level, threshold, threshold * (1 - hysteresis))
+            for level, threshold in ((2, critical), (1, warning))
+            if threshold is not None
+        )
+        self.breaches = breaches
+        self.window = max(window, breaches)
+    
+    def new_state(self) -> list:
+        """Per-target state: [active level, recent levels]."""
+        return [0, deque(maxlen=self.window)]
+    
+    def evaluate(self, metrics, state: list) -> Optional[AlertEvent]:
+        """
+        Check one sample.
+        
+        Args:
+            metrics: NetworkMetrics sample
+            state: State from new_state() for the sample's target
+        
+        Returns:
+            AlertEvent if a level fires, otherwise None
+        """
+        value = self.value_of(metrics)
+        if value is None:
+            # Not measured in this sample (e.g. latency when nothing replied)
+            return None
+        active, history = state
+        
+        level = 0
+        for candidate, threshold, clear in self.levels:
+            if value >= (clear if candidate <= active else threshold):
+                level = candidate
+                break
+        state[0] = level
+        history.append(level)
+        
+        for candidate, threshold, _ in self.levels:
+            if sum(1 for seen in history if seen >= candidate) >= self.breaches:
+                severity = LEVELS[candidate]
+                return AlertEvent(
+                    severity,
+                    self.metric,
+                    f"{metrics.target}: {self.label} {value:.2f}{self.unit} "
+                    f"exceeds {severity.lower()} threshold"
+                )
+        return None
+
+
+class RateOfChangeRule:
+    """Alert when a metric rises by more than a limit between samples."""
+    
+    def __init__(self, metric: str, max_increase: float, severity: str = "WARNING"):
+        """
+        Compile a rate-of-change rule.
+        
+        Args:
+            metric: Metric name (key of METRICS)
+            max_increase: Largest allowed rise between consecutive samples
+            severity: Severity of the resulting alert
+        """
+        attribute, self.label, self.unit = METRICS[metric]
+        self.metric = metric
+        self.value_of = attrgetter(attribute)
+        self.max_increase = max_increase
+        self.severity = severity
+    
+    def new_state(self) -> list:
+        """Per-target state: [previous value]."""
+        return [None]
+    
+    def evaluate(self, metrics, state: list) -> Optional[AlertEvent]:
+        """
+        Check one sample.
+        
+        Args:
+            metrics: NetworkMetrics sample
+            state: State from new_state() for the sample's target
+        
+        Returns:
+            AlertEvent if the metric rose too fast, otherwise None
+        """
+        value = self.value_of(metrics)
+        if value is None:
+            return None
+        previous, state[0] = state[0], value
+        if previous is None or value - previous <= self.max_increase:
+            return None
+        return AlertEvent(
+            self.severity,
+            f"{self.metric}_rate",
+            f"{metrics.target}: {self.label} rose {value - previous:.2f}{self.unit} "
+            f"to {value:.2f}{self.unit} since the previous sample"
+        )
+
+
+class RuleEngine:
+    """
+    Evaluates compiled threshold rules against metric samples.
+    
+    Rules are compiled once per target (applying that target's overrides)
+    on first use; evaluation touches only the compiled rules and the
+    target's own state.
+    """
+    
+    def __init__(self, thresholds: Optional[Dict] = None):
+        """
+        Initialize the engine.
+        
+        Args:
+            thresholds: The "thresholds" configuration section
+        """
+        thresholds = dict(thresholds or {})
+        self.overrides: Dict[str, Dict] = thresholds.pop("overrides", None) or {}
+        self.defaults = {**DEFAULT_THRESHOLDS, **thresholds}
+        self._compiled: Dict[str, Tuple[list, list]] = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config) -> "RuleEngine":
+        """
+        Build an engine from a configuration manager.
+        
+        Args:
+            config: Configuration manager instance
+        
+        Returns:
+            RuleEngine instance
+        """
+        return cls(config.get("thresholds", {}))
+    
+    def compile(self, settings: Dict) -> list:
+        """
+        Compile threshold settings into rules.
+        
+        Args:
+            settings: Flat thresholds (e.g. latency_warning, consecutive,
+                hysteresis, rate_of_change)
+        
+        Returns:
+            List of rule objects
+        """
+        consecutive = settings.get("consecutive") or {}
+        breaches = consecutive.get("breaches", 1)
+        window = consecutive.get("window", breaches)
+        hysteresis = settings.get("hysteresis", 0.0)
+        
+        rules = []
+        for metric in METRICS:
+            warning = settings.get(f"{metric}_warning")
+            critical = settings.get(f"{metric}_critical")
+            if warning is not None or critical is not None:
+                rules.append(ThresholdRule(metric, warning, critical, hysteresis, breaches, window))
+        
+        for metric, max_increase in (settings.get("rate_of_change") or {}).items():
+            rules.append(RateOfChangeRule(metric, max_increase))
+        return rules
+    
+    def _rules_for(self, target: str) -> Tuple[list, list]:
+        """Compiled rules and their state for a target."""
+        compiled = self._compiled.get(target)
+        if compiled is None:
+            with self._lock:
+                compiled = self._compiled.get(target)
+                if compiled is None:
+                    rules = self.compile({**self.defaults, **self.overrides.get(target, {})})
+                    compiled = (rules, [rule.new_state() for rule in rules])
+                    self._compiled[target] = compiled
+        return compiled
+    
+    def evaluate(self, metrics) -> List[AlertEvent]:
+        """
+        Check one sample against all rules of its target.
+        
+        Samples of one target must not be evaluated concurrently.
+        
+        Args:
+            metrics: NetworkMetrics sample
+        
+        Returns:
+            Alerts raised by this sample
+        """
+        rules, states = self._rules_for(metrics.target)
+        events = []
+        for rule, state in zip(rules, states):
+            event = rule.evaluate(metrics, state)
+            if event is not None:
+                events.append(event)
+        return events
+    
+    def forget(self, target: str):
+        """Drop the compiled rules and state of a target."""
+        with self._lock:
+            self._compiled.pop(target, None)
@@ -0,0 +1,218 @@
+"""
+Fleet Anomaly Detection Module
+
+Vectorized latency analysis across all monitored targets. Latest
+latencies of every target are kept in one (targets x window) NumPy
+array, and baselines, standard deviation thresholds, EWMA and trend are
+computed for the whole fleet in a single pass per tick.
+"""
+
+import logging
+import threading
+import warnings
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional
+
+import numpy as np
+
+
+# Trend codes reported per target
+TREND_DECREASING = -1
+TREND_STABLE = 0
+TREND_INCREASING = 1
+
+
+@dataclass
+class FleetAnalysis:
+    """
+    Result of one fleet analysis tick (one entry per target).
+    
+    Attributes:
+        targets: Target names, in row order
+        latest: Latency of this tick (NaN if the target had no sample)
+        baseline: Median of the window before this tick
+        stddev: Standard deviation of the window before this tick
+        threshold: Anomaly threshold (baseline + multiplier * stddev)
+        ewma: Exponentially weighted moving average including this tick
+        trend: TREND_INCREASING, TREND_DECREASING or TREND_STABLE
+        anomalous: Boolean mask of targets whose latest latency is anomalous
+    """
+    targets: List[str]
+    latest: np.ndarray
+    baseline: np.ndarray
+    stddev: np.ndarray
+    threshold: np.ndarray
+    ewma: np.ndarray
+    trend: np.ndarray
+    anomalous: np.ndarray
+    
+    def anomalous_targets(self) -> List[str]:
+        """Names of the targets flagged in this tick."""
+        return [self.targets[i] for i in np.flatnonzero(self.anomalous)]
+
+
+class FleetLatencyAnalyzer:
+    """
+    Analyzes latency of many targets at once.
+    
+    Each call to step() appends one column (one latency per target, NaN
+    where a target produced no sample) to a ring buffer and evaluates
+    every target against the window preceding it. Targets may be added
+    or removed from other threads while ticks run.
+    """
+    
+    def __init__(
+        self,
+        targets: List[str],
+        window: int = 100,
+        threshold_multiplier: float = 2.0,
+        min_stddev_ms: float = 1.0,
+        min_samples: int = 10,
+        ewma_alpha: float = 0.3,
+        trend_window: int = 20,
+        trend_change_pct: float = 10.0
+    ):
+        """
+        Initialize the analyzer.
+        
+        Args:
+            targets: Target names (one row each)
+            window: Ticks of history kept per target
+            threshold_multiplier: Standard deviations above the baseline
+                that count as anomalous
+            min_stddev_ms: Lower bound on the standard deviation
+            min_samples: Samples required before a target is evaluated
+            ewma_alpha: Weight of the newest sample in the EWMA
+            trend_window: Most recent ticks compared for the trend
+            trend_change_pct: Change between halves of the trend window
+                that counts as increasing/decreasing
+        """
+        self.logger = logging.getLogger(__name__)
+        self.window = window
+        self.threshold_multiplier = threshold_multiplier
+        self.min_stddev_ms = min_stddev_ms
+        self.min_samples = min_samples
+        self.ewma_alpha = ewma_alpha
+        self.trend_window = min(trend_window, window)
+        self.trend_change_pct = trend_change_pct
+        
+        self.targets: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.values = np.full((0, window), np.nan)
+        self.ewma = np.full(0, np.nan)
+        self.ticks = 0
+        self._lock = threading.Lock()
+        
+        for name in targets:
+            self.add_target(name)
+    
+    def add_target(self, name: str):
+        """Add a target with an empty history."""
+        with self._lock:
+            if name in self.index:
+                return
+            self.index[name] = len(self.targets)
+            self.targets.append(name)
+            self.values = np.vstack([self.values, np.full((1, self.window), np.nan)])
+            self.ewma = np.append(self.ewma, np.nan)
+    
+    def remove_target(self, name: str):
+        """Drop a target and its history."""
+        with self._lock:
+            row = self.index.pop(name, None)
+            if row is None:
+                return
+            del self.targets[row]
+            self.values = np.delete(self.values, row, axis=0)
+            self.ewma = np.delete(self.ewma, row)
+            self.index = {target: i for i, target in enumerate(self.targets)}
+    
+    def to_vector(self, latencies: Mapping[str, Optional[float]]) -> np.ndarray:
+        """
+        Arrange per-target latencies in row order.
+        
+        Args:
+            latencies: Target name -> latency (missing or None becomes NaN)
+        
+        Returns:
+            Array with one latency per target
+        """
+        vector = np.full(len(self.targets), np.nan)
+        for name, latency in latencies.items():
+            row = self.index.get(name)
+            if row is not None and latency is not None:
+                vector[row] = latency
+        return vector
+    
+    def step(self, latest) -> FleetAnalysis:
+        """
+        Evaluate one tick and append it to the history.
+        
+        Args:
+            latest: Array of latencies in row order, or a mapping of
+                target name -> latency
+        
+        Returns:
+            FleetAnalysis for this tick
+        """
+        with self._lock:
+            if isinstance(latest, Mapping):
+                latest = self.to_vector(latest)
+            latest = np.asarray(latest, dtype=float)
+            
+            with warnings.catch_warnings():
+                # All-NaN rows (new or silent targets) are expected
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                
+                # Baseline from the window preceding this tick
+                counts = np.count_nonzero(~np.isnan(self.values), axis=1)
+                baseline = np.nanmedian(self.values, axis=1)
+                stddev = np.nanstd(self.values, axis=1, ddof=1)
+                threshold = baseline + self.threshold_multiplier * np.fmax(stddev, self.min_stddev_ms)
+                anomalous = (counts >= self.min_samples) & (latest > threshold)
+                
+                # Append this tick
+                self.values[:, self.ticks % self.window] = latest
+                self.ticks += 1
+                
+                has_sample = ~np.isnan(latest)
+                self.ewma = np.where(
+                    np.isnan(self.ewma),
+                    latest,
+                    np.where(
+                        has_sample,
+                        self.ewma_alpha * latest + (1 - self.ewma_alpha) * self.ewma,
+                        self.ewma
+                    )
+                )
+                
+                trend = self._trend()
+            
+            return FleetAnalysis(
+                targets=list(self.targets),
+                latest=latest,
+                baseline=baseline,
+                stddev=stddev,
+                threshold=threshold,
+                ewma=self.ewma.copy(),
+                trend=trend,
+                anomalous=anomalous
+            )
+    
+    def _trend(self) -> np.ndarray:
+        """Compare the two halves of the most recent trend window."""
+        trend = np.full(len(self.targets), TREND_STABLE)
+        if self.ticks < self.trend_window or self.trend_window < 2:
+            return trend
+        
+        # Column indices of the trend window, oldest first
+        columns = np.arange(self.ticks - self.trend_window, self.ticks) % self.window
+        recent = self.values[:, columns]
+        half = self.trend_window // 2
+        first = np.nanmean(recent[:, :half], axis=1)
+        second = np.nanmean(recent[:, half:], axis=1)
+        
+        change_pct = (second - first) / first * 100
+        trend[change_pct > self.trend_change_pct] = TREND_INCREASING
+        trend[change_pct < -self.trend_change_pct] = TREND_DECREASING
+        return trend
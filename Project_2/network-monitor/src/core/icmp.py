@@ -0,0 +1,458 @@
+"""
+Native ICMP Echo Module
+
+Implements in-process ICMP Echo Request/Reply probing using raw or
+unprivileged (SOCK_DGRAM) ICMP sockets. Avoids forking a ping process
+per sample and returns per-packet Round-Trip Times directly.
+
+On Linux the kernel receive timestamp (SO_TIMESTAMPNS) is used for the
+reply time, so scheduling delays in the interpreter do not inflate RTT.
+
+Reference: RFC 792 - Internet Control Message Protocol
+"""
+
+import asyncio
+import os
+import select
+import socket
+import struct
+import sys
+import threading
+import time
+import logging
+from typing import Dict, List, Optional
+
+
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+
+# Linux socket option values (not exported by the socket module)
+SO_TIMESTAMPNS = getattr(socket, "SO_TIMESTAMPNS", 35)
+SCM_TIMESTAMPNS = SO_TIMESTAMPNS
+
+# Payload: 8-byte send timestamp followed by padding (56 bytes like ping)
+PAYLOAD_SIZE = 56
+_HEADER = struct.Struct("!BBHHH")
+_TIMESPEC = struct.Struct("@ll")
+
+
+class ICMPUnavailableError(OSError):
+    """Raised when no ICMP socket can be opened on this system."""
+
+
+def checksum(data: bytes) -> int:
+    """
+    Calculate the Internet checksum of a packet.
+    
+    Args:
+        data: Packet bytes
+    
+    Returns:
+        16-bit one's complement checksum
+    """
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def build_echo_request(identifier: int, sequence: int, payload: bytes) -> bytes:
+    """
+    Build an ICMP Echo Request packet.
+    
+    Args:
+        identifier: ICMP identifier field
+        sequence: ICMP sequence number
+        payload: Packet payload
+    
+    Returns:
+        Encoded packet with checksum
+    """
+    header = _HEADER.pack(ICMP_ECHO_REQUEST, 0, 0, identifier, sequence)
+    csum = checksum(header + payload)
+    return _HEADER.pack(ICMP_ECHO_REQUEST, 0, csum, identifier, sequence) + payload
+
+
+def parse_echo_reply(packet: bytes, raw: bool) -> Optional[tuple]:
+    """
+    Parse an ICMP Echo Reply packet.
+    
+    Args:
+        packet: Received bytes
+        raw: Whether the packet includes the IP header (raw sockets)
+    
+    Returns:
+        Tuple of (identifier, sequence) or None if not an echo reply
+    """
+    offset = 0
+    if raw:
+        if len(packet) < 20:
+            return None
+        offset = (packet[0] & 0x0F) * 4
+    
+    if len(packet) < offset + _HEADER.size:
+        return None
+    
+    icmp_type, _, _, identifier, sequence = _HEADER.unpack_from(packet, offset)
+    if icmp_type != ICMP_ECHO_REPLY:
+        return None
+    
+    return identifier, sequence
+
+
+class ICMPProber:
+    """
+    Sends ICMP echo requests from within the process.
+    
+    Tries a raw socket first and falls back to an unprivileged
+    datagram ICMP socket (Linux ``net.ipv4.ping_group_range``, macOS).
+    Each call opens its own socket, so a prober can be shared by
+    several monitoring threads.
+    """
+    
+    _id_lock = threading.Lock()
+    _id_counter = 0
+    
+    def __init__(self):
+        """
+        Initialize the prober.
+        
+        Raises:
+            ICMPUnavailableError: If neither socket type can be opened
+        """
+        self.logger = logging.getLogger(__name__)
+        self.socket_type = self._detect_socket_type()
+        self.raw = self.socket_type == socket.SOCK_RAW
+        self.kernel_timestamps = sys.platform.startswith("linux")
+        self.logger.debug(
+            f"ICMPProber initialized ({'raw' if self.raw else 'datagram'} socket)"
+        )
+    
+    @staticmethod
+    def _detect_socket_type() -> int:
+        """
+        Find a usable ICMP socket type.
+        
+        Returns:
+            socket.SOCK_RAW or socket.SOCK_DGRAM
+        """
+        for sock_type in (socket.SOCK_RAW, socket.SOCK_DGRAM):
+            try:
+                sock = socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP)
+                sock.close()
+                return sock_type
+            except (PermissionError, OSError):
+                continue
+        raise ICMPUnavailableError("No ICMP socket available (raw or datagram)")
+    
+    @classmethod
+    def _next_identifier(cls) -> int:
+        """Return a process-unique ICMP identifier."""
+        with cls._id_lock:
+            cls._id_counter = (cls._id_counter + 1) & 0xFFFF
+            return (os.getpid() + cls._id_counter) & 0xFFFF
+    
+    def _open_socket(self) -> socket.socket:
+        """Open a configured ICMP socket."""
+        sock = socket.socket(socket.AF_INET, self.socket_type, socket.IPPROTO_ICMP)
+        sock.setblocking(False)
+        if self.kernel_timestamps:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+            except OSError:
+                self.kernel_timestamps = False
+        return sock
+    
+    def _receive_time_ns(self, ancdata) -> int:
+        """
+        Extract the kernel receive timestamp from ancillary data.
+        
+        Args:
+            ancdata: Ancillary data returned by recvmsg
+        
+        Returns:
+            Receive time in nanoseconds (CLOCK_REALTIME)
+        """
+        for level, cmsg_type, data in ancdata:
+            if level == socket.SOL_SOCKET and cmsg_type == SCM_TIMESTAMPNS:
+                if len(data) >= _TIMESPEC.size:
+                    sec, nsec = _TIMESPEC.unpack_from(data)
+                    return sec * 1_000_000_000 + nsec
+        return time.time_ns()
+    
+    def ping(
+        self,
+        host: str,
+        count: int = 1,
+        timeout: float = 2.0,
+        interval: float = 0.0
+    ) -> List[Optional[float]]:
+        """
+        Send a burst of echo requests and collect per-packet RTTs.
+        
+        Args:
+            host: Target IP address or hostname
+            count: Number of echo requests to send
+            timeout: Seconds to wait for each reply
+            interval: Seconds between consecutive requests
+        
+        Returns:
+            List of RTTs in milliseconds (None for lost packets),
+            ordered by sequence number
+        
+        Raises:
+            socket.gaierror: If the host cannot be resolved
+        """
+        address = socket.gethostbyname(host)
+        identifier = self._next_identifier()
+        rtts: List[Optional[float]] = [None] * count
+        send_times: List[int] = [0] * count
+        deadlines: List[float] = [0.0] * count
+        padding = bytes(PAYLOAD_SIZE - 8)
+        
+        sock = self._open_socket()
+        try:
+            sent = 0
+            pending = 0
+            next_send = time.monotonic()
+            
+            while sent < count or pending:
+                now = time.monotonic()
+                
+                if sent < count and now >= next_send:
+                    send_ns = time.time_ns()
+                    packet = build_echo_request(
+                        identifier, sent, struct.pack("!Q", send_ns) + padding
+                    )
+                    try:
+                        sock.sendto(packet, (address, 0))
+                        send_times[sent] = send_ns
+                        deadlines[sent] = now + timeout
+                        pending += 1
+                    except OSError as e:
+                        self.logger.debug(f"Send to {host} failed: {e}")
+                    sent += 1
+                    next_send = now + interval
+                    continue
+                
+                # Drop packets whose reply window has elapsed
+                last_deadline = max(deadlines[:sent]) if sent else now
+                if sent == count and now >= last_deadline:
+                    break
+                
+                wait = last_deadline - now
+                if sent < count:
+                    wait = min(wait, next_send - now)
+                
+                readable, _, _ = select.select([sock], [], [], max(wait, 0.0))
+                if not readable:
+                    continue
+                
+                try:
+                    data, ancdata, _, source = sock.recvmsg(
+                        2048, socket.CMSG_SPACE(_TIMESPEC.size)
+                    )
+                except BlockingIOError:
+                    continue
+                
+                if source[0] != address:
+                    continue
+                reply = parse_echo_reply(data, self.raw)
+                if reply is None:
+                    continue
+                reply_id, sequence = reply
+                # Datagram sockets rewrite the identifier to the local port
+                if self.raw and reply_id != identifier:
+                    continue
+                if sequence >= sent or rtts[sequence] is not None:
+                    continue
+                if time.monotonic() > deadlines[sequence]:
+                    continue
+                
+                recv_ns = self._receive_time_ns(ancdata)
+                rtts[sequence] = max(recv_ns - send_times[sequence], 0) / 1_000_000
+                pending -= 1
+        finally:
+            sock.close()
+        
+        return rtts
+
+
+class AsyncICMPProber(ICMPProber):
+    """
+    Asyncio ICMP prober multiplexing all probes over one socket.
+    
+    Replies are matched to in-flight requests by sequence number, so
+    thousands of concurrent probes share a single file descriptor and
+    a single reader callback on the event loop.
+    """
+    
+    def __init__(self):
+        """
+        Initialize the prober.
+        
+        Raises:
+            ICMPUnavailableError: If neither socket type can be opened
+        """
+        super().__init__()
+        self.identifier = self._next_identifier()
+        self._sock: Optional[socket.socket] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[int, tuple] = {}
+        self._sequence = 0
+    
+    def _ensure_socket(self):
+        """Open the shared socket and register it with the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._sock is not None and self._loop is loop:
+            return
+        self.close()
+        self._sock = self._open_socket()
+        self._loop = loop
+        loop.add_reader(self._sock.fileno(), self._on_readable)
+    
+    def close(self):
+        """Unregister and close the shared socket."""
+        if self._sock is None:
+            return
+        try:
+            self._loop.remove_reader(self._sock.fileno())
+        except Exception:
+            pass
+        self._sock.close()
+        self._sock = None
+        self._loop = None
+        for future, _, _ in self._pending.values():
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+    
+    def _allocate_sequence(self) -> int:
+        """Return a sequence number not used by any in-flight probe."""
+        for _ in range(0x10000):
+            self._sequence = (self._sequence + 1) & 0xFFFF
+            if self._sequence not in self._pending:
+                return self._sequence
+        raise RuntimeError("Too many in-flight ICMP probes")
+    
+    def _on_readable(self):
+        """Drain the socket and resolve futures of matching replies."""
+        while True:
+            try:
+                data, ancdata, _, source = self._sock.recvmsg(
+                    2048, socket.CMSG_SPACE(_TIMESPEC.size)
+                )
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                self.logger.debug(f"ICMP receive error: {e}")
+                return
+            
+            reply = parse_echo_reply(data, self.raw)
+            if reply is None:
+                continue
+            reply_id, sequence = reply
+            if self.raw and reply_id != self.identifier:
+                continue
+            
+            entry = self._pending.get(sequence)
+            if entry is None:
+                continue
+            future, send_ns, address = entry
+            if source[0] != address or future.done():
+                continue
+            
+            recv_ns = self._receive_time_ns(ancdata)
+            future.set_result(max(recv_ns - send_ns, 0) / 1_000_000)
+    
+    async def _echo(self, address: str, timeout: float) -> Optional[float]:
+        """Send one echo request and wait for its reply."""
+        sequence = self._allocate_sequence()
+        future = self._loop.create_future()
+        send_ns = time.time_ns()
+        self._pending[sequence] = (future, send_ns, address)
+        try:
+            payload = struct.pack("!Q", send_ns) + bytes(PAYLOAD_SIZE - 8)
+            try:
+                self._sock.sendto(
+                    build_echo_request(self.identifier, sequence, payload),
+                    (address, 0)
+                )
+            except OSError as e:
+                self.logger.debug(f"Send to {address} failed: {e}")
+                return None
+            try:
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                return None
+        finally:
+            self._pending.pop(sequence, None)
+    
+    async def ping(
+        self,
+        host: str,
+        count: int = 1,
+        timeout: float = 2.0,
+        interval: float = 0.0
+    ) -> List[Optional[float]]:
+        """
+        Send a burst of echo requests without blocking the event loop.
+        
+        Args:
+            host: Target IP address or hostname
+            count: Number of echo requests to send
+            timeout: Seconds to wait for each reply
+            interval: Seconds between consecutive requests
+        
+        Returns:
+            List of RTTs in milliseconds (None for lost packets)
+        
+        Raises:
+            socket.gaierror: If the host cannot be resolved
+        """
+        self._ensure_socket()
+        infos = await self._loop.getaddrinfo(host, None, family=socket.AF_INET)
+        address = infos[0][4][0]
+        
+        tasks = []
+        for i in range(count):
+            if i and interval:
+                await asyncio.sleep(interval)
+            tasks.append(asyncio.ensure_future(self._echo(address, timeout)))
+        return list(await asyncio.gather(*tasks))
+
+
+def create_prober(
+    backend: str = "auto",
+    asynchronous: bool = False
+) -> Optional[ICMPProber]:
+    """
+    Resolve a probe backend name to a native prober.
+    
+    Args:
+        backend: "native", "subprocess" or "auto"
+        asynchronous: Return an AsyncICMPProber for use on an event loop
+    
+    Returns:
+        ICMPProber for the native backend, or None to use the ping subprocess
+    
+    Raises:
+        ICMPUnavailableError: If "native" was requested but is unavailable
+        ValueError: If the backend name is unknown
+    """
+    if backend == "subprocess":
+        return None
+    if backend not in ("auto", "native"):
+        raise ValueError(f"Unknown probe backend: {backend}")
+    
+    try:
+        return AsyncICMPProber() if asynchronous else ICMPProber()
+    except ICMPUnavailableError:
+        if backend == "native":
+            raise
+        logging.getLogger(__name__).info(
+            "Native ICMP unavailable, falling back to ping subprocess"
+        )
+        return None
@@ -7,14 +7,17 @@ Measures Round-Trip Time (RTT) between local host and remote target.
 Reference: RFC 792 - Internet Control Message Protocol
 """
 
-import platform
-import subprocess
-import re
 import statistics
+from array import array
 from typing import Optional, List
 from dataclasses import dataclass
 import logging
 
+from .probe import Prober, ProbeResult
+from .resolver import ResolutionError
+from ..utils.rolling import RollingMedian, RollingMoments
+from ..utils.sketch import DDSketch
+
 
 @dataclass
 class LatencyStats:
@@ -42,14 +45,44 @@ class LatencyMonitor:
     Monitors network latency using ICMP echo request/reply.
     
     This class provides cross-platform latency measurement capabilities
-    using the system's native ping utility.
+    using in-process ICMP sockets, falling back to the system's native
+    ping utility when raw/datagram ICMP sockets are not permitted.
     """
     
-    def __init__(self):
-        """Initialize the latency monitor."""
+    def __init__(
+        self,
+        backend: str = "auto",
+        interval: float = 0.2,
+        prober: Optional[Prober] = None
+    ):
+        """
+        Initialize the latency monitor.
+        
+        Args:
+            backend: Probe backend ("auto", "native" or "subprocess")
+            interval: Seconds between packets of a multi-packet probe
+            prober: Shared prober instance (overrides backend/interval)
+        """
         self.logger = logging.getLogger(__name__)
-        self.system = platform.system().lower()
-        self.logger.debug(f"LatencyMonitor initialized for {self.system}")
+        self.prober = prober or Prober(backend=backend, interval=interval)
+        self.logger.debug(f"LatencyMonitor initialized ({self.prober.backend} backend)")
+    
+    def probe(self, host: str, count: int = 1, timeout: int = 2) -> Optional[ProbeResult]:
+        """
+        Send one burst of echo requests and return per-packet results.
+        
+        Args:
+            host: Target IP address or hostname
+            count: Number of packets in the burst
+            timeout: Timeout in seconds for each packet
+            
+        Returns:
+            ProbeResult or None if the probe could not be performed
+        
+        Raises:
+            ResolutionError: If host cannot be resolved
+        """
+        return self.prober.probe(host, count=count, timeout=timeout)
     
     def measure(self, host: str, count: int = 1, timeout: int = 2) -> Optional[float]:
         """
@@ -64,36 +97,19 @@ class LatencyMonitor:
             Average latency in milliseconds, or None if measurement failed
         """
         try:
-            # Build platform-specific ping command
-            if self.system == "windows":
-                cmd = ["ping", "-n", str(count), "-w", str(timeout * 1000), host]
-            else:  # Linux, macOS
-                cmd = ["ping", "-c", str(count), "-W", str(timeout), host]
-            
-            # Execute ping command
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout * count + 2
-            )
-            
-            if result.returncode == 0:
-                # Parse output to extract latency
-                latency = self._parse_ping_output(result.stdout)
-                if latency is not None:
-                    self.logger.debug(f"Latency to {host}: {latency:.2f}ms")
-                return latency
-            else:
-                self.logger.warning(f"Ping to {host} failed: {result.stderr}")
-                return None
-                
-        except subprocess.TimeoutExpired:
-            self.logger.warning(f"Ping to {host} timed out")
+            result = self.probe(host, count=count, timeout=timeout)
+        except ResolutionError as e:
+            self.logger.warning(str(e))
             return None
-        except Exception as e:
-            self.logger.error(f"Error measuring latency to {host}: {e}")
+        if result is None:
             return None
+        
+        latency = result.avg_ms
+        if latency is None:
+            self.logger.warning(f"No echo replies from {host}")
+        else:
+            self.logger.debug(f"Latency to {host}: {latency:.2f}ms")
+        return latency
     
     def measure_detailed(self, host: str, count: int = 10) -> Optional[LatencyStats]:
         """
@@ -106,82 +122,53 @@ class LatencyMonitor:
         Returns:
             LatencyStats object or None if measurement failed
         """
-        latencies: List[float] = []
-        
-        for i in range(count):
-            latency = self.measure(host, count=1)
-            if latency is not None:
-                latencies.append(latency)
-        
-        if not latencies:
+        try:
+            result = self.probe(host, count=count)
+        except ResolutionError as e:
+            self.logger.warning(str(e))
+            return None
+        if result is None or result.received == 0:
             self.logger.warning(f"No successful measurements for {host}")
             return None
         
-        # Calculate statistics
-        try:
-            # Calculate 95th percentile only if enough samples
-            if len(latencies) >= 20:
-                percentile_95 = statistics.quantiles(latencies, n=20)[18]
-            else:
-                # Use max for small sample sets
-                percentile_95 = max(latencies)
-            
-            stats = LatencyStats(
-                min_ms=min(latencies),
-                max_ms=max(latencies),
-                avg_ms=statistics.mean(latencies),
-                stddev_ms=statistics.stdev(latencies) if len(latencies) > 1 else 0.0,
-                percentile_95_ms=percentile_95,
-                samples=len(latencies)
-            )
-            
+        stats = self.summarize(result)
+        if stats is not None:
             self.logger.info(
                 f"Detailed stats for {host}: avg={stats.avg_ms:.2f}ms, "
                 f"min={stats.min_ms:.2f}ms, max={stats.max_ms:.2f}ms, "
                 f"stddev={stats.stddev_ms:.2f}ms"
             )
-            
-            return stats
-            
-        except Exception as e:
-            self.logger.error(f"Error calculating statistics: {e}")
-            return None
+        return stats
     
-    def _parse_ping_output(self, output: str) -> Optional[float]:
+    def summarize(self, result: ProbeResult) -> Optional[LatencyStats]:
         """
-        Parse ping command output to extract latency.
+        Compute latency statistics from a probe burst.
         
         Args:
-            output: Raw ping command output
+            result: Probe result to summarize
             
         Returns:
-            Average latency in milliseconds or None
+            LatencyStats object or None if no reply was received
         """
+        latencies = result.received_rtts
+        if not latencies:
+            return None
+        
         try:
-            if self.system == "windows":
-                # Windows format: "Average = XXXms"
-                match = re.search(r'Average\s*=\s*(\d+)ms', output)
-                if match:
-                    return float(match.group(1))
-                # Alternative format: "time=XXms" or "time<1ms"
-                matches = re.findall(r'time[=<](\d+)ms', output)
-                if matches:
-                    return statistics.mean([float(x) for x in matches])
-            else:
-                # Linux/macOS format: "rtt min/avg/max/mdev = X/Y/Z/W ms"
-                match = re.search(r'rtt min/avg/max/mdev = [\d.]+/([\d.]+)/[\d.]+/[\d.]+ ms', output)
-                if match:
-                    return float(match.group(1))
-                # Alternative format: "time=XX.X ms"
-                matches = re.findall(r'time=([\d.]+)\s*ms', output)
-                if matches:
-                    return statistics.mean([float(x) for x in matches])
+            sketch = DDSketch()
+            sketch.update(latencies)
             
-            self.logger.warning("Could not parse latency from ping output")
-            return None
+            return LatencyStats(
+                min_ms=min(latencies),
+                max_ms=max(latencies),
+                avg_ms=statistics.mean(latencies),
+                stddev_ms=statistics.stdev(latencies) if len(latencies) > 1 else 0.0,
+                percentile_95_ms=sketch.quantile(0.95),
+                samples=len(latencies)
+            )
             
         except Exception as e:
-            self.logger.error(f"Error parsing ping output: {e}")
+            self.logger.error(f"Error calculating statistics: {e}")
             return None
 
 
@@ -191,18 +178,52 @@ class LatencyAnalyzer:
     
     Provides statistical analysis of latency measurements over time
     to identify performance degradation and network issues.
+    
+    Measurements are kept in a fixed-size ring buffer. The baseline
+    median, mean and standard deviation are maintained incrementally over
+    the last baseline_samples values, and a ring of cumulative sums makes
+    the windowed averages used for trend detection O(1), so every update
+    and query costs O(log n) or better.
     """
     
-    def __init__(self, baseline_samples: int = 100):
+    def __init__(
+        self,
+        baseline_samples: int = 100,
+        capacity: Optional[int] = None,
+        min_stddev_ms: float = 0.0
+    ):
         """
         Initialize the analyzer.
         
         Args:
             baseline_samples: Number of samples for baseline calculation
+            capacity: Measurements retained (default 2x baseline_samples);
+                also the largest usable trend window
+            min_stddev_ms: Lower bound on the baseline standard deviation,
+                so a perfectly flat baseline does not flag tiny changes
+                (0 keeps the raw standard deviation)
         """
         self.baseline_samples = baseline_samples
-        self.measurements: List[float] = []
+        self.capacity = max(capacity or baseline_samples * 2, baseline_samples)
+        self.min_stddev_ms = min_stddev_ms
         self.logger = logging.getLogger(__name__)
+        
+        self._values = array("d", bytes(8 * self.capacity))
+        self._cumulative = array("d", bytes(8 * self.capacity))
+        self._count = 0
+        self._total = 0.0
+        self._moments = RollingMoments()
+        self._median = RollingMedian()
+    
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+    
+    @property
+    def measurements(self) -> List[float]:
+        """Retained measurements, oldest first."""
+        size = len(self)
+        start = self._count - size
+        return [self._values[i % self.capacity] for i in range(start, self._count)]
     
     def add_measurement(self, latency: float):
         """
@@ -211,11 +232,25 @@ class LatencyAnalyzer:
         Args:
             latency: Latency value in milliseconds
         """
-        self.measurements.append(latency)
+        # Slide the baseline window before the slot may be overwritten
+        if self._count >= self.baseline_samples:
+            leaving = self._values[(self._count - self.baseline_samples) % self.capacity]
+            self._moments.remove(leaving)
+            self._median.remove(leaving)
+        self._moments.add(latency)
+        self._median.add(latency)
         
-        # Keep only recent measurements for performance
-        if len(self.measurements) > self.baseline_samples * 2:
-            self.measurements = self.measurements[-self.baseline_samples:]
+        slot = self._count % self.capacity
+        self._values[slot] = latency
+        self._total += latency
+        self._cumulative[slot] = self._total
+        self._count += 1
+    
+    def _sum_recent(self, size: int) -> float:
+        """Sum of the newest size measurements (size <= len(self))."""
+        if size >= self._count:
+            return self._total
+        return self._total - self._cumulative[(self._count - size - 1) % self.capacity]
     
     def get_baseline(self) -> Optional[float]:
         """
@@ -224,11 +259,23 @@ class LatencyAnalyzer:
         Returns:
             Baseline latency (median of recent measurements) or None
         """
-        if len(self.measurements) < 10:
+        if len(self) < 10:
             return None
         
         # Use median as baseline to reduce impact of outliers
-        return statistics.median(self.measurements[-self.baseline_samples:])
+        return self._median.median()
+    
+    def get_stddev(self) -> Optional[float]:
+        """
+        Standard deviation of the baseline window.
+        
+        Returns:
+            Sample standard deviation (floored at min_stddev_ms) or None
+        """
+        stddev = self._moments.stddev
+        if stddev is None:
+            return None
+        return max(stddev, self.min_stddev_ms)
     
     def detect_anomaly(self, latency: float, threshold_multiplier: float = 2.0) -> bool:
         """
@@ -245,12 +292,7 @@ class LatencyAnalyzer:
         if baseline is None:
             return False
         
-        # Calculate standard deviation of baseline
-        baseline_data = self.measurements[-self.baseline_samples:]
-        if len(baseline_data) < 10:
-            return False
-        
-        stddev = statistics.stdev(baseline_data)
+        stddev = self.get_stddev()
         threshold = baseline + (stddev * threshold_multiplier)
         
         is_anomalous = latency > threshold
@@ -273,15 +315,19 @@ class LatencyAnalyzer:
         Returns:
             Trend direction: "increasing", "decreasing", or "stable"
         """
-        if len(self.measurements) < window_size:
+        if len(self) < window_size or window_size < 2:
             return "insufficient_data"
         
-        recent = self.measurements[-window_size:]
-        first_half = recent[:window_size//2]
-        second_half = recent[window_size//2:]
+        first_size = window_size // 2
+        second_size = window_size - first_size
         
-        avg_first = statistics.mean(first_half)
-        avg_second = statistics.mean(second_half)
+        second_sum = self._sum_recent(second_size)
+        first_sum = self._sum_recent(window_size) - second_sum
+        
+        avg_first = first_sum / first_size
+        avg_second = second_sum / second_size
+        if avg_first <= 0:
+            return "stable"
         
         # Calculate percentage change
         change_pct = ((avg_second - avg_first) / avg_first) * 100
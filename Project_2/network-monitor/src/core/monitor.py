@@ -9,6 +9,8 @@ Author: Network Engineering Lab
 Date: 2025
 """
 
+import asyncio
+import itertools
 import time
 import threading
 import logging
@@ -16,10 +18,19 @@ from typing import List, Dict, Optional
 from dataclasses import dataclass
 from datetime import datetime
 
+from .fleet import FleetLatencyAnalyzer
 from .latency import LatencyMonitor
 from .packet_loss import PacketLossAnalyzer
-from ..database.db_manager import DatabaseManager
+from .probe import Prober, ProbeResult
+from .resolver import DNSCache, ResolutionError
+from .scheduler import AsyncScheduler
+from .sharding import ShardedScheduler
+from .ticker import TickSchedule, TickStats, stagger_phase
+from ..database.db_manager import DatabaseManager, to_epoch_ms
+from ..database.models import Metric
+from ..database.retention import RetentionWorker
 from ..alerts.alert_manager import AlertManager
+from ..alerts.rules import RuleEngine
 from ..utils.config import ConfigManager
 
 
@@ -46,15 +57,19 @@ class NetworkMetrics:
     Attributes:
         timestamp: Measurement time
         target: Target identifier
-        latency_ms: Round-trip time in milliseconds
+        latency_ms: Round-trip time in milliseconds (None if no packet
+            was answered)
         packet_loss_pct: Packet loss percentage
-        jitter_ms: Inter-packet delay variation
+        jitter_ms: Inter-packet delay variation (None if no packet was
+            answered)
+        dns_ms: DNS lookup time, when a lookup was made for this sample
     """
     timestamp: datetime
     target: str
-    latency_ms: float
+    latency_ms: Optional[float]
     packet_loss_pct: float
-    jitter_ms: float
+    jitter_ms: Optional[float]
+    dns_ms: Optional[float] = None
 
 
 class NetworkMonitor:
@@ -76,10 +91,49 @@ class NetworkMonitor:
         self.config = ConfigManager(config_path)
         
         # Initialize components
-        self.db_manager = DatabaseManager(self.config.get("database.path"))
-        self.alert_manager = AlertManager(self.config)
-        self.latency_monitor = LatencyMonitor()
-        self.packet_loss_analyzer = PacketLossAnalyzer()
+        self.db_manager = DatabaseManager(
+            self.config.get("database.path"),
+            max_readers=self.config.get("database.max_readers", 4),
+            pragmas=self.config.get("database.pragmas"),
+            layout=self.config.get("database.layout", "narrow"),
+            archive_dir=self.config.get("database.archive_dir"),
+            archive_format=self.config.get("database.archive_format", "parquet"),
+            stats_cache_ttl=self.config.get("database.stats_cache_ttl", 5.0),
+            engine=self.config.get("database.engine", "sqlite"),
+            tsdb_dir=self.config.get("database.tsdb_dir"),
+            tsdb_block_size=self.config.get("database.tsdb_block_size", 1024),
+            tsdb_precision=self.config.get("database.tsdb_precision", 3),
+            hot_window_size=self.config.get("database.hot_window_size", 720),
+            hot_window_dir=self.config.get("database.hot_window_dir")
+        )
+        if self.config.get("database.buffered_writes", True):
+            self.db_manager.start_writer(
+                batch_size=self.config.get("database.batch_size", 500),
+                flush_interval=self.config.get("database.flush_interval", 1.0),
+                max_pending=self.config.get("database.max_pending", 50000)
+            )
+        self.retention = RetentionWorker(
+            self.db_manager,
+            retention_days=self.config.get("database.retention_days", 30),
+            interval=self.config.get("database.retention_interval", 3600),
+            batch_size=self.config.get("database.retention_batch_size", 5000),
+            max_rows_per_second=self.config.get("database.retention_rate", 20000),
+            vacuum_pages=self.config.get("database.vacuum_pages", 2000)
+        )
+        self.alert_manager = AlertManager(self.config, db_manager=self.db_manager)
+        self.rules = RuleEngine.from_config(self.config)
+        # Latency and loss share one prober so a single burst serves both
+        self.prober = Prober(
+            backend=self.config.get("monitoring.probe_backend", "auto"),
+            interval=self.config.get("monitoring.probe_interval", 0.2),
+            cache_ttl=self.config.get("monitoring.probe_cache_ttl", 1.0),
+            resolver=DNSCache(
+                ttl=self.config.get("monitoring.dns_ttl", 300),
+                negative_ttl=self.config.get("monitoring.dns_negative_ttl", 30)
+            )
+        )
+        self.latency_monitor = LatencyMonitor(prober=self.prober)
+        self.packet_loss_analyzer = PacketLossAnalyzer(prober=self.prober)
         
         # Load monitoring targets
         self.targets = self._load_targets()
@@ -88,18 +142,45 @@ class NetworkMonitor:
         self.running = False
         self.monitor_threads: List[threading.Thread] = []
         self.interval = self.config.get("monitoring.interval", 5)
+        self.probe_count = self.config.get("monitoring.probe_count", 10)
+        self.db_manager.sample_interval = self.interval
+        self.scheduler_mode = self.config.get("monitoring.scheduler", "threads")
+        self.scheduler = None  # AsyncScheduler or ShardedScheduler
+        self.shards: Optional[int] = self.config.get("monitoring.shards")
+        
+        # Per-target tick grids are staggered in creation order
+        self.tick_stats = TickStats(
+            late_threshold=self.config.get("monitoring.late_tick_threshold", 0.5)
+        )
+        self._schedule_index = itertools.count()
+        
+        # Latest latency per target, consumed by the fleet analyzer each tick
+        self.fleet_analyzer: Optional[FleetLatencyAnalyzer] = None
+        self._fleet_thread: Optional[threading.Thread] = None
+        self._latest_latency: Dict[str, float] = {}
+        self._latest_lock = threading.Lock()
+        
+        # Apply configuration changes live
+        self.follow_config_targets = True
+        self.follow_config_interval = True
+        self._reload_lock = threading.Lock()
+        self.config.on_change(self._on_config_change)
         
         self.logger.info(f"NetworkMonitor initialized with {len(self.targets)} targets")
     
-    def _load_targets(self) -> List[MonitorTarget]:
+    def _load_targets(self, target_configs: Optional[List[Dict]] = None) -> List[MonitorTarget]:
         """
         Load monitoring targets from configuration.
         
+        Args:
+            target_configs: Target entries (defaults to monitoring.targets)
+        
         Returns:
             List of MonitorTarget objects
         """
         targets = []
-        target_configs = self.config.get("monitoring.targets", [])
+        if target_configs is None:
+            target_configs = self.config.get("monitoring.targets", [])
         
         for config in target_configs:
             target = MonitorTarget(
@@ -115,7 +196,9 @@ class NetworkMonitor:
         """
         Start the monitoring system.
         
-        Creates monitoring threads for each target and begins data collection.
+        Creates monitoring threads for each target (or a single asyncio
+        scheduler when monitoring.scheduler is "asyncio", or worker
+        processes when it is "processes") and begins data collection.
         """
         if self.running:
             self.logger.warning("Monitor already running")
@@ -123,19 +206,23 @@ class NetworkMonitor:
         
         self.running = True
         self.logger.info("Starting network monitor")
+        self._start_fleet_analysis()
+        if self.config.get("database.retention_interval", 3600):
+            self.retention.start()
+        if self.config.get("monitoring.hot_reload", True):
+            self.config.start_watching(self.config.get("monitoring.reload_interval", 2.0))
+        
+        if self.scheduler_mode == "asyncio":
+            self._start_async()
+            return
+        if self.scheduler_mode == "processes":
+            self._start_sharded()
+            return
         
         # Start monitoring thread for each target
         for target in self.targets:
             if target.enabled:
-                thread = threading.Thread(
-                    target=self._monitor_target,
-                    args=(target,),
-                    daemon=True,
-                    name=f"Monitor-{target.name}"
-                )
-                thread.start()
-                self.monitor_threads.append(thread)
-                self.logger.info(f"Started monitoring thread for {target.name}")
+                self._start_target_thread(target)
         
         # Wait for threads (blocks until Ctrl+C)
         try:
@@ -145,6 +232,184 @@ class NetworkMonitor:
             self.logger.info("Received interrupt signal")
             self.stop()
     
+    def _start_target_thread(self, target: MonitorTarget):
+        """Start the monitoring thread of one target."""
+        thread = threading.Thread(
+            target=self._monitor_target,
+            args=(target,),
+            daemon=True,
+            name=f"Monitor-{target.name}"
+        )
+        thread.start()
+        self.monitor_threads = [t for t in self.monitor_threads if t.is_alive()]
+        self.monitor_threads.append(thread)
+        self.logger.info(f"Started monitoring thread for {target.name}")
+    
+    def _on_config_change(self, old: Dict, new: Dict):
+        """
+        Apply a reloaded configuration without restarting probes.
+        
+        Intervals and probe settings take effect on the next cycle,
+        threshold rules are recompiled if the thresholds changed, and
+        targets are added or removed individually; unchanged targets keep
+        running. Settings overridden on the command line are kept.
+        
+        Args:
+            old: Previous configuration
+            new: New configuration
+        """
+        with self._reload_lock:
+            if self.follow_config_interval:
+                self.interval = self.config.get("monitoring.interval", 5)
+                self.db_manager.sample_interval = self.interval
+            self.retention.retention_days = self.config.get("database.retention_days", 30)
+            self.retention.max_rows_per_second = self.config.get("database.retention_rate", 20000)
+            self.probe_count = self.config.get("monitoring.probe_count", 10)
+            self.prober.interval = self.config.get("monitoring.probe_interval", 0.2)
+            self.prober.cache.ttl = self.config.get("monitoring.probe_cache_ttl", 1.0)
+            self.prober.resolver.ttl = self.config.get("monitoring.dns_ttl", 300)
+            self.prober.resolver.negative_ttl = self.config.get("monitoring.dns_negative_ttl", 30)
+            if old.get("thresholds") != new.get("thresholds"):
+                # Recompiling resets hysteresis and N-of-M state
+                self.rules = RuleEngine.from_config(self.config)
+            if isinstance(self.scheduler, ShardedScheduler):
+                self.scheduler.set_interval(self.interval)
+            
+            if self.follow_config_targets:
+                self._apply_targets(self._load_targets())
+    
+    def _apply_targets(self, targets: List[MonitorTarget]):
+        """
+        Replace the target list, starting and stopping only what changed.
+        
+        Args:
+            targets: New target list
+        """
+        current = {(t.name, t.host): t for t in self.targets}
+        wanted = {(t.name, t.host): t for t in targets}
+        
+        removed = [t for key, t in current.items() if key not in wanted]
+        added = [t for key, t in wanted.items() if key not in current]
+        self.targets = [current.get(key, t) for key, t in wanted.items()]
+        
+        for target in removed:
+            target.enabled = False
+            self.tick_stats.forget(target.name)
+            if self.scheduler is not None:
+                self.scheduler.remove_target(target.name)
+            if self.fleet_analyzer is not None:
+                self.fleet_analyzer.remove_target(target.name)
+            self.rules.forget(target.name)
+            self.logger.info(f"Removed target {target.name} ({target.host})")
+        
+        for target in added:
+            if self.fleet_analyzer is not None:
+                self.fleet_analyzer.add_target(target.name)
+            if self.running:
+                if self.scheduler is not None:
+                    self.scheduler.add_target(target)
+                elif self.scheduler_mode == "threads":
+                    self._start_target_thread(target)
+            self.logger.info(f"Added target {target.name} ({target.host})")
+    
+    def _start_fleet_analysis(self):
+        """Start the vectorized anomaly detection thread if enabled."""
+        if not self.config.get("anomaly_detection.enabled", True):
+            return
+        
+        self.fleet_analyzer = FleetLatencyAnalyzer(
+            [target.name for target in self.targets if target.enabled],
+            window=self.config.get("anomaly_detection.window", 100),
+            threshold_multiplier=self.config.get("anomaly_detection.threshold_multiplier", 2.0),
+            min_stddev_ms=self.config.get("anomaly_detection.min_stddev_ms", 1.0),
+            ewma_alpha=self.config.get("anomaly_detection.ewma_alpha", 0.3),
+            trend_window=self.config.get("anomaly_detection.trend_window", 20)
+        )
+        self._fleet_thread = threading.Thread(
+            target=self._fleet_loop,
+            daemon=True,
+            name="FleetAnalyzer"
+        )
+        self._fleet_thread.start()
+    
+    def _fleet_loop(self):
+        """Run one fleet analysis tick per monitoring interval."""
+        schedule = TickSchedule(self.interval, self.interval)
+        while self.running:
+            time.sleep(schedule.delay())
+            schedule.tick(self.interval)
+            try:
+                self._fleet_tick()
+            except Exception as e:
+                self.logger.error(f"Fleet analysis failed: {e}")
+    
+    def _fleet_tick(self):
+        """
+        Analyze the latencies gathered since the last tick for all targets
+        and raise alerts for anomalous ones.
+        
+        Returns:
+            FleetAnalysis of this tick
+        """
+        with self._latest_lock:
+            latest, self._latest_latency = self._latest_latency, {}
+        
+        analysis = self.fleet_analyzer.step(latest)
+        
+        for row in analysis.anomalous.nonzero()[0]:
+            self.alert_manager.trigger_alert(
+                severity="WARNING",
+                message=(
+                    f"{analysis.targets[row]}: Latency anomaly "
+                    f"({analysis.latest[row]:.2f}ms, baseline {analysis.baseline[row]:.2f}ms)"
+                ),
+                target=analysis.targets[row],
+                metric="latency_anomaly"
+            )
+        
+        return analysis
+    
+    def _start_async(self):
+        """Run all targets on one asyncio event loop until stopped."""
+        self.scheduler = AsyncScheduler(
+            self,
+            max_concurrency=self.config.get("monitoring.max_concurrency", 256)
+        )
+        
+        try:
+            asyncio.run(self.scheduler.run())
+        except KeyboardInterrupt:
+            self.logger.info("Received interrupt signal")
+        finally:
+            self.running = False
+            self.scheduler = None
+            self.config.stop_watching()
+            self.retention.stop()
+            self.alert_manager.flush(timeout=10)
+            self.db_manager.flush(timeout=10)
+            self.logger.info("Network monitor stopped")
+    
+    def _start_sharded(self):
+        """Run targets in worker processes, aggregating here until stopped."""
+        self.scheduler = ShardedScheduler(
+            self,
+            shards=self.shards,
+            max_concurrency=self.config.get("monitoring.max_concurrency", 256)
+        )
+        
+        try:
+            self.scheduler.run()
+        except KeyboardInterrupt:
+            self.logger.info("Received interrupt signal")
+        finally:
+            self.running = False
+            self.scheduler = None
+            self.config.stop_watching()
+            self.retention.stop()
+            self.alert_manager.flush(timeout=10)
+            self.db_manager.flush(timeout=10)
+            self.logger.info("Network monitor stopped")
+    
     def stop(self):
         """
         Stop the monitoring system.
@@ -153,12 +418,23 @@ class NetworkMonitor:
         """
         self.logger.info("Stopping network monitor")
         self.running = False
+        self.config.stop_watching()
+        self.retention.stop()
+        
+        if self.scheduler is not None:
+            self.scheduler.stop()
+            return
         
         # Wait for all threads to complete
         for thread in self.monitor_threads:
             thread.join(timeout=5)
         
         self.monitor_threads.clear()
+        if self._fleet_thread is not None:
+            self._fleet_thread.join(timeout=self.interval + 1)
+            self._fleet_thread = None
+        self.alert_manager.flush(timeout=10)
+        self.db_manager.flush(timeout=10)
         self.logger.info("Network monitor stopped")
     
     def _monitor_target(self, target: MonitorTarget):
@@ -170,127 +446,221 @@ class NetworkMonitor:
         """
         self.logger.info(f"Monitoring {target.name} started")
         previous_latency = None
+        schedule = self.new_schedule()
         
-        while self.running:
+        while self.running and target.enabled:
+            # Wait for the next slot of this target's grid
+            time.sleep(schedule.delay())
+            if not (self.running and target.enabled):
+                break
+            self._start_tick(target, schedule)
+            
             try:
-                # Perform measurements
-                latency = self.latency_monitor.measure(target.host)
-                packet_loss = self.packet_loss_analyzer.analyze(
-                    target.host, 
-                    count=10
-                )
-                
-                # Calculate jitter
-                jitter = 0.0
-                if previous_latency is not None and latency is not None and previous_latency > 0:
-                    jitter = abs(latency - previous_latency)
-                previous_latency = latency
-                
-                # Create metrics object
-                if latency is not None:
-                    metrics = NetworkMetrics(
-                        timestamp=datetime.now(),
-                        target=target.name,
-                        latency_ms=latency,
-                        packet_loss_pct=packet_loss,
-                        jitter_ms=jitter
-                    )
-                    
-                    # Store metrics
-                    self._store_metrics(metrics)
-                    
-                    # Check thresholds and generate alerts
-                    self._check_thresholds(metrics)
-                    
-                    # Log current status
-                    self.logger.debug(
-                        f"{target.name}: latency={latency:.2f}ms, "
-                        f"loss={packet_loss:.2f}%, jitter={jitter:.2f}ms"
-                    )
-                else:
-                    self.logger.warning(f"Failed to measure {target.name}")
-                
+                previous_latency = self._measure_target(target, previous_latency)
             except Exception as e:
                 self.logger.error(f"Error monitoring {target.name}: {e}")
-            
-            # Wait for next interval
-            time.sleep(self.interval)
         
         self.logger.info(f"Monitoring {target.name} stopped")
     
-    def _store_metrics(self, metrics: NetworkMetrics):
+    def new_schedule(self) -> TickSchedule:
         """
-        Store metrics in database.
+        Create the tick grid of a newly started target.
+        
+        Phases are staggered across one interval so targets do not probe
+        (and write) in lockstep.
+        
+        Returns:
+            TickSchedule with the monitoring interval as period
+        """
+        return TickSchedule(self.interval, stagger_phase(next(self._schedule_index), self.interval))
+    
+    def _start_tick(self, target: MonitorTarget, schedule: TickSchedule):
+        """
+        Advance a target's schedule and account for late or missed ticks.
         
         Args:
-            metrics: Metrics to store
+            target: Target whose tick starts
+            schedule: The target's schedule
         """
+        lateness, missed = schedule.tick(self.interval)
+        if self.tick_stats.record(target.name, lateness, missed):
+            self._store_tick_metrics(target, lateness, missed)
+    
+    def _store_tick_metrics(self, target: MonitorTarget, lateness: float, missed: int):
+        """
+        Store scheduling lag of a late tick and the number of missed ticks.
+        
+        Args:
+            target: Target whose tick was late
+            lateness: Seconds the tick started after its slot
+            missed: Ticks skipped before this one
+        """
+        if missed:
+            self.logger.warning(f"{target.name}: {missed} monitoring ticks missed")
+        now = datetime.now()
         try:
-            # Store latency
-            self.db_manager.insert_metric(
-                timestamp=metrics.timestamp,
-                target=metrics.target,
-                metric_type="latency",
-                value=metrics.latency_ms,
-                unit="ms"
-            )
+            self.db_manager.write_metrics([
+                Metric(now, target.name, "tick_lag", lateness * 1000, "ms"),
+                Metric(now, target.name, "missed_ticks", float(missed), "count"),
+            ])
+        except Exception as e:
+            self.logger.error(f"Failed to store tick metrics: {e}")
+    
+    def _measure_target(
+        self,
+        target: MonitorTarget,
+        previous_latency: Optional[float]
+    ) -> Optional[float]:
+        """
+        Probe a target once and record latency, loss and jitter.
+        
+        A single burst of probe_count packets feeds both the latency and
+        the packet loss computation.
+        
+        Args:
+            target: Target to measure
+            previous_latency: Latency from the previous cycle
+        
+        Returns:
+            Latency measured in this cycle, or None
+        """
+        try:
+            result = self.latency_monitor.probe(target.host, count=self.probe_count)
+        except ResolutionError as e:
+            self._record_resolution_failure(target, e)
+            return None
+        return self._record_probe(target, result, previous_latency)
+    
+    def _record_resolution_failure(self, target: MonitorTarget, error: ResolutionError):
+        """
+        Report a target whose hostname could not be resolved.
+        
+        No probe was sent, so nothing is recorded as packet loss.
+        
+        Args:
+            target: Target that failed to resolve
+            error: Resolution error
+        """
+        self.logger.warning(f"{target.name}: {error}")
+        self.alert_manager.trigger_alert(
+            severity="WARNING",
+            message=f"{target.name}: DNS resolution failed for {target.host}",
+            target=target.name,
+            metric="dns"
+        )
+    
+    def _record_probe(
+        self,
+        target: MonitorTarget,
+        result: Optional[ProbeResult],
+        previous_latency: Optional[float]
+    ) -> Optional[float]:
+        """
+        Derive metrics from a probe burst, store them and check thresholds.
+        
+        A burst without any reply is still a measurement: it is stored as
+        100% packet loss with no latency or jitter, so outages alert.
+        
+        Args:
+            target: Target that was probed
+            result: Probe result (None if the probe failed)
+            previous_latency: Latency from the previous cycle
+        
+        Returns:
+            Latency measured in this cycle, or None
+        """
+        loss = self.packet_loss_analyzer.from_probe(result) if result is not None else None
+        
+        if loss is None:
+            self.logger.warning(f"Failed to measure {target.name}")
+            return None
+        
+        latency = result.avg_ms
+        jitter = None
+        if latency is None:
+            self.logger.warning(f"{target.name}: no reply to {result.sent} packets")
+        else:
+            with self._latest_lock:
+                self._latest_latency[target.name] = latency
             
-            # Store packet loss
-            self.db_manager.insert_metric(
-                timestamp=metrics.timestamp,
-                target=metrics.target,
-                metric_type="packet_loss",
-                value=metrics.packet_loss_pct,
-                unit="percent"
+            # Jitter from consecutive RTTs in the burst, or across cycles
+            jitter = result.jitter_ms
+            if jitter is None:
+                jitter = 0.0
+                if previous_latency is not None and previous_latency > 0:
+                    jitter = abs(latency - previous_latency)
+        
+        metrics = NetworkMetrics(
+            timestamp=result.timestamp,
+            target=target.name,
+            latency_ms=latency,
+            packet_loss_pct=loss.loss_percentage,
+            jitter_ms=jitter,
+            dns_ms=result.dns_ms
+        )
+        
+        # Store metrics
+        self._store_metrics(metrics)
+        
+        # Check thresholds and generate alerts
+        self._check_thresholds(metrics)
+        
+        # Log current status
+        if latency is not None:
+            self.logger.debug(
+                f"{target.name}: latency={latency:.2f}ms, "
+                f"loss={metrics.packet_loss_pct:.2f}%, jitter={jitter:.2f}ms"
             )
-            
-            # Store jitter
-            self.db_manager.insert_metric(
-                timestamp=metrics.timestamp,
-                target=metrics.target,
-                metric_type="jitter",
-                value=metrics.jitter_ms,
-                unit="ms"
+        
+        return latency
+    
+    def _store_metrics(self, metrics: NetworkMetrics):
+        """
+        Store metrics in database.
+        
+        The sample is also recorded in the hot window, so recent reads
+        see it before the buffered writer has flushed it.
+        
+        Args:
+            metrics: Metrics to store
+        """
+        hot_window = self.db_manager.hot_window
+        if hot_window is not None:
+            hot_window.record(
+                metrics.target,
+                to_epoch_ms(metrics.timestamp),
+                metrics.latency_ms,
+                metrics.packet_loss_pct,
+                metrics.jitter_ms
             )
-            
+        
+        rows = [
+            Metric(metrics.timestamp, metrics.target, "latency", metrics.latency_ms, "ms"),
+            Metric(metrics.timestamp, metrics.target, "packet_loss", metrics.packet_loss_pct, "percent"),
+            Metric(metrics.timestamp, metrics.target, "jitter", metrics.jitter_ms, "ms"),
+        ]
+        # Latency and jitter are absent when nothing replied
+        rows = [row for row in rows if row.value is not None]
+        if metrics.dns_ms is not None:
+            rows.append(Metric(metrics.timestamp, metrics.target, "dns_time", metrics.dns_ms, "ms"))
+        try:
+            self.db_manager.write_metrics(rows)
         except Exception as e:
             self.logger.error(f"Failed to store metrics: {e}")
     
     def _check_thresholds(self, metrics: NetworkMetrics):
         """
-        Check metrics against configured thresholds.
+        Check metrics against the compiled threshold rules.
         
         Args:
             metrics: Metrics to check
         """
-        # Check latency thresholds
-        latency_warn = self.config.get("thresholds.latency_warning", 100)
-        latency_crit = self.config.get("thresholds.latency_critical", 200)
-        
-        if metrics.latency_ms >= latency_crit:
-            self.alert_manager.trigger_alert(
-                severity="CRITICAL",
-                message=f"{metrics.target}: Latency {metrics.latency_ms:.2f}ms exceeds critical threshold"
-            )
-        elif metrics.latency_ms >= latency_warn:
-            self.alert_manager.trigger_alert(
-                severity="WARNING",
-                message=f"{metrics.target}: Latency {metrics.latency_ms:.2f}ms exceeds warning threshold"
-            )
-        
-        # Check packet loss thresholds
-        loss_warn = self.config.get("thresholds.packet_loss_warning", 1.0)
-        loss_crit = self.config.get("thresholds.packet_loss_critical", 5.0)
-        
-        if metrics.packet_loss_pct >= loss_crit:
-            self.alert_manager.trigger_alert(
-                severity="CRITICAL",
-                message=f"{metrics.target}: Packet loss {metrics.packet_loss_pct:.2f}% exceeds critical threshold"
-            )
-        elif metrics.packet_loss_pct >= loss_warn:
+        for event in self.rules.evaluate(metrics):
             self.alert_manager.trigger_alert(
-                severity="WARNING",
-                message=f"{metrics.target}: Packet loss {metrics.packet_loss_pct:.2f}% exceeds warning threshold"
+                severity=event.severity,
+                message=event.message,
+                target=metrics.target,
+                metric=event.metric
             )
     
     def get_statistics(self, target: str, duration_hours: int = 24) -> Dict:
@@ -300,11 +670,25 @@ class NetworkMonitor:
         Args:
             target: Target name
             duration_hours: Time period to analyze
-            
+        
         Returns:
             Dictionary containing statistics
         """
         return self.db_manager.get_statistics(target, duration_hours)
+    
+    def get_fleet_statistics(self, duration_hours: int = 24) -> Dict[str, Dict]:
+        """
+        Get statistical summaries for all monitored targets.
+        
+        Args:
+            duration_hours: Time period to analyze
+        
+        Returns:
+            {target name: {metric type: statistics}}
+        """
+        return self.db_manager.get_fleet_statistics(
+            duration_hours, targets=[target.name for target in self.targets]
+        )
 
 
 def main():
@@ -334,6 +718,16 @@ def main():
         type=int,
         help='Monitoring interval in seconds'
     )
+    parser.add_argument(
+        '--scheduler',
+        choices=['threads', 'asyncio', 'processes'],
+        help='Scheduling mode (overrides config)'
+    )
+    parser.add_argument(
+        '--shards',
+        type=int,
+        help='Worker processes for the processes scheduler (default: CPU count)'
+    )
     
     args = parser.parse_args()
     
@@ -343,9 +737,18 @@ def main():
     if args.host:
         # Override config with single host
         monitor.targets = [MonitorTarget(host=args.host, name=args.host)]
+        monitor.follow_config_targets = False
     
     if args.interval:
         monitor.interval = args.interval
+        monitor.db_manager.sample_interval = args.interval
+        monitor.follow_config_interval = False
+    
+    if args.scheduler:
+        monitor.scheduler_mode = args.scheduler
+    
+    if args.shards:
+        monitor.shards = args.shards
     
     monitor.start()
 
@@ -7,13 +7,13 @@ Calculates packet loss percentage and provides statistical analysis.
 Packet Loss Formula: (packets_sent - packets_received) / packets_sent * 100
 """
 
-import subprocess
-import platform
-import re
 import logging
 from typing import Optional
 from dataclasses import dataclass
 
+from .probe import Prober, ProbeResult
+from .resolver import ResolutionError
+
 
 @dataclass
 class PacketLossResult:
@@ -36,16 +36,29 @@ class PacketLossAnalyzer:
     """
     Analyzes packet loss for network connections.
     
-    Uses ICMP ping to determine packet loss rate, which is a key
-    indicator of network quality and reliability.
+    Uses ICMP echo requests to determine packet loss rate, which is a key
+    indicator of network quality and reliability. Probes are sent from
+    an in-process ICMP socket when available, otherwise via ping.
     """
     
-    def __init__(self):
-        """Initialize the packet loss analyzer."""
+    def __init__(
+        self,
+        backend: str = "auto",
+        interval: float = 0.2,
+        prober: Optional[Prober] = None
+    ):
+        """
+        Initialize the packet loss analyzer.
+        
+        Args:
+            backend: Probe backend ("auto", "native" or "subprocess")
+            interval: Seconds between packets of a probe burst
+            prober: Shared prober instance (overrides backend/interval)
+        """
         self.logger = logging.getLogger(__name__)
-        self.system = platform.system().lower()
+        self.prober = prober or Prober(backend=backend, interval=interval)
     
-    def analyze(self, host: str, count: int = 10, timeout: int = 2) -> float:
+    def analyze(self, host: str, count: int = 10, timeout: int = 2) -> Optional[float]:
         """
         Analyze packet loss for a target host.
         
@@ -55,40 +68,23 @@ class PacketLossAnalyzer:
             timeout: Timeout in seconds for each packet
             
         Returns:
-            Packet loss percentage (0-100)
+            Packet loss percentage (0-100), or None if the host could not
+            be resolved (a DNS failure is not packet loss)
         """
         try:
-            # Build platform-specific ping command
-            if self.system == "windows":
-                cmd = ["ping", "-n", str(count), "-w", str(timeout * 1000), host]
-            else:  # Linux, macOS
-                cmd = ["ping", "-c", str(count), "-W", str(timeout), host]
-            
-            # Execute ping command
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout * count + 2
-            )
-            
-            # Parse packet loss from output
-            loss_pct = self._parse_packet_loss(result.stdout, count)
-            
-            if loss_pct is not None:
-                self.logger.debug(f"Packet loss to {host}: {loss_pct:.2f}%")
-                return loss_pct
-            else:
-                # If parsing failed, assume 100% loss
-                self.logger.warning(f"Could not determine packet loss for {host}")
-                return 100.0
-                
-        except subprocess.TimeoutExpired:
-            self.logger.warning(f"Ping to {host} timed out completely")
-            return 100.0
-        except Exception as e:
-            self.logger.error(f"Error analyzing packet loss for {host}: {e}")
+            result = self.prober.probe(host, count=count, timeout=timeout)
+        except ResolutionError as e:
+            self.logger.warning(str(e))
+            return None
+        
+        if result is None:
+            # If the probe failed, assume 100% loss
+            self.logger.warning(f"Could not determine packet loss for {host}")
             return 100.0
+        
+        loss_pct = result.loss_percentage
+        self.logger.debug(f"Packet loss to {host}: {loss_pct:.2f}%")
+        return loss_pct
     
     def analyze_detailed(self, host: str, count: int = 100) -> Optional[PacketLossResult]:
         """
@@ -102,127 +98,43 @@ class PacketLossAnalyzer:
             PacketLossResult object or None if analysis failed
         """
         try:
-            if self.system == "windows":
-                cmd = ["ping", "-n", str(count), "-w", "2000", host]
-            else:
-                cmd = ["ping", "-c", str(count), "-W", "2", host]
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=count * 2 + 5
-            )
-            
-            # Parse detailed results
-            sent, received = self._parse_packet_counts(result.stdout)
-            
-            if sent > 0:
-                loss_pct = ((sent - received) / sent) * 100
-            elif sent == 0:
-                self.logger.error(f"No packets sent to {host}")
-                return None
-            else:
-                self.logger.error(f"Invalid packet count for {host}")
-                return None
-                
-                result_obj = PacketLossResult(
-                    sent=sent,
-                    received=received,
-                    loss_percentage=loss_pct,
-                    host=host
-                )
-                
-                self.logger.info(
-                    f"Detailed packet loss for {host}: "
-                    f"{received}/{sent} packets received ({loss_pct:.2f}% loss)"
-                )
-                
-                return result_obj
-            else:
-                self.logger.error(f"No packets sent to {host}")
-                return None
-                
-        except Exception as e:
-            self.logger.error(f"Error in detailed packet loss analysis: {e}")
+            result = self.prober.probe(host, count=count, timeout=2)
+        except ResolutionError as e:
+            self.logger.warning(str(e))
             return None
+        if result is None:
+            self.logger.error(f"Detailed packet loss analysis failed for {host}")
+            return None
+        
+        return self.from_probe(result)
     
-    def _parse_packet_loss(self, output: str, expected_count: int) -> Optional[float]:
+    def from_probe(self, result: ProbeResult) -> Optional[PacketLossResult]:
         """
-        Parse packet loss percentage from ping output.
+        Compute packet loss from a probe burst.
         
         Args:
-            output: Raw ping command output
-            expected_count: Expected number of packets sent
+            result: Probe result to analyze
             
         Returns:
-            Packet loss percentage or None
+            PacketLossResult object or None if no packets were sent
         """
-        try:
-            if self.system == "windows":
-                # Windows format: "Lost = X (Y% loss)"
-                match = re.search(r'Lost\s*=\s*\d+\s*\((\d+)%\s*loss\)', output)
-                if match:
-                    return float(match.group(1))
-                
-                # Alternative: count received packets
-                match = re.search(r'Received\s*=\s*(\d+)', output)
-                if match:
-                    received = int(match.group(1))
-                    return ((expected_count - received) / expected_count) * 100
-            else:
-                # Linux/macOS format: "X packets transmitted, Y received, Z% packet loss"
-                match = re.search(r'(\d+)%\s*packet loss', output)
-                if match:
-                    return float(match.group(1))
-                
-                # Alternative: parse transmitted and received
-                match = re.search(r'(\d+)\s*packets transmitted,\s*(\d+)\s*received', output)
-                if match:
-                    sent = int(match.group(1))
-                    received = int(match.group(2))
-                    return ((sent - received) / sent) * 100 if sent > 0 else 100.0
-            
+        if result.sent == 0:
+            self.logger.error(f"No packets sent to {result.host}")
             return None
-            
-        except Exception as e:
-            self.logger.error(f"Error parsing packet loss: {e}")
-            return None
-    
-    def _parse_packet_counts(self, output: str) -> tuple[int, int]:
-        """
-        Parse packet sent and received counts.
         
-        Args:
-            output: Raw ping command output
-            
-        Returns:
-            Tuple of (sent, received) packet counts
-        """
-        sent = 0
-        received = 0
+        result_obj = PacketLossResult(
+            sent=result.sent,
+            received=result.received,
+            loss_percentage=result.loss_percentage,
+            host=result.host
+        )
         
-        try:
-            if self.system == "windows":
-                # Windows format
-                match_sent = re.search(r'Sent\s*=\s*(\d+)', output)
-                match_received = re.search(r'Received\s*=\s*(\d+)', output)
-                
-                if match_sent:
-                    sent = int(match_sent.group(1))
-                if match_received:
-                    received = int(match_received.group(1))
-            else:
-                # Linux/macOS format
-                match = re.search(r'(\d+)\s*packets transmitted,\s*(\d+)\s*received', output)
-                if match:
-                    sent = int(match.group(1))
-                    received = int(match.group(2))
-            
-        except Exception as e:
-            self.logger.error(f"Error parsing packet counts: {e}")
+        self.logger.debug(
+            f"Packet loss for {result.host}: {result_obj.received}/{result_obj.sent} "
+            f"packets received ({result_obj.loss_percentage:.2f}% loss)"
+        )
         
-        return sent, received
+        return result_obj
 
 
 class PacketLossClassifier:
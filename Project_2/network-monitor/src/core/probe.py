@@ -0,0 +1,357 @@
+"""
+Probe Module
+
+Runs a single burst of ICMP echo requests against a target and returns
+a unified result holding per-packet RTTs and sent/received counts.
+Latency, jitter and packet loss are all derived from the same burst,
+so each monitoring cycle probes a target only once.
+
+Jitter follows RFC 3393: mean absolute difference between the RTTs of
+consecutive received packets.
+"""
+
+import asyncio
+import platform
+import re
+import socket
+import statistics
+import subprocess
+import logging
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import List, Optional
+
+from .icmp import create_prober
+from .probe_cache import ProbeCache
+from .resolver import DNSCache
+
+
+@dataclass
+class ProbeResult:
+    """
+    Result of one probe burst.
+    
+    Attributes:
+        host: Target host
+        rtts: Per-packet RTTs in milliseconds (None for lost packets)
+        timestamp: Time the burst started
+        dns_ms: DNS lookup time spent for this probe (None if the
+            address came from the cache or host is an IP address)
+    """
+    host: str
+    rtts: List[Optional[float]]
+    timestamp: datetime = field(default_factory=datetime.now)
+    dns_ms: Optional[float] = None
+    
+    @property
+    def received_rtts(self) -> List[float]:
+        """RTTs of the packets that were answered, in send order."""
+        return [rtt for rtt in self.rtts if rtt is not None]
+    
+    @property
+    def sent(self) -> int:
+        """Number of packets sent."""
+        return len(self.rtts)
+    
+    @property
+    def received(self) -> int:
+        """Number of replies received."""
+        return len(self.received_rtts)
+    
+    @property
+    def loss_percentage(self) -> float:
+        """Packet loss as percentage (100 if nothing was sent)."""
+        if self.sent == 0:
+            return 100.0
+        return ((self.sent - self.received) / self.sent) * 100
+    
+    @property
+    def min_ms(self) -> Optional[float]:
+        """Minimum RTT, or None if no reply was received."""
+        rtts = self.received_rtts
+        return min(rtts) if rtts else None
+    
+    @property
+    def avg_ms(self) -> Optional[float]:
+        """Average RTT, or None if no reply was received."""
+        rtts = self.received_rtts
+        return statistics.mean(rtts) if rtts else None
+    
+    @property
+    def max_ms(self) -> Optional[float]:
+        """Maximum RTT, or None if no reply was received."""
+        rtts = self.received_rtts
+        return max(rtts) if rtts else None
+    
+    @property
+    def mdev_ms(self) -> Optional[float]:
+        """Mean deviation of RTT as reported by ping (population stdev)."""
+        rtts = self.received_rtts
+        return statistics.pstdev(rtts) if rtts else None
+    
+    @property
+    def jitter_ms(self) -> Optional[float]:
+        """Mean absolute difference of consecutive RTTs, or None if < 2 replies."""
+        rtts = self.received_rtts
+        if len(rtts) < 2:
+            return None
+        return statistics.mean(abs(b - a) for a, b in zip(rtts, rtts[1:]))
+
+
+def parse_ping_output(output: str, host: str) -> Optional[ProbeResult]:
+    """
+    Build a probe result from ping command output.
+    
+    Handles Linux/macOS ("time=X ms", "N packets transmitted") and
+    Windows ("time=Xms", "Sent = N") formats.
+    
+    Args:
+        output: Raw ping command output
+        host: Target host
+    
+    Returns:
+        ProbeResult or None if the output could not be parsed
+    """
+    rtts: List[Optional[float]] = [
+        float(x) for x in re.findall(r'time[=<]([\d.]+)\s*ms', output)
+    ]
+    
+    match = re.search(r'(\d+)\s*packets transmitted', output)
+    if match is None:
+        match = re.search(r'Sent\s*=\s*(\d+)', output)
+    
+    if match is not None:
+        sent = int(match.group(1))
+    elif rtts:
+        sent = len(rtts)
+    else:
+        return None
+    
+    # Lost packets are appended; their position in the burst is unknown
+    rtts += [None] * max(sent - len(rtts), 0)
+    return ProbeResult(host=host, rtts=rtts)
+
+
+class Prober:
+    """
+    Sends probe bursts using the configured backend.
+    
+    Uses the in-process ICMP prober when available and the system's
+    ping utility otherwise. Shared by LatencyMonitor and
+    PacketLossAnalyzer so both read from the same burst.
+    """
+    
+    def __init__(
+        self,
+        backend: str = "auto",
+        interval: float = 0.2,
+        cache_ttl: float = 1.0,
+        resolver: Optional[DNSCache] = None
+    ):
+        """
+        Initialize the prober.
+        
+        Args:
+            backend: Probe backend ("auto", "native" or "subprocess")
+            interval: Seconds between packets of a burst
+            cache_ttl: Seconds a burst result is reused for identical
+                requests (0 only coalesces concurrent ones)
+            resolver: DNS cache used to resolve hostnames
+        """
+        self.logger = logging.getLogger(__name__)
+        self.system = platform.system().lower()
+        self.icmp = create_prober(backend)
+        self.backend = "native" if self.icmp else "subprocess"
+        self.interval = interval
+        self._async_icmp = None
+        self.cache = ProbeCache(ttl=cache_ttl)
+        self.resolver = resolver or DNSCache()
+        self.logger.debug(f"Prober initialized ({self.backend} backend)")
+    
+    def probe(self, host: str, count: int = 1, timeout: int = 2) -> Optional[ProbeResult]:
+        """
+        Send a burst of echo requests to a target host.
+        
+        Args:
+            host: Target IP address or hostname
+            count: Number of packets to send
+            timeout: Timeout in seconds for each packet
+        
+        Returns:
+            ProbeResult, or None if the probe could not be performed
+        
+        Raises:
+            ResolutionError: If host cannot be resolved (no packets sent)
+        """
+        address, dns_ms = self.resolver.resolve(host)
+        result = self.cache.get_or_probe(
+            (address, count, timeout, self.interval),
+            lambda: self._probe(address, count, timeout)
+        )
+        return self._for_host(result, host, dns_ms)
+    
+    @staticmethod
+    def _for_host(
+        result: Optional[ProbeResult],
+        host: str,
+        dns_ms: Optional[float]
+    ) -> Optional[ProbeResult]:
+        """Copy of a (possibly shared) result labelled for one requester."""
+        if result is None:
+            return None
+        return replace(result, host=host, dns_ms=dns_ms)
+    
+    def _probe(self, host: str, count: int, timeout: int) -> Optional[ProbeResult]:
+        """Send a burst with the active backend (uncached)."""
+        if self.icmp is not None:
+            return self._probe_native(host, count, timeout)
+        return self._probe_subprocess(host, count, timeout)
+    
+    async def probe_async(
+        self,
+        host: str,
+        count: int = 1,
+        timeout: int = 2
+    ) -> Optional[ProbeResult]:
+        """
+        Send a burst of echo requests without blocking the event loop.
+        
+        Args:
+            host: Target IP address or hostname
+            count: Number of packets to send
+            timeout: Timeout in seconds for each packet
+        
+        Returns:
+            ProbeResult, or None if the probe could not be performed
+        
+        Raises:
+            ResolutionError: If host cannot be resolved (no packets sent)
+        """
+        # Lookups may block, so they run off the event loop
+        address, dns_ms = await asyncio.get_running_loop().run_in_executor(
+            None, self.resolver.resolve, host
+        )
+        result = await self.cache.get_or_probe_async(
+            (address, count, timeout, self.interval),
+            lambda: self._probe_async(address, count, timeout)
+        )
+        return self._for_host(result, host, dns_ms)
+    
+    async def _probe_async(self, host: str, count: int, timeout: int) -> Optional[ProbeResult]:
+        """Send a burst on the event loop with the active backend (uncached)."""
+        timestamp = datetime.now()
+        
+        if self.icmp is None:
+            return await self._probe_subprocess_async(host, count, timeout, timestamp)
+        
+        if self._async_icmp is None:
+            self._async_icmp = create_prober("native", asynchronous=True)
+        
+        try:
+            rtts = await self._async_icmp.ping(
+                host, count=count, timeout=timeout, interval=self.interval
+            )
+        except socket.gaierror as e:
+            self.logger.warning(f"Could not resolve {host}: {e}")
+            return None
+        except Exception as e:
+            self.logger.error(f"Error probing {host}: {e}")
+            return None
+        
+        return ProbeResult(host=host, rtts=rtts, timestamp=timestamp)
+    
+    async def _probe_subprocess_async(
+        self,
+        host: str,
+        count: int,
+        timeout: int,
+        timestamp: datetime
+    ) -> Optional[ProbeResult]:
+        """Probe by running ping as a non-blocking child process."""
+        cmd = self._ping_command(host, count, timeout)
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except Exception as e:
+            self.logger.error(f"Error running ping for {host}: {e}")
+            return None
+        
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(), timeout * count + 2
+            )
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            self.logger.warning(f"Ping to {host} timed out")
+            return ProbeResult(host=host, rtts=[None] * count, timestamp=timestamp)
+        
+        probe = parse_ping_output(stdout.decode(errors="replace"), host)
+        if probe is None:
+            self.logger.warning(
+                f"Ping to {host} failed: {stderr.decode(errors='replace').strip()}"
+            )
+            return None
+        
+        probe.timestamp = timestamp
+        return probe
+    
+    def close(self):
+        """Release sockets held by the asynchronous prober."""
+        if self._async_icmp is not None:
+            self._async_icmp.close()
+    
+    def _ping_command(self, host: str, count: int, timeout: int) -> List[str]:
+        """Build the platform-specific ping command line."""
+        if self.system == "windows":
+            return ["ping", "-n", str(count), "-w", str(timeout * 1000), host]
+        
+        # Linux, macOS
+        cmd = ["ping", "-c", str(count), "-W", str(timeout), host]
+        if self.system == "linux" and count > 1:
+            cmd[1:1] = ["-i", str(self.interval)]
+        return cmd
+    
+    def _probe_native(self, host: str, count: int, timeout: int) -> Optional[ProbeResult]:
+        """Probe with the in-process ICMP socket."""
+        timestamp = datetime.now()
+        try:
+            rtts = self.icmp.ping(host, count=count, timeout=timeout, interval=self.interval)
+        except socket.gaierror as e:
+            self.logger.warning(f"Could not resolve {host}: {e}")
+            return None
+        except Exception as e:
+            self.logger.error(f"Error probing {host}: {e}")
+            return None
+        
+        return ProbeResult(host=host, rtts=rtts, timestamp=timestamp)
+    
+    def _probe_subprocess(self, host: str, count: int, timeout: int) -> Optional[ProbeResult]:
+        """Probe by running the system ping utility."""
+        timestamp = datetime.now()
+        cmd = self._ping_command(host, count, timeout)
+        
+        try:
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=timeout * count + 2
+            )
+        except subprocess.TimeoutExpired:
+            self.logger.warning(f"Ping to {host} timed out")
+            return ProbeResult(host=host, rtts=[None] * count, timestamp=timestamp)
+        except Exception as e:
+            self.logger.error(f"Error running ping for {host}: {e}")
+            return None
+        
+        probe = parse_ping_output(result.stdout, host)
+        if probe is None:
+            self.logger.warning(f"Ping to {host} failed: {result.stderr.strip()}")
+            return None
+        
+        probe.timestamp = timestamp
+        return probe
@@ -0,0 +1,156 @@
+"""
+Probe Cache Module
+
+Short-lived cache of probe results with single-flight coalescing. When
+several requesters ask for the same host with the same probe parameters
+at the same time (duplicate targets, on-demand measurements during the
+scheduled loop), only one burst is sent and every requester receives
+its result.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Flight:
+    """A probe in progress, awaited by coalesced requesters."""
+    
+    __slots__ = ("done", "result")
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Any] = None
+
+
+class ProbeCache:
+    """
+    TTL cache and in-flight registry for probe results.
+    
+    Successful results are reused for ttl seconds; failed probes (None)
+    are shared with requesters already waiting but not cached.
+    """
+    
+    def __init__(self, ttl: float = 1.0, max_entries: int = 4096):
+        """
+        Initialize the cache.
+        
+        Args:
+            ttl: Seconds a result is reused (0 only coalesces concurrent probes)
+            max_entries: Cached results kept before expired ones are purged
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._results: Dict[Hashable, Tuple[float, Any]] = {}
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._async_flights: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {"hits": 0, "coalesced": 0, "misses": 0}
+    
+    def _cached(self, key: Hashable, now: float):
+        """Fresh cached result for a key (lock held)."""
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._results[key]
+            return None
+        return entry[1]
+    
+    def _store(self, key: Hashable, result: Optional[Any]):
+        """Cache a successful result (lock held)."""
+        if result is None or self.ttl <= 0:
+            return
+        now = time.monotonic()
+        if len(self._results) >= self.max_entries:
+            self._results = {k: v for k, v in self._results.items() if v[0] > now}
+        self._results[key] = (now + self.ttl, result)
+    
+    def get_or_probe(
+        self,
+        key: Hashable,
+        probe: Callable[[], Optional[Any]]
+    ) -> Optional[Any]:
+        """
+        Return a cached or in-flight result, or run the probe.
+        
+        Args:
+            key: Host and probe parameters
+            probe: Performs the probe when no result can be shared
+        
+        Returns:
+            ProbeResult or None
+        """
+        with self._lock:
+            cached = self._cached(key, time.monotonic())
+            if cached is not None:
+                self.stats["hits"] += 1
+                return cached
+            
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.stats["coalesced"] += 1
+                owner = False
+            else:
+                flight = self._flights[key] = _Flight()
+                self.stats["misses"] += 1
+                owner = True
+        
+        if not owner:
+            flight.done.wait()
+            return flight.result
+        
+        try:
+            flight.result = probe()
+        finally:
+            with self._lock:
+                self._store(key, flight.result)
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+    
+    async def get_or_probe_async(
+        self,
+        key: Hashable,
+        probe: Callable[[], Awaitable[Optional[Any]]]
+    ) -> Optional[Any]:
+        """
+        Asynchronous variant of get_or_probe for the event loop.
+        
+        Args:
+            key: Host and probe parameters
+            probe: Coroutine function performing the probe
+        
+        Returns:
+            ProbeResult or None
+        """
+        with self._lock:
+            cached = self._cached(key, time.monotonic())
+            if cached is not None:
+                self.stats["hits"] += 1
+                return cached
+            
+            flight = self._async_flights.get(key)
+            if flight is not None:
+                self.stats["coalesced"] += 1
+                owner = False
+            else:
+                flight = self._async_flights[key] = asyncio.get_running_loop().create_future()
+                self.stats["misses"] += 1
+                owner = True
+        
+        if not owner:
+            # Shielded so a cancelled waiter does not cancel the shared probe
+            return await asyncio.shield(flight)
+        
+        result = None
+        try:
+            result = await probe()
+        finally:
+            with self._lock:
+                self._store(key, result)
+                del self._async_flights[key]
+            if not flight.done():
+                flight.set_result(result)
+        return result
@@ -0,0 +1,168 @@
+"""
+DNS Resolution Cache Module
+
+Resolves target hostnames once and reuses the address for a configured
+time to live, so probes measure the network path rather than the
+resolver. Entries nearing expiry are refreshed in the background while
+the cached address keeps being served; the time spent in each lookup is
+reported so it can be stored as its own metric.
+
+The standard library resolver does not expose record TTLs, so a
+configured TTL is applied to every entry.
+"""
+
+import ipaddress
+import socket
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+
+class ResolutionError(OSError):
+    """Raised when a target hostname cannot be resolved."""
+
+
+@dataclass
+class _Entry:
+    """Cached resolution of one hostname."""
+    address: Optional[str]
+    expires: float
+    refresh_at: float
+    lookup_ms: Optional[float] = None
+    error: Optional[str] = None
+    refreshing: bool = False
+
+
+class DNSCache:
+    """
+    Thread-safe hostname -> address cache with background refresh.
+    """
+    
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        negative_ttl: float = 30.0,
+        refresh_ahead: float = 0.8,
+        family: int = socket.AF_INET
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            ttl: Seconds a resolved address is used
+            negative_ttl: Seconds a failed lookup is remembered
+            refresh_ahead: Fraction of ttl after which the entry is
+                refreshed in the background
+            family: Address family to resolve
+        """
+        self.logger = logging.getLogger(__name__)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.refresh_ahead = refresh_ahead
+        self.family = family
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "lookups": 0, "failures": 0, "refreshes": 0}
+    
+    def resolve(self, host: str) -> Tuple[str, Optional[float]]:
+        """
+        Return the address to probe for a host.
+        
+        Args:
+            host: Hostname or IP address
+        
+        Returns:
+            (address, lookup time in ms) - the lookup time is reported once
+            per DNS query (including background refreshes) and is None
+            when the answer came from the cache
+        
+        Raises:
+            ResolutionError: If the host cannot be resolved
+        """
+        if _is_ip_address(host):
+            return host, None
+        
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is not None and entry.expires > now:
+                self.stats["hits"] += 1
+                if entry.error is not None:
+                    raise ResolutionError(f"Could not resolve {host}: {entry.error}")
+                if now >= entry.refresh_at and not entry.refreshing:
+                    entry.refreshing = True
+                    threading.Thread(
+                        target=self._refresh, args=(host,), daemon=True,
+                        name=f"DNSRefresh-{host}"
+                    ).start()
+                lookup_ms, entry.lookup_ms = entry.lookup_ms, None
+                return entry.address, lookup_ms
+        
+        entry = self._lookup(host)
+        with self._lock:
+            self._entries[host] = entry
+            entry.lookup_ms, lookup_ms = None, entry.lookup_ms
+        if entry.error is not None:
+            raise ResolutionError(f"Could not resolve {host}: {entry.error}")
+        return entry.address, lookup_ms
+    
+    def _lookup(self, host: str) -> _Entry:
+        """Query the resolver and build a cache entry."""
+        started = time.perf_counter()
+        try:
+            info = socket.getaddrinfo(host, None, self.family, socket.SOCK_RAW)
+            address = info[0][4][0]
+            error = None
+        except (socket.gaierror, UnicodeError, IndexError) as e:
+            address = None
+            error = str(e) or type(e).__name__
+        lookup_ms = (time.perf_counter() - started) * 1000
+        
+        now = time.monotonic()
+        with self._lock:
+            self.stats["lookups"] += 1
+            if error is not None:
+                self.stats["failures"] += 1
+        
+        if error is not None:
+            self.logger.warning(f"DNS lookup for {host} failed: {error}")
+            return _Entry(None, now + self.negative_ttl, now + self.negative_ttl, lookup_ms, error)
+        
+        return _Entry(address, now + self.ttl, now + self.ttl * self.refresh_ahead, lookup_ms)
+    
+    def _refresh(self, host: str):
+        """Background refresh; keeps the current address if the lookup fails."""
+        entry = self._lookup(host)
+        with self._lock:
+            self.stats["refreshes"] += 1
+            current = self._entries.get(host)
+            if entry.error is not None and current is not None and current.address is not None:
+                # Serve the stale address until the next refresh attempt
+                current.refreshing = False
+                current.refresh_at = time.monotonic() + self.negative_ttl
+                return
+            self._entries[host] = entry
+    
+    def invalidate(self, host: Optional[str] = None):
+        """
+        Drop cached entries.
+        
+        Args:
+            host: Hostname to forget (None clears the cache)
+        """
+        with self._lock:
+            if host is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(host, None)
+
+
+def _is_ip_address(host: str) -> bool:
+    """Return True if host is an IPv4/IPv6 literal."""
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
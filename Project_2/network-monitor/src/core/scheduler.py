@@ -0,0 +1,154 @@
+"""
+Asynchronous Scheduler Module
+
+Runs the monitoring loop for all targets on a single asyncio event loop
+instead of one OS thread per target. Probes are non-blocking, the number
+of probes in flight is bounded by a semaphore, and each target follows
+its own staggered, drift-free tick grid (see ticker) so large fleets do
+not probe in lockstep.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from .resolver import ResolutionError
+
+
+class AsyncScheduler:
+    """
+    Multiplexes monitoring of many targets on one event loop.
+    
+    Probing happens on the loop; storing metrics and checking thresholds
+    (which may block on the database) run in a small worker pool so they
+    never stall probes of other targets.
+    """
+    
+    def __init__(
+        self,
+        monitor,
+        max_concurrency: int = 256,
+        workers: int = 4
+    ):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            monitor: NetworkMonitor owning targets, prober and storage
+            max_concurrency: Maximum number of probes in flight
+            workers: Threads used for storage and alerting
+        """
+        self.logger = logging.getLogger(__name__)
+        self.monitor = monitor
+        self.max_concurrency = max_concurrency
+        self.workers = workers
+        
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+    
+    async def run(self):
+        """Monitor all enabled targets until stop() is called."""
+        self.loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._executor = executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="MonitorWorker"
+        )
+        
+        for target in self.monitor.targets:
+            if target.enabled:
+                self._start_task(target)
+        self.logger.info(
+            f"Async scheduler started for {len(self._tasks)} targets "
+            f"(max {self.max_concurrency} probes in flight)"
+        )
+        
+        try:
+            await self._stop_event.wait()
+        finally:
+            tasks: List[asyncio.Task] = list(self._tasks.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._tasks.clear()
+            self.monitor.prober.close()
+            executor.shutdown(wait=True)
+            # The loop closes with run(); later target changes are no-ops
+            self.loop = None
+            self.logger.info("Async scheduler stopped")
+    
+    def stop(self):
+        """Request the scheduler to stop (safe to call from any thread)."""
+        if self.loop is not None and self._stop_event is not None:
+            self.loop.call_soon_threadsafe(self._stop_event.set)
+    
+    def add_target(self, target):
+        """Start monitoring a target (safe to call from any thread)."""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._start_task, target)
+    
+    def remove_target(self, name: str):
+        """Stop monitoring a target (safe to call from any thread)."""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._cancel_task, name)
+    
+    def _start_task(self, target):
+        """Create the monitoring task of a target (on the loop)."""
+        if target.name in self._tasks or self._stop_event.is_set():
+            return
+        self._tasks[target.name] = asyncio.create_task(
+            self._run_target(target, self._semaphore, self._executor),
+            name=f"Monitor-{target.name}"
+        )
+    
+    def _cancel_task(self, name: str):
+        """Cancel the monitoring task of a target (on the loop)."""
+        task = self._tasks.pop(name, None)
+        if task is not None:
+            task.cancel()
+    
+    async def _run_target(self, target, semaphore: asyncio.Semaphore, executor):
+        """
+        Monitoring loop for a single target.
+        
+        Args:
+            target: MonitorTarget to probe
+            semaphore: Bounds concurrent probes across all targets
+            executor: Worker pool for blocking storage/alerting
+        """
+        previous_latency = None
+        schedule = self.monitor.new_schedule()
+        
+        while True:
+            await asyncio.sleep(schedule.delay())
+            lateness, missed = schedule.tick(self.monitor.interval)
+            if self.monitor.tick_stats.record(target.name, lateness, missed):
+                self.loop.run_in_executor(
+                    executor, self.monitor._store_tick_metrics, target, lateness, missed
+                )
+            
+            try:
+                async with semaphore:
+                    result = await self.monitor.prober.probe_async(
+                        target.host, count=self.monitor.probe_count
+                    )
+                previous_latency = await self.loop.run_in_executor(
+                    executor,
+                    self.monitor._record_probe,
+                    target,
+                    result,
+                    previous_latency
+                )
+            except asyncio.CancelledError:
+                raise
+            except ResolutionError as e:
+                previous_latency = None
+                await self.loop.run_in_executor(
+                    executor, self.monitor._record_resolution_failure, target, e
+                )
+            except Exception as e:
+                self.logger.error(f"Error monitoring {target.name}: {e}")
@@ -0,0 +1,391 @@
+"""
+Sharded Monitoring Module
+
+Spreads targets over several worker processes so probing and result
+parsing are not limited to one interpreter (GIL). Targets are assigned
+to shards by CRC32 of their name; each worker runs its own asyncio probe
+loop with drift-free tick grids and streams compact result tuples back
+over a multiprocessing queue (a pipe). A single aggregator in the main
+process owns storage, threshold checks and alerting.
+"""
+
+import asyncio
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from .probe import Prober, ProbeResult
+from .resolver import DNSCache, ResolutionError
+from .ticker import TickSchedule, stagger_phase
+
+
+# Messages from workers: (kind, target, lateness, missed, *payload)
+PROBE = "probe"                  # payload: timestamp, rtts, dns_ms
+RESOLUTION_ERROR = "dns_error"   # payload: error message
+
+# Seconds between checks of the control queue and stop event in workers
+CONTROL_POLL_INTERVAL = 0.2
+
+# Seconds between liveness checks of the workers by the aggregator
+WORKER_CHECK_INTERVAL = 1.0
+
+
+def shard_for(name: str, shards: int) -> int:
+    """
+    Shard that monitors a target.
+    
+    Args:
+        name: Target name
+        shards: Number of shards
+    
+    Returns:
+        Shard index in [0, shards)
+    """
+    return zlib.crc32(name.encode()) % shards
+
+
+def _worker_main(shard: int, targets: List[Tuple], settings: Dict, results, control, stop):
+    """Process entry point of one shard."""
+    logging.basicConfig(
+        level=settings.get("log_level", logging.INFO),
+        format=f"%(asctime)s - shard {shard} - %(name)s - %(levelname)s - %(message)s"
+    )
+    worker = ShardWorker(shard, settings, results, control, stop)
+    try:
+        asyncio.run(worker.run(targets))
+    except KeyboardInterrupt:
+        pass
+
+
+class ShardWorker:
+    """
+    Probe loop of one shard (runs inside the worker process).
+    """
+    
+    def __init__(self, shard: int, settings: Dict, results, control, stop):
+        """
+        Initialize the worker.
+        
+        Args:
+            shard: Shard index
+            settings: Probe settings (interval, probe_count, probe_backend,
+                probe_interval, probe_cache_ttl, dns_ttl, dns_negative_ttl,
+                max_concurrency)
+            results: Queue results are streamed to
+            control: Queue of ("add", host, name, phase), ("remove", name)
+                and ("interval", seconds) commands
+            stop: Event ending the worker
+        """
+        self.logger = logging.getLogger(__name__)
+        self.shard = shard
+        self.interval = settings["interval"]
+        self.probe_count = settings.get("probe_count", 10)
+        self.max_concurrency = settings.get("max_concurrency", 256)
+        self.results = results
+        self.control = control
+        self.stop = stop
+        self.prober = Prober(
+            backend=settings.get("probe_backend", "auto"),
+            interval=settings.get("probe_interval", 0.2),
+            cache_ttl=settings.get("probe_cache_ttl", 1.0),
+            resolver=DNSCache(
+                ttl=settings.get("dns_ttl", 300),
+                negative_ttl=settings.get("dns_negative_ttl", 30)
+            )
+        )
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    async def run(self, targets: List[Tuple]):
+        """
+        Probe targets until the stop event is set.
+        
+        Args:
+            targets: Initial (host, name, phase) entries
+        """
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        for host, name, phase in targets:
+            self._start(host, name, phase)
+        self.logger.info(f"Shard {self.shard} started with {len(self._tasks)} targets (pid {os.getpid()})")
+        
+        try:
+            while not self.stop.is_set():
+                self._drain_control()
+                await asyncio.sleep(CONTROL_POLL_INTERVAL)
+        finally:
+            tasks = list(self._tasks.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.prober.close()
+            self.results.close()
+    
+    def _drain_control(self):
+        """Apply pending control commands."""
+        while True:
+            try:
+                command = self.control.get_nowait()
+            except queue.Empty:
+                return
+            if command[0] == "add":
+                self._start(*command[1:])
+            elif command[0] == "remove":
+                task = self._tasks.pop(command[1], None)
+                if task is not None:
+                    task.cancel()
+            elif command[0] == "interval":
+                self.interval = command[1]
+    
+    def _start(self, host: str, name: str, phase: float):
+        """Create the probe task of a target."""
+        if name not in self._tasks:
+            self._tasks[name] = asyncio.create_task(
+                self._run_target(host, name, phase), name=f"Shard{self.shard}-{name}"
+            )
+    
+    async def _run_target(self, host: str, name: str, phase: float):
+        """
+        Probe one target on its tick grid and stream the results.
+        
+        Args:
+            host: Target host
+            name: Target name
+            phase: Offset of the first tick
+        """
+        schedule = TickSchedule(self.interval, phase)
+        
+        while True:
+            await asyncio.sleep(schedule.delay())
+            lateness, missed = schedule.tick(self.interval)
+            
+            try:
+                async with self._semaphore:
+                    result = await self.prober.probe_async(host, count=self.probe_count)
+            except asyncio.CancelledError:
+                raise
+            except ResolutionError as e:
+                self.results.put((RESOLUTION_ERROR, name, lateness, missed, str(e)))
+                continue
+            except Exception as e:
+                self.logger.error(f"Error probing {name}: {e}")
+                result = None
+            
+            if result is None:
+                self.results.put((PROBE, name, lateness, missed, None, None, None))
+            else:
+                self.results.put(
+                    (PROBE, name, lateness, missed, result.timestamp, result.rtts, result.dns_ms)
+                )
+
+
+class ShardedScheduler:
+    """
+    Runs targets in worker processes and aggregates their results.
+    
+    The aggregator loop (run()) executes in the calling thread and is the
+    only place results are stored and checked, so storage and alerting
+    behave exactly as in the single-process modes.
+    """
+    
+    def __init__(self, monitor, shards: Optional[int] = None, max_concurrency: int = 256):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            monitor: NetworkMonitor owning targets, settings and storage
+            shards: Number of worker processes (None for one per CPU)
+            max_concurrency: Maximum probes in flight per worker
+        """
+        self.logger = logging.getLogger(__name__)
+        self.monitor = monitor
+        self.shards = shards or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency
+        
+        self._context = mp.get_context("spawn")
+        self._results = None
+        self._stop = None
+        self._controls: List = []
+        self._processes: List = []
+        self._assignments: List[List[Tuple]] = []
+        self._targets: Dict[str, object] = {}
+        self._phases: Dict[str, float] = {}
+        self._previous_latency: Dict[str, Optional[float]] = {}
+        self._lock = threading.Lock()
+        self._stop_requested = threading.Event()
+        self.stats = {"messages": 0, "restarts": 0}
+    
+    def _settings(self) -> Dict:
+        """Probe settings passed to workers."""
+        config = self.monitor.config
+        return {
+            "interval": self.monitor.interval,
+            "probe_count": self.monitor.probe_count,
+            "probe_backend": config.get("monitoring.probe_backend", "auto"),
+            "probe_interval": config.get("monitoring.probe_interval", 0.2),
+            "probe_cache_ttl": config.get("monitoring.probe_cache_ttl", 1.0),
+            "dns_ttl": config.get("monitoring.dns_ttl", 300),
+            "dns_negative_ttl": config.get("monitoring.dns_negative_ttl", 30),
+            "max_concurrency": self.max_concurrency,
+            "log_level": logging.getLogger().getEffectiveLevel(),
+        }
+    
+    def run(self):
+        """Start the workers and aggregate results until stop() is called."""
+        self._results = self._context.Queue()
+        self._stop = self._context.Event()
+        self._assignments = [[] for _ in range(self.shards)]
+        
+        with self._lock:
+            for target in self.monitor.targets:
+                if target.enabled:
+                    self._assign(target)
+            self._controls = [self._context.Queue() for _ in range(self.shards)]
+            self._processes = [self._spawn(shard) for shard in range(self.shards)]
+        self.logger.info(
+            f"Sharded scheduler started {self.shards} workers for {len(self._targets)} targets"
+        )
+        
+        try:
+            # Checked on a timer: busy shards keep the queue from ever idling
+            next_check = time.monotonic() + WORKER_CHECK_INTERVAL
+            while not self._stop_requested.is_set():
+                try:
+                    message = self._results.get(timeout=0.5)
+                except queue.Empty:
+                    message = None
+                if message is not None:
+                    try:
+                        self._handle(message)
+                    except Exception as e:
+                        self.logger.error(f"Error aggregating result for {message[1]}: {e}")
+                
+                now = time.monotonic()
+                if now >= next_check:
+                    self._check_workers()
+                    next_check = now + WORKER_CHECK_INTERVAL
+        finally:
+            self._shutdown()
+    
+    def stop(self):
+        """Request the scheduler to stop (safe to call from any thread)."""
+        self._stop_requested.set()
+    
+    def _assign(self, target) -> int:
+        """Record a target in its shard's assignment (lock held)."""
+        shard = shard_for(target.name, self.shards)
+        phase = stagger_phase(next(self.monitor._schedule_index), self.monitor.interval)
+        self._targets[target.name] = target
+        self._phases[target.name] = phase
+        self._assignments[shard].append((target.host, target.name, phase))
+        return shard
+    
+    def _spawn(self, shard: int):
+        """Start the worker process of a shard (lock held)."""
+        process = self._context.Process(
+            target=_worker_main,
+            args=(
+                shard,
+                list(self._assignments[shard]),
+                self._settings(),
+                self._results,
+                self._controls[shard],
+                self._stop
+            ),
+            daemon=True,
+            name=f"MonitorShard-{shard}"
+        )
+        process.start()
+        return process
+    
+    def _check_workers(self):
+        """Restart workers that died unexpectedly."""
+        with self._lock:
+            for shard, process in enumerate(self._processes):
+                if process.is_alive() or self._stop.is_set():
+                    continue
+                self.logger.error(
+                    f"Shard {shard} exited with code {process.exitcode}, restarting"
+                )
+                self._controls[shard] = self._context.Queue()
+                self._processes[shard] = self._spawn(shard)
+                self.stats["restarts"] += 1
+    
+    def add_target(self, target):
+        """Start monitoring a target (safe to call from any thread)."""
+        with self._lock:
+            if target.name in self._targets or self._stop is None:
+                return
+            shard = self._assign(target)
+            self._controls[shard].put(("add", target.host, target.name, self._phases[target.name]))
+    
+    def remove_target(self, name: str):
+        """Stop monitoring a target (safe to call from any thread)."""
+        with self._lock:
+            target = self._targets.pop(name, None)
+            if target is None or self._stop is None:
+                return
+            shard = shard_for(name, self.shards)
+            self._assignments[shard] = [
+                entry for entry in self._assignments[shard] if entry[1] != name
+            ]
+            self._phases.pop(name, None)
+            self._previous_latency.pop(name, None)
+            self._controls[shard].put(("remove", name))
+    
+    def set_interval(self, interval: float):
+        """
+        Change the monitoring interval of all workers.
+        
+        Args:
+            interval: Seconds between ticks, applied from each target's next tick
+        """
+        with self._lock:
+            for control in self._controls:
+                control.put(("interval", interval))
+    
+    def _handle(self, message: Tuple):
+        """Store and check one result streamed by a worker."""
+        kind, name, lateness, missed = message[:4]
+        target = self._targets.get(name)
+        if target is None:
+            return
+        self.stats["messages"] += 1
+        
+        if self.monitor.tick_stats.record(name, lateness, missed):
+            self.monitor._store_tick_metrics(target, lateness, missed)
+        
+        if kind == RESOLUTION_ERROR:
+            self._previous_latency[name] = None
+            self.monitor._record_resolution_failure(target, ResolutionError(message[4]))
+            return
+        
+        timestamp, rtts, dns_ms = message[4:]
+        result = None
+        if rtts is not None:
+            result = ProbeResult(host=target.host, rtts=rtts, timestamp=timestamp, dns_ms=dns_ms)
+        self._previous_latency[name] = self.monitor._record_probe(
+            target, result, self._previous_latency.get(name)
+        )
+    
+    def _shutdown(self):
+        """Stop workers and process results still in flight."""
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                self.logger.warning(f"{process.name} did not stop, terminating")
+                process.terminate()
+        
+        while True:
+            try:
+                self._handle(self._results.get_nowait())
+            except queue.Empty:
+                break
+            except Exception as e:
+                self.logger.error(f"Error aggregating result: {e}")
+        self.logger.info(f"Sharded scheduler stopped ({self.stats['messages']} results)")
@@ -0,0 +1,138 @@
+"""
+Tick Scheduling Module
+
+Drift-free periodic schedules on the monotonic clock. Each target owns a
+TickSchedule whose ticks sit on a fixed grid (phase + k * period), so the
+time spent probing never accumulates into the period. Target phases are
+staggered across the interval so a fleet does not fire in lockstep, and
+ticks that start late or are skipped because a probe overran are counted
+by TickStats.
+"""
+
+import math
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+
+# Fractional part of the golden ratio: successive multiples are spread
+# almost evenly over [0, 1) however many targets there are
+GOLDEN_RATIO_FRACTION = (math.sqrt(5) - 1) / 2
+
+
+def stagger_phase(index: int, period: float) -> float:
+    """
+    Phase offset of the index-th schedule within one period.
+    
+    Args:
+        index: Sequence number of the schedule (0, 1, 2, ...)
+        period: Tick period in seconds
+    
+    Returns:
+        Offset in [0, period)
+    """
+    return (index * GOLDEN_RATIO_FRACTION) % 1.0 * period
+
+
+class TickSchedule:
+    """
+    Fixed-period tick grid for one target.
+    """
+    
+    def __init__(
+        self,
+        period: float,
+        phase: float = 0.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the schedule.
+        
+        Args:
+            period: Seconds between ticks
+            phase: Delay of the first tick
+            clock: Monotonic time source (seconds)
+        """
+        self.period = period
+        self.clock = clock
+        self.next_tick = clock() + phase
+    
+    def delay(self) -> float:
+        """Seconds until the next tick is due (0 if already due)."""
+        return max(0.0, self.next_tick - self.clock())
+    
+    def tick(self, period: Optional[float] = None) -> Tuple[float, int]:
+        """
+        Start the due tick and schedule the next one.
+        
+        Ticks whose slot passed entirely while the previous tick was
+        still running are skipped rather than run back to back; the
+        grid itself never shifts.
+        
+        Args:
+            period: New period from this tick on (None keeps the current)
+        
+        Returns:
+            (lateness in seconds relative to the current slot, ticks missed)
+        """
+        now = self.clock()
+        lateness = max(0.0, now - self.next_tick)
+        missed = int(lateness // self.period)
+        current = self.next_tick + missed * self.period
+        
+        if period is not None:
+            self.period = period
+        self.next_tick = current + self.period
+        return max(0.0, now - current), missed
+
+
+class TickStats:
+    """
+    Thread-safe per-target counters of late and missed ticks.
+    """
+    
+    def __init__(self, late_threshold: float = 0.5):
+        """
+        Initialize the counters.
+        
+        Args:
+            late_threshold: Seconds after its slot a tick counts as late
+        """
+        self.late_threshold = late_threshold
+        self._lock = threading.Lock()
+        self._targets: Dict[str, Dict] = {}
+    
+    def record(self, target: str, lateness: float, missed: int) -> bool:
+        """
+        Record one started tick.
+        
+        Args:
+            target: Target name
+            lateness: Seconds the tick started after its slot
+            missed: Ticks skipped before this one
+        
+        Returns:
+            True if the tick was late or ticks were missed
+        """
+        late = lateness > self.late_threshold
+        with self._lock:
+            stats = self._targets.get(target)
+            if stats is None:
+                stats = self._targets[target] = {
+                    "ticks": 0, "late": 0, "missed": 0, "max_lateness_ms": 0.0
+                }
+            stats["ticks"] += 1
+            stats["late"] += late
+            stats["missed"] += missed
+            stats["max_lateness_ms"] = max(stats["max_lateness_ms"], lateness * 1000)
+        return late or missed > 0
+    
+    def snapshot(self) -> Dict[str, Dict]:
+        """Return a copy of the counters per target."""
+        with self._lock:
+            return {target: dict(stats) for target, stats in self._targets.items()}
+    
+    def forget(self, target: str):
+        """Drop the counters of a removed target."""
+        with self._lock:
+            self._targets.pop(target, None)
@@ -0,0 +1,318 @@
+"""
+Metrics Archive Module
+
+Columnar archive for history that has aged out of the SQLite database.
+Metrics are written as compressed Parquet (or Arrow IPC) files in a
+hive-partitioned directory tree (metrics/day=YYYY-MM-DD/target=NAME/),
+alerts under alerts/day=YYYY-MM-DD/. Reads go through pyarrow datasets,
+so filters on day and target prune whole directories and timestamp
+filters skip row groups using the file statistics.
+
+Retention archives in batches, so each batch adds a small file to every
+partition it touches. Once a day is complete (older than the retention
+cutoff, so no further rows can arrive) compact() merges its partitions
+into a single file sorted by timestamp.
+
+pyarrow is an optional dependency; it is only required when an archive
+is configured.
+"""
+
+import uuid
+import logging
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    ds = None
+
+
+# Supported file formats: name -> file extension
+FORMATS = {
+    "parquet": "parquet",
+    "ipc": "arrow",
+}
+
+# Partition directories of each archived table, relative to its root
+PARTITION_GLOBS = {
+    "metrics": "day=*/target=*",
+    "alerts": "day=*",
+}
+
+METRIC_COLUMNS = ["timestamp", "target", "metric_type", "value", "unit"]
+ALERT_COLUMNS = ["id", "timestamp", "severity", "message", "acknowledged", "acknowledged_at"]
+
+
+def _schemas():
+    """Arrow schemas of archived metrics and alerts (with partition fields)."""
+    timestamp = pa.timestamp("us")
+    metrics = pa.schema([
+        ("timestamp", timestamp),
+        ("metric_type", pa.string()),
+        ("value", pa.float64()),
+        ("unit", pa.string()),
+        ("day", pa.string()),
+        ("target", pa.string()),
+    ])
+    alerts = pa.schema([
+        ("id", pa.int64()),
+        ("timestamp", timestamp),
+        ("severity", pa.string()),
+        ("message", pa.string()),
+        ("acknowledged", pa.bool_()),
+        ("acknowledged_at", timestamp),
+        ("day", pa.string()),
+    ])
+    return metrics, alerts
+
+
+class MetricArchive:
+    """
+    Partitioned columnar archive of metrics and alerts.
+    
+    Each write produces new uniquely named files in the affected
+    partitions; compact() later merges the files of completed days.
+    """
+    
+    def __init__(self, root: str, format: str = "parquet", compression: str = "zstd"):
+        """
+        Initialize the archive.
+        
+        Args:
+            root: Archive directory
+            format: "parquet" or "ipc" (Arrow IPC / Feather v2)
+            compression: Codec for the files (e.g. "zstd", "lz4")
+        
+        Raises:
+            ImportError: If pyarrow is not installed
+            ValueError: If the format is unknown
+        """
+        if pa is None:
+            raise ImportError("pyarrow is required for metric archival (pip install pyarrow)")
+        if format not in FORMATS:
+            raise ValueError(f"Unknown archive format: {format}")
+        
+        self.logger = logging.getLogger(__name__)
+        self.root = Path(root)
+        self.format = format
+        self.extension = FORMATS[format]
+        
+        if format == "parquet":
+            self._file_format = ds.ParquetFileFormat()
+        else:
+            self._file_format = ds.IpcFileFormat()
+        self._write_options = self._file_format.make_write_options(compression=compression)
+        
+        self.metric_schema, self.alert_schema = _schemas()
+        self._metric_partitioning = ds.partitioning(
+            pa.schema([("day", pa.string()), ("target", pa.string())]), flavor="hive"
+        )
+        self._alert_partitioning = ds.partitioning(
+            pa.schema([("day", pa.string())]), flavor="hive"
+        )
+    
+    def write_metrics(self, rows: Sequence[Tuple]) -> int:
+        """
+        Append metric rows to the archive.
+        
+        Args:
+            rows: (timestamp, target, metric_type, value, unit) tuples
+        
+        Returns:
+            Number of rows written
+        """
+        if not rows:
+            return 0
+        
+        timestamps, targets, metric_types, values, units = zip(*rows)
+        table = pa.table(
+            {
+                "timestamp": timestamps,
+                "metric_type": metric_types,
+                "value": values,
+                "unit": units,
+                "day": [ts.date().isoformat() for ts in timestamps],
+                "target": targets,
+            },
+            schema=self.metric_schema
+        )
+        self._write("metrics", table, self._metric_partitioning)
+        return len(rows)
+    
+    def write_alerts(self, rows: Sequence[Tuple]) -> int:
+        """
+        Append alert rows to the archive.
+        
+        Args:
+            rows: (id, timestamp, severity, message, acknowledged,
+                acknowledged_at) tuples
+        
+        Returns:
+            Number of rows written
+        """
+        if not rows:
+            return 0
+        
+        columns = dict(zip(ALERT_COLUMNS, zip(*rows)))
+        columns["acknowledged"] = [bool(value) for value in columns["acknowledged"]]
+        columns["day"] = [ts.date().isoformat() for ts in columns["timestamp"]]
+        table = pa.table(columns, schema=self.alert_schema)
+        self._write("alerts", table, self._alert_partitioning)
+        return len(rows)
+    
+    def _write(self, name: str, table, partitioning):
+        """Write a table as new files in its partitions."""
+        ds.write_dataset(
+            table,
+            self.root / name,
+            format=self._file_format,
+            file_options=self._write_options,
+            partitioning=partitioning,
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.{self.extension}",
+            existing_data_behavior="overwrite_or_ignore"
+        )
+    
+    def compact(self, before: date) -> int:
+        """
+        Merge the files of every partition of a day before the given one.
+        
+        The merged file is written under a hidden name (ignored by dataset
+        discovery), renamed into place and only then are the small files
+        removed, so an interrupted compaction can leave duplicates for a
+        moment but never loses rows.
+        
+        Args:
+            before: First day that may still receive rows
+        
+        Returns:
+            Number of partitions compacted
+        """
+        compacted = 0
+        for name, pattern in PARTITION_GLOBS.items():
+            for partition in sorted((self.root / name).glob(pattern)):
+                day = partition.relative_to(self.root / name).parts[0][len("day="):]
+                if day >= before.isoformat():
+                    continue
+                files = sorted(partition.glob(f"part-*.{self.extension}"))
+                if len(files) > 1:
+                    self._compact_partition(partition, files)
+                    compacted += 1
+        if compacted:
+            self.logger.info(f"Compacted {compacted} archive partitions")
+        return compacted
+    
+    def _compact_partition(self, partition: Path, files: List[Path]):
+        """Rewrite the files of one partition as a single sorted file."""
+        table = ds.dataset([str(path) for path in files], format=self._file_format).to_table()
+        name = uuid.uuid4().hex
+        ds.write_dataset(
+            table.sort_by("timestamp"),
+            partition,
+            format=self._file_format,
+            file_options=self._write_options,
+            basename_template=f".compact-{name}-{{i}}.{self.extension}",
+            existing_data_behavior="overwrite_or_ignore"
+        )
+        for i, merged in enumerate(sorted(partition.glob(f".compact-{name}-*"))):
+            merged.rename(partition / f"part-{name}-{i}.{self.extension}")
+        for path in files:
+            path.unlink()
+    
+    def _dataset(self, name: str, schema, partitioning):
+        """Open an archived table, or None if nothing was archived yet."""
+        path = self.root / name
+        if not path.is_dir():
+            return None
+        return ds.dataset(
+            path,
+            schema=schema,
+            format=self._file_format,
+            partitioning=partitioning
+        )
+    
+    def read_metrics(
+        self,
+        target: Optional[str] = None,
+        metric_type: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        columns: Optional[List[str]] = None
+    ):
+        """
+        Query archived metrics.
+        
+        Args:
+            target: Target identifier (optional)
+            metric_type: Type of metric (optional)
+            start_time: Start of time range, inclusive (optional)
+            end_time: End of time range, inclusive (optional)
+            columns: Columns to return (default METRIC_COLUMNS)
+        
+        Returns:
+            pyarrow.Table sorted by timestamp
+        """
+        columns = columns or METRIC_COLUMNS
+        dataset = self._dataset("metrics", self.metric_schema, self._metric_partitioning)
+        if dataset is None:
+            return self.metric_schema.empty_table().select(columns)
+        
+        conditions = _time_conditions(start_time, end_time)
+        if target is not None:
+            conditions.append(ds.field("target") == target)
+        if metric_type is not None:
+            conditions.append(ds.field("metric_type") == metric_type)
+        
+        table = dataset.to_table(columns=columns, filter=_combine(conditions))
+        return table.sort_by("timestamp") if "timestamp" in columns else table
+    
+    def read_alerts(
+        self,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        severity: Optional[str] = None
+    ):
+        """
+        Query archived alerts.
+        
+        Args:
+            start_time: Start of time range, inclusive (optional)
+            end_time: End of time range, inclusive (optional)
+            severity: Alert severity (optional)
+        
+        Returns:
+            pyarrow.Table sorted by timestamp
+        """
+        dataset = self._dataset("alerts", self.alert_schema, self._alert_partitioning)
+        if dataset is None:
+            return self.alert_schema.empty_table().select(ALERT_COLUMNS)
+        
+        conditions = _time_conditions(start_time, end_time)
+        if severity is not None:
+            conditions.append(ds.field("severity") == severity)
+        
+        table = dataset.to_table(columns=ALERT_COLUMNS, filter=_combine(conditions))
+        return table.sort_by("timestamp")
+
+
+def _time_conditions(start_time: Optional[datetime], end_time: Optional[datetime]) -> list:
+    """Filters on the day partition (directory pruning) and the timestamp column."""
+    conditions = []
+    if start_time is not None:
+        conditions.append(ds.field("day") >= start_time.date().isoformat())
+        conditions.append(ds.field("timestamp") >= pa.scalar(start_time, pa.timestamp("us")))
+    if end_time is not None:
+        conditions.append(ds.field("day") <= end_time.date().isoformat())
+        conditions.append(ds.field("timestamp") <= pa.scalar(end_time, pa.timestamp("us")))
+    return conditions
+
+
+def _combine(conditions: Iterable):
+    """AND together filter expressions (None if there are none)."""
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
@@ -5,11 +5,273 @@ Manages persistent storage of network performance metrics using SQLite.
 Provides data insertion, retrieval, and statistical analysis capabilities.
 """
 
-import sqlite3
+import threading
+import time
 import logging
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, NamedTuple, Optional, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
+from collections import OrderedDict
+
+import numpy as np
+
+from .archive import MetricArchive
+from .hot_window import HotWindow
+from .models import Alert, Metric
+from ..utils.sketch import DDSketch, register_sketch_functions
+from .pool import ConnectionPool
+from .tsdb import BLOCK_SAMPLES, VALUE_PRECISION, BlockStore
+from .rollups import (
+    ROLLUP_RESOLUTIONS,
+    Aggregate,
+    add_sketch_columns,
+    create_rollup_tables,
+    plan_window,
+    rollup_table,
+    upsert_rollups,
+)
+
+
+# Metric types stored as columns of the wide samples table: (column, unit)
+WIDE_COLUMNS = {
+    "latency": ("latency_ms", "ms"),
+    "packet_loss": ("packet_loss_pct", "percent"),
+    "jitter": ("jitter_ms", "ms"),
+}
+
+
+# Rows fetched per round trip by the streaming read APIs
+STREAM_BATCH_SIZE = 10000
+
+
+# Cached get_fleet_statistics results (distinct windows/filters)
+STATS_CACHE_ENTRIES = 64
+
+
+# Rows removed per retention transaction
+RETENTION_BATCH_SIZE = 5000
+
+
+# Percentiles reported by get_statistics (from rollup sketches)
+PERCENTILES = {
+    "p50": 0.50,
+    "p95": 0.95,
+    "p99": 0.99,
+    "p999": 0.999,
+}
+
+
+class SeriesSource(NamedTuple):
+    """Location of one metric series in either storage layout."""
+    clause: str
+    params: list
+    time_column: str
+    value_column: str
+    unit: str
+    epoch_ms: bool
+
+
+def to_epoch_ms(timestamp: datetime) -> int:
+    """Convert a datetime (naive = local time) to epoch milliseconds."""
+    return int(round(timestamp.timestamp() * 1000))
+
+
+def from_epoch_ms(ts_ms: int) -> datetime:
+    """Convert epoch milliseconds to a naive local datetime."""
+    return datetime.fromtimestamp(ts_ms / 1000)
+
+
+def _copy_statistics(stats: Dict) -> Dict:
+    """Copy nested statistics so callers cannot modify cached results."""
+    return {
+        target: {metric_type: dict(summary) for metric_type, summary in metrics.items()}
+        for target, metrics in stats.items()
+    }
+
+
+def _array_aggregate(values: np.ndarray) -> Aggregate:
+    """Aggregate an array of values, with a quantile sketch."""
+    sketch = DDSketch()
+    sketch.update(values.tolist())
+    return Aggregate(
+        int(len(values)), float(values.sum()), float(np.dot(values, values)),
+        float(values.min()), float(values.max()), sketch
+    )
+
+
+def _summarize(agg: Aggregate) -> Dict:
+    """Statistics of one series as reported by get_fleet_statistics."""
+    summary = {
+        "average": agg.mean,
+        "minimum": agg.minimum,
+        "maximum": agg.maximum,
+        "samples": agg.count,
+        "stddev": agg.stddev
+    }
+    if agg.sketch is not None:
+        summary.update({name: agg.quantile(q) for name, q in PERCENTILES.items()})
+    return summary
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    """Parse a DATETIME column value stored by the sqlite3 adapter."""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+class MetricWriter:
+    """
+    Write-behind buffer for metric rows.
+    
+    Accumulates Metric rows submitted from any number of monitoring
+    threads and flushes them with a single executemany transaction when
+    batch_size rows are pending or flush_interval seconds have elapsed.
+    The buffer is bounded: when it is full, submitters block for up to
+    their timeout (backpressure) and rows are dropped after that.
+    """
+    
+    def __init__(
+        self,
+        db_manager: "DatabaseManager",
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_pending: int = 50000
+    ):
+        """
+        Initialize and start the writer thread.
+        
+        Args:
+            db_manager: Database manager used to write batches
+            batch_size: Rows that trigger an immediate flush
+            flush_interval: Maximum seconds a row waits before being flushed
+            max_pending: Maximum rows buffered before submitters block
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max(max_pending, batch_size)
+        
+        self._buffer: List[Metric] = []
+        self._condition = threading.Condition()
+        self._flushing = False
+        self._flush_requested = False
+        self._closed = False
+        
+        self.stats = {
+            "submitted": 0,
+            "written": 0,
+            "dropped": 0,
+            "flushes": 0,
+            "last_flush_ms": 0.0
+        }
+        
+        self._thread = threading.Thread(
+            target=self._run, daemon=True, name="MetricWriter"
+        )
+        self._thread.start()
+    
+    def submit(self, metrics: List[Metric], timeout: Optional[float] = 5.0) -> bool:
+        """
+        Queue metric rows for writing.
+        
+        Args:
+            metrics: Rows to write
+            timeout: Seconds to wait for buffer space (None waits forever)
+        
+        Returns:
+            True if queued, False if dropped because the buffer stayed full
+        """
+        with self._condition:
+            if self._closed:
+                self.logger.warning("MetricWriter closed, dropping metrics")
+                self.stats["dropped"] += len(metrics)
+                return False
+            
+            has_space = self._condition.wait_for(
+                lambda: len(self._buffer) + len(metrics) <= self.max_pending
+                or self._closed,
+                timeout=timeout
+            )
+            if not has_space or self._closed:
+                self.stats["dropped"] += len(metrics)
+                self.logger.warning(
+                    f"Metric buffer full, dropped {len(metrics)} rows"
+                )
+                return False
+            
+            self._buffer.extend(metrics)
+            self.stats["submitted"] += len(metrics)
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify_all()
+            return True
+    
+    def pending(self) -> int:
+        """Return the number of rows waiting to be written."""
+        with self._condition:
+            return len(self._buffer)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every row submitted so far has been written.
+        
+        Args:
+            timeout: Maximum seconds to wait
+        
+        Returns:
+            True if the buffer was drained
+        """
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            return self._condition.wait_for(
+                lambda: not self._buffer and not self._flushing,
+                timeout=timeout
+            )
+    
+    def close(self):
+        """Flush remaining rows and stop the writer thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+    
+    def _run(self):
+        """Writer loop: wait for a size/time trigger and flush a batch."""
+        while True:
+            with self._condition:
+                deadline = time.monotonic() + self.flush_interval
+                while (
+                    len(self._buffer) < self.batch_size
+                    and not self._closed
+                    and not self._flush_requested
+                    and time.monotonic() < deadline
+                ):
+                    self._condition.wait(deadline - time.monotonic())
+                
+                batch, self._buffer = self._buffer, []
+                self._flushing = bool(batch)
+                self._flush_requested = False
+                closed = self._closed
+                # Wake submitters blocked on a full buffer
+                self._condition.notify_all()
+            
+            if batch:
+                started = time.perf_counter()
+                written = self.db_manager.insert_metrics(batch)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                
+                with self._condition:
+                    self.stats["written"] += written
+                    self.stats["dropped"] += len(batch) - written
+                    self.stats["flushes"] += 1
+                    self.stats["last_flush_ms"] = elapsed_ms
+                    self._flushing = False
+                    self._condition.notify_all()
+            
+            if closed and not batch:
+                return
 
 
 class DatabaseManager:
@@ -17,40 +279,184 @@ class DatabaseManager:
     Manages database operations for network monitoring data.
     
     Uses SQLite for lightweight, embedded database storage.
-    Stores time-series metrics and alert history.
+    Stores time-series metrics and alert history. Connections are
+    pooled and the database runs in WAL mode so statistics queries
+    do not block monitoring writes.
     """
     
-    def __init__(self, db_path: str = "data/metrics.db"):
+    def __init__(
+        self,
+        db_path: str = "data/metrics.db",
+        max_readers: int = 4,
+        pragmas: Optional[Dict] = None,
+        layout: str = "narrow",
+        archive_dir: Optional[str] = None,
+        archive_format: str = "parquet",
+        stats_cache_ttl: float = 5.0,
+        engine: str = "sqlite",
+        tsdb_dir: Optional[str] = None,
+        tsdb_block_size: int = BLOCK_SAMPLES,
+        tsdb_precision: Optional[int] = VALUE_PRECISION,
+        hot_window_size: int = 0,
+        hot_window_dir: Optional[str] = None
+    ):
         """
         Initialize database manager.
         
         Args:
             db_path: Path to SQLite database file
+            max_readers: Size of the read-only connection pool
+            pragmas: SQLite PRAGMA overrides (see pool.DEFAULT_PRAGMAS)
+            layout: "narrow" (one row per metric) or "wide" (one row per
+                sample with latency/loss/jitter columns)
+            archive_dir: Directory aged data is archived to before
+                retention cleanup deletes it (None disables archival;
+                requires pyarrow)
+            archive_format: "parquet" or "ipc" archive files
+            stats_cache_ttl: Seconds fleet statistics are reused while no
+                new data is written
+            engine: "sqlite" stores raw samples in the database, "tsdb" in
+                compressed block files (rollups, alerts and targets stay
+                in SQLite)
+            tsdb_dir: Block store directory (default: next to db_path)
+            tsdb_block_size: Samples per compressed block
+            tsdb_precision: Decimal places raw samples are stored with
+                by the tsdb engine (None stores floats losslessly)
+            hot_window_size: Recent samples per target kept in memory and
+                served before the database (0 disables the hot window)
+            hot_window_dir: Memory-map the hot window here so other
+                processes can read it (None keeps it in process memory)
         """
+        if layout not in ("narrow", "wide"):
+            raise ValueError(f"Unknown database layout: {layout}")
+        if engine not in ("sqlite", "tsdb"):
+            raise ValueError(f"Unknown storage engine: {engine}")
+        
         self.logger = logging.getLogger(__name__)
         self.db_path = db_path
+        self.layout = layout
+        self.engine = engine
+        self._target_ids: Dict[str, int] = {}
+        
+        # Expected spacing of raw samples, used to plan auto resolution
+        self.sample_interval = 5.0
+        
+        # Statistics cache, invalidated whenever the write generation moves
+        self.stats_cache_ttl = stats_cache_ttl
+        self.cache_stats = {"hits": 0}
+        self._generation = 0
+        self._stats_cache: "OrderedDict[tuple, Tuple[int, float, Dict]]" = OrderedDict()
+        self._stats_lock = threading.Lock()
         
         # Ensure directory exists
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         
+        # Long-lived connections: one writer, a pool of WAL readers
+        self.pool = ConnectionPool(
+            db_path,
+            max_readers=max_readers,
+            pragmas=pragmas,
+            on_connect=register_sketch_functions
+        )
+        
+        # Raw samples live in compressed blocks with the tsdb engine
+        self.tsdb: Optional[BlockStore] = None
+        if engine == "tsdb":
+            self.tsdb = BlockStore(
+                tsdb_dir or str(Path(db_path).with_suffix(".tsdb")),
+                block_size=tsdb_block_size,
+                precision=tsdb_precision
+            )
+        
+        # Most recent samples per target, recorded by the monitor
+        self.hot_window: Optional[HotWindow] = None
+        if hot_window_size:
+            self.hot_window = HotWindow(hot_window_size, directory=hot_window_dir)
+        
         # Initialize database schema
         self._initialize_schema()
+        self.writer: Optional[MetricWriter] = None
+        self.archive = MetricArchive(archive_dir, format=archive_format) if archive_dir else None
         self.logger.info(f"DatabaseManager initialized with {db_path}")
     
-    def _get_connection(self) -> sqlite3.Connection:
+    def start_writer(
+        self,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_pending: int = 50000
+    ) -> MetricWriter:
+        """
+        Enable buffered, batched metric writes.
+        
+        After this call write_metrics() queues rows to a background
+        writer instead of inserting them synchronously.
+        
+        Args:
+            batch_size: Rows that trigger an immediate flush
+            flush_interval: Maximum seconds a row waits before being flushed
+            max_pending: Maximum rows buffered before submitters block
+        
+        Returns:
+            The running MetricWriter
+        """
+        if self.writer is None:
+            self.writer = MetricWriter(
+                self,
+                batch_size=batch_size,
+                flush_interval=flush_interval,
+                max_pending=max_pending
+            )
+            self.logger.info(
+                f"Buffered metric writer started (batch={batch_size}, "
+                f"interval={flush_interval}s, max_pending={max_pending})"
+            )
+        return self.writer
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until buffered metrics have been written.
+        
+        Args:
+            timeout: Maximum seconds to wait
+        
+        Returns:
+            True if nothing is left pending
+        """
+        if self.writer is None:
+            return True
+        return self.writer.flush(timeout=timeout)
+    
+    def pool_stats(self) -> Dict:
         """
-        Create database connection.
+        Get connection pool and write buffer metrics.
         
         Returns:
-            SQLite connection object
+            Dictionary of pool statistics, plus writer, block store and
+            hot window statistics if enabled
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        stats = self.pool.stats()
+        if self.writer is not None:
+            stats["writer"] = dict(self.writer.stats, pending=self.writer.pending())
+        if self.tsdb is not None:
+            stats["tsdb"] = self.tsdb.storage_stats()
+        if self.hot_window is not None:
+            stats["hot_window"] = dict(self.hot_window.stats, targets=len(self.hot_window.targets()))
+        return stats
+    
+    def close(self):
+        """Flush buffered metrics, stop the writer and close connections."""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        if self.tsdb is not None:
+            self.tsdb.close()
+        if self.hot_window is not None:
+            self.hot_window.close()
+        self.pool.close()
     
     def _initialize_schema(self):
-        """Create database tables if they don't exist."""
-        with self._get_connection() as conn:
+        """Create database tables if they don't exist and apply migrations."""
+        with self.pool.writer() as conn:
             cursor = conn.cursor()
             
             # Metrics table (removed INDEX syntax from CREATE TABLE)
@@ -65,10 +471,8 @@ class DatabaseManager:
                 )
             """)
             
-            # Create indexes separately
+            # Timestamp index serves retention cleanup
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_timestamp ON metrics(timestamp)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_target ON metrics(target)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_metric_type ON metrics(metric_type)")
             
             # Alerts table (removed INDEX syntax from CREATE TABLE)
             cursor.execute("""
@@ -86,9 +490,265 @@ class DatabaseManager:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_alerts_timestamp ON alerts(timestamp)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_alerts_severity ON alerts(severity)")
             
-            conn.commit()
+            version = cursor.execute("PRAGMA user_version").fetchone()[0]
+            for target_version, migration in enumerate(self._MIGRATIONS, start=1):
+                if version < target_version:
+                    self.logger.info(f"Migrating database schema to version {target_version}")
+                    migration(self, cursor)
+                    cursor.execute(f"PRAGMA user_version = {target_version}")
+            
+            if self.engine == "tsdb":
+                if cursor.execute("SELECT 1 FROM metrics LIMIT 1").fetchone():
+                    self.logger.warning(
+                        "Database contains raw metric rows but was opened with "
+                        "engine='tsdb'; only rollups of those rows remain visible"
+                    )
+            elif self.layout == "wide":
+                self._migrate_to_wide(cursor)
+            elif cursor.execute("SELECT 1 FROM samples LIMIT 1").fetchone():
+                self.logger.warning(
+                    "Database contains wide-layout samples but was opened with "
+                    "layout='narrow'; those samples will not be visible"
+                )
+            
             self.logger.debug("Database schema initialized")
     
+    def _migrate_v2(self, cursor):
+        """
+        Schema version 2: composite covering index and wide sample table.
+        
+        The (target, metric_type, timestamp, value) index answers range
+        queries for one series without touching the table, and makes the
+        single-column target/metric_type indexes redundant.
+        """
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_metrics_series
+            ON metrics(target, metric_type, timestamp, value)
+        """)
+        cursor.execute("DROP INDEX IF EXISTS idx_target")
+        cursor.execute("DROP INDEX IF EXISTS idx_metric_type")
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS targets (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        """)
+        
+        # One row per sample; epoch milliseconds and integer target IDs
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS samples (
+                target_id INTEGER NOT NULL,
+                ts_ms INTEGER NOT NULL,
+                latency_ms REAL,
+                packet_loss_pct REAL,
+                jitter_ms REAL,
+                PRIMARY KEY (target_id, ts_ms)
+            ) WITHOUT ROWID
+        """)
+    
+    def _migrate_v3(self, cursor):
+        """
+        Schema version 3: 1m/1h/1d rollup tables, backfilled from raw data.
+        """
+        create_rollup_tables(cursor)
+        
+        for resolution, width in ROLLUP_RESOLUTIONS.items():
+            table = rollup_table(resolution)
+            # 'utc' converts the naive local timestamp like datetime.timestamp()
+            cursor.execute(f"""
+                INSERT INTO {table}
+                    (target, metric_type, bucket, count, sum_value, sum_sq,
+                     min_value, max_value, unit)
+                SELECT target, metric_type,
+                       CAST(ROUND((julianday(timestamp, 'utc') - 2440587.5) * 86400000) AS INTEGER)
+                           / 1000 / {width} * {width} AS bucket,
+                       COUNT(*), SUM(value), SUM(value * value), MIN(value), MAX(value),
+                       MAX(unit)
+                FROM metrics
+                GROUP BY target, metric_type, bucket
+            """)
+            for metric_type, (column, unit) in WIDE_COLUMNS.items():
+                cursor.execute(
+                    f"""
+                    INSERT INTO {table}
+                        (target, metric_type, bucket, count, sum_value, sum_sq,
+                         min_value, max_value, unit)
+                    SELECT t.name, ?, s.ts_ms / 1000 / {width} * {width} AS bucket,
+                           COUNT(*), SUM(s.{column}), SUM(s.{column} * s.{column}),
+                           MIN(s.{column}), MAX(s.{column}), ?
+                    FROM samples s JOIN targets t ON t.id = s.target_id
+                    WHERE s.{column} IS NOT NULL
+                    GROUP BY t.name, bucket
+                    ON CONFLICT (target, metric_type, bucket) DO UPDATE SET
+                        count = count + excluded.count,
+                        sum_value = sum_value + excluded.sum_value,
+                        sum_sq = sum_sq + excluded.sum_sq,
+                        min_value = MIN(min_value, excluded.min_value),
+                        max_value = MAX(max_value, excluded.max_value)
+                    """,
+                    (metric_type, unit)
+                )
+    
+    def _migrate_v4(self, cursor):
+        """
+        Schema version 4: quantile sketch per rollup bucket.
+        
+        Sketches of existing buckets are rebuilt from the raw rows still
+        retained; buckets whose raw data has expired keep a NULL sketch.
+        """
+        add_sketch_columns(cursor)
+        
+        for resolution, width in ROLLUP_RESOLUTIONS.items():
+            table = rollup_table(resolution)
+            cursor.execute(f"""
+                UPDATE {table} SET sketch = (
+                    SELECT sketch_build(m.value) FROM metrics m
+                    WHERE m.target = {table}.target
+                      AND m.metric_type = {table}.metric_type
+                      AND m.timestamp >= datetime({table}.bucket, 'unixepoch', 'localtime')
+                      AND m.timestamp < datetime({table}.bucket + {width}, 'unixepoch', 'localtime')
+                )
+            """)
+            for metric_type, (column, _) in WIDE_COLUMNS.items():
+                cursor.execute(
+                    f"""
+                    UPDATE {table} SET sketch = sketch_merge(sketch, (
+                        SELECT sketch_build(s.{column})
+                        FROM samples s JOIN targets t ON t.id = s.target_id
+                        WHERE t.name = {table}.target
+                          AND s.ts_ms >= {table}.bucket * 1000
+                          AND s.ts_ms < ({table}.bucket + {width}) * 1000
+                    ))
+                    WHERE metric_type = ?
+                    """,
+                    (metric_type,)
+                )
+    
+    _MIGRATIONS = (
+        lambda self, cursor: None,      # Version 1: baseline schema
+        _migrate_v2,
+        _migrate_v3,
+        _migrate_v4,
+    )
+    
+    def _migrate_to_wide(self, cursor):
+        """
+        Move narrow latency/packet_loss/jitter rows into the samples table.
+        
+        Args:
+            cursor: Cursor inside the schema transaction
+        """
+        metric_types = list(WIDE_COLUMNS)
+        placeholders = ", ".join("?" * len(metric_types))
+        
+        row = cursor.execute(
+            f"SELECT COUNT(*) FROM metrics WHERE metric_type IN ({placeholders})",
+            metric_types
+        ).fetchone()
+        if not row[0]:
+            return
+        
+        self.logger.info(f"Migrating {row[0]} narrow metric rows to wide layout")
+        cursor.execute(
+            f"""
+            INSERT OR IGNORE INTO targets (name)
+            SELECT DISTINCT target FROM metrics WHERE metric_type IN ({placeholders})
+            """,
+            metric_types
+        )
+        for metric_type, (column, _) in WIDE_COLUMNS.items():
+            # 'utc' converts the naive local timestamp like datetime.timestamp()
+            cursor.execute(
+                f"""
+                INSERT INTO samples (target_id, ts_ms, {column})
+                SELECT t.id,
+                       CAST(ROUND((julianday(m.timestamp, 'utc') - 2440587.5) * 86400000) AS INTEGER),
+                       m.value
+                FROM metrics m JOIN targets t ON t.name = m.target
+                WHERE m.metric_type = ?
+                ON CONFLICT (target_id, ts_ms) DO UPDATE SET {column} = excluded.{column}
+                """,
+                (metric_type,)
+            )
+        cursor.execute(
+            f"DELETE FROM metrics WHERE metric_type IN ({placeholders})",
+            metric_types
+        )
+    
+    def _target_id(self, conn, target: str, create: bool = False) -> Optional[int]:
+        """
+        Look up (and optionally register) the integer ID of a target.
+        
+        Args:
+            conn: Open connection
+            target: Target name
+            create: Insert the target if it is unknown
+        
+        Returns:
+            Target ID, or None if unknown and create is False
+        """
+        target_id = self._target_ids.get(target)
+        if target_id is not None:
+            return target_id
+        
+        if create:
+            conn.execute("INSERT OR IGNORE INTO targets (name) VALUES (?)", (target,))
+        row = conn.execute("SELECT id FROM targets WHERE name = ?", (target,)).fetchone()
+        if row is None:
+            return None
+        
+        self._target_ids[target] = row[0]
+        return row[0]
+    
+    def _series(
+        self,
+        conn,
+        target: str,
+        metric_type: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> Optional[SeriesSource]:
+        """
+        Describe where one metric series of a target is stored.
+        
+        Args:
+            conn: Open connection
+            target: Target identifier
+            metric_type: Type of metric
+            start_time: Start of time range (optional)
+            end_time: End of time range (optional)
+        
+        Returns:
+            SeriesSource with FROM/WHERE clause and parameters, or None if
+            the target has no wide-layout samples
+        """
+        if self.layout == "wide" and metric_type in WIDE_COLUMNS:
+            column, unit = WIDE_COLUMNS[metric_type]
+            target_id = self._target_id(conn, target)
+            if target_id is None:
+                return None
+            
+            clause = f"FROM samples WHERE target_id = ? AND {column} IS NOT NULL"
+            params = [target_id]
+            if start_time:
+                clause += " AND ts_ms >= ?"
+                params.append(to_epoch_ms(start_time))
+            if end_time:
+                clause += " AND ts_ms <= ?"
+                params.append(to_epoch_ms(end_time))
+            return SeriesSource(clause, params, "ts_ms", column, f"'{unit}'", True)
+        
+        clause = "FROM metrics WHERE target = ? AND metric_type = ?"
+        params = [target, metric_type]
+        if start_time:
+            clause += " AND timestamp >= ?"
+            params.append(start_time)
+        if end_time:
+            clause += " AND timestamp <= ?"
+            params.append(end_time)
+        return SeriesSource(clause, params, "timestamp", "value", "unit", False)
+    
     def insert_metric(
         self,
         timestamp: datetime,
@@ -107,22 +767,101 @@ class DatabaseManager:
             value: Metric value
             unit: Unit of measurement
         """
+        self.insert_metrics([Metric(timestamp, target, metric_type, value, unit)])
+    
+    def insert_metrics(self, metrics: List[Metric]) -> int:
+        """
+        Insert many metrics in a single transaction.
+        
+        Args:
+            metrics: Metric rows to insert
+        
+        Returns:
+            Number of rows inserted
+        """
+        if not metrics:
+            return 0
+        
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    INSERT INTO metrics (timestamp, target, metric_type, value, unit)
-                    VALUES (?, ?, ?, ?, ?)
-                    """,
-                    (timestamp, target, metric_type, value, unit)
-                )
-                conn.commit()
-                self.logger.debug(
-                    f"Inserted metric: {target} {metric_type}={value}{unit}"
-                )
+            if self.tsdb is not None:
+                self.tsdb.append(metrics)
+                with self.pool.writer() as conn:
+                    upsert_rollups(conn, metrics)
+                self._data_changed()
+                return len(metrics)
+            
+            with self.pool.writer() as conn:
+                narrow = metrics
+                if self.layout == "wide":
+                    narrow = self._insert_wide(conn, metrics)
+                
+                if narrow:
+                    conn.executemany(
+                        """
+                        INSERT INTO metrics (timestamp, target, metric_type, value, unit)
+                        VALUES (?, ?, ?, ?, ?)
+                        """,
+                        [
+                            (m.timestamp, m.target, m.metric_type, m.value, m.unit)
+                            for m in narrow
+                        ]
+                    )
+                
+                upsert_rollups(conn, metrics)
+                self.logger.debug(f"Inserted {len(metrics)} metrics")
+            self._data_changed()
+            return len(metrics)
         except Exception as e:
-            self.logger.error(f"Error inserting metric: {e}")
+            self.logger.error(f"Error inserting metrics batch: {e}")
+            return 0
+    
+    def _insert_wide(self, conn, metrics: List[Metric]) -> List[Metric]:
+        """
+        Upsert latency/packet_loss/jitter rows into the samples table.
+        
+        Args:
+            conn: Writer connection
+            metrics: Metric rows to insert
+        
+        Returns:
+            Rows of other metric types, to be stored in the narrow table
+        """
+        by_column: Dict[str, List[tuple]] = {}
+        narrow = []
+        
+        for m in metrics:
+            if m.metric_type not in WIDE_COLUMNS:
+                narrow.append(m)
+                continue
+            column = WIDE_COLUMNS[m.metric_type][0]
+            by_column.setdefault(column, []).append(
+                (self._target_id(conn, m.target, create=True), to_epoch_ms(m.timestamp), m.value)
+            )
+        
+        for column, rows in by_column.items():
+            conn.executemany(
+                f"""
+                INSERT INTO samples (target_id, ts_ms, {column}) VALUES (?, ?, ?)
+                ON CONFLICT (target_id, ts_ms) DO UPDATE SET {column} = excluded.{column}
+                """,
+                rows
+            )
+        
+        return narrow
+    
+    def write_metrics(self, metrics: List[Metric]) -> bool:
+        """
+        Store metrics through the buffered writer if enabled.
+        
+        Args:
+            metrics: Metric rows to store
+        
+        Returns:
+            True if the rows were written or queued
+        """
+        if self.writer is not None:
+            return self.writer.submit(metrics)
+        return self.insert_metrics(metrics) == len(metrics)
     
     def insert_alert(self, timestamp: datetime, severity: str, message: str):
         """
@@ -133,27 +872,44 @@ class DatabaseManager:
             severity: Alert severity level
             message: Alert message
         """
+        self.insert_alerts([Alert(None, timestamp, severity, message)])
+    
+    def insert_alerts(self, alerts: List[Alert]) -> bool:
+        """
+        Insert a batch of alerts in one transaction.
+        
+        Args:
+            alerts: Alerts to insert
+        
+        Returns:
+            True if the batch was written, False otherwise
+        """
+        if not alerts:
+            return True
+        
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
+            with self.pool.writer() as conn:
+                conn.executemany(
                     """
                     INSERT INTO alerts (timestamp, severity, message)
                     VALUES (?, ?, ?)
                     """,
-                    (timestamp, severity, message)
+                    [(alert.timestamp, alert.severity, alert.message) for alert in alerts]
                 )
-                conn.commit()
-                self.logger.debug(f"Inserted alert: {severity} - {message}")
+                self.logger.debug(f"Inserted {len(alerts)} alerts")
+            return True
         except Exception as e:
-            self.logger.error(f"Error inserting alert: {e}")
+            self.logger.error(f"Error inserting alerts: {e}")
+            return False
     
     def get_metrics(
         self,
         target: str,
         metric_type: str,
         start_time: Optional[datetime] = None,
-        end_time: Optional[datetime] = None
+        end_time: Optional[datetime] = None,
+        resolution: Optional[str] = None,
+        max_points: int = 1000
     ) -> List[Dict]:
         """
         Retrieve metrics from database.
@@ -163,121 +919,943 @@ class DatabaseManager:
             metric_type: Type of metric to retrieve
             start_time: Start of time range (optional)
             end_time: End of time range (optional)
-            
+            resolution: None or "raw" for raw samples, a rollup resolution
+                ("1m", "1h", "1d"), or "auto" to pick the finest resolution
+                returning at most max_points points
+            max_points: Point budget for resolution="auto"
+        
         Returns:
-            List of metric dictionaries
+            List of metric dictionaries; rollup rows carry the bucket start
+            as timestamp, the bucket mean as value, plus minimum, maximum
+            and samples
+        
+        Raw ranges held entirely by the hot window are served from memory.
         """
+        if resolution == "auto":
+            resolution = self._choose_resolution(start_time, end_time, max_points)
+        if resolution not in (None, "raw"):
+            return self._get_rollup_metrics(
+                target, metric_type, resolution, start_time, end_time
+            )
+        
+        recent = self._recent(target, metric_type, start_time, end_time)
+        if recent is not None:
+            stamps, values = recent
+            unit = WIDE_COLUMNS[metric_type][1]
+            return [
+                {"timestamp": str(from_epoch_ms(ts_ms)), "value": value, "unit": unit}
+                for ts_ms, value in zip(stamps.tolist(), values.tolist())
+            ]
+        
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                query = """
-                    SELECT timestamp, value, unit
-                    FROM metrics
-                    WHERE target = ? AND metric_type = ?
-                """
-                params = [target, metric_type]
-                
-                if start_time:
-                    query += " AND timestamp >= ?"
-                    params.append(start_time)
-                
-                if end_time:
-                    query += " AND timestamp <= ?"
-                    params.append(end_time)
-                
-                query += " ORDER BY timestamp ASC"
-                
-                cursor.execute(query, params)
-                rows = cursor.fetchall()
-                
-                return [dict(row) for row in rows]
-                
+            return list(self.iter_metrics(target, metric_type, start_time, end_time))
         except Exception as e:
             self.logger.error(f"Error retrieving metrics: {e}")
             return []
     
+    def _recent(
+        self,
+        target: str,
+        metric_type: str,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime]
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Read a raw range from the hot window.
+        
+        Returns:
+            (epoch ms, values), or None if the hot window is disabled or
+            does not hold the whole range
+        """
+        if self.hot_window is None or start_time is None:
+            return None
+        return self.hot_window.window(
+            target,
+            metric_type,
+            to_epoch_ms(start_time),
+            to_epoch_ms(end_time) if end_time else None
+        )
+    
+    def _series_cursor(
+        self,
+        conn,
+        target: str,
+        metric_type: str,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        columns: bool = False
+    ):
+        """
+        Open a time-ordered cursor over one raw series.
+        
+        Args:
+            conn: Open connection
+            target: Target identifier
+            metric_type: Type of metric
+            start_time: Start of time range (optional)
+            end_time: End of time range (optional)
+            columns: Select (epoch ms, value) for both layouts instead of
+                (stored timestamp, value, unit)
+        
+        Returns:
+            (cursor yielding plain tuples, SeriesSource), or (None, None)
+            if the series does not exist
+        """
+        source = self._series(conn, target, metric_type, start_time, end_time)
+        if source is None:
+            return None, None
+        
+        if columns:
+            time_column = source.time_column
+            if not source.epoch_ms:
+                # Stored as local time text; convert in SQL to avoid datetimes
+                time_column = (
+                    f"CAST(ROUND((julianday({time_column}, 'utc') - 2440587.5) "
+                    f"* 86400000) AS INTEGER)"
+                )
+            select = f"{time_column}, {source.value_column}"
+        else:
+            select = f"{source.time_column}, {source.value_column}, {source.unit}"
+        
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(
+            f"SELECT {select} {source.clause} ORDER BY {source.time_column} ASC",
+            source.params
+        )
+        return cursor, source
+    
+    def iter_metrics(
+        self,
+        target: str,
+        metric_type: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        batch_size: int = STREAM_BATCH_SIZE
+    ) -> Iterator[Dict]:
+        """
+        Lazily yield raw metric rows in time order.
+        
+        Rows are fetched batch_size at a time, so memory stays flat for
+        any time range. A reader connection is held until the iterator is
+        exhausted or closed.
+        
+        Args:
+            target: Target identifier
+            metric_type: Type of metric to retrieve
+            start_time: Start of time range (optional)
+            end_time: End of time range (optional)
+            batch_size: Rows fetched per round trip
+        
+        Yields:
+            Metric dictionaries (timestamp, value, unit), as get_metrics
+        """
+        if self.tsdb is not None:
+            series = self._read_blocks(target, metric_type, start_time, end_time)
+            if series is None:
+                return
+            stamps, values, unit = series
+            for ts_ms, value in zip(stamps.tolist(), values.tolist()):
+                yield {"timestamp": str(from_epoch_ms(ts_ms)), "value": value, "unit": unit}
+            return
+        
+        with self.pool.reader() as conn:
+            cursor, source = self._series_cursor(conn, target, metric_type, start_time, end_time)
+            if cursor is None:
+                return
+            
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for timestamp, value, unit in rows:
+                    if source.epoch_ms:
+                        timestamp = str(from_epoch_ms(timestamp))
+                    yield {"timestamp": timestamp, "value": value, "unit": unit}
+    
+    def iter_metric_batches(
+        self,
+        target: str,
+        metric_type: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        batch_size: int = STREAM_BATCH_SIZE
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Lazily yield raw samples as fixed-size NumPy column batches.
+        
+        No per-row dictionaries or datetimes are created. A reader
+        connection is held until the iterator is exhausted or closed.
+        
+        Args:
+            target: Target identifier
+            metric_type: Type of metric to retrieve
+            start_time: Start of time range (optional)
+            end_time: End of time range (optional)
+            batch_size: Samples per batch (the last one may be shorter)
+        
+        Yields:
+            (timestamps as datetime64[ms] UTC, values as float64) arrays
+        """
+        if self.tsdb is not None:
+            series = self._read_blocks(target, metric_type, start_time, end_time)
+            if series is None:
+                return
+            stamps, values, _ = series
+            for start in range(0, len(stamps), batch_size):
+                yield (
+                    stamps[start:start + batch_size].astype("datetime64[ms]"),
+                    values[start:start + batch_size]
+                )
+            return
+        
+        with self.pool.reader() as conn:
+            cursor, _ = self._series_cursor(
+                conn, target, metric_type, start_time, end_time, columns=True
+            )
+            if cursor is None:
+                return
+            
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                data = np.array(rows, dtype=np.float64)
+                yield data[:, 0].astype(np.int64).astype("datetime64[ms]"), data[:, 1]
+    
+    def _read_blocks(
+        self,
+        target: str,
+        metric_type: str,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime]
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, str]]:
+        """
+        Read one raw series from the block store.
+        
+        Args:
+            target: Target identifier
+            metric_type: Type of metric
+            start_time: Start of time range (optional)
+            end_time: End of time range (optional)
+        
+        Returns:
+            (epoch ms, values, unit), or None if the series does not exist
+        """
+        return self.tsdb.read(
+            target,
+            metric_type,
+            to_epoch_ms(start_time) if start_time else None,
+            to_epoch_ms(end_time) if end_time else None
+        )
+    
+    def get_metric_columns(
+        self,
+        target: str,
+        metric_type: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retrieve a raw series as typed arrays instead of dictionaries.
+        
+        Args:
+            target: Target identifier
+            metric_type: Type of metric to retrieve
+            start_time: Start of time range (optional)
+            end_time: End of time range (optional)
+        
+        Returns:
+            (timestamps as datetime64[ms] UTC, values as float64); empty
+            arrays if there is no data or the query failed
+        """
+        recent = self._recent(target, metric_type, start_time, end_time)
+        if recent is not None:
+            stamps, values = recent
+            return stamps.astype("datetime64[ms]"), values
+        
+        try:
+            batches = list(self.iter_metric_batches(target, metric_type, start_time, end_time))
+        except Exception as e:
+            self.logger.error(f"Error retrieving metric columns: {e}")
+            batches = []
+        
+        if not batches:
+            return np.empty(0, dtype="datetime64[ms]"), np.empty(0, dtype=np.float64)
+        timestamps, values = zip(*batches)
+        return np.concatenate(timestamps), np.concatenate(values)
+    
+    def query_history(
+        self,
+        target: str,
+        metric_type: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> List[Dict]:
+        """
+        Retrieve raw metrics from the archive and the live database.
+        
+        Archived rows are read with the target, metric type and time range
+        pushed down to the archive files, followed by live rows.
+        
+        Args:
+            target: Target identifier
+            metric_type: Type of metric to retrieve
+            start_time: Start of time range (optional)
+            end_time: End of time range (optional)
+        
+        Returns:
+            List of metric dictionaries (timestamp, value, unit)
+        """
+        rows = []
+        if self.archive is not None:
+            try:
+                table = self.archive.read_metrics(
+                    target, metric_type, start_time, end_time,
+                    columns=["timestamp", "value", "unit"]
+                )
+                rows = [
+                    {"timestamp": str(timestamp), "value": value, "unit": unit}
+                    for timestamp, value, unit in zip(
+                        table["timestamp"].to_pylist(),
+                        table["value"].to_pylist(),
+                        table["unit"].to_pylist()
+                    )
+                ]
+            except Exception as e:
+                self.logger.error(f"Error reading archived metrics: {e}")
+        
+        return rows + self.get_metrics(target, metric_type, start_time, end_time)
+    
+    def _choose_resolution(
+        self,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        max_points: int
+    ) -> str:
+        """
+        Pick the finest resolution that keeps a window within a point budget.
+        
+        Args:
+            start_time: Start of time range (None means all history)
+            end_time: End of time range (None means now)
+            max_points: Maximum number of points wanted
+        
+        Returns:
+            "raw" or a rollup resolution name
+        """
+        if start_time is None:
+            return list(ROLLUP_RESOLUTIONS)[-1]
+        
+        window = ((end_time or datetime.now()) - start_time).total_seconds()
+        if window / self.sample_interval <= max_points:
+            return "raw"
+        for resolution, width in ROLLUP_RESOLUTIONS.items():
+            if window / width <= max_points:
+                return resolution
+        return list(ROLLUP_RESOLUTIONS)[-1]
+    
+    def _get_rollup_metrics(
+        self,
+        target: str,
+        metric_type: str,
+        resolution: str,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime]
+    ) -> List[Dict]:
+        """
+        Retrieve one series from a rollup table.
+        
+        Args:
+            target: Target identifier
+            metric_type: Type of metric to retrieve
+            resolution: Rollup resolution name
+            start_time: Start of time range (optional)
+            end_time: End of time range (optional)
+        
+        Returns:
+            List of bucket dictionaries
+        """
+        if resolution not in ROLLUP_RESOLUTIONS:
+            self.logger.error(f"Unknown resolution: {resolution}")
+            return []
+        
+        width = ROLLUP_RESOLUTIONS[resolution]
+        query = f"""
+            SELECT bucket, sum_value / count AS value, unit,
+                   min_value, max_value, count
+            FROM {rollup_table(resolution)}
+            WHERE target = ? AND metric_type = ?
+        """
+        params: list = [target, metric_type]
+        if start_time:
+            # Include the bucket containing start_time
+            query += " AND bucket > ?"
+            params.append(start_time.timestamp() - width)
+        if end_time:
+            query += " AND bucket <= ?"
+            params.append(end_time.timestamp())
+        query += " ORDER BY bucket ASC"
+        
+        try:
+            with self.pool.reader() as conn:
+                return [
+                    {
+                        "timestamp": str(datetime.fromtimestamp(row["bucket"])),
+                        "value": row["value"],
+                        "unit": row["unit"],
+                        "minimum": row["min_value"],
+                        "maximum": row["max_value"],
+                        "samples": row["count"]
+                    }
+                    for row in conn.execute(query, params)
+                ]
+        except Exception as e:
+            self.logger.error(f"Error retrieving rollup metrics: {e}")
+            return []
+    
+    def _aggregate(
+        self,
+        conn,
+        start_time: datetime,
+        end_time: Optional[datetime] = None,
+        targets: Optional[List[str]] = None,
+        metric_types: Optional[List[str]] = None
+    ) -> Dict[tuple, Aggregate]:
+        """
+        Aggregate metrics over a window using rollups where possible.
+        
+        Args:
+            conn: Open connection
+            start_time: Start of window (inclusive)
+            end_time: End of window (exclusive), None for "until now"
+            targets: Restrict to these targets (None for all)
+            metric_types: Restrict to these metric types (None for all)
+        
+        Returns:
+            {(target, metric_type): Aggregate}
+        """
+        start_s = start_time.timestamp()
+        end_s = end_time.timestamp() if end_time is not None else None
+        
+        result: Dict[tuple, Aggregate] = {}
+        for resolution, piece_start, piece_end in plan_window(start_s, end_s):
+            if resolution == "raw":
+                partial = self._raw_aggregate(conn, piece_start, piece_end, targets, metric_types)
+            else:
+                partial = self._rollup_aggregate(
+                    conn, resolution, piece_start, piece_end, targets, metric_types
+                )
+            for key, agg in partial.items():
+                result.setdefault(key, Aggregate()).merge(agg)
+        
+        return result
+    
+    @staticmethod
+    def _filters(
+        targets: Optional[List[str]],
+        metric_types: Optional[List[str]],
+        target_column: str = "target",
+        type_column: Optional[str] = "metric_type"
+    ) -> tuple:
+        """Build "AND ... IN (...)" clauses for target/metric filters."""
+        clause, params = "", []
+        if targets is not None:
+            clause += f" AND {target_column} IN ({', '.join('?' * len(targets))})"
+            params.extend(targets)
+        if metric_types is not None and type_column is not None:
+            clause += f" AND {type_column} IN ({', '.join('?' * len(metric_types))})"
+            params.extend(metric_types)
+        return clause, params
+    
+    def _rollup_aggregate(
+        self,
+        conn,
+        resolution: str,
+        start_s: float,
+        end_s: Optional[float],
+        targets: Optional[List[str]],
+        metric_types: Optional[List[str]]
+    ) -> Dict[tuple, Aggregate]:
+        """Sum whole rollup buckets in [start_s, end_s)."""
+        query = f"""
+            SELECT target, metric_type, SUM(count), SUM(sum_value), SUM(sum_sq),
+                   MIN(min_value), MAX(max_value), sketch_union(sketch)
+            FROM {rollup_table(resolution)}
+            WHERE bucket >= ?
+        """
+        params: list = [start_s]
+        if end_s is not None:
+            query += " AND bucket < ?"
+            params.append(end_s)
+        clause, filter_params = self._filters(targets, metric_types)
+        query += clause + " GROUP BY target, metric_type"
+        
+        return {
+            (row[0], row[1]): Aggregate.from_row(row[2:])
+            for row in conn.execute(query, params + filter_params)
+        }
+    
+    def _raw_aggregate(
+        self,
+        conn,
+        start_s: float,
+        end_s: Optional[float],
+        targets: Optional[List[str]],
+        metric_types: Optional[List[str]]
+    ) -> Dict[tuple, Aggregate]:
+        """Aggregate raw samples in [start_s, end_s) from both layouts."""
+        if self.tsdb is not None:
+            return self._block_aggregate(start_s, end_s, targets, metric_types)
+        
+        result: Dict[tuple, Aggregate] = {}
+        
+        query = """
+            SELECT target, metric_type, COUNT(*), SUM(value), SUM(value * value),
+                   MIN(value), MAX(value), sketch_build(value)
+            FROM metrics
+            WHERE timestamp >= ?
+        """
+        params: list = [datetime.fromtimestamp(start_s)]
+        if end_s is not None:
+            query += " AND timestamp < ?"
+            params.append(datetime.fromtimestamp(end_s))
+        clause, filter_params = self._filters(targets, metric_types)
+        query += clause + " GROUP BY target, metric_type"
+        
+        for row in conn.execute(query, params + filter_params):
+            result[(row[0], row[1])] = Aggregate.from_row(row[2:])
+        
+        if self.layout != "wide":
+            return result
+        
+        columns = [
+            (metric_type, column) for metric_type, (column, _) in WIDE_COLUMNS.items()
+            if metric_types is None or metric_type in metric_types
+        ]
+        if not columns:
+            return result
+        
+        selects = ", ".join(
+            f"COUNT({c}), SUM({c}), SUM({c} * {c}), MIN({c}), MAX({c}), sketch_build({c})"
+            for _, c in columns
+        )
+        query = f"""
+            SELECT t.name, {selects}
+            FROM samples s JOIN targets t ON t.id = s.target_id
+            WHERE s.ts_ms >= ?
+        """
+        params = [int(start_s * 1000)]
+        if end_s is not None:
+            query += " AND s.ts_ms < ?"
+            params.append(int(end_s * 1000))
+        clause, filter_params = self._filters(targets, None, target_column="t.name")
+        query += clause + " GROUP BY t.name"
+        
+        for row in conn.execute(query, params + filter_params):
+            for i, (metric_type, _) in enumerate(columns):
+                values = row[1 + i * 6: 7 + i * 6]
+                if values[0]:
+                    result[(row[0], metric_type)] = Aggregate.from_row(values)
+        
+        return result
+    
+    def _block_aggregate(
+        self,
+        start_s: float,
+        end_s: Optional[float],
+        targets: Optional[List[str]],
+        metric_types: Optional[List[str]]
+    ) -> Dict[tuple, Aggregate]:
+        """Aggregate raw samples in [start_s, end_s) from the block store."""
+        result: Dict[tuple, Aggregate] = {}
+        end_ms = int(end_s * 1000) - 1 if end_s is not None else None
+        
+        for target, metric_type in self.tsdb.series():
+            if targets is not None and target not in targets:
+                continue
+            if metric_types is not None and metric_type not in metric_types:
+                continue
+            series = self.tsdb.read(target, metric_type, int(start_s * 1000), end_ms)
+            if series is None or not len(series[1]):
+                continue
+            
+            result[(target, metric_type)] = _array_aggregate(series[1])
+        return result
+    
     def get_statistics(self, target: str, duration_hours: int = 24) -> Dict:
         """
         Calculate statistical summary for a target.
         
+        Windows held entirely by the hot window are computed from memory.
+        
         Args:
             target: Target identifier
             duration_hours: Time period to analyze
-            
+        
         Returns:
-            Dictionary containing statistics
+            Dictionary containing statistics per metric type (latency,
+            packet_loss, jitter), see get_fleet_statistics
+        """
+        if self.hot_window is not None:
+            start_ms = to_epoch_ms(datetime.now() - timedelta(hours=duration_hours))
+            recent = {
+                metric_type: self.hot_window.window(target, metric_type, start_ms)
+                for metric_type in WIDE_COLUMNS
+            }
+            if all(series is not None for series in recent.values()):
+                return {
+                    metric_type: _summarize(_array_aggregate(values))
+                    for metric_type, (_, values) in recent.items()
+                    if len(values)
+                }
+        
+        stats = self.get_fleet_statistics(
+            duration_hours, targets=[target], metric_types=list(WIDE_COLUMNS)
+        )
+        return stats.get(target, {})
+    
+    def get_fleet_statistics(
+        self,
+        duration_hours: float = 24,
+        targets: Optional[List[str]] = None,
+        metric_types: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Dict]]:
         """
+        Calculate statistics for many targets and metrics at once.
+        
+        All series are aggregated together by grouped queries: whole
+        1m/1h/1d buckets are read from rollup tables and only the partial
+        edges of the window from raw samples. Percentiles (p50/p95/p99/
+        p999) come from merged bucket sketches and are accurate to 1%
+        relative error.
+        
+        Results are cached per window and filter until new data is
+        written or stats_cache_ttl seconds pass (the window slides).
+        
+        Args:
+            duration_hours: Time period to analyze
+            targets: Restrict to these targets (None for all)
+            metric_types: Restrict to these metric types (None for all)
+        
+        Returns:
+            {target: {metric_type: {average, minimum, maximum, samples,
+            stddev, p50, p95, p99, p999}}}
+        """
+        key = (
+            duration_hours,
+            tuple(sorted(targets)) if targets is not None else None,
+            tuple(sorted(metric_types)) if metric_types is not None else None
+        )
+        cached = self._cached_statistics(key)
+        if cached is not None:
+            return cached
+        
+        generation = self._generation
         start_time = datetime.now() - timedelta(hours=duration_hours)
         
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                stats = {}
-                
-                for metric_type in ["latency", "packet_loss", "jitter"]:
-                    cursor.execute(
-                        """
-                        SELECT
-                            AVG(value) as avg,
-                            MIN(value) as min,
-                            MAX(value) as max,
-                            COUNT(*) as count
-                        FROM metrics
-                        WHERE target = ? AND metric_type = ? AND timestamp >= ?
-                        """,
-                        (target, metric_type, start_time)
-                    )
-                    
-                    row = cursor.fetchone()
-                    if row and row["count"] > 0:
-                        stats[metric_type] = {
-                            "average": row["avg"],
-                            "minimum": row["min"],
-                            "maximum": row["max"],
-                            "samples": row["count"]
-                        }
-                
-                return stats
-                
+            with self.pool.reader() as conn:
+                aggregates = self._aggregate(
+                    conn, start_time, targets=targets, metric_types=metric_types
+                )
         except Exception as e:
             self.logger.error(f"Error calculating statistics: {e}")
             return {}
+        
+        stats: Dict[str, Dict[str, Dict]] = {}
+        for (target, metric_type), agg in aggregates.items():
+            if agg.count == 0:
+                continue
+            stats.setdefault(target, {})[metric_type] = _summarize(agg)
+        
+        with self._stats_lock:
+            self._stats_cache[key] = (generation, time.monotonic(), stats)
+            self._stats_cache.move_to_end(key)
+            while len(self._stats_cache) > STATS_CACHE_ENTRIES:
+                self._stats_cache.popitem(last=False)
+        return _copy_statistics(stats)
+    
+    def _cached_statistics(self, key: tuple) -> Optional[Dict]:
+        """Cached statistics for a key if no data was written since."""
+        with self._stats_lock:
+            entry = self._stats_cache.get(key)
+            if entry is None:
+                return None
+            generation, computed, stats = entry
+            if generation != self._generation or time.monotonic() - computed > self.stats_cache_ttl:
+                del self._stats_cache[key]
+                return None
+            self._stats_cache.move_to_end(key)
+            self.cache_stats["hits"] += 1
+        return _copy_statistics(stats)
+    
+    def _data_changed(self):
+        """Advance the write generation, invalidating cached statistics."""
+        with self._stats_lock:
+            self._generation += 1
     
-    def cleanup_old_data(self, retention_days: int = 30):
+    def cleanup_old_data(
+        self,
+        retention_days: int = 30,
+        batch_size: int = RETENTION_BATCH_SIZE
+    ) -> Dict[str, int]:
         """
         Remove old data beyond retention period.
         
+        Rows are deleted in batches of short transactions, so buffered
+        metric writes interleave with the cleanup instead of waiting for
+        one long delete. Use RetentionWorker to run this in the background
+        with a rate limit.
+        
         Args:
             retention_days: Number of days to retain data
+            batch_size: Rows deleted per transaction
+        
+        Returns:
+            Dictionary with metrics, alerts and rollup buckets removed
         """
         cutoff_date = datetime.now() - timedelta(days=retention_days)
+        removed = {"metrics": 0, "alerts": 0, "rollups": 0}
         
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Delete old metrics
-                cursor.execute(
-                    "DELETE FROM metrics WHERE timestamp < ?",
-                    (cutoff_date,)
-                )
-                metrics_deleted = cursor.rowcount
-                
-                # Delete old acknowledged alerts
-                cursor.execute(
-                    "DELETE FROM alerts WHERE timestamp < ? AND acknowledged = 1",
-                    (cutoff_date,)
+            while True:
+                metrics, alerts, rollups = self.purge_batch(cutoff_date, batch_size)
+                removed["metrics"] += metrics
+                removed["alerts"] += alerts
+                removed["rollups"] += rollups
+                if metrics + alerts + rollups < batch_size:
+                    break
+            self.compact_archive(cutoff_date)
+            
+            self.logger.info(
+                f"Cleanup complete: {removed['metrics']} metrics, "
+                f"{removed['alerts']} alerts, {removed['rollups']} rollup buckets removed"
+            )
+        except Exception as e:
+            self.logger.error(f"Error during cleanup: {e}")
+        return removed
+    
+    def purge_batch(
+        self,
+        cutoff_date: datetime,
+        batch_size: int = RETENTION_BATCH_SIZE
+    ) -> Tuple[int, int, int]:
+        """
+        Delete up to batch_size rows older than the cutoff in one transaction.
+        
+        Narrow metrics go first, then wide samples, then expired blocks of
+        the block store, then rollup buckets that end before the cutoff,
+        then acknowledged alerts. With an archive configured the raw rows
+        are archived in the same transaction before they are deleted; if
+        archiving fails the batch is rolled back.
+        
+        Args:
+            cutoff_date: Rows older than this are removed
+            batch_size: Maximum rows removed
+        
+        Returns:
+            (metrics removed, alerts removed, rollup buckets removed);
+            fewer than batch_size in total means nothing older than the
+            cutoff is left
+        """
+        with self.pool.writer() as conn:
+            metrics = self._purge_metrics(conn, cutoff_date, batch_size)
+            if metrics < batch_size:
+                metrics += self._purge_samples(conn, cutoff_date, batch_size - metrics)
+            if metrics < batch_size and self.tsdb is not None:
+                metrics += self._purge_blocks(cutoff_date, batch_size - metrics)
+            rollups = 0
+            if metrics < batch_size:
+                rollups = self._purge_rollups(conn, cutoff_date, batch_size - metrics)
+            alerts = 0
+            if metrics + rollups < batch_size:
+                alerts = self._purge_alerts(conn, cutoff_date, batch_size - metrics - rollups)
+        if metrics or rollups:
+            self._data_changed()
+        return metrics, alerts, rollups
+    
+    def _purge_metrics(self, conn, cutoff_date: datetime, limit: int) -> int:
+        """Archive and delete the oldest narrow metric rows (writer held)."""
+        rows = conn.execute(
+            """
+            SELECT id, timestamp, target, metric_type, value, unit FROM metrics
+            WHERE timestamp < ? ORDER BY timestamp LIMIT ?
+            """,
+            (cutoff_date, limit)
+        ).fetchall()
+        if not rows:
+            return 0
+        
+        if self.archive is not None:
+            self.archive.write_metrics([
+                (_parse_timestamp(row[1]), row[2], row[3], row[4], row[5]) for row in rows
+            ])
+        conn.executemany("DELETE FROM metrics WHERE id = ?", [(row[0],) for row in rows])
+        return len(rows)
+    
+    def _purge_samples(self, conn, cutoff_date: datetime, limit: int) -> int:
+        """Archive and delete the oldest wide samples, target by target (writer held)."""
+        cutoff_ms = to_epoch_ms(cutoff_date)
+        columns = ", ".join(column for column, _ in WIDE_COLUMNS.values())
+        removed = 0
+        
+        for target_id, name in conn.execute("SELECT id, name FROM targets").fetchall():
+            if removed >= limit:
+                break
+            # Primary key order: each target's oldest samples come first
+            rows = conn.execute(
+                f"""
+                SELECT ts_ms, {columns} FROM samples
+                WHERE target_id = ? AND ts_ms < ? ORDER BY ts_ms LIMIT ?
+                """,
+                (target_id, cutoff_ms, limit - removed)
+            ).fetchall()
+            if not rows:
+                continue
+            
+            if self.archive is not None:
+                self.archive.write_metrics([
+                    (from_epoch_ms(row[0]), name, metric_type, row[index], unit)
+                    for row in rows
+                    for index, (metric_type, (_, unit)) in enumerate(WIDE_COLUMNS.items(), start=1)
+                    if row[index] is not None
+                ])
+            conn.execute(
+                "DELETE FROM samples WHERE target_id = ? AND ts_ms <= ?",
+                (target_id, rows[-1][0])
+            )
+            removed += len(rows)
+        return removed
+    
+    def _purge_blocks(self, cutoff_date: datetime, limit: int) -> int:
+        """Archive and delete block store blocks older than the cutoff."""
+        archive = None
+        if self.archive is not None:
+            def archive(target, metric_type, unit, stamps, values):
+                self.archive.write_metrics([
+                    (from_epoch_ms(ts_ms), target, metric_type, value, unit)
+                    for ts_ms, value in zip(stamps.tolist(), values.tolist())
+                ])
+        return self.tsdb.expire(to_epoch_ms(cutoff_date), limit, before_delete=archive)
+    
+    def _purge_rollups(self, conn, cutoff_date: datetime, limit: int) -> int:
+        """Delete rollup buckets that end before the cutoff, oldest first (writer held)."""
+        cutoff_s = cutoff_date.timestamp()
+        removed = 0
+        for resolution, width in ROLLUP_RESOLUTIONS.items():
+            if removed >= limit:
+                break
+            table = rollup_table(resolution)
+            removed += conn.execute(
+                f"""
+                DELETE FROM {table} WHERE (target, metric_type, bucket) IN (
+                    SELECT target, metric_type, bucket FROM {table}
+                    WHERE bucket <= ? ORDER BY bucket LIMIT ?
                 )
-                alerts_deleted = cursor.rowcount
-                
-                conn.commit()
-                
-                self.logger.info(
-                    f"Cleanup complete: {metrics_deleted} metrics, "
-                    f"{alerts_deleted} alerts removed"
+                """,
+                (cutoff_s - width, limit - removed)
+            ).rowcount
+        return removed
+    
+    def _purge_alerts(self, conn, cutoff_date: datetime, limit: int) -> int:
+        """Archive and delete old acknowledged alerts (writer held)."""
+        rows = conn.execute(
+            """
+            SELECT id, timestamp, severity, message, acknowledged, acknowledged_at
+            FROM alerts WHERE timestamp < ? AND acknowledged = 1
+            ORDER BY timestamp LIMIT ?
+            """,
+            (cutoff_date, limit)
+        ).fetchall()
+        if not rows:
+            return 0
+        
+        if self.archive is not None:
+            self.archive.write_alerts([
+                (row[0], _parse_timestamp(row[1]), row[2], row[3], row[4], _parse_timestamp(row[5]))
+                for row in rows
+            ])
+        conn.executemany("DELETE FROM alerts WHERE id = ?", [(row[0],) for row in rows])
+        return len(rows)
+    
+    def count_expired(self, cutoff_date: datetime) -> int:
+        """
+        Count rows older than the cutoff (for progress reporting).
+        
+        Args:
+            cutoff_date: Retention cutoff
+        
+        Returns:
+            Metric rows, samples, block store samples, rollup buckets and
+            acknowledged alerts to be removed
+        """
+        try:
+            expired = 0
+            if self.tsdb is not None:
+                expired = self.tsdb.count_expired(to_epoch_ms(cutoff_date))
+            with self.pool.reader() as conn:
+                for resolution, width in ROLLUP_RESOLUTIONS.items():
+                    expired += conn.execute(
+                        f"SELECT COUNT(*) FROM {rollup_table(resolution)} WHERE bucket <= ?",
+                        (cutoff_date.timestamp() - width,)
+                    ).fetchone()[0]
+                return expired + sum(
+                    conn.execute(query, (value,)).fetchone()[0]
+                    for query, value in (
+                        ("SELECT COUNT(*) FROM metrics WHERE timestamp < ?", cutoff_date),
+                        ("SELECT COUNT(*) FROM samples WHERE ts_ms < ?", to_epoch_ms(cutoff_date)),
+                        ("SELECT COUNT(*) FROM alerts WHERE timestamp < ? AND acknowledged = 1", cutoff_date),
+                    )
                 )
-                
         except Exception as e:
-            self.logger.error(f"Error during cleanup: {e}")
+            self.logger.error(f"Error counting expired rows: {e}")
+            return 0
+    
+    def compact_archive(self, cutoff_date: datetime) -> int:
+        """
+        Merge the archive files of days that lie completely before the cutoff.
+        
+        Each retention batch archives its rows as new files, so a day is
+        spread over many small files until it is complete; days before the
+        cutoff day cannot receive further rows and are compacted.
+        
+        Args:
+            cutoff_date: Retention cutoff of the finished run
+        
+        Returns:
+            Number of partitions compacted
+        """
+        if self.archive is None:
+            return 0
+        try:
+            return self.archive.compact(cutoff_date.date())
+        except Exception as e:
+            self.logger.error(f"Error compacting archive: {e}")
+            return 0
+    
+    def incremental_vacuum(self, pages: Optional[int] = None) -> int:
+        """
+        Return free pages to the filesystem.
+        
+        Only effective when the database was created with
+        auto_vacuum=INCREMENTAL (the pool default); older databases need
+        a one-time VACUUM to switch.
+        
+        Args:
+            pages: Maximum pages to release (None releases all)
+        
+        Returns:
+            Number of pages released
+        """
+        try:
+            with self.pool.writer() as conn:
+                if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                    return 0
+                before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                # executescript steps the pragma to completion
+                conn.executescript(f"PRAGMA incremental_vacuum({int(pages or 0)});")
+                return before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+        except Exception as e:
+            self.logger.error(f"Error during incremental vacuum: {e}")
+            return 0
@@ -0,0 +1,363 @@
+"""
+Hot Window Module
+
+Fixed-size ring buffers holding the most recent samples of each target
+(latency, packet loss and jitter), so dashboards and statistics over the
+last minutes are answered from memory instead of the database.
+
+A ring is one contiguous buffer: a small header followed by an int64
+array of timestamps (epoch milliseconds) and one float64 array per
+metric. Rings live in process memory, or, with a directory, in
+memory-mapped files that other processes (a dashboard, a CLI) can attach
+to read-only. Writers bracket every update with a sequence counter
+(odd while writing), and readers copy the arrays and retry if the
+counter moved, so no lock is shared between processes.
+
+A ring only knows what its owner recorded: it covers a target from the
+first sample recorded into it (or, once full, from its oldest retained
+sample). Reads over an older window must fall back to disk.
+"""
+
+import mmap
+import os
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote
+
+import numpy as np
+
+
+# Metrics held per target, in storage order
+HOT_METRICS = ("latency", "packet_loss", "jitter")
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S4"),
+    ("capacity", "<u4"),
+    ("sequence", "<u8"),     # odd while a write is in progress
+    ("written", "<u8"),      # samples recorded since the ring was reset
+    ("first_ms", "<i8"),     # timestamp of the first recorded sample
+])
+
+MAGIC = b"NMHW"
+
+# Samples kept per target (one hour at a 5 s interval)
+WINDOW_SAMPLES = 720
+
+# Attempts to read a consistent snapshot while a writer is active
+READ_RETRIES = 100
+
+
+class HotSeries(NamedTuple):
+    """Snapshot of one ring in time order."""
+    timestamps: np.ndarray               # int64 epoch milliseconds
+    values: Dict[str, np.ndarray]        # float64 per metric type
+    covered_from: int                    # epoch ms from which the ring is complete
+
+
+def _ring_size(capacity: int) -> int:
+    """Bytes of a ring with the given capacity."""
+    return HEADER_DTYPE.itemsize + 8 * capacity * (1 + len(HOT_METRICS))
+
+
+class _Ring:
+    """One target's ring over a bytearray or a memory map."""
+    
+    def __init__(self, buffer, capacity: int, inode: Optional[int] = None):
+        self.buffer = buffer
+        self.capacity = capacity
+        self.inode = inode
+        self.header = np.frombuffer(buffer, dtype=HEADER_DTYPE, count=1)
+        offset = HEADER_DTYPE.itemsize
+        self.timestamps = np.frombuffer(buffer, dtype="<i8", count=capacity, offset=offset)
+        self.columns = []
+        for i in range(len(HOT_METRICS)):
+            self.columns.append(np.frombuffer(
+                buffer, dtype="<f8", count=capacity, offset=offset + 8 * capacity * (i + 1)
+            ))
+    
+    def reset(self):
+        """Forget all samples (the header stays valid for readers)."""
+        header = self.header[0]
+        header["sequence"] += 1
+        header["written"] = 0
+        header["first_ms"] = 0
+        header["sequence"] += 1
+    
+    def append(self, ts_ms: int, values: Tuple[float, ...]):
+        """Record one sample, overwriting the oldest when full."""
+        header = self.header[0]
+        written = int(header["written"])
+        slot = written % self.capacity
+        
+        header["sequence"] += 1
+        self.timestamps[slot] = ts_ms
+        for column, value in zip(self.columns, values):
+            column[slot] = value
+        if written == 0:
+            header["first_ms"] = ts_ms
+        header["written"] = written + 1
+        header["sequence"] += 1
+    
+    def snapshot(self) -> Optional[HotSeries]:
+        """
+        Copy the ring's samples in time order.
+        
+        Returns:
+            HotSeries, or None if the ring is empty or a writer kept
+            changing it
+        """
+        header = self.header[0]
+        for _ in range(READ_RETRIES):
+            sequence = int(header["sequence"])
+            if sequence % 2:
+                continue
+            written = int(header["written"])
+            first_ms = int(header["first_ms"])
+            count = min(written, self.capacity)
+            stamps = self.timestamps[:count].copy()
+            columns = [column[:count].copy() for column in self.columns]
+            if int(header["sequence"]) != sequence:
+                continue
+            
+            if not count:
+                return None
+            if written > self.capacity:
+                # Oldest sample first; the ring covers from it onwards
+                start = written % self.capacity
+                stamps = np.roll(stamps, -start)
+                columns = [np.roll(column, -start) for column in columns]
+                first_ms = int(stamps[0])
+            order = np.argsort(stamps, kind="stable")
+            return HotSeries(
+                stamps[order],
+                {name: column[order] for name, column in zip(HOT_METRICS, columns)},
+                min(first_ms, int(stamps[order[0]]))
+            )
+        return None
+    
+    def close(self):
+        """Release the buffer views and unmap."""
+        self.header = self.timestamps = None
+        self.columns = []
+        if isinstance(self.buffer, mmap.mmap):
+            try:
+                self.buffer.close()
+            except BufferError:
+                # A snapshot still references the map; it is freed with it
+                pass
+
+
+class HotWindow:
+    """
+    Per-target ring buffers of the most recent samples.
+    
+    The owning process records samples; with a directory, other processes
+    open the same rings with readonly=True.
+    """
+    
+    def __init__(
+        self,
+        capacity: int = WINDOW_SAMPLES,
+        directory: Optional[str] = None,
+        readonly: bool = False
+    ):
+        """
+        Initialize the hot window.
+        
+        Args:
+            capacity: Samples kept per target
+            directory: Directory of memory-mapped ring files (None keeps
+                rings in process memory)
+            readonly: Attach to rings written by another process instead
+                of recording (requires directory)
+        """
+        if capacity < 1:
+            raise ValueError(f"Hot window capacity must be positive: {capacity}")
+        if readonly and directory is None:
+            raise ValueError("A read-only hot window needs a directory")
+        
+        self.logger = logging.getLogger(__name__)
+        self.capacity = capacity
+        self.directory = Path(directory) if directory else None
+        self.readonly = readonly
+        self.stats = {"hits": 0, "misses": 0}
+        self._rings: Dict[str, _Ring] = {}
+        self._lock = threading.Lock()
+        
+        if self.directory is not None and not readonly:
+            self.directory.mkdir(parents=True, exist_ok=True)
+    
+    def _path(self, target: str) -> Path:
+        """Ring file of a target."""
+        return self.directory / f"{quote(target, safe='')}.ring"
+    
+    def _create(self, target: str) -> _Ring:
+        """Create the writable ring of a target."""
+        if self.directory is None:
+            buffer = bytearray(_ring_size(self.capacity))
+            ring = _Ring(buffer, self.capacity)
+        else:
+            ring = self._map(self._path(target), create=True)
+        
+        ring.header[0]["magic"] = MAGIC
+        ring.header[0]["capacity"] = self.capacity
+        ring.reset()
+        return ring
+    
+    def _map(self, path: Path, create: bool = False) -> Optional[_Ring]:
+        """
+        Memory-map a ring file.
+        
+        Writers replace files of a different capacity atomically so that
+        attached readers never see a truncated file.
+        
+        Args:
+            path: Ring file
+            create: Create or resize the file for writing
+        
+        Returns:
+            _Ring, or None if a reader found no valid ring
+        """
+        size = _ring_size(self.capacity)
+        if create and (not path.exists() or path.stat().st_size != size):
+            temporary = path.with_suffix(".tmp")
+            with open(temporary, "wb") as f:
+                f.truncate(size)
+            os.replace(temporary, path)
+        
+        try:
+            with open(path, "r+b" if create else "rb") as f:
+                inode = os.fstat(f.fileno()).st_ino
+                access = mmap.ACCESS_WRITE if create else mmap.ACCESS_READ
+                buffer = mmap.mmap(f.fileno(), 0, access=access)
+        except (OSError, ValueError):
+            return None
+        
+        if create:
+            return _Ring(buffer, self.capacity, inode)
+        
+        capacity = 0
+        if len(buffer) >= HEADER_DTYPE.itemsize:
+            header = np.frombuffer(buffer, dtype=HEADER_DTYPE, count=1)[0]
+            if header["magic"] == MAGIC:
+                capacity = int(header["capacity"])
+            del header
+        if not capacity or len(buffer) != _ring_size(capacity):
+            buffer.close()
+            return None
+        return _Ring(buffer, capacity, inode)
+    
+    def _attached(self, target: str) -> Optional[_Ring]:
+        """Ring of a target written by another process, remapped if replaced."""
+        path = self._path(target)
+        try:
+            inode = path.stat().st_ino
+        except OSError:
+            inode = None
+        
+        ring = self._rings.get(target)
+        if ring is not None and ring.inode == inode:
+            return ring
+        if ring is not None:
+            ring.close()
+            del self._rings[target]
+        if inode is None:
+            return None
+        
+        ring = self._map(path)
+        if ring is not None:
+            self._rings[target] = ring
+        return ring
+    
+    def record(
+        self,
+        target: str,
+        ts_ms: int,
+        latency_ms: Optional[float],
+        packet_loss_pct: Optional[float],
+        jitter_ms: Optional[float]
+    ):
+        """
+        Record one sample of a target.
+        
+        Args:
+            target: Target identifier
+            ts_ms: Sample time in epoch milliseconds
+            latency_ms: Latency (None is stored as NaN)
+            packet_loss_pct: Packet loss percentage
+            jitter_ms: Jitter
+        """
+        if self.readonly:
+            raise RuntimeError("Cannot record into a read-only hot window")
+        
+        values = tuple(
+            np.nan if value is None else float(value)
+            for value in (latency_ms, packet_loss_pct, jitter_ms)
+        )
+        with self._lock:
+            ring = self._rings.get(target)
+            if ring is None:
+                ring = self._rings[target] = self._create(target)
+            ring.append(ts_ms, values)
+    
+    def snapshot(self, target: str) -> Optional[HotSeries]:
+        """
+        Get the recent samples of a target.
+        
+        Args:
+            target: Target identifier
+        
+        Returns:
+            HotSeries in time order, or None if nothing was recorded
+        """
+        with self._lock:
+            ring = self._attached(target) if self.readonly else self._rings.get(target)
+            return ring.snapshot() if ring is not None else None
+    
+    def window(
+        self,
+        target: str,
+        metric_type: str,
+        start_ms: int,
+        end_ms: Optional[int] = None
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Get one metric of a target over [start_ms, end_ms] if fully held.
+        
+        Args:
+            target: Target identifier
+            metric_type: One of HOT_METRICS
+            start_ms: Start of range in epoch milliseconds (inclusive)
+            end_ms: End of range (inclusive), None for "until now"
+        
+        Returns:
+            (timestamps as int64 epoch ms, values as float64) without
+            unmeasured (NaN) samples, or None if the ring does not cover
+            start_ms and the caller must read from disk
+        """
+        series = self.snapshot(target) if metric_type in HOT_METRICS else None
+        if series is None or start_ms < series.covered_from:
+            self.stats["misses"] += 1
+            return None
+        
+        stamps = series.timestamps
+        values = series.values[metric_type]
+        mask = (stamps >= start_ms) & ~np.isnan(values)
+        if end_ms is not None:
+            mask &= stamps <= end_ms
+        self.stats["hits"] += 1
+        return stamps[mask], values[mask]
+    
+    def targets(self) -> List[str]:
+        """Targets with a ring in this process."""
+        with self._lock:
+            return list(self._rings)
+    
+    def close(self):
+        """Unmap all rings."""
+        with self._lock:
+            for ring in self._rings.values():
+                ring.close()
+            self._rings.clear()
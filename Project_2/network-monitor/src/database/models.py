@@ -32,3 +32,4 @@ class Alert:
     message: str
     acknowledged: bool = False
     acknowledged_at: Optional[datetime] = None
+    target: Optional[str] = None
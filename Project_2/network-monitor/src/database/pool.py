@@ -0,0 +1,214 @@
+"""
+Connection Pool Module
+
+Keeps long-lived SQLite connections for the metrics store: a single
+writer connection serialized by a lock and a bounded pool of read-only
+connections. The database runs in WAL journal mode, so readers see a
+consistent snapshot and never block (or are blocked by) the writer.
+"""
+
+import sqlite3
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+DEFAULT_PRAGMAS = {
+    "auto_vacuum": "INCREMENTAL",   # New databases only; before journal_mode
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",        # Durable at checkpoints; safe with WAL
+    "cache_size": -16000,           # 16 MB page cache per connection
+    "mmap_size": 268435456,         # 256 MB memory-mapped I/O
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,           # ms to wait on a locked database
+}
+
+
+class ConnectionPool:
+    """
+    Pool of persistent SQLite connections.
+    
+    One writer connection is shared by all writers under a lock (SQLite
+    allows a single writer at a time anyway); up to max_readers reader
+    connections are created on demand and reused.
+    """
+    
+    def __init__(
+        self,
+        db_path: str,
+        max_readers: int = 4,
+        pragmas: Optional[Dict] = None,
+        on_connect: Optional[Callable[[sqlite3.Connection], None]] = None
+    ):
+        """
+        Initialize the pool and open the writer connection.
+        
+        Args:
+            db_path: Path to SQLite database file
+            max_readers: Maximum number of concurrent reader connections
+            pragmas: PRAGMA overrides merged into DEFAULT_PRAGMAS
+            on_connect: Called with every new connection (e.g. to register
+                SQL functions)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db_path = db_path
+        self.max_readers = max_readers
+        self.pragmas = dict(DEFAULT_PRAGMAS)
+        self.pragmas.update(pragmas or {})
+        self.on_connect = on_connect
+        
+        self._writer_lock = threading.Lock()
+        self._readers_available = threading.Condition()
+        self._idle_readers: List[sqlite3.Connection] = []
+        self._reader_count = 0
+        self._closed = False
+        
+        self._stats = {
+            "writer_acquisitions": 0,
+            "writer_wait_ms": 0.0,
+            "reader_acquisitions": 0,
+            "reader_waits": 0,
+            "reader_wait_ms": 0.0,
+            "readers_created": 0,
+        }
+        
+        self._writer = self._connect()
+        self.journal_mode = self._writer.execute("PRAGMA journal_mode").fetchone()[0]
+        self.logger.debug(f"ConnectionPool opened {db_path} (journal_mode={self.journal_mode})")
+    
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """
+        Open a connection with the configured pragmas.
+        
+        Args:
+            read_only: Reject writes on this connection
+        
+        Returns:
+            SQLite connection object
+        """
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            # auto_vacuum may need the write lock; readers leave it alone
+            if read_only and name == "auto_vacuum":
+                continue
+            conn.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            conn.execute("PRAGMA query_only=1")
+        if self.on_connect is not None:
+            self.on_connect(conn)
+        return conn
+    
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow the writer connection.
+        
+        The transaction is committed when the block exits normally and
+        rolled back if it raises.
+        
+        Yields:
+            The writer connection
+        """
+        started = time.perf_counter()
+        with self._writer_lock:
+            self._stats["writer_acquisitions"] += 1
+            self._stats["writer_wait_ms"] += (time.perf_counter() - started) * 1000
+            try:
+                yield self._writer
+                self._writer.commit()
+            except BaseException:
+                self._writer.rollback()
+                raise
+    
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a read-only connection.
+        
+        Blocks while all max_readers connections are in use.
+        
+        Yields:
+            A reader connection
+        """
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            # End the read transaction so the WAL can be checkpointed
+            if conn.in_transaction:
+                conn.rollback()
+            self._release_reader(conn)
+    
+    def _acquire_reader(self) -> sqlite3.Connection:
+        """Take an idle reader, create one, or wait for one to be returned."""
+        started = time.perf_counter()
+        with self._readers_available:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Connection pool is closed")
+            
+            waited = False
+            while not self._idle_readers and self._reader_count >= self.max_readers:
+                waited = True
+                self._readers_available.wait()
+            
+            self._stats["reader_acquisitions"] += 1
+            if waited:
+                self._stats["reader_waits"] += 1
+                self._stats["reader_wait_ms"] += (time.perf_counter() - started) * 1000
+            
+            if self._idle_readers:
+                return self._idle_readers.pop()
+            
+            self._reader_count += 1
+            self._stats["readers_created"] += 1
+        
+        try:
+            return self._connect(read_only=True)
+        except Exception:
+            with self._readers_available:
+                self._reader_count -= 1
+                self._readers_available.notify()
+            raise
+    
+    def _release_reader(self, conn: sqlite3.Connection):
+        """Return a reader connection to the pool."""
+        with self._readers_available:
+            if self._closed:
+                conn.close()
+                self._reader_count -= 1
+            else:
+                self._idle_readers.append(conn)
+            self._readers_available.notify()
+    
+    def stats(self) -> Dict:
+        """
+        Get pool usage metrics.
+        
+        Returns:
+            Dictionary of connection counts, acquisitions and wait times
+        """
+        with self._readers_available:
+            stats = dict(self._stats)
+            stats["readers_open"] = self._reader_count
+            stats["readers_idle"] = len(self._idle_readers)
+            stats["readers_in_use"] = self._reader_count - len(self._idle_readers)
+        stats["max_readers"] = self.max_readers
+        stats["journal_mode"] = self.journal_mode
+        stats["writer_busy"] = self._writer_lock.locked()
+        return stats
+    
+    def close(self):
+        """Close all idle connections and the writer."""
+        with self._readers_available:
+            self._closed = True
+            for conn in self._idle_readers:
+                conn.close()
+            self._reader_count -= len(self._idle_readers)
+            self._idle_readers.clear()
+            self._readers_available.notify_all()
+        
+        with self._writer_lock:
+            self._writer.close()
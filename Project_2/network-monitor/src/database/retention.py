@@ -0,0 +1,186 @@
+"""
+Retention Worker Module
+
+Background thread enforcing the data retention period. Each run deletes
+expired rows (raw metrics, rollup buckets and acknowledged alerts) in
+small batches (one short write transaction each),
+sleeps between batches to stay under a row rate limit, reports progress,
+and finishes with an incremental vacuum so freed pages are returned to
+the filesystem a little at a time.
+"""
+
+import threading
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from .db_manager import RETENTION_BATCH_SIZE
+
+
+class RetentionWorker:
+    """
+    Periodic, rate-limited retention cleanup.
+    
+    Attributes:
+        progress: State of the current (or last) run - state, cutoff,
+            expected, metrics, alerts, rollups, batches, percent,
+            vacuumed_pages
+    """
+    
+    def __init__(
+        self,
+        db_manager,
+        retention_days: float = 30,
+        interval: float = 3600,
+        batch_size: int = RETENTION_BATCH_SIZE,
+        max_rows_per_second: float = 20000,
+        vacuum_pages: Optional[int] = 2000,
+        on_progress: Optional[Callable[[Dict], None]] = None
+    ):
+        """
+        Initialize the worker (call start() to run it).
+        
+        Args:
+            db_manager: DatabaseManager to clean up
+            retention_days: Number of days to retain data
+            interval: Seconds between runs
+            batch_size: Rows deleted per transaction
+            max_rows_per_second: Deletion rate limit (0 disables it)
+            vacuum_pages: Pages released by the incremental vacuum after
+                each run (None releases all, 0 disables vacuuming)
+            on_progress: Called with a copy of progress after each batch
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db_manager = db_manager
+        self.retention_days = retention_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_rows_per_second = max_rows_per_second
+        self.vacuum_pages = vacuum_pages
+        self.on_progress = on_progress
+        
+        self.progress: Dict = {"state": "idle"}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start the background thread (first run happens immediately)."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="RetentionWorker")
+        self._thread.start()
+        self.logger.info(
+            f"Retention worker started (retention={self.retention_days}d, "
+            f"interval={self.interval}s, rate={self.max_rows_per_second} rows/s)"
+        )
+    
+    def stop(self, timeout: Optional[float] = 10):
+        """
+        Stop the worker; an interrupted run resumes on the next start.
+        
+        Args:
+            timeout: Maximum seconds to wait for the current batch
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+    
+    def _run(self):
+        """Worker loop: run, then wait for the next interval or stop."""
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                self.logger.error(f"Retention run failed: {e}")
+            self._stop.wait(self.interval)
+    
+    def run_once(self) -> Dict:
+        """
+        Remove everything older than the retention period.
+        
+        Returns:
+            Final progress of the run
+        """
+        cutoff = datetime.now() - timedelta(days=self.retention_days)
+        self._update(
+            state="running",
+            cutoff=cutoff,
+            expected=self.db_manager.count_expired(cutoff),
+            metrics=0,
+            alerts=0,
+            rollups=0,
+            batches=0,
+            percent=0.0,
+            vacuumed_pages=0,
+            started=datetime.now()
+        )
+        started = time.monotonic()
+        removed = 0
+        
+        while not self._stop.is_set():
+            metrics, alerts, rollups = self.db_manager.purge_batch(cutoff, self.batch_size)
+            removed += metrics + alerts + rollups
+            
+            with self._lock:
+                progress = self.progress
+                progress["metrics"] += metrics
+                progress["alerts"] += alerts
+                progress["rollups"] += rollups
+                progress["batches"] += 1
+                if progress["expected"]:
+                    progress["percent"] = min(100.0, 100.0 * removed / progress["expected"])
+            self._report()
+            
+            if metrics + alerts + rollups < self.batch_size:
+                break
+            
+            # Rate limit: stay at or below max_rows_per_second on average
+            if self.max_rows_per_second > 0:
+                delay = removed / self.max_rows_per_second - (time.monotonic() - started)
+                if delay > 0:
+                    self._stop.wait(delay)
+        
+        if self._stop.is_set():
+            self._update(state="interrupted", finished=datetime.now())
+            self.logger.info(f"Retention run interrupted after {removed} rows")
+            return self.snapshot()
+        
+        self.db_manager.compact_archive(cutoff)
+        if self.vacuum_pages != 0:
+            self._update(vacuumed_pages=self.db_manager.incremental_vacuum(self.vacuum_pages))
+        
+        self._update(state="done", percent=100.0, finished=datetime.now())
+        progress = self.snapshot()
+        self.logger.info(
+            f"Retention complete: {progress['metrics']} metrics, {progress['alerts']} "
+            f"alerts, {progress['rollups']} rollup buckets removed in {progress['batches']} batches "
+            f"({time.monotonic() - started:.1f}s), {progress['vacuumed_pages']} pages vacuumed"
+        )
+        return progress
+    
+    def snapshot(self) -> Dict:
+        """Return a copy of the current progress."""
+        with self._lock:
+            return dict(self.progress)
+    
+    def _update(self, **values):
+        """Merge values into progress (a new run replaces it)."""
+        with self._lock:
+            if values.get("state") == "running":
+                self.progress = values
+            else:
+                self.progress.update(values)
+    
+    def _report(self):
+        """Log and publish progress after a batch."""
+        progress = self.snapshot()
+        self.logger.debug(
+            f"Retention batch {progress['batches']}: {progress['metrics']} metrics, "
+            f"{progress['alerts']} alerts removed ({progress['percent']:.1f}%)"
+        )
+        if self.on_progress is not None:
+            self.on_progress(progress)
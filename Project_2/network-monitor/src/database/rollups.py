@@ -0,0 +1,252 @@
+"""
+Rollup Module
+
+Downsampled aggregates of the metrics table at 1 minute, 1 hour and
+1 day resolution. Each rollup row holds count, sum, sum of squares,
+minimum and maximum of one metric of one target over one bucket, so
+averages and standard deviations over any window can be combined from
+buckets without reading raw samples.
+
+Each bucket also stores a DDSketch of its values, so percentiles over
+any window are answered by merging bucket sketches.
+
+Rollups are maintained incrementally as metric batches are inserted,
+and a planner splits a query window into whole buckets of the coarsest
+resolution that fits plus finer (or raw) fragments at the edges.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import Metric
+from ..utils.sketch import DDSketch
+
+
+# Resolution name -> bucket width in seconds (fine to coarse)
+ROLLUP_RESOLUTIONS = {
+    "1m": 60,
+    "1h": 3600,
+    "1d": 86400,
+}
+
+
+def rollup_table(resolution: str) -> str:
+    """Return the table name for a rollup resolution."""
+    return f"rollup_{resolution}"
+
+
+@dataclass
+class Aggregate:
+    """
+    Mergeable summary of a set of values.
+    
+    Attributes:
+        count: Number of values
+        total: Sum of values
+        total_sq: Sum of squared values
+        minimum: Smallest value
+        maximum: Largest value
+        sketch: Quantile sketch of the values (None if unavailable)
+    """
+    count: int = 0
+    total: float = 0.0
+    total_sq: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+    sketch: Optional[DDSketch] = None
+    
+    @classmethod
+    def from_row(cls, values) -> "Aggregate":
+        """
+        Build an aggregate from a query row.
+        
+        Args:
+            values: (count, sum, sum of squares, min, max, sketch blob)
+            
+        Returns:
+            Aggregate instance
+        """
+        count, total, total_sq, minimum, maximum, sketch = values
+        return cls(
+            count, total, total_sq, minimum, maximum,
+            DDSketch.from_bytes(sketch) if sketch is not None else None
+        )
+    
+    def add(self, value: float):
+        """Add one value."""
+        self.count += 1
+        self.total += value
+        self.total_sq += value * value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        if self.sketch is None:
+            self.sketch = DDSketch()
+        self.sketch.add(value)
+    
+    def merge(self, other: "Aggregate"):
+        """Combine another aggregate into this one."""
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        if other.sketch is not None:
+            if self.sketch is None:
+                self.sketch = DDSketch(other.sketch.relative_accuracy)
+            self.sketch.merge(other.sketch)
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated quantile, or None if no sketch is available."""
+        return self.sketch.quantile(q) if self.sketch is not None else None
+    
+    @property
+    def mean(self) -> Optional[float]:
+        """Average value, or None if empty."""
+        return self.total / self.count if self.count else None
+    
+    @property
+    def stddev(self) -> Optional[float]:
+        """Sample standard deviation, or None if empty."""
+        if not self.count:
+            return None
+        if self.count < 2:
+            return 0.0
+        variance = (self.total_sq - self.total * self.total / self.count) / (self.count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+
+def bucket_start(epoch_s: float, width: int) -> int:
+    """Return the start (epoch seconds) of the bucket containing a time."""
+    return int(epoch_s // width) * width
+
+
+def aggregate_batch(metrics: Iterable[Metric]) -> Dict[str, Dict[tuple, Tuple[Aggregate, str]]]:
+    """
+    Pre-aggregate a batch of metrics into rollup buckets.
+    
+    Args:
+        metrics: Metric rows being inserted
+    
+    Returns:
+        {resolution: {(target, metric_type, bucket): (Aggregate, unit)}}
+    """
+    result: Dict[str, Dict[tuple, Tuple[Aggregate, str]]] = {
+        resolution: {} for resolution in ROLLUP_RESOLUTIONS
+    }
+    
+    for m in metrics:
+        epoch_s = m.timestamp.timestamp()
+        for resolution, width in ROLLUP_RESOLUTIONS.items():
+            key = (m.target, m.metric_type, bucket_start(epoch_s, width))
+            entry = result[resolution].get(key)
+            if entry is None:
+                entry = result[resolution][key] = (Aggregate(), m.unit)
+            entry[0].add(m.value)
+    
+    return result
+
+
+def plan_window(
+    start_s: float,
+    end_s: Optional[float],
+    resolutions: Optional[List[str]] = None
+) -> List[tuple]:
+    """
+    Split a time window into rollup and raw pieces.
+    
+    Whole buckets of the coarsest resolution that fits are read from its
+    rollup table; the partial edges are planned recursively with finer
+    resolutions and finally read from raw samples. With an open end
+    (end_s None, i.e. "until now") the last bucket is still filling and
+    is read whole.
+    
+    Args:
+        start_s: Window start, epoch seconds (inclusive)
+        end_s: Window end, epoch seconds (exclusive), or None for open
+        resolutions: Candidate resolutions, fine to coarse
+    
+    Returns:
+        List of (resolution, start, end) pieces; resolution is "raw" for
+        raw samples, end is None for an open-ended piece
+    """
+    if resolutions is None:
+        resolutions = list(ROLLUP_RESOLUTIONS)
+    if not resolutions:
+        return [("raw", start_s, end_s)]
+    if end_s is not None and end_s <= start_s:
+        return []
+    
+    coarsest, finer = resolutions[-1], resolutions[:-1]
+    width = ROLLUP_RESOLUTIONS[coarsest]
+    first = math.ceil(start_s / width) * width
+    last = None if end_s is None else bucket_start(end_s, width)
+    
+    if last is not None and last - first < width:
+        return plan_window(start_s, end_s, finer)
+    
+    pieces = plan_window(start_s, first, finer)
+    pieces.append((coarsest, first, last))
+    if last is not None:
+        pieces.extend(plan_window(last, end_s, finer))
+    return pieces
+
+
+def create_rollup_tables(cursor):
+    """Create one rollup table per resolution."""
+    for resolution in ROLLUP_RESOLUTIONS:
+        table = rollup_table(resolution)
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                target TEXT NOT NULL,
+                metric_type TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                sum_value REAL NOT NULL,
+                sum_sq REAL NOT NULL,
+                min_value REAL NOT NULL,
+                max_value REAL NOT NULL,
+                unit TEXT NOT NULL,
+                PRIMARY KEY (target, metric_type, bucket)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_bucket ON {table}(bucket)")
+
+
+def add_sketch_columns(cursor):
+    """Add the sketch column to every rollup table."""
+    for resolution in ROLLUP_RESOLUTIONS:
+        cursor.execute(f"ALTER TABLE {rollup_table(resolution)} ADD COLUMN sketch BLOB")
+
+
+def upsert_rollups(conn, metrics: List[Metric]):
+    """
+    Fold a batch of metrics into the rollup tables.
+    
+    Requires the sketch SQL functions (utils.sketch) on the connection.
+    
+    Args:
+        conn: Writer connection (inside the insert transaction)
+        metrics: Metric rows being inserted
+    """
+    for resolution, buckets in aggregate_batch(metrics).items():
+        conn.executemany(
+            f"""
+            INSERT INTO {rollup_table(resolution)}
+                (target, metric_type, bucket, count, sum_value, sum_sq,
+                 min_value, max_value, unit, sketch)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (target, metric_type, bucket) DO UPDATE SET
+                count = count + excluded.count,
+                sum_value = sum_value + excluded.sum_value,
+                sum_sq = sum_sq + excluded.sum_sq,
+                min_value = MIN(min_value, excluded.min_value),
+                max_value = MAX(max_value, excluded.max_value),
+                sketch = sketch_merge(sketch, excluded.sketch)
+            """,
+            [
+                (target, metric_type, bucket, agg.count, agg.total, agg.total_sq,
+                 agg.minimum, agg.maximum, unit, agg.sketch.to_bytes())
+                for (target, metric_type, bucket), (agg, unit) in buckets.items()
+            ]
+        )
@@ -0,0 +1,774 @@
+"""
+Block Storage Engine Module
+
+Compressed time-series storage for raw metric samples, used by
+DatabaseManager when engine="tsdb". Each (target, metric type) series
+lives in its own pair of files:
+
+- <metric>.blocks: a small file header (with the unit and the offset of
+  the first live block) followed by sealed, immutable blocks. A block header holds the sample count, first
+  and last timestamp and payload length. In the payload, timestamps
+  (epoch milliseconds) are stored as delta-of-deltas and values are
+  quantized to the probes' resolution (by default 3 decimal places, i.e.
+  microseconds of latency) and stored as integer differences or offsets.
+  Both integer streams are Rice-coded with quotients and remainders in
+  separate bit streams, so a block decodes with a few NumPy operations
+  instead of a per-sample loop. Block files are memory-mapped for reads
+  and blocks outside a query range are skipped using their headers.
+- <metric>.head: the open block, appended to as raw 16-byte records and
+  sealed into a compressed block once block_size samples are collected.
+
+Regularly spaced series with stable values (packet loss, counters) take
+well under 1 byte per sample. Latency costs about as many bits as its
+spread in microseconds needs: about 2 bytes per sample for a standard
+deviation near 10 ms. Decoded blocks are cached, so repeated range scans
+over the same history do not decode again.
+
+Retention removes whole blocks whose newest sample is past the cutoff by
+advancing the first live block offset in the file header; the file is
+only rewritten without them once they make up COMPACT_FRACTION of it.
+Head samples past the cutoff are removed too, so a series that stopped
+receiving data (a removed target) still expires.
+"""
+
+import math
+import mmap
+import os
+import struct
+import threading
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from .models import Metric
+
+
+FILE_HEADER = struct.Struct("<4sB16sQQ")  # magic, version, unit, blocks dropped, first live offset
+BLOCK_HEADER = struct.Struct("<IqqI")    # count, first ts, last ts, payload length
+HEAD_HEADER = struct.Struct("<Q")        # blocks ever sealed when the head was written
+HEAD_RECORD = struct.Struct("<qd")       # ts (epoch ms), value
+
+MAGIC = b"NMTS"
+VERSION = 3
+
+# Samples per sealed block
+BLOCK_SAMPLES = 1024
+
+# Decimal places of stored values
+VALUE_PRECISION = 3
+
+# Decoded blocks kept in memory across reads
+CACHE_BLOCKS = 256
+
+# Share of a block file taken by expired blocks before it is rewritten
+COMPACT_FRACTION = 0.5
+
+# Unary quotients at or above this are escaped and stored as raw 64 bits
+RICE_ESCAPE = 32
+
+# Payload codecs
+CODEC_QUANTIZED = 0
+CODEC_RAW = 1
+
+# Timestamp modes
+TIME_DOD = 0          # delta-of-deltas
+TIME_GRID = 1         # offsets from a regular grid (first ts + i * step)
+
+# Value modes of quantized payloads
+MODE_DELTA = 0        # differences of consecutive values
+MODE_OFFSET = 1       # offsets from the block minimum
+
+PAYLOAD_HEADER = struct.Struct("<BBBBqqq")  # codec, time mode, value mode, precision, first ts, step, value base
+RICE_HEADER = struct.Struct("<BI")        # k, unary stream bytes
+
+# Rice parameter marking a stream of zeros (no bits stored)
+RICE_ZEROS = 0xFF
+
+# Largest quantized magnitude (keeps differences within int64)
+_MAX_QUANTIZED = 1 << 61
+
+
+def _zigzag(values: np.ndarray) -> np.ndarray:
+    """Map signed integers to unsigned ones (0, -1, 1, -2, ... -> 0, 1, 2, 3, ...)."""
+    values = values.astype(np.int64)
+    return ((values << 1) ^ (values >> 63)).view(np.uint64)
+
+
+def _unzigzag(values: np.ndarray) -> np.ndarray:
+    """Inverse of _zigzag."""
+    return (values >> np.uint64(1)).view(np.int64) ^ -(values & np.uint64(1)).view(np.int64)
+
+
+def _rice_parameter(values: np.ndarray) -> Tuple[int, int]:
+    """
+    Choose the Rice parameter minimizing the encoded size.
+    
+    Returns:
+        (k, encoded size in bits)
+    """
+    if not len(values):
+        return 0, 0
+    mean = float(values.astype(np.float64).mean())
+    best = None
+    for k in range(min(int(np.log2(mean + 1)) + 3, 63) + 1):
+        quotients = values >> np.uint64(k)
+        escaped = quotients >= RICE_ESCAPE
+        bits = (
+            int(np.minimum(quotients, RICE_ESCAPE).sum())
+            + len(values) * (k + 1)
+            + 64 * int(escaped.sum())
+        )
+        if best is None or bits < best[1]:
+            best = (k, bits)
+    return best
+
+
+def _rice_encode(values: np.ndarray) -> bytes:
+    """
+    Rice-code unsigned integers.
+    
+    Quotients are written as a unary bit stream and remainders as a
+    separate stream of fixed-width k-bit fields, so both can be decoded
+    with whole-array operations. Quotients of RICE_ESCAPE or more are
+    written as RICE_ESCAPE and the value appended raw. A stream of zeros
+    (a perfect grid, a constant value) is stored as its header only.
+    """
+    if not values.any():
+        return RICE_HEADER.pack(RICE_ZEROS, 0)
+    k, _ = _rice_parameter(values)
+    quotients = values >> np.uint64(k)
+    escaped = quotients >= RICE_ESCAPE
+    unary_lengths = np.minimum(quotients, RICE_ESCAPE).astype(np.int64) + 1
+    
+    ends = np.cumsum(unary_lengths)
+    unary = np.ones(int(ends[-1]) if len(ends) else 0, dtype=np.uint8)
+    unary[ends - 1] = 0
+    unary = np.packbits(unary).tobytes()
+    
+    remainders = b""
+    if k:
+        shifts = np.arange(k - 1, -1, -1, dtype=np.uint64)
+        bits = (values[:, None] >> shifts) & np.uint64(1)
+        remainders = np.packbits(bits.astype(np.uint8).ravel()).tobytes()
+    
+    raw = values[escaped].astype("<u8").tobytes()
+    return RICE_HEADER.pack(k, len(unary)) + unary + remainders + raw
+
+
+def _rice_decode(payload: bytes, offset: int, count: int) -> Tuple[np.ndarray, int]:
+    """
+    Decode count Rice-coded integers.
+    
+    Returns:
+        (values as uint64, offset after the stream)
+    """
+    k, unary_bytes = RICE_HEADER.unpack_from(payload, offset)
+    offset += RICE_HEADER.size
+    if k == RICE_ZEROS:
+        return np.zeros(count, dtype=np.uint64), offset
+    unary = np.unpackbits(np.frombuffer(payload, dtype=np.uint8, count=unary_bytes, offset=offset))
+    offset += unary_bytes
+    
+    # Each quotient is the run of ones before its terminating zero
+    ends = np.flatnonzero(unary == 0)[:count]
+    quotients = np.diff(ends, prepend=-1) - 1
+    values = quotients.astype(np.uint64) << np.uint64(k)
+    
+    if k:
+        remainder_bytes = (count * k + 7) // 8
+        bits = np.unpackbits(
+            np.frombuffer(payload, dtype=np.uint8, count=remainder_bytes, offset=offset)
+        )[:count * k].reshape(count, k).astype(np.uint64)
+        offset += remainder_bytes
+        for column in range(k):
+            values |= bits[:, column] << np.uint64(k - 1 - column)
+    
+    escaped = quotients >= RICE_ESCAPE
+    escapes = int(escaped.sum())
+    if escapes:
+        values[escaped] = np.frombuffer(payload, dtype="<u8", count=escapes, offset=offset)
+        offset += 8 * escapes
+    return values, offset
+
+
+def _quantize(values: np.ndarray, precision: Optional[int]) -> Optional[np.ndarray]:
+    """Values as integer multiples of 10**-precision, or None if not representable."""
+    if precision is None or not np.isfinite(values).all():
+        return None
+    scaled = np.rint(values * 10.0 ** precision)
+    if np.abs(scaled).max(initial=0) >= _MAX_QUANTIZED:
+        return None
+    return scaled.astype(np.int64)
+
+
+def encode_block(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    precision: Optional[int] = VALUE_PRECISION
+) -> bytes:
+    """
+    Encode a run of samples.
+    
+    Timestamps are stored as Rice-coded delta-of-deltas or offsets from
+    a regular grid, whichever is smaller. Values are rounded to precision
+    decimal places and stored as Rice-coded integer differences or
+    offsets from the block minimum, whichever is smaller; blocks holding
+    NaN or infinite values, or precision None, keep raw float64 values.
+    
+    Args:
+        timestamps: Epoch milliseconds (int64), ascending
+        values: Sample values (float64)
+        precision: Decimal places kept (3 keeps microseconds of
+            millisecond values); None stores values losslessly
+    
+    Returns:
+        Encoded payload
+    """
+    stamps = timestamps.astype(np.int64)
+    if not len(stamps):
+        return b""
+    
+    # Drift-free schedules stay close to a grid; irregular ones suit dods
+    first = int(stamps[0])
+    step = (int(stamps[-1]) - first) // max(len(stamps) - 1, 1)
+    time_mode, times = TIME_DOD, _zigzag(np.diff(np.diff(stamps), prepend=0))
+    grid = _zigzag(stamps[1:] - first - np.arange(1, len(stamps), dtype=np.int64) * step)
+    if _rice_parameter(grid)[1] < _rice_parameter(times)[1]:
+        time_mode, times = TIME_GRID, grid
+    
+    quantized = _quantize(np.asarray(values, dtype=np.float64), precision)
+    if quantized is None:
+        header = PAYLOAD_HEADER.pack(CODEC_RAW, time_mode, 0, 0, first, step, 0)
+        return header + _rice_encode(times) + np.asarray(values, dtype="<f8").tobytes()
+    
+    deltas = _zigzag(np.diff(quantized))
+    base = int(quantized.min())
+    offsets = (quantized - base).view(np.uint64)
+    if _rice_parameter(deltas)[1] <= _rice_parameter(offsets)[1]:
+        value_mode, base, encoded = MODE_DELTA, int(quantized[0]), deltas
+    else:
+        value_mode, encoded = MODE_OFFSET, offsets
+    
+    header = PAYLOAD_HEADER.pack(CODEC_QUANTIZED, time_mode, value_mode, precision, first, step, base)
+    return header + _rice_encode(times) + _rice_encode(encoded)
+
+
+def decode_block(payload: bytes, count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode a payload written by encode_block.
+    
+    Args:
+        payload: Encoded payload
+        count: Number of samples in the payload
+    
+    Returns:
+        (epoch milliseconds as int64, values as float64)
+    """
+    if count == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    
+    codec, time_mode, value_mode, precision, first_ts, step, base = PAYLOAD_HEADER.unpack_from(payload, 0)
+    times, offset = _rice_decode(payload, PAYLOAD_HEADER.size, count - 1)
+    stamps = np.empty(count, dtype=np.int64)
+    stamps[0] = first_ts
+    if time_mode == TIME_GRID:
+        stamps[1:] = first_ts + np.arange(1, count, dtype=np.int64) * step + _unzigzag(times)
+    else:
+        stamps[1:] = first_ts + np.cumsum(np.cumsum(_unzigzag(times)))
+    
+    if codec == CODEC_RAW:
+        return stamps, np.frombuffer(payload, dtype="<f8", count=count, offset=offset).astype(np.float64)
+    
+    if value_mode == MODE_DELTA:
+        encoded, _ = _rice_decode(payload, offset, count - 1)
+        quantized = np.empty(count, dtype=np.int64)
+        quantized[0] = base
+        quantized[1:] = base + np.cumsum(_unzigzag(encoded))
+    else:
+        encoded, _ = _rice_decode(payload, offset, count)
+        quantized = base + encoded.view(np.int64)
+    return stamps, quantized / 10.0 ** precision
+
+
+class _Block(NamedTuple):
+    """Location and extent of one sealed block."""
+    offset: int
+    count: int
+    first_ts: int
+    last_ts: int
+    length: int
+
+
+class _Series:
+    """Files and in-memory state of one series."""
+    
+    def __init__(self, directory: Path, target: str, metric_type: str):
+        self.target = target
+        self.metric_type = metric_type
+        self.blocks_path = directory / f"{quote(metric_type, safe='')}.blocks"
+        self.head_path = directory / f"{quote(metric_type, safe='')}.head"
+        self.unit = ""
+        self.blocks: List[_Block] = []
+        # Expired blocks still at the start of the block file, and all
+        # blocks dropped since the series was created
+        self.dead_bytes = 0
+        self.dropped = 0
+        self.head: List[Tuple[int, float]] = []
+        self.head_file = None
+        self.map: Optional[mmap.mmap] = None
+        self.mapped_size = 0
+        # Bumped when the block file is rewritten (cached block keys change)
+        self.epoch = 0
+    
+    @property
+    def size(self) -> int:
+        """Bytes of the block file."""
+        if self.blocks:
+            return self.blocks[-1].offset + self.blocks[-1].length
+        return FILE_HEADER.size + self.dead_bytes
+
+
+class BlockStore:
+    """
+    Directory of compressed series, one pair of files per
+    (target, metric type).
+    """
+    
+    def __init__(
+        self,
+        root: str,
+        block_size: int = BLOCK_SAMPLES,
+        cache_blocks: int = CACHE_BLOCKS,
+        precision: Optional[int] = VALUE_PRECISION
+    ):
+        """
+        Open (or create) a store.
+        
+        Args:
+            root: Store directory
+            block_size: Samples per sealed block
+            cache_blocks: Decoded blocks kept in memory
+            precision: Decimal places values are rounded to (None stores
+                them losslessly as raw float64)
+        """
+        if precision is not None and not 0 <= precision <= 15:
+            raise ValueError(f"Value precision must be 0-15 decimal places: {precision}")
+        
+        self.logger = logging.getLogger(__name__)
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.block_size = block_size
+        self.cache_blocks = cache_blocks
+        self.precision = precision
+        
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._cache: "OrderedDict[tuple, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.stats = {"blocks_decoded": 0, "cache_hits": 0, "compactions": 0}
+        
+        for directory in sorted(p for p in self.root.iterdir() if p.is_dir()):
+            for path in sorted(directory.glob("*.blocks")):
+                self._open(unquote(directory.name), unquote(path.stem))
+        self.logger.info(f"Block store opened at {root} ({len(self._series)} series)")
+    
+    def _open(self, target: str, metric_type: str, unit: str = "") -> _Series:
+        """Load or create the files of a series (lock held)."""
+        directory = self.root / quote(target, safe="")
+        directory.mkdir(exist_ok=True)
+        series = _Series(directory, target, metric_type)
+        
+        if series.blocks_path.exists():
+            self._load_blocks(series)
+        else:
+            with open(series.blocks_path, "wb") as f:
+                f.write(FILE_HEADER.pack(MAGIC, VERSION, unit.encode()[:16], 0, FILE_HEADER.size))
+            series.unit = unit
+        
+        if series.head_path.exists():
+            self._load_head(series)
+        else:
+            self._rewrite_head(series)
+        series.head_file = open(series.head_path, "ab")
+        
+        self._series[(target, metric_type)] = series
+        return series
+    
+    def _load_blocks(self, series: _Series):
+        """Read the block index of a series, dropping a torn last block."""
+        with open(series.blocks_path, "rb") as f:
+            data = f.read()
+        magic, version = data[:4], data[4] if len(data) > 4 else None
+        if magic != MAGIC:
+            raise ValueError(f"Not a block file: {series.blocks_path}")
+        if version != VERSION:
+            raise ValueError(f"Unsupported block file version {version}: {series.blocks_path}")
+        _, _, unit, series.dropped, offset = FILE_HEADER.unpack_from(data, 0)
+        series.unit = unit.rstrip(b"\0").decode()
+        series.dead_bytes = offset - FILE_HEADER.size
+        
+        while offset + BLOCK_HEADER.size <= len(data):
+            count, first_ts, last_ts, length = BLOCK_HEADER.unpack_from(data, offset)
+            end = offset + BLOCK_HEADER.size + length
+            if end > len(data):
+                break
+            series.blocks.append(_Block(offset, count, first_ts, last_ts, end - offset))
+            offset = end
+        
+        if offset != len(data):
+            self.logger.warning(f"Truncating incomplete block in {series.blocks_path}")
+            with open(series.blocks_path, "r+b") as f:
+                f.truncate(offset)
+    
+    def _load_head(self, series: _Series):
+        """
+        Read the open block of a series.
+        
+        The head records the number of sealed blocks it was written
+        against; samples already sealed into later blocks (a crash between
+        sealing and rewriting the head) are skipped.
+        """
+        with open(series.head_path, "rb") as f:
+            data = f.read()
+        if len(data) < HEAD_HEADER.size:
+            self._rewrite_head(series)
+            return
+        
+        (sealed,) = HEAD_HEADER.unpack_from(data, 0)
+        usable = (len(data) - HEAD_HEADER.size) // HEAD_RECORD.size * HEAD_RECORD.size
+        records = sorted(
+            HEAD_RECORD.iter_unpack(data[HEAD_HEADER.size:HEAD_HEADER.size + usable]),
+            key=lambda record: record[0]
+        )
+        skip = sum(block.count for block in series.blocks[max(sealed - series.dropped, 0):])
+        series.head = records[skip:]
+        if skip or usable != len(data) - HEAD_HEADER.size:
+            self._rewrite_head(series)
+    
+    def _rewrite_head(self, series: _Series):
+        """Replace the head file with the in-memory head (lock held)."""
+        if series.head_file is not None:
+            series.head_file.close()
+        tmp = series.head_path.with_suffix(".head.tmp")
+        with open(tmp, "wb") as f:
+            f.write(HEAD_HEADER.pack(series.dropped + len(series.blocks)))
+            f.write(b"".join(HEAD_RECORD.pack(ts, value) for ts, value in series.head))
+        os.replace(tmp, series.head_path)
+        if series.head_file is not None:
+            series.head_file = open(series.head_path, "ab")
+    
+    def append(self, metrics: Iterable[Metric]) -> int:
+        """
+        Store metric rows.
+        
+        Args:
+            metrics: Rows to store (any order)
+        
+        Returns:
+            Number of samples stored
+        """
+        grouped: Dict[Tuple[str, str], List[Metric]] = {}
+        for m in metrics:
+            grouped.setdefault((m.target, m.metric_type), []).append(m)
+        
+        stored = 0
+        with self._lock:
+            for (target, metric_type), rows in grouped.items():
+                series = self._series.get((target, metric_type))
+                if series is None:
+                    series = self._open(target, metric_type, rows[0].unit)
+                
+                records = [(int(round(m.timestamp.timestamp() * 1000)), self._round(m.value)) for m in rows]
+                series.head_file.write(b"".join(HEAD_RECORD.pack(*record) for record in records))
+                series.head_file.flush()
+                
+                in_order = not series.head or records[0][0] >= series.head[-1][0]
+                series.head.extend(records)
+                if not in_order or any(a[0] > b[0] for a, b in zip(records, records[1:])):
+                    series.head.sort(key=lambda record: record[0])
+                
+                while len(series.head) >= self.block_size:
+                    self._seal(series)
+                stored += len(records)
+        return stored
+    
+    def _round(self, value: float) -> float:
+        """Round a value as it will be stored, so head and blocks agree."""
+        value = float(value)
+        if self.precision is None or not math.isfinite(value):
+            return value
+        return round(value, self.precision)
+    
+    def _seal(self, series: _Series):
+        """Compress the oldest block_size head samples into a block (lock held)."""
+        sealed, series.head = series.head[:self.block_size], series.head[self.block_size:]
+        stamps = np.array([ts for ts, _ in sealed], dtype=np.int64)
+        values = np.array([value for _, value in sealed], dtype=np.float64)
+        payload = encode_block(stamps, values, self.precision)
+        header = BLOCK_HEADER.pack(len(sealed), int(stamps[0]), int(stamps[-1]), len(payload))
+        
+        offset = series.size
+        with open(series.blocks_path, "ab") as f:
+            f.write(header + payload)
+        series.blocks.append(
+            _Block(offset, len(sealed), int(stamps[0]), int(stamps[-1]), len(header) + len(payload))
+        )
+        self._rewrite_head(series)
+    
+    def _payload(self, series: _Series, block: _Block) -> bytes:
+        """Copy a block payload out of the memory map (lock held)."""
+        if series.map is None or series.mapped_size < block.offset + block.length:
+            if series.map is not None:
+                series.map.close()
+            with open(series.blocks_path, "rb") as f:
+                series.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            series.mapped_size = len(series.map)
+        start = block.offset + BLOCK_HEADER.size
+        return series.map[start:block.offset + block.length]
+    
+    def read(
+        self,
+        target: str,
+        metric_type: str,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, str]]:
+        """
+        Read one series in time order.
+        
+        Args:
+            target: Target identifier
+            metric_type: Type of metric
+            start_ms: Start of range in epoch ms, inclusive (optional)
+            end_ms: End of range in epoch ms, inclusive (optional)
+        
+        Returns:
+            (epoch ms as int64, values as float64, unit), or None if the
+            series does not exist
+        """
+        low = start_ms if start_ms is not None else -(1 << 63)
+        high = end_ms if end_ms is not None else (1 << 63) - 1
+        
+        pieces: List[Tuple[np.ndarray, np.ndarray]] = []
+        pending: List[Tuple[tuple, bytes, int, int]] = []
+        with self._lock:
+            series = self._series.get((target, metric_type))
+            if series is None:
+                return None
+            unit = series.unit
+            for block in series.blocks:
+                if block.last_ts < low or block.first_ts > high:
+                    continue
+                key = (target, metric_type, series.epoch, block.offset)
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    self.stats["cache_hits"] += 1
+                    pieces.append(cached)
+                else:
+                    pieces.append(None)
+                    pending.append((key, self._payload(series, block), block.count, len(pieces) - 1))
+            head = [record for record in series.head if low <= record[0] <= high]
+        
+        # Decode outside the lock; sealed blocks never change
+        for key, payload, count, index in pending:
+            decoded = decode_block(payload, count)
+            pieces[index] = decoded
+            with self._lock:
+                self.stats["blocks_decoded"] += 1
+                self._cache[key] = decoded
+                while len(self._cache) > self.cache_blocks:
+                    self._cache.popitem(last=False)
+        
+        if head:
+            pieces.append((
+                np.array([ts for ts, _ in head], dtype=np.int64),
+                np.array([value for _, value in head], dtype=np.float64)
+            ))
+        if not pieces:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64), unit
+        
+        stamps = np.concatenate([piece[0] for piece in pieces])
+        values = np.concatenate([piece[1] for piece in pieces])
+        if len(stamps) > 1 and (np.diff(stamps) < 0).any():
+            # Late samples can make blocks overlap in time
+            order = np.argsort(stamps, kind="stable")
+            stamps, values = stamps[order], values[order]
+        
+        keep = (stamps >= low) & (stamps <= high)
+        if not keep.all():
+            stamps, values = stamps[keep], values[keep]
+        return stamps, values, unit
+    
+    def series(self) -> List[Tuple[str, str]]:
+        """(target, metric type) of every stored series."""
+        with self._lock:
+            return list(self._series)
+    
+    def count_expired(self, cutoff_ms: int) -> int:
+        """
+        Count samples that retention would remove.
+        
+        Args:
+            cutoff_ms: Retention cutoff in epoch ms
+        
+        Returns:
+            Samples in blocks whose newest sample is older than the cutoff,
+            plus head samples older than the cutoff
+        """
+        with self._lock:
+            return sum(
+                sum(block.count for block in series.blocks if block.last_ts < cutoff_ms)
+                + sum(1 for ts, _ in series.head if ts < cutoff_ms)
+                for series in self._series.values()
+            )
+    
+    def expire(
+        self,
+        cutoff_ms: int,
+        limit: int,
+        before_delete: Optional[Callable[[str, str, str, np.ndarray, np.ndarray], None]] = None
+    ) -> int:
+        """
+        Remove the oldest blocks that lie entirely before the cutoff, then
+        head samples older than the cutoff.
+        
+        Whole blocks are removed, so up to one block more than limit
+        samples may go.
+        
+        Args:
+            cutoff_ms: Retention cutoff in epoch ms
+            limit: Samples to remove before stopping
+            before_delete: Called with (target, metric_type, unit,
+                timestamps, values) of each series' expired samples before
+                they are removed; an exception aborts the removal
+        
+        Returns:
+            Number of samples removed
+        """
+        removed = 0
+        with self._lock:
+            for series in list(self._series.values()):
+                if removed >= limit:
+                    break
+                expired = []
+                for block in series.blocks:
+                    if block.last_ts >= cutoff_ms or removed >= limit:
+                        break
+                    expired.append(block)
+                    removed += block.count
+                
+                # The head holds the newest samples unless the series went quiet
+                head = 0
+                if len(expired) == len(series.blocks):
+                    while (
+                        head < len(series.head) and series.head[head][0] < cutoff_ms
+                        and removed < limit
+                    ):
+                        head += 1
+                        removed += 1
+                if not expired and not head:
+                    continue
+                
+                if before_delete is not None:
+                    decoded = [decode_block(self._payload(series, block), block.count) for block in expired]
+                    if head:
+                        decoded.append((
+                            np.array([ts for ts, _ in series.head[:head]], dtype=np.int64),
+                            np.array([value for _, value in series.head[:head]], dtype=np.float64)
+                        ))
+                    before_delete(
+                        series.target, series.metric_type, series.unit,
+                        np.concatenate([d[0] for d in decoded]),
+                        np.concatenate([d[1] for d in decoded])
+                    )
+                if head:
+                    del series.head[:head]
+                if expired:
+                    self._drop_blocks(series, len(expired))
+                else:
+                    self._rewrite_head(series)
+        return removed
+    
+    def _drop_blocks(self, series: _Series, count: int):
+        """
+        Drop the first count blocks of a series (lock held).
+        
+        Dropped blocks stay in the file behind the first live block offset
+        of the header until they make up COMPACT_FRACTION of it; the file
+        is then rewritten without them.
+        """
+        keep = series.blocks[count:]
+        start = keep[0].offset if keep else series.size
+        series.dropped += count
+        series.blocks = keep
+        series.dead_bytes = start - FILE_HEADER.size
+        
+        if keep and series.dead_bytes < COMPACT_FRACTION * (series.size - FILE_HEADER.size):
+            # Header fields only: readers of the live blocks are unaffected
+            with open(series.blocks_path, "r+b") as f:
+                header = bytearray(f.read(FILE_HEADER.size))
+                FILE_HEADER.pack_into(header, 0, *FILE_HEADER.unpack(header)[:3], series.dropped, start)
+                f.seek(0)
+                f.write(header)
+        else:
+            self._compact(series)
+        self._rewrite_head(series)
+    
+    def _compact(self, series: _Series):
+        """Rewrite a block file without its dropped blocks (lock held)."""
+        start = FILE_HEADER.size + series.dead_bytes
+        tmp = series.blocks_path.with_suffix(".blocks.tmp")
+        with open(series.blocks_path, "rb") as src, open(tmp, "wb") as dst:
+            magic, version, unit, _, _ = FILE_HEADER.unpack(src.read(FILE_HEADER.size))
+            dst.write(FILE_HEADER.pack(magic, version, unit, series.dropped, FILE_HEADER.size))
+            src.seek(start)
+            dst.write(src.read())
+        
+        if series.map is not None:
+            series.map.close()
+            series.map = None
+            series.mapped_size = 0
+        os.replace(tmp, series.blocks_path)
+        
+        shift = series.dead_bytes
+        series.blocks = [block._replace(offset=block.offset - shift) for block in series.blocks]
+        series.dead_bytes = 0
+        series.epoch += 1
+        self.stats["compactions"] += 1
+    
+    def storage_stats(self) -> Dict:
+        """
+        Size of the store.
+        
+        Returns:
+            Dictionary with series, sealed samples, head samples, block
+            bytes and bytes per sealed sample
+        """
+        with self._lock:
+            sealed = sum(block.count for s in self._series.values() for block in s.blocks)
+            size = sum(block.length for s in self._series.values() for block in s.blocks)
+            return {
+                "series": len(self._series),
+                "samples": sealed,
+                "head_samples": sum(len(s.head) for s in self._series.values()),
+                "block_bytes": size,
+                "bytes_per_sample": size / sealed if sealed else None,
+                **self.stats,
+            }
+    
+    def close(self):
+        """Close files and memory maps (the head stays on disk)."""
+        with self._lock:
+            for series in self._series.values():
+                if series.head_file is not None:
+                    series.head_file.close()
+                    series.head_file = None
+                if series.map is not None:
+                    series.map.close()
+                    series.map = None
+            self._series.clear()
+            self._cache.clear()
@@ -0,0 +1 @@
+# Remote Module
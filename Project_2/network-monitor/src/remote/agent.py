@@ -0,0 +1,385 @@
+"""
+Probe Agent Module
+
+Lightweight measurement mode for remote vantage points. An agent probes
+its targets with LatencyMonitor and PacketLossAnalyzer on staggered tick
+grids and ships the results to a central collector as binary batches
+over TCP. It keeps no database of its own.
+
+Measurements wait in a bounded in-memory buffer until the collector has
+acknowledged them. While the collector is unreachable the buffer absorbs
+the backlog (dropping the oldest entries once full) and the sender
+reconnects with exponential backoff. A batch is resent with the same
+sequence number until acked, so none is lost or stored twice.
+"""
+
+import random
+import socket
+import threading
+import time
+import logging
+from collections import deque
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from ..core.latency import LatencyMonitor
+from ..core.packet_loss import PacketLossAnalyzer
+from ..core.probe import Prober
+from ..core.resolver import DNSCache, ResolutionError
+from ..core.ticker import TickSchedule, stagger_phase
+from .protocol import (
+    ACK_OK, FRAME_ACK, STATUS_DNS_ERROR, STATUS_NO_REPLY, STATUS_OK,
+    Measurement, decode_ack, encode_batch, read_frame
+)
+
+
+DEFAULT_PORT = 7400
+
+
+class ProbeAgent:
+    """
+    Probes targets and streams measurements to a collector.
+    """
+    
+    def __init__(
+        self,
+        collector: Tuple[str, int],
+        targets: List[Tuple[str, str]],
+        agent_id: Optional[str] = None,
+        interval: float = 5,
+        probe_count: int = 10,
+        prober: Optional[Prober] = None,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_buffer: int = 100000,
+        timeout: float = 10.0,
+        max_backoff: float = 30.0
+    ):
+        """
+        Initialize the agent (call start() to run it).
+        
+        Args:
+            collector: (host, port) of the collector
+            targets: (host, name) pairs to probe
+            agent_id: Name of this vantage point (default: hostname)
+            interval: Seconds between probes of a target
+            probe_count: Packets per probe burst
+            prober: Prober to use (default: auto backend with DNS cache)
+            batch_size: Maximum measurements per batch
+            flush_interval: Maximum seconds a measurement waits to be sent
+            max_buffer: Measurements kept while the collector is unreachable
+            timeout: Seconds to wait for a connection or an ack
+            max_backoff: Maximum seconds between reconnection attempts
+        """
+        self.logger = logging.getLogger(__name__)
+        self.collector = collector
+        self.targets = list(targets)
+        self.agent_id = agent_id or socket.gethostname()
+        self.interval = interval
+        self.probe_count = probe_count
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+        
+        self.prober = prober or Prober(resolver=DNSCache())
+        self.latency_monitor = LatencyMonitor(prober=self.prober)
+        self.packet_loss_analyzer = PacketLossAnalyzer(prober=self.prober)
+        
+        # Measurements not yet acked: the in-flight batch plus the buffer
+        self._buffer: deque = deque()
+        self._inflight: List[Measurement] = []
+        self._condition = threading.Condition()
+        self._session = random.getrandbits(32)
+        self._sequence = 0
+        self._socket: Optional[socket.socket] = None
+        
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.stats = {
+            "measurements": 0, "batches": 0, "sent": 0,
+            "dropped": 0, "retries": 0, "connects": 0
+        }
+    
+    def start(self):
+        """Start one probe thread per target and the sender thread."""
+        self._stop.clear()
+        sender = threading.Thread(target=self._send_loop, daemon=True, name="AgentSender")
+        sender.start()
+        self._threads = [sender]
+        
+        for index, (host, name) in enumerate(self.targets):
+            thread = threading.Thread(
+                target=self._probe_loop,
+                args=(host, name, stagger_phase(index, self.interval)),
+                daemon=True,
+                name=f"Agent-{name}"
+            )
+            thread.start()
+            self._threads.append(thread)
+        
+        self.logger.info(
+            f"Agent {self.agent_id} started with {len(self.targets)} targets, "
+            f"collector {self.collector[0]}:{self.collector[1]}"
+        )
+    
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop probing and try once more to deliver buffered measurements.
+        
+        Args:
+            timeout: Maximum seconds to wait for each thread
+        """
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+        
+        if self.buffered():
+            self._deliver()
+        self._disconnect()
+        self.prober.close()
+        
+        if self.buffered():
+            self.logger.warning(f"Agent stopped with {self.buffered()} undelivered measurements")
+        self.logger.info(f"Agent {self.agent_id} stopped")
+    
+    def buffered(self) -> int:
+        """Number of measurements not yet acked by the collector."""
+        with self._condition:
+            return len(self._buffer) + len(self._inflight)
+    
+    def _probe_loop(self, host: str, name: str, phase: float):
+        """Probe one target on its tick grid until stopped."""
+        schedule = TickSchedule(self.interval, phase)
+        while not self._stop.wait(schedule.delay()):
+            schedule.tick(self.interval)
+            try:
+                self.submit(self.measure(host, name))
+            except Exception as e:
+                self.logger.error(f"Error probing {name}: {e}")
+    
+    def measure(self, host: str, name: str) -> Measurement:
+        """
+        Probe a target once.
+        
+        Args:
+            host: Target host
+            name: Target name
+        
+        Returns:
+            Measurement (with a failure status if nothing was measured)
+        """
+        now = datetime.now()
+        try:
+            result = self.latency_monitor.probe(host, count=self.probe_count)
+        except ResolutionError as e:
+            self.logger.warning(f"{name}: {e}")
+            return Measurement(name, host, now, status=STATUS_DNS_ERROR)
+        
+        stats = self.latency_monitor.summarize(result) if result is not None else None
+        if stats is None:
+            sent = result.sent if result is not None else self.probe_count
+            return Measurement(
+                name, host, now, status=STATUS_NO_REPLY,
+                packet_loss_pct=100.0, sent=sent
+            )
+        
+        loss = self.packet_loss_analyzer.from_probe(result)
+        jitter = result.jitter_ms
+        return Measurement(
+            target=name,
+            host=host,
+            timestamp=result.timestamp,
+            status=STATUS_OK,
+            latency_ms=stats.avg_ms,
+            packet_loss_pct=loss.loss_percentage,
+            jitter_ms=jitter if jitter is not None else 0.0,
+            dns_ms=result.dns_ms,
+            sent=loss.sent,
+            received=loss.received
+        )
+    
+    def submit(self, measurement: Measurement):
+        """
+        Queue a measurement for the collector.
+        
+        Args:
+            measurement: Measurement to send
+        """
+        with self._condition:
+            if len(self._buffer) + len(self._inflight) >= self.max_buffer:
+                self._buffer.popleft()
+                self.stats["dropped"] += 1
+            self._buffer.append(measurement)
+            self.stats["measurements"] += 1
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify_all()
+    
+    def _send_loop(self):
+        """Sender thread: deliver batches, backing off while disconnected."""
+        backoff = 0.5
+        while not self._stop.is_set():
+            with self._condition:
+                if not self._inflight and len(self._buffer) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+            if self._stop.is_set():
+                break
+            
+            if self._deliver():
+                backoff = 0.5
+            else:
+                self._stop.wait(backoff * random.uniform(0.5, 1.0))
+                backoff = min(backoff * 2, self.max_backoff)
+    
+    def _deliver(self) -> bool:
+        """
+        Send everything buffered, one batch at a time.
+        
+        Returns:
+            True unless a batch could not be delivered
+        """
+        while True:
+            with self._condition:
+                if not self._inflight:
+                    if not self._buffer:
+                        return True
+                    count = min(self.batch_size, len(self._buffer))
+                    self._inflight = [self._buffer.popleft() for _ in range(count)]
+                    self._sequence += 1
+                batch, sequence = list(self._inflight), self._sequence
+            
+            if not self._send_batch(sequence, batch):
+                return False
+            
+            with self._condition:
+                self._inflight = []
+                self.stats["batches"] += 1
+                self.stats["sent"] += len(batch)
+    
+    def _send_batch(self, sequence: int, batch: List[Measurement]) -> bool:
+        """
+        Send one batch and wait for its ack.
+        
+        Args:
+            sequence: Batch sequence number
+            batch: Measurements of the batch
+        
+        Returns:
+            True if the collector acknowledged the batch
+        """
+        try:
+            if self._socket is None:
+                self._socket = socket.create_connection(self.collector, timeout=self.timeout)
+                self.stats["connects"] += 1
+                self.logger.info(f"Connected to collector {self.collector[0]}:{self.collector[1]}")
+            
+            self._socket.sendall(encode_batch(self.agent_id, self._session, sequence, batch))
+            frame_type, payload = read_frame(self._socket)
+            if frame_type != FRAME_ACK:
+                raise ConnectionError(f"Unexpected frame type {frame_type}")
+            acked, status = decode_ack(payload)
+            if acked != sequence:
+                raise ConnectionError(f"Ack for batch {acked}, expected {sequence}")
+            if status == ACK_OK:
+                return True
+            self.logger.warning(f"Collector asked to retry batch {sequence}")
+        except (OSError, ValueError) as e:
+            self.logger.warning(
+                f"Delivery to collector failed ({e}); {self.buffered()} measurements buffered"
+            )
+            self._disconnect()
+        
+        self.stats["retries"] += 1
+        return False
+    
+    def _disconnect(self):
+        """Close the collector connection."""
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+
+
+def parse_address(value: str, default_port: int = DEFAULT_PORT) -> Tuple[str, int]:
+    """
+    Parse a "host[:port]" string.
+    
+    Args:
+        value: Address string
+        default_port: Port used when none is given
+    
+    Returns:
+        (host, port)
+    """
+    host, _, port = value.rpartition(":")
+    if not host:
+        return value, default_port
+    return host, int(port)
+
+
+def main():
+    """Run a probe agent from the command line."""
+    import argparse
+    from ..utils.config import ConfigManager
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    parser = argparse.ArgumentParser(description='Network Monitor Probe Agent')
+    parser.add_argument('--config', default='config/config.yaml', help='Configuration file path')
+    parser.add_argument('--collector', help='Collector address host[:port] (overrides config)')
+    parser.add_argument('--agent-id', help='Name of this vantage point (default: hostname)')
+    parser.add_argument('--host', action='append', help='Host to probe (repeatable, overrides config)')
+    args = parser.parse_args()
+    
+    config = ConfigManager(args.config)
+    if args.host:
+        targets = [(host, host) for host in args.host]
+    else:
+        targets = [
+            (entry["host"], entry.get("name", entry["host"]))
+            for entry in config.get("monitoring.targets", [])
+        ]
+    collector = args.collector or (
+        f"{config.get('remote.collector_host', 'localhost')}:"
+        f"{config.get('remote.collector_port', DEFAULT_PORT)}"
+    )
+    
+    agent = ProbeAgent(
+        parse_address(collector),
+        targets,
+        agent_id=args.agent_id or config.get("remote.agent_id"),
+        interval=config.get("monitoring.interval", 5),
+        probe_count=config.get("monitoring.probe_count", 10),
+        prober=Prober(
+            backend=config.get("monitoring.probe_backend", "auto"),
+            interval=config.get("monitoring.probe_interval", 0.2),
+            cache_ttl=config.get("monitoring.probe_cache_ttl", 1.0),
+            resolver=DNSCache(
+                ttl=config.get("monitoring.dns_ttl", 300),
+                negative_ttl=config.get("monitoring.dns_negative_ttl", 30)
+            )
+        ),
+        batch_size=config.get("remote.batch_size", 500),
+        flush_interval=config.get("remote.flush_interval", 1.0),
+        max_buffer=config.get("remote.max_buffer", 100000)
+    )
+    agent.start()
+    
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        agent.stop()
+
+
+if __name__ == "__main__":
+    main()
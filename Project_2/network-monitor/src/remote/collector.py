@@ -0,0 +1,310 @@
+"""
+Collector Module
+
+Central ingestion point for probe agents. Each agent connection is served
+by its own thread. Every batch received is turned into metric rows and
+inserted in one transaction, and is only acknowledged once that
+transaction committed: an agent drops acknowledged batches from its
+buffer, so they must not be lost if the collector stops afterwards.
+Thresholds are then checked and alerts raised as for local targets.
+Probes nobody answered are stored as packet loss only, so an outage
+seen from a vantage point still alerts.
+
+Metrics of remote targets are stored under "<agent>/<target>" so the same
+target seen from different vantage points stays distinguishable.
+"""
+
+import socket
+import socketserver
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from ..core.monitor import NetworkMetrics
+from ..database.models import Metric
+from .agent import DEFAULT_PORT
+from .protocol import (
+    ACK_OK, ACK_RETRY, FRAME_BATCH, STATUS_DNS_ERROR, STATUS_NO_REPLY, STATUS_OK,
+    Batch, ProtocolError, decode_batch, encode_ack, read_frame
+)
+
+
+class _AgentHandler(socketserver.BaseRequestHandler):
+    """Serves the batches of one agent connection."""
+    
+    def handle(self):
+        collector = self.server.collector
+        peer = f"{self.client_address[0]}:{self.client_address[1]}"
+        collector._register(self.request)
+        collector.logger.info(f"Agent connected from {peer}")
+        
+        try:
+            while True:
+                frame_type, payload = read_frame(self.request)
+                if frame_type != FRAME_BATCH:
+                    raise ProtocolError(f"Unexpected frame type {frame_type}")
+                batch = decode_batch(payload)
+                status = ACK_OK if collector.ingest(batch) else ACK_RETRY
+                self.request.sendall(encode_ack(batch.sequence, status))
+        except ConnectionError:
+            pass
+        except ProtocolError as e:
+            collector.logger.warning(f"Dropping connection from {peer}: {e}")
+        except OSError as e:
+            collector.logger.debug(f"Connection from {peer} failed: {e}")
+        finally:
+            collector._unregister(self.request)
+            collector.logger.info(f"Agent disconnected from {peer}")
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    """TCP server bound to a collector."""
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class Collector:
+    """
+    Receives measurement batches from probe agents and stores them.
+    """
+    
+    def __init__(
+        self,
+        db_manager,
+        host: str = "0.0.0.0",
+        port: int = DEFAULT_PORT,
+        rules=None,
+        alert_manager=None
+    ):
+        """
+        Initialize the collector (call start() to listen).
+        
+        Args:
+            db_manager: DatabaseManager receiving the metrics
+            host: Address to listen on
+            port: TCP port to listen on (0 picks a free port)
+            rules: RuleEngine checking thresholds (optional)
+            alert_manager: AlertManager raising alerts (required with rules)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db_manager = db_manager
+        self.host = host
+        self.port = port
+        self.rules = rules
+        self.alert_manager = alert_manager
+        
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self._connections: List[socket.socket] = []
+        self._lock = threading.Lock()
+        # Last sequence stored per agent: agent -> (session, sequence)
+        self._sequences: Dict[str, Tuple[int, int]] = {}
+        self.stats = {"batches": 0, "measurements": 0, "duplicates": 0, "failed": 0}
+    
+    @property
+    def address(self) -> Tuple[str, int]:
+        """(host, port) the collector listens on."""
+        if self._server is None:
+            return self.host, self.port
+        return self._server.server_address[:2]
+    
+    def start(self):
+        """Start listening in a background thread."""
+        if self._server is not None:
+            return
+        self._server = _Server((self.host, self.port), _AgentHandler)
+        self._server.collector = self
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True, name="Collector"
+        )
+        self._thread.start()
+        host, port = self.address
+        self.logger.info(f"Collector listening on {host}:{port}")
+    
+    def stop(self):
+        """Stop listening and close agent connections."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        with self._lock:
+            for conn in self._connections:
+                try:
+                    conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        self._thread.join(timeout=5)
+        self._server = None
+        self._thread = None
+        self.logger.info("Collector stopped")
+    
+    def _register(self, conn: socket.socket):
+        """Track an agent connection so stop() can close it."""
+        with self._lock:
+            self._connections.append(conn)
+    
+    def _unregister(self, conn: socket.socket):
+        """Forget a closed agent connection."""
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+    
+    def ingest(self, batch: Batch) -> bool:
+        """
+        Store a batch and check its measurements against thresholds.
+        
+        Batches resent by an agent after a lost ack are recognized by
+        their sequence number and acknowledged without storing them again.
+        
+        Args:
+            batch: Decoded batch
+        
+        Returns:
+            True if the batch is committed (the agent may discard it)
+        """
+        with self._lock:
+            last = self._sequences.get(batch.agent)
+            if last is not None and last[0] == batch.session and batch.sequence <= last[1]:
+                self.stats["duplicates"] += 1
+                return True
+        
+        rows = []
+        samples = []
+        for m in batch.measurements:
+            target = f"{batch.agent}/{m.target}"
+            if m.status == STATUS_DNS_ERROR:
+                self._report_resolution_failure(target, m.host)
+                continue
+            if m.status == STATUS_NO_REPLY:
+                # Nothing replied: only packet loss was measured
+                self.logger.warning(f"{target}: no reply to {m.sent} packets")
+                sample = NetworkMetrics(
+                    timestamp=m.timestamp,
+                    target=target,
+                    latency_ms=None,
+                    packet_loss_pct=100.0 if m.packet_loss_pct is None else m.packet_loss_pct,
+                    jitter_ms=None,
+                    dns_ms=m.dns_ms
+                )
+            elif m.status == STATUS_OK:
+                sample = NetworkMetrics(
+                    timestamp=m.timestamp,
+                    target=target,
+                    latency_ms=m.latency_ms,
+                    packet_loss_pct=m.packet_loss_pct,
+                    jitter_ms=m.jitter_ms,
+                    dns_ms=m.dns_ms
+                )
+            else:
+                self.logger.warning(f"Failed to measure {target}")
+                continue
+            
+            rows.extend(
+                metric for metric in (
+                    Metric(m.timestamp, target, "latency", sample.latency_ms, "ms"),
+                    Metric(m.timestamp, target, "packet_loss", sample.packet_loss_pct, "percent"),
+                    Metric(m.timestamp, target, "jitter", sample.jitter_ms, "ms"),
+                    Metric(m.timestamp, target, "dns_time", sample.dns_ms, "ms"),
+                )
+                if metric.value is not None
+            )
+            samples.append(sample)
+        
+        try:
+            # Synchronous: the buffered writer would ack rows not yet on disk
+            stored = self.db_manager.insert_metrics(rows) == len(rows)
+        except Exception as e:
+            self.logger.error(f"Failed to store batch {batch.sequence} of {batch.agent}: {e}")
+            stored = False
+        if not stored:
+            with self._lock:
+                self.stats["failed"] += 1
+            return False
+        
+        with self._lock:
+            self._sequences[batch.agent] = (batch.session, batch.sequence)
+            self.stats["batches"] += 1
+            self.stats["measurements"] += len(batch.measurements)
+        
+        if self.rules is not None:
+            for sample in samples:
+                self._check_thresholds(sample)
+        return True
+    
+    def _check_thresholds(self, metrics: NetworkMetrics):
+        """Raise alerts for threshold rules a sample breaches."""
+        for event in self.rules.evaluate(metrics):
+            self.alert_manager.trigger_alert(
+                severity=event.severity,
+                message=event.message,
+                target=metrics.target,
+                metric=event.metric
+            )
+    
+    def _report_resolution_failure(self, target: str, host: str):
+        """Raise a DNS alert for a remote target."""
+        self.logger.warning(f"{target}: DNS resolution failed for {host}")
+        if self.alert_manager is not None:
+            self.alert_manager.trigger_alert(
+                severity="WARNING",
+                message=f"{target}: DNS resolution failed for {host}",
+                target=target,
+                metric="dns"
+            )
+
+
+def main():
+    """Run a collector from the command line."""
+    import argparse
+    import time
+    from ..alerts.alert_manager import AlertManager
+    from ..alerts.rules import RuleEngine
+    from ..database.db_manager import DatabaseManager
+    from ..utils.config import ConfigManager
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    parser = argparse.ArgumentParser(description='Network Monitor Collector')
+    parser.add_argument('--config', default='config/config.yaml', help='Configuration file path')
+    parser.add_argument('--port', type=int, help='TCP port to listen on (overrides config)')
+    args = parser.parse_args()
+    
+    config = ConfigManager(args.config)
+    db_manager = DatabaseManager(
+        config.get("database.path"),
+        max_readers=config.get("database.max_readers", 4),
+        pragmas=config.get("database.pragmas"),
+        layout=config.get("database.layout", "narrow"),
+        archive_dir=config.get("database.archive_dir"),
+        archive_format=config.get("database.archive_format", "parquet"),
+        stats_cache_ttl=config.get("database.stats_cache_ttl", 5.0),
+        engine=config.get("database.engine", "sqlite"),
+        tsdb_dir=config.get("database.tsdb_dir"),
+        tsdb_block_size=config.get("database.tsdb_block_size", 1024),
+        tsdb_precision=config.get("database.tsdb_precision", 3)
+    )
+    alert_manager = AlertManager(config, db_manager=db_manager)
+    
+    collector = Collector(
+        db_manager,
+        host=config.get("remote.listen_host", "0.0.0.0"),
+        port=args.port or config.get("remote.collector_port", DEFAULT_PORT),
+        rules=RuleEngine.from_config(config),
+        alert_manager=alert_manager
+    )
+    collector.start()
+    
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        collector.stop()
+        alert_manager.flush(timeout=10)
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Agent Wire Protocol Module
+
+Binary framing used between probe agents and the collector. Every frame
+starts with a fixed header (magic, version, frame type, flags, payload
+length) followed by the payload, which is zlib-compressed when that makes
+it smaller.
+
+A batch payload carries the agent id, a session id and a sequence number
+(used by the collector to discard batches it already stored), a string
+table of target names and hosts, and one fixed-size record per
+measurement. Millisecond values travel as float32 with NaN meaning
+"not measured". The collector answers each batch with an ack frame.
+"""
+
+import math
+import struct
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+MAGIC = b"NM"
+VERSION = 1
+
+# Frame types
+FRAME_BATCH = 1
+FRAME_ACK = 2
+
+# Header flags
+FLAG_COMPRESSED = 0x01
+
+# Measurement status
+STATUS_OK = 0
+STATUS_NO_REPLY = 1
+STATUS_DNS_ERROR = 2
+
+# Ack status
+ACK_OK = 0
+ACK_RETRY = 1
+
+HEADER = struct.Struct("!2sBBBI")     # magic, version, type, flags, payload length
+BATCH_HEADER = struct.Struct("!IQ")   # session, sequence
+RECORD = struct.Struct("!HHdBffffHH")  # target, host, timestamp, status, latency, loss, jitter, dns, sent, received
+ACK = struct.Struct("!QB")            # sequence, status
+LENGTH = struct.Struct("!H")
+COUNT = struct.Struct("!I")
+
+MAX_PAYLOAD = 16 * 1024 * 1024
+COMPRESS_MIN_BYTES = 512
+
+
+class ProtocolError(ValueError):
+    """Raised when a peer sends a malformed frame."""
+
+
+@dataclass
+class Measurement:
+    """
+    One probe cycle of an agent.
+    
+    Attributes:
+        target: Target name on the agent
+        host: Target host
+        timestamp: Measurement time
+        status: STATUS_OK, STATUS_NO_REPLY or STATUS_DNS_ERROR
+        latency_ms: Average round-trip time
+        packet_loss_pct: Packet loss percentage
+        jitter_ms: Inter-packet delay variation
+        dns_ms: DNS lookup time, when a lookup was made
+        sent: Packets sent
+        received: Packets received
+    """
+    target: str
+    host: str
+    timestamp: datetime
+    status: int = STATUS_OK
+    latency_ms: Optional[float] = None
+    packet_loss_pct: Optional[float] = None
+    jitter_ms: Optional[float] = None
+    dns_ms: Optional[float] = None
+    sent: int = 0
+    received: int = 0
+
+
+@dataclass
+class Batch:
+    """Decoded batch frame."""
+    agent: str
+    session: int
+    sequence: int
+    measurements: List[Measurement]
+
+
+def encode_frame(frame_type: int, payload: bytes) -> bytes:
+    """
+    Build a frame, compressing the payload when worthwhile.
+    
+    Args:
+        frame_type: FRAME_BATCH or FRAME_ACK
+        payload: Frame payload
+    
+    Returns:
+        Header and payload bytes
+    """
+    flags = 0
+    if len(payload) >= COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(payload, 6)
+        if len(compressed) < len(payload):
+            payload = compressed
+            flags |= FLAG_COMPRESSED
+    return HEADER.pack(MAGIC, VERSION, frame_type, flags, len(payload)) + payload
+
+
+def read_frame(sock) -> Tuple[int, bytes]:
+    """
+    Read one frame from a socket.
+    
+    Args:
+        sock: Connected socket
+    
+    Returns:
+        (frame type, decompressed payload)
+    
+    Raises:
+        ConnectionError: If the peer closed the connection
+        ProtocolError: If the frame is malformed
+    """
+    magic, version, frame_type, flags, length = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    if magic != MAGIC:
+        raise ProtocolError(f"Bad frame magic: {magic!r}")
+    if version != VERSION:
+        raise ProtocolError(f"Unsupported protocol version: {version}")
+    if length > MAX_PAYLOAD:
+        raise ProtocolError(f"Frame too large: {length} bytes")
+    
+    payload = _recv_exact(sock, length)
+    if flags & FLAG_COMPRESSED:
+        # Bound the output too, a small frame can expand enormously
+        decompressor = zlib.decompressobj()
+        try:
+            payload = decompressor.decompress(payload, MAX_PAYLOAD)
+        except zlib.error as e:
+            raise ProtocolError(f"Corrupt compressed payload: {e}")
+        if decompressor.unconsumed_tail or not decompressor.eof:
+            raise ProtocolError(f"Compressed payload truncated or over {MAX_PAYLOAD} bytes")
+    return frame_type, payload
+
+
+def _recv_exact(sock, size: int) -> bytes:
+    """Receive exactly size bytes."""
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError("Connection closed by peer")
+        buffer += chunk
+    return bytes(buffer)
+
+
+def encode_batch(agent: str, session: int, sequence: int, measurements: List[Measurement]) -> bytes:
+    """
+    Build a batch frame.
+    
+    Args:
+        agent: Agent identifier
+        session: Random id of the agent process
+        sequence: Batch number within the session
+        measurements: Measurements to send
+    
+    Returns:
+        Frame bytes
+    """
+    strings: Dict[str, int] = {}
+    records = []
+    for m in measurements:
+        target = strings.setdefault(m.target, len(strings))
+        host = strings.setdefault(m.host, len(strings))
+        records.append(RECORD.pack(
+            target,
+            host,
+            m.timestamp.timestamp(),
+            m.status,
+            _float(m.latency_ms),
+            _float(m.packet_loss_pct),
+            _float(m.jitter_ms),
+            _float(m.dns_ms),
+            min(m.sent, 0xFFFF),
+            min(m.received, 0xFFFF)
+        ))
+    
+    parts = [_string(agent), BATCH_HEADER.pack(session, sequence), LENGTH.pack(len(strings))]
+    parts.extend(_string(value) for value in strings)
+    parts.append(COUNT.pack(len(records)))
+    parts.extend(records)
+    return encode_frame(FRAME_BATCH, b"".join(parts))
+
+
+def decode_batch(payload: bytes) -> Batch:
+    """
+    Parse a batch payload.
+    
+    Args:
+        payload: Payload of a FRAME_BATCH frame
+    
+    Returns:
+        Decoded Batch
+    
+    Raises:
+        ProtocolError: If the payload is malformed
+    """
+    try:
+        agent, offset = _read_string(payload, 0)
+        session, sequence = BATCH_HEADER.unpack_from(payload, offset)
+        offset += BATCH_HEADER.size
+        
+        (string_count,) = LENGTH.unpack_from(payload, offset)
+        offset += LENGTH.size
+        strings = []
+        for _ in range(string_count):
+            value, offset = _read_string(payload, offset)
+            strings.append(value)
+        
+        (count,) = COUNT.unpack_from(payload, offset)
+        offset += COUNT.size
+        if offset + count * RECORD.size != len(payload):
+            raise ProtocolError("Batch length does not match its record count")
+        
+        measurements = []
+        for fields in RECORD.iter_unpack(payload[offset:]):
+            target, host, timestamp, status, latency, loss, jitter, dns, sent, received = fields
+            measurements.append(Measurement(
+                target=strings[target],
+                host=strings[host],
+                timestamp=datetime.fromtimestamp(timestamp),
+                status=status,
+                latency_ms=_optional(latency),
+                packet_loss_pct=_optional(loss),
+                jitter_ms=_optional(jitter),
+                dns_ms=_optional(dns),
+                sent=sent,
+                received=received
+            ))
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ProtocolError(f"Malformed batch: {e}")
+    
+    return Batch(agent, session, sequence, measurements)
+
+
+def encode_ack(sequence: int, status: int = ACK_OK) -> bytes:
+    """Build the ack frame of a batch."""
+    return encode_frame(FRAME_ACK, ACK.pack(sequence, status))
+
+
+def decode_ack(payload: bytes) -> Tuple[int, int]:
+    """
+    Parse an ack payload.
+    
+    Returns:
+        (sequence, status)
+    """
+    try:
+        return ACK.unpack(payload)
+    except struct.error as e:
+        raise ProtocolError(f"Malformed ack: {e}")
+
+
+def _string(value: str) -> bytes:
+    """Length-prefixed UTF-8 string."""
+    data = value.encode()
+    if len(data) > 0xFFFF:
+        raise ValueError(f"String too long for the wire format: {value[:32]}...")
+    return LENGTH.pack(len(data)) + data
+
+
+def _read_string(payload: bytes, offset: int) -> Tuple[str, int]:
+    """Read a length-prefixed string, returning it and the next offset."""
+    (length,) = LENGTH.unpack_from(payload, offset)
+    offset += LENGTH.size
+    data = payload[offset:offset + length]
+    if len(data) != length:
+        raise ProtocolError("Truncated string")
+    return data.decode(), offset + length
+
+
+def _float(value: Optional[float]) -> float:
+    """Encode an optional value (None travels as NaN)."""
+    return math.nan if value is None else value
+
+
+def _optional(value: float) -> Optional[float]:
+    """Decode an optional value."""
+    return None if math.isnan(value) else value
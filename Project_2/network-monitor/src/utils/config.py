@@ -2,12 +2,47 @@
 Configuration Management Module
 
 Handles loading and validation of YAML configuration files.
+
+Each load produces an immutable snapshot holding the parsed data and a
+flattened {dotted path: value} index, swapped in atomically. The file
+can be watched for changes (mtime polling); on reload, registered
+callbacks receive the old and new configuration.
 """
 
+import os
 import yaml
+import threading
 import logging
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+_MISSING = object()
+
+
+def flatten(data: Any, prefix: str = "", flat: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Index every node of a nested configuration by its dotted path.
+    
+    Sections are indexed as well as leaves, so "database" and
+    "database.path" both resolve.
+    
+    Args:
+        data: Parsed configuration
+        prefix: Dotted path of data
+        flat: Index to extend
+        
+    Returns:
+        Dictionary of dotted path -> value
+    """
+    if flat is None:
+        flat = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            path = f"{prefix}.{key}" if prefix else str(key)
+            flat[path] = value
+            flatten(value, path, flat)
+    return flat
 
 
 class ConfigManager:
@@ -27,10 +62,33 @@ class ConfigManager:
         """
         self.logger = logging.getLogger(__name__)
         self.config_path = config_path
-        self.config_data = {}
+        self._snapshot: Tuple[Dict, Dict[str, Any]] = ({}, {})
+        self._file_stamp: Optional[Tuple[int, int]] = None
+        self._callbacks: List[Callable[[Dict, Dict], None]] = []
+        self._reload_lock = threading.Lock()
+        self._watch_stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
         
         self._load_config()
     
+    @property
+    def config_data(self) -> Dict:
+        """Current parsed configuration."""
+        return self._snapshot[0]
+    
+    @config_data.setter
+    def config_data(self, data: Dict):
+        # Build the index first so readers never see a partial snapshot
+        self._snapshot = (data, flatten(data))
+    
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        """Modification time and size of the config file, or None."""
+        try:
+            stat = os.stat(self.config_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
     def _load_config(self):
         """Load configuration from YAML file."""
         try:
@@ -41,6 +99,7 @@ class ConfigManager:
                 self._create_default_config()
                 return
             
+            self._file_stamp = self._stat()
             with open(config_file, 'r') as f:
                 self.config_data = yaml.safe_load(f) or {}
             
@@ -80,6 +139,7 @@ class ConfigManager:
                 yaml.dump(default_config, f, default_flow_style=False)
             
             self.config_data = default_config
+            self._file_stamp = self._stat()
             self.logger.info(f"Created default configuration: {self.config_path}")
             
         except PermissionError:
@@ -100,12 +160,84 @@ class ConfigManager:
         Returns:
             Configuration value or default
         """
-        keys = key_path.split('.')
-        value = self.config_data
+        value = self._snapshot[1].get(key_path, _MISSING)
+        return default if value is _MISSING else value
+    
+    def on_change(self, callback: Callable[[Dict, Dict], None]):
+        """
+        Register a callback invoked after the configuration is reloaded.
         
-        try:
-            for key in keys:
-                value = value[key]
-            return value
-        except (KeyError, TypeError):
-            return default
+        Args:
+            callback: Called with (old configuration, new configuration)
+        """
+        self._callbacks.append(callback)
+    
+    def reload(self, force: bool = False) -> bool:
+        """
+        Re-read the configuration file if it changed.
+        
+        An unreadable or invalid file keeps the current configuration.
+        
+        Args:
+            force: Re-read even if the file's mtime and size are unchanged
+            
+        Returns:
+            True if a different configuration was installed
+        """
+        with self._reload_lock:
+            stamp = self._stat()
+            if stamp is None or (stamp == self._file_stamp and not force):
+                return False
+            
+            try:
+                with open(self.config_path, 'r') as f:
+                    data = yaml.safe_load(f) or {}
+                if not isinstance(data, dict):
+                    raise ValueError("top level must be a mapping")
+            except Exception as e:
+                self.logger.error(f"Ignoring invalid configuration update: {e}")
+                self._file_stamp = stamp
+                return False
+            
+            self._file_stamp = stamp
+            old = self.config_data
+            if data == old:
+                return False
+            
+            self.config_data = data
+            self.logger.info(f"Configuration reloaded from {self.config_path}")
+        
+        for callback in list(self._callbacks):
+            try:
+                callback(old, data)
+            except Exception as e:
+                self.logger.error(f"Configuration change callback failed: {e}")
+        return True
+    
+    def start_watching(self, interval: float = 2.0):
+        """
+        Poll the configuration file for changes in a background thread.
+        
+        Args:
+            interval: Seconds between checks
+        """
+        if self._watcher is not None:
+            return
+        
+        self._watch_stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), daemon=True, name="ConfigWatcher"
+        )
+        self._watcher.start()
+    
+    def stop_watching(self):
+        """Stop the watcher thread."""
+        self._watch_stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+    
+    def _watch(self, interval: float):
+        """Watcher loop."""
+        while not self._watch_stop.wait(interval):
+            self.reload()
@@ -0,0 +1,157 @@
+"""
+Rolling Statistics Module
+
+Incremental statistics over a sliding window of values. Each structure
+supports adding the newest value and removing the value leaving the
+window, so a window of size n is maintained in O(log n) per sample
+instead of being recomputed from scratch.
+"""
+
+import heapq
+import math
+from collections import Counter
+from typing import List, Optional
+
+
+class RollingMoments:
+    """
+    Running mean and variance over a sliding window (Welford's method).
+    """
+    
+    def __init__(self):
+        """Initialize empty moments."""
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+    
+    def add(self, value: float):
+        """Add a value to the window."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+    
+    def remove(self, value: float):
+        """Remove a value previously added to the window."""
+        if self.count <= 1:
+            self.count = 0
+            self.mean = 0.0
+            self._m2 = 0.0
+            return
+        
+        self.count -= 1
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self._m2 = max(self._m2 - delta * (value - self.mean), 0.0)
+    
+    @property
+    def variance(self) -> Optional[float]:
+        """Sample variance, or None with fewer than two values."""
+        if self.count < 2:
+            return None
+        return self._m2 / (self.count - 1)
+    
+    @property
+    def stddev(self) -> Optional[float]:
+        """Sample standard deviation, or None with fewer than two values."""
+        variance = self.variance
+        return math.sqrt(variance) if variance is not None else None
+
+
+class RollingMedian:
+    """
+    Median over a sliding window using two heaps with lazy deletion.
+    
+    The lower half of the window is kept in a max-heap and the upper half
+    in a min-heap. Removed values are only marked and discarded once they
+    reach the top of a heap; the heaps are compacted if stale entries
+    accumulate.
+    """
+    
+    def __init__(self):
+        """Initialize an empty window."""
+        self._low: List[float] = []      # Max-heap (negated values)
+        self._high: List[float] = []     # Min-heap
+        self._low_size = 0
+        self._high_size = 0
+        self._delayed: Counter = Counter()
+    
+    def __len__(self) -> int:
+        return self._low_size + self._high_size
+    
+    def add(self, value: float):
+        """Add a value to the window."""
+        if not self._low or value <= -self._low[0]:
+            heapq.heappush(self._low, -value)
+            self._low_size += 1
+        else:
+            heapq.heappush(self._high, value)
+            self._high_size += 1
+        self._rebalance()
+    
+    def remove(self, value: float):
+        """Remove a value previously added to the window."""
+        self._delayed[value] += 1
+        if self._low and value <= -self._low[0]:
+            self._low_size -= 1
+            if value == -self._low[0]:
+                self._prune(self._low, -1)
+        else:
+            self._high_size -= 1
+            if self._high and value == self._high[0]:
+                self._prune(self._high, 1)
+        self._rebalance()
+        
+        if len(self._low) + len(self._high) > 2 * len(self) + 64:
+            self._compact()
+    
+    def median(self) -> Optional[float]:
+        """Median of the window, or None if empty."""
+        if not len(self):
+            return None
+        if self._low_size > self._high_size:
+            return -self._low[0]
+        return (-self._low[0] + self._high[0]) / 2
+    
+    def _prune(self, heap: List[float], sign: int):
+        """Pop marked-as-removed values from the top of a heap."""
+        while heap:
+            value = sign * heap[0]
+            if not self._delayed[value]:
+                break
+            self._delayed[value] -= 1
+            if not self._delayed[value]:
+                del self._delayed[value]
+            heapq.heappop(heap)
+    
+    def _rebalance(self):
+        """Keep the lower half equal to or one larger than the upper half."""
+        if self._low_size > self._high_size + 1:
+            heapq.heappush(self._high, -heapq.heappop(self._low))
+            self._low_size -= 1
+            self._high_size += 1
+            self._prune(self._low, -1)
+        elif self._low_size < self._high_size:
+            heapq.heappush(self._low, -heapq.heappop(self._high))
+            self._low_size += 1
+            self._high_size -= 1
+            self._prune(self._high, 1)
+    
+    def _compact(self):
+        """Rebuild both heaps without stale entries."""
+        values = []
+        for value in [-v for v in self._low] + self._high:
+            if self._delayed[value]:
+                self._delayed[value] -= 1
+            else:
+                values.append(value)
+        values.sort()
+        
+        split = (len(values) + 1) // 2
+        self._low = [-v for v in values[:split]]
+        self._high = values[split:]
+        heapq.heapify(self._low)
+        heapq.heapify(self._high)
+        self._low_size = len(self._low)
+        self._high_size = len(self._high)
+        self._delayed.clear()
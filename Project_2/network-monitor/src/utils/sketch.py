@@ -0,0 +1,278 @@
+"""
+Quantile Sketch Module
+
+Implements DDSketch, a mergeable quantile sketch with relative-error
+guarantees. Values are counted in logarithmically sized bins, so any
+quantile is answered within +/- relative_accuracy of the true value
+using memory proportional to the logarithm of the value range.
+
+Sketches of rollup buckets can be merged to answer p50/p95/p99 over
+any window without reading raw samples.
+
+Reference: Masson, Rim, Lee (2019) - DDSketch: A Fast and Fully-Mergeable
+Quantile Sketch with Relative-Error Guarantees
+"""
+
+import math
+from typing import Dict, Iterable, Optional, Tuple
+
+
+SKETCH_FORMAT_VERSION = 1
+
+
+def _write_varint(out: bytearray, value: int):
+    """Append an unsigned LEB128 varint."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Read an unsigned LEB128 varint; returns (value, new position)."""
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _unzigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+class DDSketch:
+    """
+    Mergeable quantile sketch for non-negative values.
+    
+    Values at or below min_value are counted as zero. When the number of
+    bins exceeds max_bins the lowest bins are collapsed, which keeps the
+    accuracy guarantee for the upper quantiles that matter for latency.
+    """
+    
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        max_bins: int = 2048,
+        min_value: float = 1e-9
+    ):
+        """
+        Initialize an empty sketch.
+        
+        Args:
+            relative_accuracy: Maximum relative error of quantiles
+            max_bins: Maximum number of bins kept
+            min_value: Values at or below this are counted as zero
+        """
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+    
+    def _index(self, value: float) -> int:
+        """Bin index holding a value."""
+        return math.ceil(math.log(value) / self._log_gamma)
+    
+    def _value(self, index: int) -> float:
+        """Representative value of a bin (relative error <= accuracy)."""
+        return 2 * self.gamma ** index / (self.gamma + 1)
+    
+    def add(self, value: float, count: int = 1):
+        """
+        Add a value to the sketch.
+        
+        Args:
+            value: Value to add (negative values are counted as zero)
+            count: Number of occurrences
+        """
+        self.count += count
+        if value <= self.min_value:
+            self.zero_count += count
+            return
+        
+        index = self._index(value)
+        self.bins[index] = self.bins.get(index, 0) + count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+    
+    def update(self, values: Iterable[float]):
+        """Add many values."""
+        for value in values:
+            self.add(value)
+    
+    def _collapse(self):
+        """Merge the lowest bins until the bin limit is respected."""
+        indexes = sorted(self.bins)
+        excess = len(indexes) - self.max_bins
+        target = indexes[excess]
+        for index in indexes[:excess]:
+            self.bins[target] += self.bins.pop(index)
+    
+    def merge(self, other: "DDSketch"):
+        """
+        Merge another sketch into this one.
+        
+        Args:
+            other: Sketch created with the same relative accuracy
+        
+        Raises:
+            ValueError: If the sketches use different accuracies
+        """
+        if not math.isclose(self.gamma, other.gamma):
+            raise ValueError("Cannot merge sketches with different accuracy")
+        
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile.
+        
+        Args:
+            q: Quantile in [0, 1]
+        
+        Returns:
+            Estimated value, or None if the sketch is empty
+        """
+        if self.count == 0:
+            return None
+        
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                return self._value(index)
+        
+        return self._value(max(self.bins))
+    
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the sketch compactly.
+        
+        Layout: version, accuracy (parts per million), zero count, bin
+        count, then (index delta, count) pairs, all as varints.
+        """
+        out = bytearray([SKETCH_FORMAT_VERSION])
+        _write_varint(out, round(self.relative_accuracy * 1_000_000))
+        _write_varint(out, self.zero_count)
+        _write_varint(out, len(self.bins))
+        
+        previous = 0
+        for index in sorted(self.bins):
+            _write_varint(out, _zigzag(index - previous))
+            _write_varint(out, self.bins[index])
+            previous = index
+        
+        return bytes(out)
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DDSketch":
+        """
+        Deserialize a sketch produced by to_bytes().
+        
+        Args:
+            data: Serialized sketch
+        
+        Returns:
+            DDSketch instance
+        
+        Raises:
+            ValueError: If the format version is not supported
+        """
+        if not data or data[0] != SKETCH_FORMAT_VERSION:
+            raise ValueError("Unsupported sketch format")
+        
+        accuracy_ppm, pos = _read_varint(data, 1)
+        sketch = cls(relative_accuracy=accuracy_ppm / 1_000_000)
+        sketch.zero_count, pos = _read_varint(data, pos)
+        sketch.count = sketch.zero_count
+        num_bins, pos = _read_varint(data, pos)
+        
+        index = 0
+        for _ in range(num_bins):
+            delta, pos = _read_varint(data, pos)
+            count, pos = _read_varint(data, pos)
+            index += _unzigzag(delta)
+            sketch.bins[index] = count
+            sketch.count += count
+        
+        return sketch
+
+
+def merge_sketch_bytes(left: Optional[bytes], right: Optional[bytes]) -> Optional[bytes]:
+    """
+    Merge two serialized sketches (either may be None).
+    
+    Registered as the SQLite scalar function sketch_merge(a, b).
+    """
+    if left is None:
+        return right
+    if right is None:
+        return left
+    sketch = DDSketch.from_bytes(left)
+    sketch.merge(DDSketch.from_bytes(right))
+    return sketch.to_bytes()
+
+
+class SketchUnion:
+    """SQLite aggregate sketch_union(blob): merge serialized sketches."""
+    
+    def __init__(self):
+        self.sketch: Optional[DDSketch] = None
+    
+    def step(self, data: Optional[bytes]):
+        if data is None:
+            return
+        other = DDSketch.from_bytes(data)
+        if self.sketch is None:
+            self.sketch = other
+        else:
+            self.sketch.merge(other)
+    
+    def finalize(self) -> Optional[bytes]:
+        return self.sketch.to_bytes() if self.sketch is not None else None
+
+
+class SketchBuild:
+    """SQLite aggregate sketch_build(value): sketch raw values."""
+    
+    def __init__(self):
+        self.sketch = DDSketch()
+    
+    def step(self, value: Optional[float]):
+        if value is not None:
+            self.sketch.add(value)
+    
+    def finalize(self) -> Optional[bytes]:
+        return self.sketch.to_bytes() if self.sketch.count else None
+
+
+def register_sketch_functions(conn):
+    """
+    Register sketch SQL functions on a SQLite connection.
+    
+    Args:
+        conn: sqlite3 connection
+    """
+    conn.create_function("sketch_merge", 2, merge_sketch_bytes, deterministic=True)
+    conn.create_aggregate("sketch_union", 1, SketchUnion)
+    conn.create_aggregate("sketch_build", 1, SketchBuild)
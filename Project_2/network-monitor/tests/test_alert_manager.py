@@ -0,0 +1,276 @@
+"""
+Unit Tests for Alert Manager
+
+Tests the non-blocking alert pipeline: batched persistence and
+concurrent notification delivery with retries.
+"""
+
+import threading
+import time
+import pytest
+from src.alerts.alert_manager import AlertManager
+from src.alerts.channels import NotificationChannel, create_channels, LogChannel
+from src.alerts.dedup import DedupCache
+from src.database.db_manager import DatabaseManager
+
+
+class DictConfig:
+    """Minimal dotted-path configuration for tests."""
+    
+    def __init__(self, values=None):
+        self.values = values or {}
+    
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+
+class RecordingChannel(NotificationChannel):
+    """Channel that fails a number of times, then records alerts."""
+    
+    def __init__(self, failures=0, delay=0.0, **kwargs):
+        super().__init__("recording", **kwargs)
+        self.failures = failures
+        self.delay = delay
+        self.attempts = 0
+        self.sent = []
+        self.sent_at = []
+    
+    def send(self, alert):
+        self.attempts += 1
+        time.sleep(self.delay)
+        if self.attempts <= self.failures:
+            raise OSError("endpoint unavailable")
+        self.sent.append(alert)
+        self.sent_at.append(time.monotonic())
+
+
+class HangingChannel(NotificationChannel):
+    """Channel whose send() ignores its timeout and blocks until released."""
+    
+    def __init__(self, **kwargs):
+        super().__init__("hanging", **kwargs)
+        self.release = threading.Event()
+        self.attempts = 0
+    
+    def send(self, alert):
+        self.attempts += 1
+        self.release.wait()
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "metrics.db"))
+    yield manager
+    manager.close()
+
+
+def count_alerts(db):
+    with db.pool.reader() as conn:
+        return conn.execute("SELECT COUNT(*) FROM alerts").fetchone()[0]
+
+
+class TestAlertManager:
+    """Test suite for AlertManager."""
+    
+    def test_trigger_does_not_wait_for_database(self, db):
+        """Test that a slow database does not block trigger_alert."""
+        release = threading.Event()
+        insert_alerts = db.insert_alerts
+        batches = []
+        
+        def slow_insert(alerts):
+            release.wait(5)
+            batches.append(len(alerts))
+            return insert_alerts(alerts)
+        
+        db.insert_alerts = slow_insert
+        manager = AlertManager(DictConfig(), db_manager=db, channels=[])
+        
+        started = time.perf_counter()
+        for i in range(50):
+            manager.trigger_alert("WARNING", f"target-{i}: latency high")
+        elapsed = time.perf_counter() - started
+        
+        release.set()
+        assert manager.flush(timeout=5)
+        manager.close()
+        
+        assert elapsed < 1.0
+        assert count_alerts(db) == 50
+        assert sum(batches) == 50
+        assert len(batches) < 50  # Queued alerts are written together
+        assert manager.stats()["written"] == 50
+    
+    def test_queue_full_drops_alerts(self, db):
+        """Test that a full queue drops alerts instead of blocking."""
+        release = threading.Event()
+        db.insert_alerts = lambda alerts: release.wait(5)
+        manager = AlertManager(
+            DictConfig({"alerts.queue_size": 5, "alerts.batch_size": 1}),
+            db_manager=db,
+            channels=[]
+        )
+        
+        for i in range(20):
+            manager.trigger_alert("INFO", f"alert {i}")
+        release.set()
+        manager.close()
+        
+        stats = manager.stats()
+        assert stats["dropped"] > 0
+        assert stats["queued"] + stats["dropped"] == 20
+    
+    def test_repeated_breaches_are_collapsed(self, db):
+        """Test dedup on (target, metric, severity) despite changing values."""
+        manager = AlertManager(DictConfig(), db_manager=db, channels=[])
+        
+        for latency in (120.5, 131.2, 150.0):
+            manager.trigger_alert(
+                "WARNING", f"a: Latency {latency}ms exceeds warning threshold",
+                target="a", metric="latency"
+            )
+        manager.trigger_alert("CRITICAL", "a: Latency 250ms", target="a", metric="latency")
+        manager.trigger_alert("WARNING", "b: Latency 120ms", target="b", metric="latency")
+        manager.close()
+        
+        assert count_alerts(db) == 3
+        assert manager.stats()["suppressed"] == 2
+    
+    def test_notifications_retry_and_fan_out(self, db):
+        """Test retries and concurrent delivery to several channels."""
+        flaky = RecordingChannel(failures=2, retries=2)
+        slow = RecordingChannel(delay=0.3, min_severity="WARNING")
+        manager = AlertManager(
+            DictConfig({"alerts.retry_backoff": 0.01}),
+            db_manager=db,
+            channels=[flaky, slow]
+        )
+        
+        manager.trigger_alert("CRITICAL", "a: down", target="a")
+        manager.trigger_alert("WARNING", "b: slow", target="b")
+        manager.close()
+        
+        assert [alert.target for alert in flaky.sent] == ["a"]
+        assert flaky.attempts == 3
+        assert sorted(alert.target for alert in slow.sent) == ["a", "b"]
+        assert manager.stats()["notified"] == 3
+    
+    def test_notification_gives_up_after_retries(self, db):
+        """Test that a permanently failing channel is counted as failed."""
+        broken = RecordingChannel(failures=10, retries=1)
+        manager = AlertManager(
+            DictConfig({"alerts.retry_backoff": 0.01}),
+            db_manager=db,
+            channels=[broken]
+        )
+        
+        manager.trigger_alert("CRITICAL", "a: down")
+        manager.close()
+        
+        assert broken.attempts == 2
+        assert manager.stats()["notification_failures"] == 1
+        assert count_alerts(db) == 1
+    
+    
+    def test_hung_channel_is_abandoned_after_timeout(self, db):
+        """Test that a send() ignoring its timeout does not hold the pool."""
+        hanging = HangingChannel(timeout=0.2, retries=1)
+        working = RecordingChannel()
+        manager = AlertManager(
+            DictConfig({"alerts.retry_backoff": 0.01, "alerts.notification_workers": 1}),
+            db_manager=db,
+            channels=[hanging, working]
+        )
+        
+        try:
+            manager.trigger_alert("CRITICAL", "a: down", target="a")
+            manager.close()
+        finally:
+            hanging.release.set()
+        
+        assert hanging.attempts == 2
+        assert len(working.sent) == 1
+        stats = manager.stats()
+        assert (stats["notification_timeouts"], stats["notification_failures"]) == (2, 1)
+    
+    def test_retry_backoff_does_not_block_workers(self, db):
+        """Test that a retry waiting for its backoff leaves the pool free."""
+        flaky = RecordingChannel(failures=1, retries=1)
+        working = RecordingChannel(min_severity="WARNING")
+        working.accepts = lambda alert: alert.severity == "WARNING"
+        manager = AlertManager(
+            DictConfig({"alerts.retry_backoff": 1.0, "alerts.notification_workers": 1}),
+            db_manager=db,
+            channels=[flaky, working]
+        )
+        
+        started = time.monotonic()
+        manager.trigger_alert("CRITICAL", "a: down", target="a")
+        assert manager.flush(timeout=5)
+        manager.trigger_alert("WARNING", "b: slow", target="b")
+        manager.close()
+        
+        assert working.sent_at[0] - started < 0.5
+        assert flaky.attempts == 2 and len(flaky.sent) == 1
+        assert flaky.sent_at[0] - started >= 1.0
+
+
+class TestDedupCache:
+    """Test suite for DedupCache."""
+    
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.now = 0.0
+        self.cache = DedupCache(ttl_seconds=10, max_entries=3, clock=lambda: self.now)
+    
+    def test_expiry(self):
+        """Test that keys are suppressed until their cooldown ends."""
+        assert self.cache.check_and_record("a")
+        self.now = 9.9
+        assert not self.cache.check_and_record("a")
+        self.now = 10.0
+        assert self.cache.check_and_record("a")
+        assert self.cache.suppressed == 1
+    
+    def test_bounded(self):
+        """Test that size stays bounded and expired keys are evicted."""
+        for i in range(100):
+            self.now = i * 0.01
+            self.cache.check_and_record(("target", i))
+        assert len(self.cache) == 3
+        assert self.cache.evicted == 97
+        
+        self.now = 100.0
+        self.cache.check_and_record("b")
+        assert len(self.cache) == 1
+    
+    def test_concurrent_callers(self):
+        """Test that exactly one of many concurrent callers wins a key."""
+        cache = DedupCache(ttl_seconds=60)
+        results = []
+        
+        def worker():
+            for i in range(200):
+                results.append((i, cache.check_and_record(i)))
+        
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert sum(1 for _, raised in results if raised) == 200
+
+
+def test_create_channels():
+    """Test channel construction from configuration."""
+    assert isinstance(create_channels(None)[0], LogChannel)
+    
+    channels = create_channels([
+        {"type": "webhook", "url": "http://127.0.0.1:9/hook", "min_severity": "WARNING"}
+    ])
+    assert channels[0].url == "http://127.0.0.1:9/hook"
+    assert channels[0].min_severity == "WARNING"
+    
+    with pytest.raises(ValueError):
+        create_channels([{"type": "pager"}])
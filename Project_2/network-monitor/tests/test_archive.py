@@ -0,0 +1,134 @@
+"""
+Unit Tests for Metric Archive
+
+Tests archival of aged rows before retention cleanup and combined reads.
+"""
+
+import pytest
+from datetime import date, datetime, timedelta
+from src.database.db_manager import DatabaseManager
+from src.database.models import Alert, Metric
+
+pytest.importorskip("pyarrow")
+
+from src.database.archive import MetricArchive
+
+
+class TestMetricArchive:
+    """Test suite for MetricArchive class."""
+    
+    @pytest.mark.parametrize("format", ["parquet", "ipc"])
+    def test_round_trip_with_filters(self, tmp_path, format):
+        """Test partitioned writes and filtered reads."""
+        archive = MetricArchive(str(tmp_path), format=format)
+        day = datetime(2025, 3, 1, 12, 0)
+        rows = [
+            (day + timedelta(hours=h), target, "latency", float(h), "ms")
+            for h in range(48)
+            for target in ("a", "b/c")
+        ]
+        
+        assert archive.write_metrics(rows) == 96
+        
+        table = archive.read_metrics(
+            target="b/c",
+            metric_type="latency",
+            start_time=day + timedelta(hours=10),
+            end_time=day + timedelta(hours=20)
+        )
+        assert table["value"].to_pylist() == [float(h) for h in range(10, 21)]
+        assert set(table["target"].to_pylist()) == {"b/c"}
+        assert len(list(tmp_path.glob("metrics/day=*/target=*/*"))) == 6
+    
+    def test_compact_merges_completed_days(self, tmp_path):
+        """Test that compaction leaves one sorted file per completed partition."""
+        archive = MetricArchive(str(tmp_path))
+        day = datetime(2025, 3, 1)
+        for batch in range(5):
+            archive.write_metrics([
+                (day + timedelta(days=d, minutes=batch * 10 + i), "a", "latency", float(i), "ms")
+                for d in range(2)
+                for i in range(10)
+            ])
+            archive.write_alerts([(batch, day + timedelta(minutes=batch), "WARNING", "x", False, None)])
+        
+        assert archive.compact(date(2025, 3, 2)) == 2
+        
+        assert len(list(tmp_path.glob("metrics/day=2025-03-01/target=a/*"))) == 1
+        assert len(list(tmp_path.glob("metrics/day=2025-03-02/target=a/*"))) == 5
+        assert len(list(tmp_path.glob("alerts/day=2025-03-01/*"))) == 1
+        table = archive.read_metrics(target="a")
+        assert table.num_rows == 100
+        assert table["timestamp"].to_pylist() == sorted(table["timestamp"].to_pylist())
+        assert archive.read_alerts()["id"].to_pylist() == list(range(5))
+        assert archive.compact(date(2025, 3, 2)) == 0
+    
+    def test_empty_archive(self, tmp_path):
+        """Test reading before anything was archived."""
+        archive = MetricArchive(str(tmp_path))
+        
+        assert archive.read_metrics(target="a").num_rows == 0
+        assert archive.read_alerts().num_rows == 0
+    
+    def test_unknown_format(self, tmp_path):
+        """Test that unsupported formats are rejected."""
+        with pytest.raises(ValueError):
+            MetricArchive(str(tmp_path), format="csv")
+
+
+class TestArchivalCleanup:
+    """Test suite for archival during retention cleanup."""
+    
+    @pytest.mark.parametrize("layout", ["narrow", "wide"])
+    def test_cleanup_archives_before_delete(self, tmp_path, layout):
+        """Test that aged rows move to the archive and stay queryable."""
+        db = DatabaseManager(
+            str(tmp_path / "metrics.db"),
+            layout=layout,
+            archive_dir=str(tmp_path / "archive")
+        )
+        now = datetime.now()
+        old = [Metric(now - timedelta(days=40, minutes=i), "a", "latency", float(i), "ms") for i in range(5)]
+        recent = [Metric(now - timedelta(minutes=i), "a", "latency", 100.0 + i, "ms") for i in range(3)]
+        db.insert_metrics(old + recent)
+        db.insert_alerts([
+            Alert(None, now - timedelta(days=40), "WARNING", "old", acknowledged=False),
+        ])
+        with db.pool.writer() as conn:
+            conn.execute("UPDATE alerts SET acknowledged = 1, acknowledged_at = ?", (now,))
+        
+        db.cleanup_old_data(retention_days=30)
+        
+        assert len(db.get_metrics("a", "latency")) == 3
+        assert db.archive.read_metrics(target="a").num_rows == 5
+        assert db.archive.read_alerts()["message"].to_pylist() == ["old"]
+        
+        history = db.query_history("a", "latency", start_time=now - timedelta(days=41))
+        assert [row["value"] for row in history] == [4.0, 3.0, 2.0, 1.0, 0.0, 102.0, 101.0, 100.0]
+        
+        pruned = db.query_history("a", "latency", start_time=now - timedelta(days=1))
+        assert len(pruned) == 3
+        db.close()
+    
+    def test_cleanup_compacts_completed_days(self, tmp_path):
+        """Test that small retention batches end up as one file per day and target."""
+        db = DatabaseManager(str(tmp_path / "metrics.db"), archive_dir=str(tmp_path / "archive"))
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=40)
+        db.insert_metrics([
+            Metric(start + timedelta(hours=h), target, "latency", float(h), "ms")
+            for h in range(72)
+            for target in ("a", "b")
+        ])
+        
+        db.cleanup_old_data(retention_days=30, batch_size=10)
+        
+        partitions = list((tmp_path / "archive" / "metrics").glob("day=*/target=*"))
+        assert len(partitions) == 6
+        assert all(len(list(partition.iterdir())) == 1 for partition in partitions)
+        history = db.query_history("a", "latency", start_time=start)
+        assert [row["value"] for row in history] == [float(h) for h in range(72)]
+        db.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
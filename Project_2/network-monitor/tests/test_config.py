@@ -0,0 +1,149 @@
+"""
+Unit Tests for Configuration Management
+
+Tests flattened lookups, reloading and live application of changes.
+"""
+
+import os
+import time
+import yaml
+import pytest
+from src.utils.config import ConfigManager
+
+
+def write_config(path, data):
+    path.write_text(yaml.safe_dump(data))
+    # Make sure the change is visible even on coarse mtime filesystems
+    stamp = time.time() + 1
+    os.utime(path, (stamp, stamp))
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "config.yaml"
+    write_config(path, {
+        "monitoring": {"interval": 5, "targets": [{"host": "127.0.0.1", "name": "lo"}]},
+        "thresholds": {"latency_warning": 100},
+        "database": {"path": str(tmp_path / "metrics.db")},
+    })
+    return path
+
+
+class TestConfigManager:
+    """Test suite for ConfigManager."""
+    
+    def test_flattened_get(self, config_file):
+        """Test leaf, section and missing lookups."""
+        config = ConfigManager(str(config_file))
+        
+        assert config.get("monitoring.interval") == 5
+        assert config.get("thresholds") == {"latency_warning": 100}
+        assert config.get("thresholds.latency_critical", 200) == 200
+        assert config.get("monitoring.interval.value", "x") == "x"
+    
+    def test_reload_and_callbacks(self, config_file):
+        """Test that changes are swapped in and reported once."""
+        config = ConfigManager(str(config_file))
+        changes = []
+        config.on_change(lambda old, new: changes.append((old, new)))
+        
+        assert not config.reload()
+        
+        write_config(config_file, {"monitoring": {"interval": 1}})
+        assert config.reload()
+        assert config.get("monitoring.interval") == 1
+        assert config.get("thresholds.latency_warning") is None
+        assert changes[0][0]["monitoring"]["interval"] == 5
+        assert changes[0][1]["monitoring"]["interval"] == 1
+        
+        assert not config.reload()
+        assert len(changes) == 1
+    
+    def test_invalid_update_keeps_config(self, config_file):
+        """Test that a broken file does not replace the working config."""
+        config = ConfigManager(str(config_file))
+        
+        config_file.write_text("monitoring: [unclosed")
+        os.utime(config_file, (time.time() + 2, time.time() + 2))
+        
+        assert not config.reload()
+        assert config.get("monitoring.interval") == 5
+    
+    def test_watcher(self, config_file):
+        """Test that the polling watcher picks up edits."""
+        config = ConfigManager(str(config_file))
+        config.start_watching(interval=0.05)
+        try:
+            write_config(config_file, {"monitoring": {"interval": 9}})
+            deadline = time.monotonic() + 5
+            while config.get("monitoring.interval") != 9 and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert config.get("monitoring.interval") == 9
+        finally:
+            config.stop_watching()
+
+
+def test_monitor_applies_target_changes(config_file):
+    """Test that NetworkMonitor adds/removes targets and retunes live."""
+    from src.core.monitor import NetworkMonitor
+    
+    monitor = NetworkMonitor(str(config_file))
+    monitor.running = True
+    monitor._start_target_thread(monitor.targets[0])
+    original = monitor.targets[0]
+    
+    data = yaml.safe_load(config_file.read_text())
+    data["monitoring"]["interval"] = 1
+    data["monitoring"]["targets"] = [
+        {"host": "127.0.0.1", "name": "lo"},
+        {"host": "127.0.0.2", "name": "lo2"},
+    ]
+    data["thresholds"]["latency_warning"] = 0.001
+    write_config(config_file, data)
+    
+    try:
+        assert monitor.config.reload()
+        assert monitor.interval == 1
+        assert [t.name for t in monitor.targets] == ["lo", "lo2"]
+        assert monitor.targets[0] is original
+        assert {t.name for t in monitor.monitor_threads} == {"Monitor-lo", "Monitor-lo2"}
+        
+        data["monitoring"]["targets"] = [{"host": "127.0.0.2", "name": "lo2"}]
+        write_config(config_file, data)
+        assert monitor.config.reload()
+        assert [t.name for t in monitor.targets] == ["lo2"]
+        assert not original.enabled
+        assert monitor.rules.defaults["latency_warning"] == 0.001
+    finally:
+        monitor.running = False
+        for thread in monitor.monitor_threads:
+            thread.join(timeout=5)
+        monitor.db_manager.close()
+
+
+def test_monitor_reload_keeps_overrides_and_rule_state(config_file):
+    """Test that unrelated edits keep the CLI interval and alert state."""
+    from src.core.monitor import NetworkMonitor
+    
+    monitor = NetworkMonitor(str(config_file))
+    monitor.interval = 2
+    monitor.follow_config_interval = False
+    rules = monitor.rules
+    
+    data = yaml.safe_load(config_file.read_text())
+    data["database"]["retention_days"] = 7
+    write_config(config_file, data)
+    
+    try:
+        assert monitor.config.reload()
+        assert monitor.interval == 2
+        assert monitor.rules is rules
+        assert monitor.retention.retention_days == 7
+        
+        data["thresholds"]["latency_warning"] = 50
+        write_config(config_file, data)
+        assert monitor.config.reload()
+        assert monitor.rules is not rules
+        assert monitor.rules.defaults["latency_warning"] == 50
+    finally:
+        monitor.db_manager.close()
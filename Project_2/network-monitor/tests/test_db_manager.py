@@ -0,0 +1,429 @@
+"""
+Unit Tests for Database Manager
+
+Tests metric storage, buffered writes and statistics queries.
+"""
+
+import random
+import statistics
+import threading
+import time
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+from src.database.db_manager import DatabaseManager, to_epoch_ms
+from src.database.models import Alert, Metric
+from src.database.retention import RetentionWorker
+from src.database.rollups import plan_window
+
+
+class TestDatabaseManager:
+    """Test suite for DatabaseManager class."""
+    
+    @pytest.fixture(autouse=True)
+    def setup_db(self, tmp_path):
+        """Setup test fixtures."""
+        self.db = DatabaseManager(str(tmp_path / "metrics.db"))
+        yield
+        self.db.close()
+    
+    def _metrics(self, target: str, count: int):
+        now = datetime.now()
+        return [Metric(now, target, "latency", float(i), "ms") for i in range(count)]
+    
+    def test_insert_metrics_batch(self):
+        """Test inserting many rows in one transaction."""
+        assert self.db.insert_metrics(self._metrics("a", 100)) == 100
+        
+        stats = self.db.get_statistics("a")
+        assert stats["latency"]["samples"] == 100
+        assert stats["latency"]["maximum"] == 99.0
+    
+    def test_buffered_writer_from_threads(self):
+        """Test that rows from many threads are written by the buffer."""
+        writer = self.db.start_writer(batch_size=50, flush_interval=0.05)
+        
+        threads = [
+            threading.Thread(target=self.db.write_metrics, args=(self._metrics(f"t{i}", 30),))
+            for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert self.db.flush(timeout=5)
+        assert writer.stats["written"] == 240
+        assert writer.stats["dropped"] == 0
+        assert self.db.get_statistics("t3")["latency"]["samples"] == 30
+    
+    def test_buffered_writer_backpressure(self):
+        """Test that a full buffer rejects rows after the timeout."""
+        release = threading.Event()
+        insert = self.db.insert_metrics
+        
+        def slow_insert(metrics):
+            release.wait()
+            return insert(metrics)
+        
+        self.db.insert_metrics = slow_insert
+        writer = self.db.start_writer(batch_size=10, flush_interval=60, max_pending=10)
+        
+        assert writer.submit(self._metrics("a", 10))   # taken by the blocked flush
+        assert self.db.flush(timeout=0.2) is False
+        assert writer.submit(self._metrics("a", 10))   # fills the buffer
+        assert not writer.submit(self._metrics("a", 1), timeout=0.1)
+        assert writer.stats["dropped"] == 1
+        
+        release.set()
+        assert self.db.flush(timeout=5)
+        assert writer.stats["written"] == 20
+    
+    def test_wal_mode(self):
+        """Test that the pool enables WAL journaling."""
+        assert self.db.pool_stats()["journal_mode"] == "wal"
+    
+    def test_reader_not_blocked_by_writer(self):
+        """Test that statistics can be read while a write transaction is open."""
+        self.db.insert_metrics(self._metrics("a", 5))
+        
+        with self.db.pool.writer() as conn:
+            conn.execute(
+                "INSERT INTO metrics (timestamp, target, metric_type, value, unit) "
+                "VALUES (?, 'a', 'latency', 1.0, 'ms')",
+                (datetime.now(),)
+            )
+            # Uncommitted row is invisible, committed rows are readable
+            assert len(self.db.get_metrics("a", "latency")) == 5
+        
+        assert len(self.db.get_metrics("a", "latency")) == 6
+        assert self.db.pool_stats()["readers_created"] == 1
+    
+    
+    def test_series_query_uses_covering_index(self):
+        """Test that series range scans use the composite index only."""
+        with self.db.pool.reader() as conn:
+            plan = " ".join(
+                row["detail"] for row in conn.execute(
+                    "EXPLAIN QUERY PLAN SELECT timestamp, value FROM metrics "
+                    "WHERE target = 'a' AND metric_type = 'latency' AND timestamp >= 0"
+                )
+            )
+        assert "COVERING INDEX idx_metrics_series" in plan
+
+
+
+class TestRollups:
+    """Test suite for rollup tables and the window planner."""
+    
+    def test_plan_window_covers_interval(self):
+        """Test that planned pieces tile the window without overlap."""
+        start, end = 1_000_123.5, 1_400_000.0
+        pieces = plan_window(start, end)
+        
+        assert pieces[0][1] == start
+        assert pieces[-1][2] == end
+        for (_, _, prev_end), (_, next_start, _) in zip(pieces, pieces[1:]):
+            assert prev_end == next_start
+        assert "1d" in [resolution for resolution, _, _ in pieces]
+    
+    @pytest.mark.parametrize("layout", ["narrow", "wide"])
+    def test_statistics_match_raw(self, tmp_path, layout):
+        """Test that rollup-planned statistics equal a raw computation."""
+        db = DatabaseManager(str(tmp_path / "metrics.db"), layout=layout)
+        rng = random.Random(7)
+        now = datetime.now()
+        values = []
+        metrics = []
+        for i in range(3000):
+            timestamp = now - timedelta(seconds=i * 97)
+            value = rng.uniform(1, 100)
+            metrics.append(Metric(timestamp, "a", "latency", value, "ms"))
+            if timestamp >= now - timedelta(hours=72):
+                values.append(value)
+        
+        try:
+            db.insert_metrics(metrics)
+            stats = db.get_statistics("a", duration_hours=72)["latency"]
+            
+            assert stats["samples"] == len(values)
+            assert stats["average"] == pytest.approx(statistics.mean(values))
+            assert stats["minimum"] == min(values)
+            assert stats["maximum"] == max(values)
+        finally:
+            db.close()
+    
+    def test_backfill_and_rollup_series(self, tmp_path):
+        """Test that existing rows are backfilled into rollups on migration."""
+        path = str(tmp_path / "metrics.db")
+        db = DatabaseManager(path)
+        db.close()
+        
+        import sqlite3
+        conn = sqlite3.connect(path)
+        for resolution in ("1m", "1h", "1d"):
+            conn.execute(f"DROP TABLE rollup_{resolution}")
+        conn.execute("PRAGMA user_version = 2")
+        hour = datetime(2025, 1, 1, 10)
+        conn.executemany(
+            "INSERT INTO metrics (timestamp, target, metric_type, value, unit) VALUES (?, ?, ?, ?, ?)",
+            [(hour + timedelta(minutes=m), "a", "latency", float(m), "ms") for m in (5, 10, 65)]
+        )
+        conn.commit()
+        conn.close()
+        
+        db = DatabaseManager(path)
+        try:
+            rows = db.get_metrics("a", "latency", resolution="1h")
+            
+            assert [row["samples"] for row in rows] == [2, 1]
+            assert rows[0]["value"] == 7.5
+            assert rows[0]["timestamp"] == str(hour)
+            assert db._choose_resolution(hour, hour + timedelta(days=30), 1000) == "1h"
+            
+            stats = db.get_statistics("a", duration_hours=24 * 365 * 100)
+            assert stats["latency"]["p50"] == pytest.approx(10.0, rel=0.01)
+        finally:
+            db.close()
+
+
+class TestWideLayout:
+    """Test suite for the wide (row per sample) layout."""
+    
+    def test_migrate_narrow_rows(self, tmp_path):
+        """Test that reopening with layout='wide' migrates existing rows."""
+        path = str(tmp_path / "metrics.db")
+        now = datetime.now().replace(microsecond=0)
+        
+        narrow = DatabaseManager(path)
+        narrow.insert_metrics([
+            Metric(now, "a", "latency", 12.5, "ms"),
+            Metric(now, "a", "packet_loss", 10.0, "percent"),
+            Metric(now, "a", "dns_time", 3.0, "ms"),
+        ])
+        narrow.close()
+        
+        wide = DatabaseManager(path, layout="wide")
+        try:
+            assert wide.get_metrics("a", "latency") == [
+                {"timestamp": str(now), "value": 12.5, "unit": "ms"}
+            ]
+            assert wide.get_statistics("a")["packet_loss"]["average"] == 10.0
+            # Metric types without a wide column stay in the narrow table
+            assert wide.get_metrics("a", "dns_time")[0]["value"] == 3.0
+            
+            with wide.pool.reader() as conn:
+                assert conn.execute("SELECT COUNT(*) FROM samples").fetchone()[0] == 1
+        finally:
+            wide.close()
+    
+    def test_insert_merges_sample_columns(self, tmp_path):
+        """Test that metrics of one sample share a single wide row."""
+        db = DatabaseManager(str(tmp_path / "metrics.db"), layout="wide")
+        now = datetime.now()
+        try:
+            db.insert_metrics([
+                Metric(now, "a", "latency", 5.0, "ms"),
+                Metric(now, "a", "jitter", 1.0, "ms"),
+            ])
+            stats = db.get_statistics("a")
+            
+            assert stats["latency"]["samples"] == 1
+            assert stats["jitter"]["maximum"] == 1.0
+            assert "packet_loss" not in stats
+        finally:
+            db.close()
+
+
+
+
+
+class TestFleetStatistics:
+    """Test suite for fleet-wide statistics."""
+    
+    @pytest.fixture
+    def db(self, tmp_path):
+        db = DatabaseManager(str(tmp_path / "metrics.db"), stats_cache_ttl=60)
+        now = datetime.now()
+        db.insert_metrics([
+            Metric(now - timedelta(minutes=i), target, metric_type, float(i), "ms")
+            for i in range(1, 11)
+            for target in ("a", "b", "c")
+            for metric_type in ("latency", "jitter")
+        ])
+        yield db
+        db.close()
+    
+    def test_all_targets_and_metrics(self, db):
+        """Test that every series is summarized in one call."""
+        stats = db.get_fleet_statistics(duration_hours=1)
+        
+        assert set(stats) == {"a", "b", "c"}
+        latency = stats["b"]["latency"]
+        assert latency["samples"] == 10
+        assert latency["average"] == pytest.approx(5.5)
+        assert latency["stddev"] == pytest.approx(statistics.stdev(range(1, 11)))
+        assert latency["p50"] == pytest.approx(5.0, rel=0.02)
+        
+        subset = db.get_fleet_statistics(duration_hours=1, targets=["a"], metric_types=["jitter"])
+        assert list(subset) == ["a"] and list(subset["a"]) == ["jitter"]
+    
+    def test_cache_invalidated_by_writes(self, db):
+        """Test that cached results are reused until new data lands."""
+        first = db.get_fleet_statistics(duration_hours=1)
+        first["a"]["latency"]["samples"] = -1
+        
+        assert db.get_fleet_statistics(duration_hours=1)["a"]["latency"]["samples"] == 10
+        assert db.cache_stats["hits"] == 1
+        
+        db.insert_metric(datetime.now(), "a", "latency", 50.0, "ms")
+        
+        assert db.get_fleet_statistics(duration_hours=1)["a"]["latency"]["samples"] == 11
+        assert db.cache_stats["hits"] == 1
+
+
+class TestStreaming:
+    """Test suite for the streaming read APIs."""
+    
+    @pytest.mark.parametrize("layout", ["narrow", "wide"])
+    def test_iter_metrics_matches_get_metrics(self, tmp_path, layout):
+        """Test that the lazy iterator yields the same rows."""
+        db = DatabaseManager(str(tmp_path / "metrics.db"), layout=layout)
+        start = datetime(2025, 6, 1, 12, 0)
+        db.insert_metrics([
+            Metric(start + timedelta(seconds=i), "a", "latency", float(i), "ms") for i in range(25)
+        ])
+        
+        rows = db.iter_metrics("a", "latency", batch_size=4)
+        assert next(rows)["value"] == 0.0
+        assert [row["value"] for row in rows] == [float(i) for i in range(1, 25)]
+        assert list(db.iter_metrics("a", "latency")) == db.get_metrics("a", "latency")
+        assert list(db.iter_metrics("missing", "latency")) == []
+        db.close()
+    
+    @pytest.mark.parametrize("layout", ["narrow", "wide"])
+    def test_column_batches(self, tmp_path, layout):
+        """Test fixed-size typed batches and the columns mode."""
+        db = DatabaseManager(str(tmp_path / "metrics.db"), layout=layout)
+        start = datetime(2025, 6, 1, 12, 0, 0, 250000)
+        metrics = [
+            Metric(start + timedelta(seconds=i), "a", "latency", i / 2, "ms") for i in range(10)
+        ]
+        db.insert_metrics(metrics)
+        
+        batches = list(db.iter_metric_batches("a", "latency", batch_size=4))
+        assert [len(values) for _, values in batches] == [4, 4, 2]
+        
+        timestamps, values = db.get_metric_columns(
+            "a", "latency", start_time=start + timedelta(seconds=2)
+        )
+        assert timestamps.dtype == np.dtype("datetime64[ms]")
+        assert values.dtype == np.float64
+        assert values.tolist() == [i / 2 for i in range(2, 10)]
+        assert timestamps.astype(np.int64).tolist() == [to_epoch_ms(m.timestamp) for m in metrics[2:]]
+        
+        timestamps, values = db.get_metric_columns("missing", "latency")
+        assert len(timestamps) == len(values) == 0
+        db.close()
+
+
+def count_rollups(db):
+    with db.pool.reader() as conn:
+        return sum(
+            conn.execute(f"SELECT COUNT(*) FROM rollup_{resolution}").fetchone()[0]
+            for resolution in ("1m", "1h", "1d")
+        )
+
+
+class TestRetention:
+    """Test suite for batched retention cleanup."""
+    
+    @pytest.fixture
+    def db(self, tmp_path):
+        db = DatabaseManager(str(tmp_path / "metrics.db"))
+        now = datetime.now()
+        db.insert_metrics(
+            [Metric(now - timedelta(days=40, seconds=i), "a", "latency", 1.0, "ms") for i in range(250)]
+            + [Metric(now, "a", "latency", 2.0, "ms")]
+        )
+        db.insert_alerts([Alert(None, now - timedelta(days=40), "WARNING", "old")])
+        with db.pool.writer() as conn:
+            conn.execute("UPDATE alerts SET acknowledged = 1")
+        yield db
+        db.close()
+    
+    def test_cleanup_in_batches(self, db):
+        """Test that cleanup removes expired rows over several batches."""
+        rollups = count_rollups(db)
+        removed = db.cleanup_old_data(retention_days=30, batch_size=100)
+        
+        # The recent sample keeps one bucket per resolution
+        assert removed == {"metrics": 250, "alerts": 1, "rollups": rollups - 3}
+        assert count_rollups(db) == 3
+        assert len(db.get_metrics("a", "latency")) == 1
+    
+    def test_statistics_forget_purged_data(self, tmp_path):
+        """Test that purged samples no longer show up in statistics."""
+        db = DatabaseManager(str(tmp_path / "metrics.db"))
+        old = datetime.now() - timedelta(days=60)
+        db.insert_metrics([
+            Metric(old + timedelta(seconds=i), "t", "latency", float(i % 10), "ms") for i in range(300)
+        ])
+        assert db.get_statistics("t", 24 * 90)["latency"]["samples"] == 300
+        
+        db.cleanup_old_data(retention_days=30)
+        
+        assert count_rollups(db) == 0
+        assert db.get_statistics("t", 24 * 90) == {}
+        db.close()
+    
+    @pytest.mark.parametrize("layout", ["narrow", "wide"])
+    def test_purge_batch_limit(self, tmp_path, layout):
+        """Test that one batch removes at most batch_size rows."""
+        db = DatabaseManager(str(tmp_path / "metrics.db"), layout=layout)
+        old = datetime.now() - timedelta(days=40)
+        db.insert_metrics([
+            Metric(old + timedelta(seconds=i), target, "latency", 1.0, "ms")
+            for i in range(30) for target in ("a", "b")
+        ])
+        
+        rollups = count_rollups(db)
+        assert db.purge_batch(datetime.now(), batch_size=40) == (40, 0, 0)
+        assert db.purge_batch(datetime.now(), batch_size=40) == (20, 0, rollups)
+        assert db.count_expired(datetime.now()) == 0
+        db.close()
+    
+    def test_worker_progress_and_vacuum(self, db):
+        """Test a rate-limited worker run with progress reports."""
+        reports = []
+        rollups = count_rollups(db) - 3
+        worker = RetentionWorker(
+            db, retention_days=30, batch_size=50,
+            max_rows_per_second=2000, vacuum_pages=None, on_progress=reports.append
+        )
+        
+        progress = worker.run_once()
+        
+        assert progress["state"] == "done"
+        assert progress["expected"] == 251 + rollups
+        assert progress["metrics"] == 250 and progress["alerts"] == 1
+        assert progress["rollups"] == rollups
+        assert [r["batches"] for r in reports] == list(range(1, 7))
+        assert reports[-2]["percent"] < 100.0
+        with db.pool.reader() as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+            assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+    
+    def test_worker_stop_interrupts_run(self, db):
+        """Test that stopping the worker ends a throttled run early."""
+        worker = RetentionWorker(db, batch_size=10, max_rows_per_second=10)
+        worker.start()
+        time.sleep(0.2)
+        worker.stop(timeout=5)
+        
+        assert worker.snapshot()["state"] == "interrupted"
+        assert db.count_expired(worker.snapshot()["cutoff"]) > 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,101 @@
+"""
+Unit Tests for Fleet Anomaly Detection
+
+Tests the vectorized analyzer against per-target recomputation.
+"""
+
+import statistics
+import numpy as np
+import pytest
+from src.core.fleet import (
+    FleetLatencyAnalyzer,
+    TREND_DECREASING,
+    TREND_INCREASING,
+    TREND_STABLE,
+)
+
+
+class TestFleetLatencyAnalyzer:
+    """Test suite for FleetLatencyAnalyzer."""
+    
+    def test_matches_per_target_statistics(self):
+        """Test baselines and thresholds against statistics on each row."""
+        rng = np.random.default_rng(5)
+        names = [f"t{i}" for i in range(50)]
+        analyzer = FleetLatencyAnalyzer(names, window=30)
+        history = {name: [] for name in names}
+        
+        for _ in range(80):
+            latest = rng.gamma(4.0, 5.0, size=len(names))
+            latest[rng.random(len(names)) < 0.1] = np.nan
+            analysis = analyzer.step(latest)
+            
+            for row, name in enumerate(names):
+                window = [v for v in history[name][-30:] if not np.isnan(v)]
+                if len(window) >= 10:
+                    baseline = statistics.median(window)
+                    threshold = baseline + 2.0 * max(statistics.stdev(window), 1.0)
+                    assert analysis.baseline[row] == pytest.approx(baseline)
+                    assert analysis.threshold[row] == pytest.approx(threshold)
+                    assert analysis.anomalous[row] == (latest[row] > threshold)
+                else:
+                    assert not analysis.anomalous[row]
+                history[name].append(latest[row])
+    
+    def test_flags_only_spiking_targets(self):
+        """Test the anomaly mask and target names for a latency spike."""
+        analyzer = FleetLatencyAnalyzer(["a", "b", "c"], window=20)
+        for _ in range(20):
+            analyzer.step({"a": 10.0, "b": 20.0, "c": 30.0})
+        
+        analysis = analyzer.step({"a": 11.0, "b": 90.0, "c": None})
+        
+        assert analysis.anomalous.tolist() == [False, True, False]
+        assert analysis.anomalous_targets() == ["b"]
+    
+    def test_ewma_and_trend(self):
+        """Test EWMA updates and trend codes per target."""
+        analyzer = FleetLatencyAnalyzer(["up", "down", "flat"], ewma_alpha=0.5, trend_window=10)
+        for i in range(10):
+            analysis = analyzer.step([10.0 + i * 2, 40.0 - i * 2, 10.0])
+        
+        assert analysis.trend.tolist() == [TREND_INCREASING, TREND_DECREASING, TREND_STABLE]
+        assert analysis.ewma[2] == 10.0
+        
+        analysis = analyzer.step([np.nan, np.nan, 20.0])
+        assert analysis.ewma[2] == 15.0
+        assert analysis.ewma[0] == pytest.approx(analyzer.ewma[0])
+    
+    def test_add_and_remove_targets(self):
+        """Test that rows follow target changes and keep their history."""
+        analyzer = FleetLatencyAnalyzer(["a", "b"], window=10)
+        for _ in range(10):
+            analyzer.step({"a": 10.0, "b": 50.0})
+        
+        analyzer.remove_target("a")
+        analyzer.add_target("c")
+        analysis = analyzer.step({"b": 50.0, "c": 5.0})
+        
+        assert analysis.targets == ["b", "c"]
+        assert analysis.baseline[0] == 50.0
+        assert np.isnan(analysis.baseline[1])
+    
+    def test_targets_change_during_ticks(self):
+        """Test that adding and removing targets from another thread is safe."""
+        import threading
+        
+        analyzer = FleetLatencyAnalyzer(["a"], window=10)
+        done = threading.Event()
+        
+        def churn():
+            for i in range(300):
+                analyzer.add_target(f"t{i}")
+                analyzer.remove_target(f"t{i - 1}")
+            done.set()
+        
+        thread = threading.Thread(target=churn)
+        thread.start()
+        while not done.is_set():
+            analysis = analyzer.step({"a": 10.0})
+            assert analysis.latest[analysis.targets.index("a")] == 10.0
+        thread.join()
@@ -0,0 +1,122 @@
+"""
+Unit Tests for the Hot Window
+
+Tests the per-target ring buffers and reads served from them by
+DatabaseManager.
+"""
+
+import statistics
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from src.database.db_manager import DatabaseManager, to_epoch_ms
+from src.database.hot_window import HotWindow
+from src.database.models import Metric
+
+
+class TestHotWindow:
+    """Test suite for HotWindow class."""
+    
+    def test_ring_wraps_and_tracks_coverage(self):
+        """Test that a full ring keeps the newest samples only."""
+        window = HotWindow(capacity=4)
+        for i in range(6):
+            window.record("lo", 1000 + i, float(i), 0.0, None)
+        
+        series = window.snapshot("lo")
+        assert series.timestamps.tolist() == [1002, 1003, 1004, 1005]
+        assert series.values["latency"].tolist() == [2.0, 3.0, 4.0, 5.0]
+        assert series.covered_from == 1002
+        
+        stamps, values = window.window("lo", "latency", 1003, 1004)
+        assert (stamps.tolist(), values.tolist()) == ([1003, 1004], [3.0, 4.0])
+        assert window.window("lo", "jitter", 1002)[1].size == 0
+        assert window.window("lo", "latency", 1001) is None
+        assert window.window("missing", "latency", 0) is None
+    
+    def test_shared_between_processes(self, tmp_path):
+        """Test that a read-only window sees a writer's mapped rings."""
+        writer = HotWindow(capacity=8, directory=str(tmp_path))
+        reader = HotWindow(directory=str(tmp_path), readonly=True)
+        assert reader.snapshot("edge/lo") is None
+        
+        writer.record("edge/lo", 1000, 1.5, 0.0, 0.1)
+        writer.record("edge/lo", 2000, 2.5, 10.0, 0.2)
+        assert reader.window("edge/lo", "packet_loss", 0) is None
+        stamps, values = reader.window("edge/lo", "packet_loss", 1000)
+        assert (stamps.tolist(), values.tolist()) == ([1000, 2000], [0.0, 10.0])
+        
+        # A restarted writer with another capacity replaces the file
+        writer.close()
+        writer = HotWindow(capacity=16, directory=str(tmp_path))
+        writer.record("edge/lo", 5000, 3.5, 0.0, 0.0)
+        assert reader.snapshot("edge/lo").timestamps.tolist() == [5000]
+        
+        with pytest.raises(RuntimeError):
+            reader.record("edge/lo", 6000, 1.0, 0.0, 0.0)
+        reader.close()
+        writer.close()
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "metrics.db"), hot_window_size=100)
+    yield manager
+    manager.close()
+
+
+def record(db, target, start, count, step=5):
+    """Record samples in the hot window only, as the monitor does first."""
+    latencies = []
+    for i in range(count):
+        timestamp = start + timedelta(seconds=i * step)
+        latency = 10.0 + (i * 7) % 13
+        db.hot_window.record(target, to_epoch_ms(timestamp), latency, float(i % 2), 0.5)
+        latencies.append(latency)
+    return latencies
+
+
+class TestHotReads:
+    """Test suite for DatabaseManager reads served from the hot window."""
+    
+    def test_statistics_from_memory(self, db):
+        """Test that a window the ring covers never reaches the database."""
+        # Samples every 5 s from 10 minutes ago; the last 6 minutes hold 52
+        latencies = record(db, "lo", datetime.now() - timedelta(seconds=598), 100)[48:]
+        
+        stats = db.get_statistics("lo", duration_hours=0.1)
+        assert stats["latency"]["samples"] == 52
+        assert stats["latency"]["average"] == pytest.approx(statistics.mean(latencies))
+        assert stats["latency"]["stddev"] == pytest.approx(statistics.stdev(latencies))
+        assert stats["packet_loss"]["maximum"] == 1.0
+        assert db.hot_window.stats["hits"] == 3
+    
+    def test_uncovered_window_reads_disk(self, db):
+        """Test the fallback when the ring starts inside the window."""
+        start = datetime.now() - timedelta(hours=2)
+        db.insert_metrics([
+            Metric(start + timedelta(minutes=i), "lo", "latency", 100.0, "ms") for i in range(10)
+        ])
+        record(db, "lo", datetime.now() - timedelta(minutes=5), 10)
+        
+        stats = db.get_statistics("lo", duration_hours=3)
+        assert stats["latency"]["samples"] == 10
+        assert stats["latency"]["average"] == 100.0
+    
+    def test_raw_reads_from_memory(self, db):
+        """Test get_metrics and get_metric_columns over a covered range."""
+        start = datetime(2025, 6, 1, 12, 0)
+        latencies = record(db, "lo", start, 20)
+        
+        rows = db.get_metrics("lo", "latency", start_time=start + timedelta(seconds=50))
+        assert [row["value"] for row in rows] == latencies[10:]
+        assert rows[0] == {"timestamp": "2025-06-01 12:00:50", "value": latencies[10], "unit": "ms"}
+        
+        timestamps, values = db.get_metric_columns(
+            "lo", "jitter", start, start + timedelta(seconds=20)
+        )
+        assert timestamps.dtype == np.dtype("datetime64[ms]")
+        assert values.tolist() == [0.5] * 5
+        
+        # Unbounded ranges still go to the database
+        assert db.get_metrics("lo", "latency") == []
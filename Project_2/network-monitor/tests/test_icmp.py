@@ -0,0 +1,161 @@
+"""
+Unit Tests for Native ICMP Prober
+
+Tests packet encoding/decoding, in-process echo probing and reply
+matching of the asyncio prober.
+"""
+
+import asyncio
+import socket
+import struct
+import pytest
+from src.core.icmp import (
+    AsyncICMPProber,
+    ICMPProber,
+    ICMPUnavailableError,
+    build_echo_request,
+    checksum,
+    create_prober,
+    parse_echo_reply,
+)
+
+
+def _native_available() -> bool:
+    try:
+        ICMPProber()
+        return True
+    except ICMPUnavailableError:
+        return False
+
+
+class TestICMPPackets:
+    """Test suite for ICMP packet helpers."""
+    
+    def test_checksum_verifies(self):
+        """Test that a packet with its checksum sums to zero."""
+        packet = build_echo_request(0x1234, 7, b"payload!")
+        assert checksum(packet) == 0
+    
+    def test_parse_echo_reply_datagram(self):
+        """Test parsing an echo reply without IP header."""
+        reply = struct.pack("!BBHHH", 0, 0, 0, 42, 3) + b"data"
+        assert parse_echo_reply(reply, raw=False) == (42, 3)
+    
+    def test_parse_echo_reply_raw(self):
+        """Test parsing an echo reply behind a 20-byte IP header."""
+        ip_header = bytes([0x45]) + bytes(19)
+        reply = ip_header + struct.pack("!BBHHH", 0, 0, 0, 42, 3)
+        assert parse_echo_reply(reply, raw=True) == (42, 3)
+    
+    def test_parse_ignores_echo_request(self):
+        """Test that echo requests are not mistaken for replies."""
+        request = build_echo_request(42, 3, b"")
+        assert parse_echo_reply(request, raw=False) is None
+    
+    def test_unknown_backend(self):
+        """Test that unknown backend names are rejected."""
+        with pytest.raises(ValueError):
+            create_prober("carrier-pigeon")
+
+
+@pytest.mark.skipif(not _native_available(), reason="ICMP sockets not permitted")
+class TestICMPProber:
+    """Test suite for ICMPProber against localhost."""
+    
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.prober = ICMPProber()
+    
+    def test_ping_localhost(self):
+        """Test per-packet RTTs for localhost."""
+        rtts = self.prober.ping("127.0.0.1", count=3, timeout=1, interval=0.01)
+        
+        assert len(rtts) == 3
+        assert all(rtt is not None and 0 <= rtt < 1000 for rtt in rtts)
+
+
+class FakeICMPSocket:
+    """Datagram ICMP socket stand-in: records requests, replays replies."""
+    
+    def __init__(self):
+        self._reader, self._waker = socket.socketpair()
+        self._reader.setblocking(False)
+        self.sent = []
+        self.inbox = []
+    
+    def fileno(self):
+        return self._reader.fileno()
+    
+    def sendto(self, packet, address):
+        self.sent.append((packet, address))
+    
+    def deliver(self, sequence, source="127.0.0.1"):
+        # Datagram sockets hand over the ICMP message without IP header
+        self.inbox.append((struct.pack("!BBHHH", 0, 0, 0, 0, sequence), source))
+        self._waker.send(b"x")
+    
+    def recvmsg(self, size, ancsize):
+        if not self.inbox:
+            raise BlockingIOError
+        self._reader.recv(1)
+        data, source = self.inbox.pop(0)
+        return data, [], 0, (source, 0)
+    
+    def close(self):
+        self._reader.close()
+        self._waker.close()
+
+
+@pytest.fixture
+def async_prober(monkeypatch):
+    monkeypatch.setattr(ICMPProber, "_detect_socket_type", staticmethod(lambda: socket.SOCK_DGRAM))
+    prober = AsyncICMPProber()
+    prober.fake = FakeICMPSocket()
+    prober._open_socket = lambda: prober.fake
+    return prober
+
+
+class TestAsyncICMPProber:
+    """Test suite for AsyncICMPProber sequence allocation and reply matching."""
+    
+    def test_sequence_allocation_skips_in_flight(self, async_prober):
+        """Test that sequences wrap and never reuse an in-flight number."""
+        async_prober._pending = {1: None, 2: None}
+        assert async_prober._allocate_sequence() == 3
+        
+        async_prober._sequence = 0xFFFE
+        async_prober._pending[0xFFFF] = None
+        assert async_prober._allocate_sequence() == 0
+        
+        async_prober._pending = dict.fromkeys(range(0x10000))
+        with pytest.raises(RuntimeError):
+            async_prober._allocate_sequence()
+    
+    def test_replies_resolve_matching_probes(self, async_prober):
+        """Test that replies are matched by sequence number and source."""
+        fake = async_prober.fake
+        
+        async def run():
+            ping = asyncio.ensure_future(async_prober.ping("127.0.0.1", count=3, timeout=0.5))
+            while len(fake.sent) < 3:
+                await asyncio.sleep(0.01)
+            sequences = [struct.unpack_from("!H", packet, 6)[0] for packet, _ in fake.sent]
+            assert len(set(sequences)) == 3
+            assert set(async_prober._pending) == set(sequences)
+            
+            fake.deliver(sequences[1], source="192.0.2.1")   # wrong source
+            fake.deliver(sequences[0])
+            fake.deliver(sequences[0])                        # duplicate
+            fake.deliver(sequences[2])
+            fake.deliver(0xBEEF)                              # not in flight
+            return await ping
+        
+        try:
+            rtts = asyncio.run(run())
+        finally:
+            async_prober.close()
+        
+        assert rtts[1] is None
+        assert rtts[0] is not None and rtts[2] is not None
+        assert async_prober._pending == {}
+        assert all(address == ("127.0.0.1", 0) for _, address in fake.sent)
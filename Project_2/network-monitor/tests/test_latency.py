@@ -78,6 +78,9 @@ class TestLatencyAnalyzer:
     
     def test_anomaly_detection(self):
         """Test anomaly detection."""
+        # A perfectly flat baseline needs a stddev floor to tolerate 1 ms
+        self.analyzer = LatencyAnalyzer(baseline_samples=20, min_stddev_ms=1.0)
+        
         # Add baseline measurements
         for _ in range(50):
             self.analyzer.add_measurement(10.0)
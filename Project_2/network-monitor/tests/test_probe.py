@@ -0,0 +1,148 @@
+"""
+Unit Tests for Probe Results
+
+Tests the unified burst result shared by latency and loss computation.
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from src.core.probe import Prober, ProbeResult, parse_ping_output
+from src.core.probe_cache import ProbeCache
+from src.core.packet_loss import PacketLossAnalyzer
+
+
+LINUX_OUTPUT = """PING 10.0.0.1 (10.0.0.1) 56(84) bytes of data.
+64 bytes from 10.0.0.1: icmp_seq=1 ttl=64 time=10.0 ms
+64 bytes from 10.0.0.1: icmp_seq=2 ttl=64 time=14.0 ms
+64 bytes from 10.0.0.1: icmp_seq=4 ttl=64 time=12.0 ms
+
+--- 10.0.0.1 ping statistics ---
+4 packets transmitted, 3 received, 25% packet loss, time 3004ms
+rtt min/avg/max/mdev = 10.000/12.000/14.000/1.633 ms
+"""
+
+
+class TestProbeResult:
+    """Test suite for ProbeResult statistics."""
+    
+    def test_statistics(self):
+        """Test RTT statistics, loss and jitter from one burst."""
+        result = ProbeResult(host="h", rtts=[10.0, 14.0, None, 12.0])
+        
+        assert result.sent == 4
+        assert result.received == 3
+        assert result.loss_percentage == 25.0
+        assert result.min_ms == 10.0
+        assert result.max_ms == 14.0
+        assert result.avg_ms == 12.0
+        assert result.mdev_ms == pytest.approx(1.633, abs=1e-3)
+        assert result.jitter_ms == 3.0
+    
+    def test_all_lost(self):
+        """Test a burst without replies."""
+        result = ProbeResult(host="h", rtts=[None, None])
+        
+        assert result.loss_percentage == 100.0
+        assert result.avg_ms is None
+        assert result.jitter_ms is None
+    
+    def test_parse_linux_output(self):
+        """Test building a result from Linux ping output."""
+        result = parse_ping_output(LINUX_OUTPUT, "10.0.0.1")
+        
+        assert result is not None
+        assert result.sent == 4
+        assert result.received_rtts == [10.0, 14.0, 12.0]
+    
+    def test_parse_unrecognized_output(self):
+        """Test that unparseable output yields None."""
+        assert parse_ping_output("ping: unknown host", "x") is None
+    
+    def test_loss_from_probe(self):
+        """Test packet loss computation from a shared probe result."""
+        analyzer = PacketLossAnalyzer(backend="subprocess")
+        loss = analyzer.from_probe(ProbeResult(host="h", rtts=[1.0, None]))
+        
+        assert loss.sent == 2
+        assert loss.received == 1
+        assert loss.loss_percentage == 50.0
+
+
+
+class TestProbeCache:
+    """Test suite for probe result caching and coalescing."""
+    
+    def test_concurrent_requests_share_one_probe(self):
+        """Test that concurrent identical requests send a single burst."""
+        cache = ProbeCache(ttl=0)
+        calls = []
+        
+        def probe():
+            calls.append(1)
+            time.sleep(0.2)
+            return ProbeResult(host="h", rtts=[1.0])
+        
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_probe("h", probe)))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len(calls) == 1
+        assert len(results) == 10
+        assert all(result is results[0] for result in results)
+        assert cache.stats["coalesced"] == 9
+    
+    def test_ttl_and_failures(self):
+        """Test that results expire and failed probes are not cached."""
+        cache = ProbeCache(ttl=0.1)
+        result = ProbeResult(host="h", rtts=[1.0])
+        
+        assert cache.get_or_probe("h", lambda: result) is result
+        assert cache.get_or_probe("h", lambda: None) is result
+        time.sleep(0.15)
+        assert cache.get_or_probe("h", lambda: None) is None
+        assert cache.get_or_probe(("h", 2), lambda: result) is result
+        assert cache.stats == {"hits": 1, "coalesced": 0, "misses": 3}
+    
+    def test_async_coalescing(self):
+        """Test coalescing of concurrent probes on the event loop."""
+        cache = ProbeCache(ttl=0)
+        calls = []
+        
+        async def probe():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return ProbeResult(host="h", rtts=[2.0])
+        
+        async def run():
+            return await asyncio.gather(*[cache.get_or_probe_async("h", probe) for _ in range(5)])
+        
+        results = asyncio.run(run())
+        
+        assert len(calls) == 1
+        assert [r.avg_ms for r in results] == [2.0] * 5
+    
+    def test_prober_key_includes_parameters(self):
+        """Test that different packet counts are probed separately."""
+        prober = Prober(backend="subprocess", cache_ttl=60)
+        calls = []
+        prober._probe = lambda host, count, timeout: calls.append(count) or ProbeResult(
+            host=host, rtts=[1.0] * count
+        )
+        
+        prober.probe("10.0.0.1", count=1)
+        prober.probe("10.0.0.1", count=1)
+        prober.probe("10.0.0.1", count=5)
+        
+        assert calls == [1, 5]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,217 @@
+"""
+Unit Tests for Distributed Probing
+
+Tests the agent wire protocol and agent/collector delivery on localhost.
+"""
+
+import time
+from datetime import datetime
+import pytest
+from src.alerts.rules import RuleEngine
+from src.database.db_manager import DatabaseManager
+from src.remote.agent import ProbeAgent, parse_address
+from src.remote.collector import Collector
+from src.remote.protocol import (
+    FRAME_BATCH, STATUS_DNS_ERROR, STATUS_NO_REPLY, Batch, Measurement, ProtocolError,
+    decode_batch, encode_batch
+)
+
+
+class FrameSocket:
+    """Socket stand-in replaying bytes for read_frame."""
+    
+    def __init__(self, data: bytes):
+        self.data = data
+    
+    def recv(self, size: int) -> bytes:
+        chunk, self.data = self.data[:size], self.data[size:]
+        return chunk
+
+
+def sample(target="lo", offset=0, **kwargs) -> Measurement:
+    values = dict(latency_ms=1.5 + offset, packet_loss_pct=0.0, jitter_ms=0.25, sent=10, received=10)
+    values.update(kwargs)
+    return Measurement(target, "127.0.0.1", datetime(2024, 1, 1, 12, 0, offset), **values)
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+class TestProtocol:
+    """Test suite for the wire protocol."""
+    
+    def test_batch_round_trip(self):
+        """Test that a batch decodes to the measurements sent."""
+        from src.remote.protocol import read_frame
+        
+        measurements = [
+            sample(),
+            sample("dns", 1, status=STATUS_DNS_ERROR, latency_ms=None, jitter_ms=None, dns_ms=None),
+            sample(offset=2, dns_ms=3.0),
+        ]
+        frame_type, payload = read_frame(FrameSocket(encode_batch("agent-1", 7, 42, measurements)))
+        batch = decode_batch(payload)
+        
+        assert frame_type == FRAME_BATCH
+        assert (batch.agent, batch.session, batch.sequence) == ("agent-1", 7, 42)
+        assert batch.measurements == measurements
+    
+    def test_large_batches_are_compressed(self):
+        """Test that repetitive batches shrink on the wire."""
+        from src.remote.protocol import RECORD, read_frame
+        
+        measurements = [sample() for _ in range(200)]
+        frame = encode_batch("agent-1", 1, 1, measurements)
+        assert len(frame) < len(measurements) * RECORD.size / 2
+        _, payload = read_frame(FrameSocket(frame))
+        assert decode_batch(payload).measurements == measurements
+    
+    def test_malformed_frames(self):
+        """Test that bad magic and truncated payloads are rejected."""
+        from src.remote.protocol import read_frame
+        
+        frame = encode_batch("agent-1", 1, 1, [sample()])
+        with pytest.raises(ProtocolError):
+            read_frame(FrameSocket(b"XX" + frame[2:]))
+        with pytest.raises(ProtocolError):
+            decode_batch(read_frame(FrameSocket(frame))[1][:-3])
+        with pytest.raises(ConnectionError):
+            read_frame(FrameSocket(frame[:-3]))
+    
+    def test_decompression_is_bounded(self):
+        """Test that a frame expanding past MAX_PAYLOAD is rejected."""
+        import zlib
+        from src.remote.protocol import FLAG_COMPRESSED, HEADER, MAGIC, MAX_PAYLOAD, VERSION, read_frame
+        
+        bomb = zlib.compress(b"\0" * (MAX_PAYLOAD + 1), 9)
+        frame = HEADER.pack(MAGIC, VERSION, FRAME_BATCH, FLAG_COMPRESSED, len(bomb)) + bomb
+        with pytest.raises(ProtocolError):
+            read_frame(FrameSocket(frame))
+        
+        truncated = zlib.compress(b"x" * 1000)[:-4]
+        frame = HEADER.pack(MAGIC, VERSION, FRAME_BATCH, FLAG_COMPRESSED, len(truncated)) + truncated
+        with pytest.raises(ProtocolError):
+            read_frame(FrameSocket(frame))
+    
+    def test_parse_address(self):
+        """Test collector address parsing."""
+        assert parse_address("collector:9000") == ("collector", 9000)
+        assert parse_address("collector") == ("collector", 7400)
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "collector.db"))
+    yield manager
+    manager.close()
+
+
+class TestCollector:
+    """Test suite for Collector class."""
+    
+    def test_ingest_and_duplicates(self, db):
+        """Test that a resent batch is acked but stored only once."""
+        collector = Collector(db)
+        batch = Batch("agent-1", 5, 1, [sample(), sample(offset=1, dns_ms=2.0)])
+        
+        assert collector.ingest(batch)
+        assert collector.ingest(batch)
+        assert collector.stats["duplicates"] == 1
+        
+        rows = db.get_metrics("agent-1/lo", "latency", start_time=datetime(2024, 1, 1))
+        assert [row["value"] for row in rows] == pytest.approx([1.5, 2.5])
+        assert len(db.get_metrics("agent-1/lo", "dns_time", start_time=datetime(2024, 1, 1))) == 1
+        
+        # A restarted agent (new session) starts its sequence again
+        assert collector.ingest(Batch("agent-1", 6, 1, [sample(offset=2)]))
+        assert collector.stats["batches"] == 2
+    
+    def test_ack_after_commit(self, db):
+        """Test that acked batches are committed, not only buffered."""
+        db.start_writer(flush_interval=60)
+        collector = Collector(db)
+        
+        assert collector.ingest(Batch("agent-1", 5, 1, [sample()]))
+        assert db.writer.pending() == 0
+        assert db.get_metrics("agent-1/lo", "latency", start_time=datetime(2024, 1, 1))
+    
+    
+    def test_no_reply_is_stored_as_loss(self, db):
+        """Test that an unanswered probe stores and alerts on 100% loss."""
+        alerts = []
+        
+        class Alerts:
+            def trigger_alert(self, **alert):
+                alerts.append(alert)
+        
+        collector = Collector(db, rules=RuleEngine(), alert_manager=Alerts())
+        outage = Measurement(
+            "lo", "127.0.0.1", datetime(2024, 1, 1, 12, 0, 5),
+            status=STATUS_NO_REPLY, packet_loss_pct=100.0, sent=10, dns_ms=3.0
+        )
+        assert collector.ingest(Batch("agent-1", 5, 1, [sample(), outage]))
+        
+        start = datetime(2024, 1, 1)
+        loss = db.get_metrics("agent-1/lo", "packet_loss", start_time=start)
+        assert [row["value"] for row in loss] == [0.0, 100.0]
+        assert len(db.get_metrics("agent-1/lo", "latency", start_time=start)) == 1
+        assert len(db.get_metrics("agent-1/lo", "dns_time", start_time=start)) == 1
+        assert [(a["target"], a["metric"], a["severity"]) for a in alerts] == [
+            ("agent-1/lo", "packet_loss", "CRITICAL")
+        ]
+
+
+class TestAgent:
+    """Test suite for ProbeAgent class."""
+    
+    def test_probes_reach_collector(self, db):
+        """Test that measurements of a live agent are stored centrally."""
+        collector = Collector(db, host="127.0.0.1", port=0)
+        collector.start()
+        agent = ProbeAgent(
+            collector.address, [("127.0.0.1", "lo")], agent_id="edge",
+            interval=0.5, probe_count=2, flush_interval=0.1
+        )
+        agent.start()
+        
+        try:
+            assert wait_for(lambda: collector.stats["measurements"] >= 2)
+        finally:
+            agent.stop()
+            collector.stop()
+        
+        assert agent.buffered() == 0
+        assert db.get_metrics("edge/lo", "packet_loss")
+    
+    def test_buffers_during_outage(self, db):
+        """Test that measurements survive a collector outage."""
+        collector = Collector(db, host="127.0.0.1", port=0)
+        collector.start()
+        address = collector.address
+        collector.stop()
+        
+        agent = ProbeAgent(address, [], agent_id="edge", batch_size=4, flush_interval=0.1, max_buffer=8)
+        agent.start()
+        try:
+            for offset in range(10):
+                agent.submit(sample(offset=offset))
+            assert wait_for(lambda: agent.stats["retries"] >= 1)
+            assert agent.buffered() == 8
+            assert agent.stats["dropped"] == 2
+            
+            collector = Collector(db, host=address[0], port=address[1])
+            collector.start()
+            assert wait_for(lambda: agent.buffered() == 0, timeout=20)
+        finally:
+            agent.stop()
+            collector.stop()
+        
+        rows = db.get_metrics("edge/lo", "latency", start_time=datetime(2024, 1, 1))
+        assert [row["value"] for row in rows] == pytest.approx([1.5 + i for i in range(2, 10)])
+        assert collector.stats["measurements"] == 8
@@ -0,0 +1,130 @@
+"""
+Unit Tests for DNS Resolution Cache
+
+Tests address caching, negative caching and background refresh.
+"""
+
+import socket
+import time
+from types import SimpleNamespace
+import pytest
+from src.core.probe import Prober, ProbeResult
+from src.core.resolver import DNSCache, ResolutionError
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Replace getaddrinfo with a counting fake resolver."""
+    fake = SimpleNamespace(calls=[], answers={"db.example": "10.0.0.5"})
+    
+    def getaddrinfo(host, port, family=0, type=0, *args):
+        fake.calls.append(host)
+        if host not in fake.answers:
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return [(family, type, 0, "", (fake.answers[host], 0))]
+    
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    return fake
+
+
+class TestDNSCache:
+    """Test suite for DNSCache class."""
+    
+    def test_ip_literal_passthrough(self, lookups):
+        """Test that IP addresses are not looked up."""
+        cache = DNSCache()
+        
+        assert cache.resolve("192.0.2.1") == ("192.0.2.1", None)
+        assert cache.resolve("::1") == ("::1", None)
+        assert lookups.calls == []
+    
+    def test_cached_address(self, lookups):
+        """Test that the lookup time is reported once and then cached."""
+        cache = DNSCache(ttl=60)
+        
+        address, lookup_ms = cache.resolve("db.example")
+        assert address == "10.0.0.5"
+        assert lookup_ms is not None and lookup_ms >= 0
+        
+        assert cache.resolve("db.example") == ("10.0.0.5", None)
+        assert lookups.calls == ["db.example"]
+        assert cache.stats["hits"] == 1
+    
+    def test_negative_caching(self, lookups):
+        """Test that failed lookups raise and are remembered."""
+        cache = DNSCache(negative_ttl=60)
+        
+        for _ in range(3):
+            with pytest.raises(ResolutionError):
+                cache.resolve("missing.example")
+        
+        assert lookups.calls == ["missing.example"]
+        assert cache.stats["failures"] == 1
+    
+    def test_background_refresh(self, lookups):
+        """Test that entries near expiry are refreshed without blocking."""
+        cache = DNSCache(ttl=0.2, refresh_ahead=0.1)
+        cache.resolve("db.example")
+        lookups.answers["db.example"] = "10.0.0.6"
+        time.sleep(0.05)
+        
+        # Stale address served while the refresh runs
+        assert cache.resolve("db.example")[0] == "10.0.0.5"
+        
+        deadline = time.monotonic() + 2
+        while cache.stats["refreshes"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        address, lookup_ms = cache.resolve("db.example")
+        assert address == "10.0.0.6"
+        assert lookup_ms is not None
+    
+    def test_refresh_failure_keeps_address(self, lookups):
+        """Test that a failed refresh keeps serving the last address."""
+        cache = DNSCache(ttl=10, refresh_ahead=0.0)
+        cache.resolve("db.example")
+        del lookups.answers["db.example"]
+        
+        cache.resolve("db.example")
+        deadline = time.monotonic() + 2
+        while cache.stats["refreshes"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        
+        assert cache.resolve("db.example")[0] == "10.0.0.5"
+    
+    def test_localhost(self):
+        """Test resolving localhost with the system resolver."""
+        address, _ = DNSCache().resolve("localhost")
+        
+        assert address.startswith("127.")
+
+
+class TestProberResolution:
+    """Test suite for resolution inside the prober."""
+    
+    def test_probe_uses_cached_address(self, lookups):
+        """Test that probes target the resolved address."""
+        prober = Prober(backend="subprocess", cache_ttl=0)
+        probed = []
+        prober._probe = lambda host, count, timeout: probed.append(host) or ProbeResult(
+            host=host, rtts=[1.0]
+        )
+        
+        first = prober.probe("db.example")
+        second = prober.probe("db.example")
+        
+        assert probed == ["10.0.0.5", "10.0.0.5"]
+        assert first.host == "db.example"
+        assert first.dns_ms is not None
+        assert second.dns_ms is None
+    
+    def test_unresolvable_host_is_not_loss(self, lookups):
+        """Test that resolution failures raise instead of probing."""
+        prober = Prober(backend="subprocess")
+        prober._probe = lambda *args: pytest.fail("probe sent for unresolved host")
+        
+        with pytest.raises(ResolutionError):
+            prober.probe("missing.example")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,85 @@
+"""
+Unit Tests for Rolling Statistics
+
+Tests the incremental window statistics against full recomputation.
+"""
+
+import random
+import statistics
+import pytest
+from src.core.latency import LatencyAnalyzer
+from src.utils.rolling import RollingMedian, RollingMoments
+
+
+@pytest.mark.parametrize("window", [1, 2, 7, 50])
+def test_rolling_window_matches_recompute(window):
+    """Test median, mean and stddev over a sliding window."""
+    rng = random.Random(window)
+    # Rounded values produce many duplicates for the lazy deletion path
+    values = [round(rng.expovariate(0.1), 1) for _ in range(2000)]
+    median = RollingMedian()
+    moments = RollingMoments()
+    
+    for i, value in enumerate(values):
+        if i >= window:
+            median.remove(values[i - window])
+            moments.remove(values[i - window])
+        median.add(value)
+        moments.add(value)
+        
+        current = values[max(0, i - window + 1):i + 1]
+        assert median.median() == statistics.median(current)
+        assert moments.mean == pytest.approx(statistics.mean(current))
+        if len(current) > 1:
+            assert moments.variance == pytest.approx(statistics.variance(current), abs=1e-9)
+
+
+def test_analyzer_matches_list_implementation():
+    """Test the ring-buffer analyzer against list-based recomputation."""
+    rng = random.Random(1)
+    analyzer = LatencyAnalyzer(baseline_samples=30, capacity=60)
+    history = []
+    
+    for _ in range(500):
+        latency = rng.uniform(5, 50)
+        analyzer.add_measurement(latency)
+        history.append(latency)
+        baseline = history[-30:]
+        
+        assert analyzer.measurements == history[-60:]
+        if len(history) < 40:
+            continue
+        assert analyzer.get_baseline() == statistics.median(baseline)
+        assert analyzer.get_stddev() == pytest.approx(statistics.stdev(baseline))
+        
+        recent = history[-40:]
+        first = statistics.mean(recent[:20])
+        second = statistics.mean(recent[20:])
+        change = (second - first) / first * 100
+        expected = "increasing" if change > 10 else "decreasing" if change < -10 else "stable"
+        assert analyzer.get_trend(window_size=40) == expected
+
+
+def test_analyzer_trend_window_limited_by_capacity():
+    """Test that trend windows larger than the buffer report insufficient data."""
+    analyzer = LatencyAnalyzer(baseline_samples=10, capacity=20)
+    for _ in range(100):
+        analyzer.add_measurement(10.0)
+    
+    assert len(analyzer.measurements) == 20
+    assert analyzer.get_trend(window_size=20) == "stable"
+    assert analyzer.get_trend(window_size=21) == "insufficient_data"
+
+
+def test_analyzer_stddev_floor_is_opt_in():
+    """Test that small baseline deviations are only floored on request."""
+    default = LatencyAnalyzer(baseline_samples=10)
+    floored = LatencyAnalyzer(baseline_samples=10, min_stddev_ms=1.0)
+    for i in range(10):
+        default.add_measurement(10.0 + (i % 2) * 0.1)
+        floored.add_measurement(10.0 + (i % 2) * 0.1)
+    
+    assert default.get_stddev() < 0.1
+    assert floored.get_stddev() == 1.0
+    assert default.detect_anomaly(10.5)
+    assert not floored.detect_anomaly(10.5)
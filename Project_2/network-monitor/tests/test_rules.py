@@ -0,0 +1,130 @@
+"""
+Unit Tests for the Threshold Rule Engine
+
+Tests compiled threshold, hysteresis, N-of-M and rate-of-change rules,
+and alerts raised by the monitor for bursts without replies.
+"""
+
+from datetime import datetime
+import yaml
+import pytest
+from src.alerts.rules import RuleEngine
+from src.core.monitor import NetworkMetrics
+from src.core.probe import ProbeResult
+
+
+def sample(latency=10.0, loss=0.0, jitter=0.0, target="a"):
+    return NetworkMetrics(datetime.now(), target, latency, loss, jitter)
+
+
+def severities(engine, metrics):
+    return [(event.metric, event.severity) for event in engine.evaluate(metrics)]
+
+
+class TestRuleEngine:
+    """Test suite for RuleEngine."""
+    
+    def test_default_thresholds(self):
+        """Test the built-in latency and packet loss thresholds."""
+        engine = RuleEngine()
+        
+        assert severities(engine, sample(latency=50)) == []
+        assert severities(engine, sample(latency=150)) == [("latency", "WARNING")]
+        assert severities(engine, sample(latency=250, loss=2.0)) == [
+            ("latency", "CRITICAL"), ("packet_loss", "WARNING")
+        ]
+        
+        event = engine.evaluate(sample(latency=120.5))[0]
+        assert event.message == "a: Latency 120.50ms exceeds warning threshold"
+    
+    def test_overrides_and_jitter(self):
+        """Test per-target overrides and jitter thresholds."""
+        engine = RuleEngine({
+            "jitter_warning": 10.0,
+            "overrides": {"b": {"latency_warning": 20, "jitter_warning": None}},
+        })
+        
+        assert severities(engine, sample(latency=30, jitter=15)) == [("jitter", "WARNING")]
+        assert severities(engine, sample(latency=30, jitter=15, target="b")) == [
+            ("latency", "WARNING")
+        ]
+    
+    def test_hysteresis(self):
+        """Test that an active level clears only below its clear level."""
+        engine = RuleEngine({"hysteresis": 0.1})
+        
+        assert severities(engine, sample(latency=95)) == []
+        assert severities(engine, sample(latency=105)) == [("latency", "WARNING")]
+        assert severities(engine, sample(latency=95)) == [("latency", "WARNING")]
+        assert severities(engine, sample(latency=89)) == []
+        assert severities(engine, sample(latency=95)) == []
+    
+    def test_n_of_m(self):
+        """Test that levels fire only after N breaches in the last M samples."""
+        engine = RuleEngine({"consecutive": {"breaches": 2, "window": 3}})
+        
+        results = [
+            severities(engine, sample(latency=latency))
+            for latency in (150, 10, 10, 150, 10, 250, 250)
+        ]
+        
+        assert results == [
+            [], [], [], [], [],
+            [("latency", "WARNING")],
+            [("latency", "CRITICAL")],
+        ]
+    
+    def test_rate_of_change(self):
+        """Test alerts on a fast rise between consecutive samples."""
+        engine = RuleEngine({"rate_of_change": {"latency": 20}})
+        
+        assert severities(engine, sample(latency=10)) == []
+        assert severities(engine, sample(latency=25)) == []
+        assert severities(engine, sample(latency=60)) == [("latency_rate", "WARNING")]
+        assert severities(engine, sample(latency=60, target="b")) == []
+    
+    def test_unmeasured_metrics_are_skipped(self):
+        """Test that a sample without latency only checks packet loss."""
+        engine = RuleEngine({"rate_of_change": {"latency": 20}, "jitter_warning": 5.0})
+        
+        assert severities(engine, sample(latency=10)) == []
+        assert severities(engine, sample(latency=None, loss=100.0, jitter=None)) == [
+            ("packet_loss", "CRITICAL")
+        ]
+        assert severities(engine, sample(latency=20)) == []
+    
+    def test_unknown_metric_rejected(self):
+        """Test that a rate rule on an unknown metric fails at compile time."""
+        engine = RuleEngine({"rate_of_change": {"throughput": 5}})
+        with pytest.raises(KeyError):
+            engine.evaluate(sample())
+
+
+def test_monitor_alerts_on_total_loss(tmp_path):
+    """Test that a burst without replies is stored and alerts as 100% loss."""
+    from src.core.monitor import NetworkMonitor
+    
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump({
+        "monitoring": {"targets": [{"host": "127.0.0.1", "name": "lo"}]},
+        "database": {"path": str(tmp_path / "metrics.db")},
+    }))
+    monitor = NetworkMonitor(str(path))
+    alerts = []
+    monitor.alert_manager.trigger_alert = lambda **alert: alerts.append(alert)
+    
+    try:
+        result = ProbeResult(host="127.0.0.1", rtts=[None, None, None])
+        assert monitor._record_probe(monitor.targets[0], result, 12.0) is None
+        monitor.db_manager.flush(timeout=5)
+        
+        assert [row["value"] for row in monitor.db_manager.get_metrics("lo", "packet_loss")] == [100.0]
+        assert monitor.db_manager.get_metrics("lo", "latency") == []
+        assert [(a["metric"], a["severity"]) for a in alerts] == [("packet_loss", "CRITICAL")]
+        
+        # Nothing sent is a failed measurement, not loss
+        assert monitor._record_probe(monitor.targets[0], ProbeResult(host="h", rtts=[]), None) is None
+        monitor.db_manager.flush(timeout=5)
+        assert len(monitor.db_manager.get_metrics("lo", "packet_loss")) == 1
+    finally:
+        monitor.db_manager.close()
@@ -0,0 +1,164 @@
+"""
+Unit Tests for the Asynchronous Scheduler
+
+Tests bounded probe concurrency, live target changes and shutdown of
+AsyncScheduler, with a prober that answers without the network.
+"""
+
+import asyncio
+import threading
+import time
+import yaml
+import pytest
+from src.core.monitor import MonitorTarget, NetworkMonitor
+from src.core.probe import ProbeResult
+from src.core.resolver import ResolutionError
+from src.core.scheduler import AsyncScheduler
+
+
+class FakeProber:
+    """Prober stand-in answering every probe after a delay."""
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.probed = {}
+        self.closed = False
+    
+    async def probe_async(self, host, count=1):
+        if host == "unresolvable":
+            raise ResolutionError(f"Cannot resolve {host}")
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        self.probed[host] = self.probed.get(host, 0) + 1
+        return ProbeResult(host=host, rtts=[1.0] * count)
+    
+    def close(self):
+        self.closed = True
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+@pytest.fixture
+def make_monitor(tmp_path):
+    monitors = []
+    
+    def make(hosts, delay=0.05):
+        path = tmp_path / f"config-{len(monitors)}.yaml"
+        path.write_text(yaml.safe_dump({
+            "monitoring": {"targets": [{"host": host, "name": host} for host in hosts]},
+            "database": {"path": str(tmp_path / f"metrics-{len(monitors)}.db")},
+            "anomaly_detection": {"enabled": False},
+        }))
+        monitor = NetworkMonitor(str(path))
+        monitor.interval = 0.2
+        monitor.prober = FakeProber(delay)
+        monitors.append(monitor)
+        return monitor
+    
+    yield make
+    for monitor in monitors:
+        monitor.db_manager.close()
+
+
+def start(scheduler):
+    thread = threading.Thread(target=asyncio.run, args=(scheduler.run(),), daemon=True)
+    thread.start()
+    assert wait_for(lambda: scheduler.loop is not None)
+    return thread
+
+
+class TestAsyncScheduler:
+    """Test suite for AsyncScheduler class."""
+    
+    def test_concurrency_is_bounded(self, make_monitor):
+        """Test that no more than max_concurrency probes are in flight."""
+        monitor = make_monitor([f"host-{i}" for i in range(10)], delay=0.3)
+        prober = monitor.prober
+        scheduler = AsyncScheduler(monitor, max_concurrency=3)
+        thread = start(scheduler)
+        
+        try:
+            assert wait_for(lambda: sum(prober.probed.values()) >= 15)
+        finally:
+            scheduler.stop()
+            thread.join(timeout=10)
+        
+        assert prober.max_active == 3
+        monitor.db_manager.flush(timeout=5)
+        assert monitor.db_manager.get_metrics("host-0", "latency")
+    
+    def test_targets_change_while_running(self, make_monitor):
+        """Test add_target and remove_target from another thread."""
+        monitor = make_monitor(["a"])
+        prober = monitor.prober
+        scheduler = AsyncScheduler(monitor)
+        thread = start(scheduler)
+        
+        try:
+            assert wait_for(lambda: prober.probed.get("a", 0) >= 2)
+            
+            scheduler.add_target(MonitorTarget("b", "b"))
+            scheduler.add_target(MonitorTarget("b", "b"))      # already running
+            assert wait_for(lambda: prober.probed.get("b", 0) >= 2)
+            assert sorted(scheduler._tasks) == ["a", "b"]
+            
+            scheduler.remove_target("a")
+            assert wait_for(lambda: list(scheduler._tasks) == ["b"])
+            removed = prober.probed["a"]
+            probed_b = prober.probed["b"]
+            assert wait_for(lambda: prober.probed["b"] >= probed_b + 3)
+            assert prober.probed["a"] == removed
+        finally:
+            scheduler.stop()
+            thread.join(timeout=10)
+    
+    def test_resolution_failure_alerts(self, make_monitor):
+        """Test that an unresolvable host raises a DNS alert and keeps running."""
+        monitor = make_monitor(["unresolvable"])
+        alerts = []
+        monitor.alert_manager.trigger_alert = lambda **alert: alerts.append(alert)
+        scheduler = AsyncScheduler(monitor)
+        thread = start(scheduler)
+        
+        try:
+            assert wait_for(lambda: len(alerts) >= 2)
+        finally:
+            scheduler.stop()
+            thread.join(timeout=10)
+        
+        assert {alert["metric"] for alert in alerts} == {"dns"}
+    
+    def test_stop_cancels_probes_in_flight(self, make_monitor):
+        """Test that stop() returns promptly and releases all resources."""
+        monitor = make_monitor(["a", "b"], delay=30)
+        prober = monitor.prober
+        scheduler = AsyncScheduler(monitor)
+        thread = start(scheduler)
+        assert wait_for(lambda: prober.active == 2)
+        
+        started = time.monotonic()
+        scheduler.stop()
+        thread.join(timeout=10)
+        
+        assert not thread.is_alive()
+        assert time.monotonic() - started < 5
+        assert prober.active == 0
+        assert prober.closed
+        assert scheduler._tasks == {}
+        
+        # Targets added after stopping are ignored
+        scheduler.add_target(MonitorTarget("c", "c"))
+        assert scheduler._tasks == {}
@@ -0,0 +1,113 @@
+"""
+Unit Tests for Sharded Monitoring
+
+Tests target partitioning and the worker process / aggregator pipeline.
+"""
+
+import threading
+import time
+import yaml
+import pytest
+from src.core.sharding import ShardedScheduler, shard_for
+
+
+class TestShardFor:
+    """Test suite for shard_for function."""
+    
+    def test_stable_and_in_range(self):
+        """Test that a target always maps to the same valid shard."""
+        for name in ["lo", "Google DNS", "host-17", ""]:
+            shard = shard_for(name, 4)
+            assert 0 <= shard < 4
+            assert shard_for(name, 4) == shard
+    
+    def test_distribution(self):
+        """Test that many targets are spread over all shards."""
+        counts = [0] * 4
+        for i in range(1000):
+            counts[shard_for(f"target-{i}", 4)] += 1
+        assert all(150 < count < 350 for count in counts)
+
+
+@pytest.fixture
+def monitor(tmp_path):
+    from src.core.monitor import NetworkMonitor
+    
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump({
+        "monitoring": {
+            "interval": 1,
+            "probe_count": 2,
+            "probe_interval": 0.05,
+            "targets": [
+                {"host": "127.0.0.1", "name": "lo"},
+                {"host": "127.0.0.2", "name": "lo2"},
+            ],
+        },
+        "database": {"path": str(tmp_path / "metrics.db"), "flush_interval": 0.1},
+        "anomaly_detection": {"enabled": False},
+    }))
+    monitor = NetworkMonitor(str(path))
+    yield monitor
+    monitor.db_manager.close()
+
+
+def test_workers_stream_results_to_aggregator(monitor):
+    """Test that results probed in worker processes are stored centrally."""
+    scheduler = ShardedScheduler(monitor, shards=2)
+    thread = threading.Thread(target=scheduler.run, daemon=True)
+    thread.start()
+    
+    try:
+        deadline = time.monotonic() + 30
+        while scheduler.stats["messages"] < 4 and time.monotonic() < deadline:
+            time.sleep(0.2)
+    finally:
+        scheduler.stop()
+        thread.join(timeout=15)
+    
+    assert not thread.is_alive()
+    assert scheduler.stats["messages"] >= 4
+    assert all(not process.is_alive() for process in scheduler._processes)
+    
+    monitor.db_manager.flush(timeout=5)
+    for name in ["lo", "lo2"]:
+        assert monitor.db_manager.get_metrics(name, "packet_loss")
+
+
+def test_crashed_worker_restarts_while_results_stream(monitor):
+    """Test that a dead shard is restarted even if the queue never idles."""
+    scheduler = ShardedScheduler(monitor, shards=2)
+    thread = threading.Thread(target=scheduler.run, daemon=True)
+    thread.start()
+    
+    streaming = threading.Event()
+    
+    def stream():
+        # Results of an unknown target, faster than the aggregator's get() timeout
+        while not streaming.is_set():
+            if scheduler._results is not None:
+                scheduler._results.put(("probe", "elsewhere", 0.0, 0, None, None, None))
+            time.sleep(0.05)
+    
+    feeder = threading.Thread(target=stream, daemon=True)
+    feeder.start()
+    
+    try:
+        deadline = time.monotonic() + 30
+        while len(scheduler._processes) < 2 and time.monotonic() < deadline:
+            time.sleep(0.1)
+        crashed = scheduler._processes[0]
+        crashed.kill()
+        crashed.join(timeout=5)
+        
+        while scheduler.stats["restarts"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.1)
+    finally:
+        streaming.set()
+        feeder.join(timeout=5)
+        scheduler.stop()
+        thread.join(timeout=15)
+    
+    assert scheduler.stats["restarts"] == 1
+    assert scheduler._processes[0] is not crashed
@@ -0,0 +1,90 @@
+"""
+Unit Tests for Quantile Sketches
+
+Tests DDSketch accuracy, merging, serialization and the SQLite functions.
+"""
+
+import random
+import sqlite3
+import pytest
+from src.utils.sketch import DDSketch, register_sketch_functions
+
+
+def exact_quantile(values, q):
+    """Nearest-rank quantile matching DDSketch's rank convention."""
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+class TestDDSketch:
+    """Test suite for DDSketch."""
+    
+    @pytest.mark.parametrize("q", [0.5, 0.95, 0.99, 0.999])
+    def test_relative_accuracy(self, q):
+        """Test that quantiles are within the configured relative error."""
+        rng = random.Random(7)
+        values = [rng.lognormvariate(3, 1) for _ in range(20000)]
+        sketch = DDSketch(relative_accuracy=0.01)
+        sketch.update(values)
+        
+        assert sketch.quantile(q) == pytest.approx(exact_quantile(values, q), rel=0.01)
+    
+    def test_merge_equals_single_sketch(self):
+        """Test that merged sketches match a sketch of all values."""
+        rng = random.Random(3)
+        values = [rng.uniform(1, 500) for _ in range(5000)]
+        whole = DDSketch()
+        whole.update(values)
+        
+        merged = DDSketch()
+        for start in range(0, len(values), 1000):
+            part = DDSketch()
+            part.update(values[start:start + 1000])
+            merged.merge(part)
+        
+        assert merged.count == whole.count
+        assert merged.bins == whole.bins
+    
+    def test_serialization_roundtrip(self):
+        """Test that to_bytes/from_bytes preserves the sketch."""
+        sketch = DDSketch()
+        sketch.update([0.0, 0.5, 12.0, 12.1, 250.0, 1e6])
+        
+        restored = DDSketch.from_bytes(sketch.to_bytes())
+        
+        assert restored.bins == sketch.bins
+        assert restored.zero_count == 1
+        assert restored.count == 6
+        assert restored.quantile(0.5) == sketch.quantile(0.5)
+    
+    def test_bin_limit(self):
+        """Test that collapsing keeps memory bounded and upper quantiles accurate."""
+        values = [1.001 ** i for i in range(20000)]
+        sketch = DDSketch(max_bins=128)
+        sketch.update(values)
+        
+        assert len(sketch.bins) <= 128
+        assert sketch.quantile(0.99) == pytest.approx(exact_quantile(values, 0.99), rel=0.01)
+    
+    def test_empty(self):
+        """Test that an empty sketch has no quantiles."""
+        assert DDSketch().quantile(0.5) is None
+
+
+def test_sql_functions():
+    """Test sketch_build, sketch_union and sketch_merge in SQLite."""
+    conn = sqlite3.connect(":memory:")
+    register_sketch_functions(conn)
+    conn.execute("CREATE TABLE t (grp INTEGER, value REAL)")
+    conn.executemany("INSERT INTO t VALUES (?, ?)", [(i % 4, float(i + 1)) for i in range(1000)])
+    
+    blob = conn.execute("""
+        SELECT sketch_union(s) FROM (SELECT sketch_build(value) AS s FROM t GROUP BY grp)
+    """).fetchone()[0]
+    assert DDSketch.from_bytes(blob).quantile(0.5) == pytest.approx(500, rel=0.01)
+    
+    left, right = conn.execute("SELECT sketch_build(value) FROM t GROUP BY grp < 2").fetchall()
+    merged = conn.execute("SELECT sketch_merge(?, ?)", (left[0], right[0])).fetchone()[0]
+    assert DDSketch.from_bytes(merged).count == 1000
+    assert conn.execute("SELECT sketch_merge(NULL, ?)", (left[0],)).fetchone()[0] == left[0]
+    conn.close()
@@ -0,0 +1,93 @@
+"""
+Unit Tests for Tick Scheduling
+
+Tests the drift-free tick grid, phase staggering and tick statistics.
+"""
+
+import pytest
+from src.core.ticker import TickSchedule, TickStats, stagger_phase
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+    
+    def __init__(self):
+        self.now = 100.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTickSchedule:
+    """Test suite for TickSchedule class."""
+    
+    def test_no_drift(self):
+        """Test that work time does not shift later ticks."""
+        clock = FakeClock()
+        schedule = TickSchedule(5.0, phase=1.0, clock=clock)
+        starts = []
+        
+        for _ in range(4):
+            clock.now += schedule.delay()
+            starts.append(clock.now)
+            assert schedule.tick() == (0.0, 0)
+            clock.now += 1.7  # Probe time
+        
+        assert starts == [101.0, 106.0, 111.0, 116.0]
+    
+    def test_overrun_skips_missed_ticks(self):
+        """Test that an overrunning tick skips slots and reports them."""
+        clock = FakeClock()
+        schedule = TickSchedule(5.0, clock=clock)
+        schedule.tick()
+        
+        clock.now += 12.5  # Slot 105 was missed, slot 110 runs late
+        lateness, missed = schedule.tick()
+        
+        assert missed == 1
+        assert lateness == pytest.approx(2.5)
+        assert schedule.next_tick == 115.0
+    
+    def test_period_change(self):
+        """Test that a new period applies from the current slot."""
+        clock = FakeClock()
+        schedule = TickSchedule(5.0, clock=clock)
+        
+        schedule.tick(period=2.0)
+        
+        assert schedule.delay() == 2.0
+
+
+class TestStagger:
+    """Test suite for phase staggering."""
+    
+    @pytest.mark.parametrize("count", [2, 10, 100])
+    def test_phases_spread_over_interval(self, count):
+        """Test that no two phases bunch together."""
+        phases = sorted(stagger_phase(i, 10.0) for i in range(count))
+        gaps = [b - a for a, b in zip(phases, phases[1:])]
+        
+        assert all(0 <= phase < 10.0 for phase in phases)
+        assert min(gaps) > 10.0 / count / 3
+
+
+class TestTickStats:
+    """Test suite for TickStats class."""
+    
+    def test_late_and_missed_counts(self):
+        """Test per-target counters."""
+        stats = TickStats(late_threshold=0.5)
+        
+        assert not stats.record("a", 0.1, 0)
+        assert stats.record("a", 0.8, 0)
+        assert stats.record("a", 0.0, 3)
+        
+        assert stats.snapshot()["a"] == {
+            "ticks": 3, "late": 1, "missed": 3, "max_lateness_ms": 800.0
+        }
+        stats.forget("a")
+        assert stats.snapshot() == {}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
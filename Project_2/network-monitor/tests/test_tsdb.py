@@ -0,0 +1,271 @@
+"""
+Unit Tests for the Block Storage Engine
+
+Tests block encoding, the block store and the tsdb engine of
+DatabaseManager.
+"""
+
+import random
+import statistics
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+from src.database.db_manager import DatabaseManager, to_epoch_ms
+from src.database.models import Metric
+from src.database.tsdb import HEAD_RECORD, BlockStore, decode_block, encode_block
+
+
+START_MS = 1_750_000_000_000
+
+
+class TestEncoding:
+    """Test suite for block encoding."""
+    
+    def test_round_trip(self):
+        """Test that irregular timestamps and quantized values survive."""
+        rng = np.random.default_rng(3)
+        timestamps = START_MS + np.cumsum(rng.integers(0, 10_000, 500))
+        timestamps[100] = timestamps[99]           # repeated timestamp
+        timestamps[200] += 10**9                    # huge gap
+        values = np.round(rng.normal(20, 5, 500), 3)
+        values[[10, 11]] = [0.0, 1e6]               # outlier escapes the Rice code
+        
+        stamps, decoded = decode_block(encode_block(timestamps, values), 500)
+        assert stamps.tolist() == timestamps.tolist()
+        assert decoded.tolist() == values.tolist()
+        
+        # Values are rounded to the requested precision
+        _, decoded = decode_block(encode_block(timestamps, values, precision=1), 500)
+        assert decoded.tolist() == np.round(values, 1).tolist()
+    
+    def test_raw_fallback_is_lossless(self):
+        """Test that blocks which cannot be quantized keep exact floats."""
+        rng = np.random.default_rng(4)
+        timestamps = START_MS + np.arange(100) * 5000
+        values = rng.normal(20, 5, 100)
+        
+        _, decoded = decode_block(encode_block(timestamps, values, precision=None), 100)
+        assert decoded.tobytes() == values.tobytes()
+        
+        values[[1, 2, 3]] = [np.nan, -0.0, np.inf]
+        _, decoded = decode_block(encode_block(timestamps, values), 100)
+        assert decoded.tobytes() == values.tobytes()
+    
+    def test_compressed_sizes(self):
+        """Test bytes per sample of stable and noisy series."""
+        rng = np.random.default_rng(1)
+        timestamps = START_MS + np.arange(1024) * 5000
+        jittered = timestamps + rng.integers(-3, 4, 1024)
+        loss = np.zeros(1024)
+        loss[::100] = 10.0
+        latency = np.round(rng.gamma(2, 10, 1024), 3)
+        
+        assert len(encode_block(timestamps, loss)) / 1024 < 0.5
+        assert len(encode_block(jittered, loss)) / 1024 < 1
+        assert len(encode_block(timestamps, latency)) / 1024 < 2.2
+        assert len(encode_block(jittered, latency)) / 1024 < 2.7
+        assert len(encode_block(timestamps, latency, precision=2)) / 1024 < 1.8
+
+
+def metrics(target, count, start=None, metric_type="latency", step=5):
+    start = start or datetime(2025, 6, 1, 12, 0)
+    return [
+        Metric(start + timedelta(seconds=i * step), target, metric_type, float(i % 7), "ms")
+        for i in range(count)
+    ]
+
+
+class TestBlockStore:
+    """Test suite for BlockStore class."""
+    
+    def test_seal_read_and_reopen(self, tmp_path):
+        """Test sealing into blocks, range reads and persistence."""
+        store = BlockStore(str(tmp_path / "tsdb"), block_size=100)
+        rows = metrics("edge/lo", 250)
+        rows[0].value = 1.23456                     # rounded to 3 places
+        assert store.append(rows) == 250
+        
+        stats = store.storage_stats()
+        assert (stats["samples"], stats["head_samples"]) == (200, 50)
+        
+        low, high = to_epoch_ms(rows[90].timestamp), to_epoch_ms(rows[210].timestamp)
+        stamps, values, unit = store.read("edge/lo", "latency", low, high)
+        assert unit == "ms"
+        assert stamps.tolist() == [to_epoch_ms(m.timestamp) for m in rows[90:211]]
+        assert values.tolist() == [m.value for m in rows[90:211]]
+        assert store.read("edge/lo", "latency", end_ms=low)[1][0] == 1.235
+        assert store.read("missing", "latency") is None
+        store.close()
+        
+        store = BlockStore(str(tmp_path / "tsdb"), block_size=100)
+        assert store.series() == [("edge/lo", "latency")]
+        stamps, values, _ = store.read("edge/lo", "latency")
+        assert values.tolist() == [1.235] + [m.value for m in rows[1:]]
+        store.close()
+    
+    def test_cached_blocks(self, tmp_path):
+        """Test that repeated scans reuse decoded blocks."""
+        store = BlockStore(str(tmp_path / "tsdb"), block_size=50)
+        store.append(metrics("a", 200))
+        store.read("a", "latency")
+        store.read("a", "latency")
+        assert store.stats["blocks_decoded"] == 4
+        assert store.stats["cache_hits"] == 4
+        store.close()
+    
+    def test_late_samples_are_ordered(self, tmp_path):
+        """Test that out-of-order appends are read back in time order."""
+        store = BlockStore(str(tmp_path / "tsdb"), block_size=10)
+        rows = metrics("a", 30)
+        random.Random(5).shuffle(rows)
+        store.append(rows[:20])
+        store.append(rows[20:])
+        
+        stamps, _, _ = store.read("a", "latency")
+        assert stamps.tolist() == sorted(to_epoch_ms(m.timestamp) for m in rows)
+        store.close()
+    
+    def test_head_recovery_after_seal(self, tmp_path):
+        """Test that samples sealed before a crash are not read twice."""
+        root = tmp_path / "tsdb"
+        store = BlockStore(str(root), block_size=10)
+        store.append(metrics("a", 8))
+        head = next(root.glob("*/latency.head"))
+        stale = head.read_bytes()
+        store.append(metrics("a", 5, start=datetime(2025, 6, 1, 13, 0)))
+        store.close()
+        
+        # Head as it was before sealing, plus the records appended after
+        appended = metrics("a", 5, start=datetime(2025, 6, 1, 13, 0))
+        head.write_bytes(stale + b"".join(
+            HEAD_RECORD.pack(to_epoch_ms(m.timestamp), m.value) for m in appended
+        ))
+        
+        store = BlockStore(str(root), block_size=10)
+        stamps, _, _ = store.read("a", "latency")
+        assert len(stamps) == 13
+        assert len(set(stamps.tolist())) == 13
+        store.close()
+    
+    def test_expire_whole_blocks(self, tmp_path):
+        """Test that retention drops blocks entirely before the cutoff."""
+        store = BlockStore(str(tmp_path / "tsdb"), block_size=10)
+        rows = metrics("a", 35)
+        store.append(rows)
+        cutoff = to_epoch_ms(rows[15].timestamp)
+        
+        assert store.count_expired(cutoff) == 10
+        archived = []
+        removed = store.expire(cutoff, 100, before_delete=lambda *args: archived.append(args))
+        assert removed == 10
+        assert archived[0][:3] == ("a", "latency", "ms")
+        assert len(archived[0][3]) == 10
+        
+        stamps, _, _ = store.read("a", "latency")
+        assert stamps.tolist() == [to_epoch_ms(m.timestamp) for m in rows[10:]]
+        store.close()
+    
+    def test_expired_blocks_are_compacted_lazily(self, tmp_path):
+        """Test that dropping a few blocks does not rewrite the block file."""
+        root = tmp_path / "tsdb"
+        store = BlockStore(str(root), block_size=10)
+        rows = metrics("a", 100)
+        store.append(rows)
+        blocks = next(root.glob("*/latency.blocks"))
+        size = blocks.stat().st_size
+        
+        assert store.expire(to_epoch_ms(rows[20].timestamp), 1000) == 20
+        assert store.stats["compactions"] == 0
+        assert blocks.stat().st_size == size
+        store.close()
+        
+        # The live offset survives a reopen, and later drops compact the file
+        store = BlockStore(str(root), block_size=10)
+        stamps, _, _ = store.read("a", "latency")
+        assert stamps.tolist() == [to_epoch_ms(m.timestamp) for m in rows[20:]]
+        assert store.expire(to_epoch_ms(rows[60].timestamp), 1000) == 40
+        assert store.stats["compactions"] == 1
+        assert blocks.stat().st_size < size / 2
+        
+        store.append(metrics("a", 10, start=datetime(2025, 6, 1, 13, 0)))
+        stamps, _, _ = store.read("a", "latency")
+        assert len(stamps) == 50
+        store.close()
+        
+        store = BlockStore(str(root), block_size=10)
+        assert len(store.read("a", "latency")[0]) == 50
+        store.close()
+    
+    def test_quiet_series_head_expires(self, tmp_path):
+        """Test that head samples of a series without new data expire."""
+        root = tmp_path / "tsdb"
+        store = BlockStore(str(root), block_size=10)
+        rows = metrics("gone", 25)
+        store.append(rows)
+        cutoff = to_epoch_ms(rows[-1].timestamp) + 1
+        
+        assert store.count_expired(cutoff) == 25
+        archived = []
+        assert store.expire(cutoff, 1000, before_delete=lambda *args: archived.append(args)) == 25
+        assert len(archived[0][3]) == 25
+        assert store.read("gone", "latency")[0].size == 0
+        store.close()
+        
+        store = BlockStore(str(root), block_size=10)
+        assert store.read("gone", "latency")[0].size == 0
+        store.close()
+
+
+class TestTsdbEngine:
+    """Test suite for DatabaseManager with engine="tsdb"."""
+    
+    @pytest.fixture
+    def db(self, tmp_path):
+        manager = DatabaseManager(str(tmp_path / "metrics.db"), engine="tsdb", tsdb_block_size=64)
+        yield manager
+        manager.close()
+    
+    def test_raw_reads(self, db):
+        """Test that raw reads come from the block store."""
+        rows = metrics("a", 150)
+        db.insert_metrics(rows)
+        
+        assert db.tsdb.storage_stats()["samples"] == 128
+        result = db.get_metrics("a", "latency", start_time=rows[10].timestamp)
+        assert [row["value"] for row in result] == [m.value for m in rows[10:]]
+        assert result[0]["unit"] == "ms"
+        
+        batches = list(db.iter_metric_batches("a", "latency", batch_size=100))
+        assert [len(values) for _, values in batches] == [100, 50]
+        timestamps, _ = db.get_metric_columns("a", "latency")
+        assert timestamps.astype(np.int64).tolist() == [to_epoch_ms(m.timestamp) for m in rows]
+        
+        with db.pool.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM metrics").fetchone()[0] == 0
+    
+    def test_statistics(self, db):
+        """Test that statistics combine rollups with raw block edges."""
+        rng = random.Random(11)
+        now = datetime.now()
+        rows, values = [], []
+        for i in range(1500):
+            timestamp = now - timedelta(seconds=i * 97)
+            value = round(rng.uniform(1, 100), 3)
+            rows.append(Metric(timestamp, "a", "latency", value, "ms"))
+            if timestamp >= now - timedelta(hours=24):
+                values.append(value)
+        db.insert_metrics(rows)
+        
+        stats = db.get_statistics("a")["latency"]
+        assert stats["samples"] == len(values)
+        assert stats["average"] == pytest.approx(statistics.mean(values))
+        assert stats["maximum"] == max(values)
+    
+    def test_retention(self, db):
+        """Test that cleanup removes expired blocks."""
+        old = metrics("a", 100, start=datetime.now() - timedelta(days=40))
+        db.insert_metrics(old + metrics("a", 10, start=datetime.now()))
+        
+        # One sealed block plus the 36 old samples still in the head
+        assert db.cleanup_old_data(retention_days=30)["metrics"] == 100
+        assert len(db.get_metrics("a", "latency")) == 10